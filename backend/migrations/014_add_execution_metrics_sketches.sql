@@ -0,0 +1,20 @@
+-- Migration: Add persisted duration sketches for O(1) percentile queries
+
+CREATE TABLE IF NOT EXISTS execution_metrics_sketches (
+    id TEXT PRIMARY KEY,
+    project_id TEXT NOT NULL,
+    command TEXT NOT NULL DEFAULT '',
+    model_used TEXT NOT NULL DEFAULT 'unknown',
+    bucket_date DATE NOT NULL,
+
+    -- Serialized DDSketch (JSON)
+    sketch TEXT NOT NULL,
+    sample_count INTEGER DEFAULT 0,
+
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT uq_execution_metrics_sketch UNIQUE (project_id, command, model_used, bucket_date)
+);
+
+CREATE INDEX IF NOT EXISTS ix_execution_metrics_sketches_project_id
+    ON execution_metrics_sketches(project_id);
@@ -0,0 +1,16 @@
+-- Migration: Turn project_metrics into time-bucket rollups
+-- Description: Each row is one (granularity, bucket_start, command, model_used) bucket,
+-- filled incrementally by MetricsCollector and compacted hour -> day -> week.
+
+ALTER TABLE project_metrics ADD COLUMN granularity TEXT DEFAULT 'hour';
+ALTER TABLE project_metrics ADD COLUMN bucket_start TIMESTAMP;
+ALTER TABLE project_metrics ADD COLUMN command TEXT DEFAULT '';
+ALTER TABLE project_metrics ADD COLUMN model_used TEXT DEFAULT 'unknown';
+ALTER TABLE project_metrics ADD COLUMN execution_count INTEGER DEFAULT 0;
+ALTER TABLE project_metrics ADD COLUMN successful_executions INTEGER DEFAULT 0;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_project_metrics_bucket
+    ON project_metrics(project_id, granularity, bucket_start, command, model_used);
+
+CREATE INDEX IF NOT EXISTS idx_project_metrics_project_bucket
+    ON project_metrics(project_id, bucket_start);
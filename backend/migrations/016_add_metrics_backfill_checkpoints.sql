@@ -0,0 +1,14 @@
+-- Migration: Checkpoints for resumable set-based metrics backfill
+
+CREATE TABLE IF NOT EXISTS metrics_backfill_checkpoints (
+    project_id TEXT PRIMARY KEY,
+    last_rowid INTEGER NOT NULL DEFAULT 0,
+    inserted_count INTEGER DEFAULT 0,
+    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+
+-- Anti-join lookup used by the backfill (NOT EXISTS on execution_id)
+CREATE INDEX IF NOT EXISTS ix_execution_metrics_execution_id
+    ON execution_metrics(execution_id);
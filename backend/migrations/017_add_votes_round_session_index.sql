@@ -0,0 +1,15 @@
+-- Migration: One project vote per session per round
+-- Batched vote ingestion inserts with OR IGNORE and counts only inserted rows,
+-- so duplicates accepted by different workers are discarded here.
+
+DELETE FROM votes
+WHERE vote_type = 'project'
+  AND id NOT IN (
+      SELECT MIN(id) FROM votes
+      WHERE vote_type = 'project'
+      GROUP BY voting_round_id, session_id
+  );
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_votes_round_session
+    ON votes(voting_round_id, session_id)
+    WHERE vote_type = 'project';
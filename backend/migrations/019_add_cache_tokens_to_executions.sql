@@ -0,0 +1,6 @@
+-- Migration: Track prompt cache tokens per execution
+-- ResultMessage.usage reports cache reads/writes separately from input_tokens;
+-- stages that share a stable prompt prefix should show growing cache reads.
+
+ALTER TABLE executions ADD COLUMN cache_read_tokens INTEGER;
+ALTER TABLE executions ADD COLUMN cache_write_tokens INTEGER;
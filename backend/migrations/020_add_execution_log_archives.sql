@@ -0,0 +1,14 @@
+-- Migration: Compressed cold storage for finished execution logs
+-- Logs of executions finished for longer than execution_log_archive_after_hours
+-- are packed into one compressed blob per execution (blocks of lines with a
+-- sequence index) and their execution_logs rows are deleted.
+
+CREATE TABLE IF NOT EXISTS execution_log_archives (
+    execution_id VARCHAR NOT NULL PRIMARY KEY REFERENCES executions(id),
+    codec VARCHAR NOT NULL,
+    line_count INTEGER NOT NULL,
+    raw_bytes INTEGER NOT NULL,
+    seq_index JSON NOT NULL,
+    data BLOB NOT NULL,
+    archived_at DATETIME
+);
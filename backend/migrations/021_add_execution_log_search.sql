@@ -0,0 +1,44 @@
+-- Migration: Full-text search over execution logs (SQLite FTS5)
+-- Contentless FTS5 index: the text stays in execution_logs / execution_log_archives
+-- and only the terms are indexed, so archived logs remain searchable.
+-- execution_log_search_rows maps each index rowid back to its log line.
+
+CREATE VIRTUAL TABLE IF NOT EXISTS execution_logs_fts
+    USING fts5(content, content='', tokenize='unicode61 remove_diacritics 2');
+
+CREATE TABLE IF NOT EXISTS execution_log_search_rows (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    execution_id VARCHAR NOT NULL,
+    sequence INTEGER NOT NULL,
+    type VARCHAR,
+    timestamp DATETIME
+);
+
+CREATE INDEX IF NOT EXISTS idx_log_search_rows_execution
+    ON execution_log_search_rows(execution_id, sequence);
+
+-- Backfill of the existing hot rows, oldest first (rowid order = time order)
+INSERT INTO execution_log_search_rows (execution_id, sequence, type, timestamp)
+SELECT execution_id, sequence, type, timestamp
+FROM execution_logs
+ORDER BY timestamp, execution_id, sequence;
+
+INSERT INTO execution_logs_fts (rowid, content)
+SELECT r.id, l.content
+FROM execution_log_search_rows r
+JOIN execution_logs l ON l.execution_id = r.execution_id AND l.sequence = r.sequence;
+
+CREATE TRIGGER IF NOT EXISTS execution_logs_fts_insert AFTER INSERT ON execution_logs
+BEGIN
+    INSERT INTO execution_log_search_rows (execution_id, sequence, type, timestamp)
+    VALUES (new.execution_id, new.sequence, new.type, new.timestamp);
+    INSERT INTO execution_logs_fts (rowid, content) VALUES (last_insert_rowid(), new.content);
+END;
+
+-- Only the mapping is removed here: a contentless index needs the original text
+-- to drop terms, so LogSearchService.remove_executions does it before a card is
+-- deleted and the log_search_reindex job rebuilds the index if terms are orphaned.
+CREATE TRIGGER IF NOT EXISTS executions_log_search_delete AFTER DELETE ON executions
+BEGIN
+    DELETE FROM execution_log_search_rows WHERE execution_id = old.id;
+END;
@@ -0,0 +1,39 @@
+-- Migration: Server-side card search (SQLite FTS5 on title, description, spec_path)
+-- card_search_rows gives every card a stable integer rowid for the index
+-- (the implicit rowid of cards may change on VACUUM).
+
+CREATE VIRTUAL TABLE IF NOT EXISTS cards_fts
+    USING fts5(title, description, spec_path, tokenize='unicode61 remove_diacritics 2');
+
+CREATE TABLE IF NOT EXISTS card_search_rows (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    card_id VARCHAR(36) NOT NULL UNIQUE
+);
+
+-- Backfill
+INSERT OR IGNORE INTO card_search_rows (card_id) SELECT id FROM cards ORDER BY created_at;
+
+INSERT INTO cards_fts (rowid, title, description, spec_path)
+SELECT r.id, c.title, c.description, c.spec_path
+FROM card_search_rows r
+JOIN cards c ON c.id = r.card_id;
+
+CREATE TRIGGER IF NOT EXISTS cards_fts_insert AFTER INSERT ON cards
+BEGIN
+    INSERT INTO card_search_rows (card_id) VALUES (new.id);
+    INSERT INTO cards_fts (rowid, title, description, spec_path)
+    VALUES (last_insert_rowid(), new.title, new.description, new.spec_path);
+END;
+
+CREATE TRIGGER IF NOT EXISTS cards_fts_update AFTER UPDATE OF title, description, spec_path ON cards
+BEGIN
+    DELETE FROM cards_fts WHERE rowid = (SELECT id FROM card_search_rows WHERE card_id = old.id);
+    INSERT INTO cards_fts (rowid, title, description, spec_path)
+    SELECT id, new.title, new.description, new.spec_path FROM card_search_rows WHERE card_id = new.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS cards_fts_delete AFTER DELETE ON cards
+BEGIN
+    DELETE FROM cards_fts WHERE rowid = (SELECT id FROM card_search_rows WHERE card_id = old.id);
+    DELETE FROM card_search_rows WHERE card_id = old.id;
+END;
@@ -0,0 +1,8 @@
+-- Migration: Indexes for orchestrator short-term memory retention
+-- Recent context reads the newest rows (per goal) and the retention job
+-- deletes by expires_at and by rank inside each goal, in batches.
+
+CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON orchestrator_logs(timestamp);
+CREATE INDEX IF NOT EXISTS idx_logs_expires_at ON orchestrator_logs(expires_at);
+CREATE INDEX IF NOT EXISTS idx_logs_goal_timestamp ON orchestrator_logs(goal_id, timestamp);
+DROP INDEX IF EXISTS idx_logs_goal_id;
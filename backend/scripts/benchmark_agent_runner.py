@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Offline throughput benchmark of the workflow stage pipeline.
+
+Runs executions the way the stages do (create the execution, stream the
+agent through ``run_stream``, record token usage, close the execution) with
+the fake agent backend, against a temporary SQLite database. No network,
+Claude SDK session or Gemini CLI is needed, so it can run in CI.
+
+Reports executions/min, log lines/s and DB writes/s (INSERT/UPDATE/DELETE
+statements) for the given concurrency. The stream is the built-in fake
+script unless ``--script`` points to a recorded JSONL stream (see
+``RecordingRunner``); ``--speed 0`` replays without the recorded delays, so
+the numbers measure the pipeline itself.
+
+Uso (a partir de backend/):
+    python scripts/benchmark_agent_runner.py --executions 200 --concurrency 8 --speed 0
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import event, func, select  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+
+from src.agent import run_stream  # noqa: E402
+from src.database import Base  # noqa: E402
+from src.execution import ExecutionRecord, ExecutionStatus  # noqa: E402
+from src.models.card import Card  # noqa: E402
+from src.models.execution import Execution, ExecutionLog  # noqa: E402
+from src.models.execution import ExecutionStatus as DBExecutionStatus  # noqa: E402
+from src.repositories.execution_repository import ExecutionRepository  # noqa: E402
+from src.services.agent_runner import FakeRunner, RunRequest, load_script  # noqa: E402
+
+
+async def make_database(path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _pragmas(dbapi_conn, _):
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+    async with engine.begin() as conn:
+        await conn.run_sync(
+            Base.metadata.create_all,
+            tables=[Card.__table__, Execution.__table__, ExecutionLog.__table__],
+        )
+    writes = [0]
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _count_write(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip()[:6].upper() in ("INSERT", "UPDATE", "DELETE"):
+            writes[0] += 1
+
+    return engine, async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False), writes
+
+
+async def run_execution(sessions, runner, n):
+    """One stage execution, as in execute_implement (without worktree setup)."""
+    card_id = f"card-{n}"
+    async with sessions() as db:
+        db.add(Card(id=card_id, title=f"Card {n}", column_id="implement"))
+        await db.commit()
+
+        repo = ExecutionRepository(db)
+        execution_db = await repo.create_execution(card_id=card_id, command="/implement", title=f"Card {n}")
+        await repo.add_log(execution_id=execution_db.id, log_type="info", content="Starting implementation")
+        record = ExecutionRecord(
+            cardId=card_id,
+            title=f"Card {n}",
+            startedAt=datetime.now().isoformat(),
+            status=ExecutionStatus.RUNNING,
+            logs=[],
+        )
+        request = RunRequest(prompt=f"/implement specs/card-{n}.md", cwd="/tmp", model="sonnet-4.5")
+        result = await run_stream(runner, request, record, repo, execution_db)
+        await repo.update_execution_status(
+            execution_id=execution_db.id, status=DBExecutionStatus.SUCCESS, result=result
+        )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--executions", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--speed", type=float, default=0.0, help="divides recorded delays; 0 = no waiting")
+    parser.add_argument("--script", default="", help="recorded JSONL stream (default: built-in script)")
+    args = parser.parse_args()
+
+    runner = FakeRunner(script=load_script(args.script) if args.script else None, speed=args.speed)
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, sessions, writes = await make_database(Path(tmp) / "bench.db")
+
+        async def bounded(n):
+            async with semaphore:
+                await run_execution(sessions, runner, n)
+
+        # add_log imprime cada linha; o console não faz parte da medição
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            await asyncio.gather(*(bounded(n) for n in range(args.executions)))
+            elapsed = time.perf_counter() - start
+
+        async with sessions() as db:
+            log_lines = await db.scalar(select(func.count()).select_from(ExecutionLog))
+            done = await db.scalar(
+                select(func.count()).select_from(Execution)
+                .where(Execution.status == DBExecutionStatus.SUCCESS)
+            )
+        await engine.dispose()
+
+    print(f"{done}/{args.executions} executions in {elapsed:.2f}s "
+          f"(concurrency {args.concurrency}, speed {args.speed:g})")
+    print(f"  executions/min : {done / elapsed * 60:,.0f}")
+    print(f"  log lines/s    : {log_lines / elapsed:,.0f} ({log_lines} stored)")
+    print(f"  DB writes/s    : {writes[0] / elapsed:,.0f} ({writes[0]} statements)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
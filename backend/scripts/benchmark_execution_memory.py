@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark of the in-memory execution registry (``agent.executions``).
+
+Runs 1,000 synthetic executions through the same calls the stages make
+(register the record, ``add_log`` for every line, finish) and samples the
+process RSS along the way. With the bounded registry, finished executions
+keep only a summary, so RSS must stay flat once the first executions have
+warmed up the allocator. ``--legacy`` reproduces the previous behaviour (a
+plain dict of records with pydantic log lines, never evicted) for
+comparison.
+
+The live log replay ring of the execution WebSocket is expired right after
+each execution (it is normally kept for a few minutes), so only the
+registry is measured. Exits with status 1 when RSS grows more than
+``--max-growth-mb`` after warm-up.
+
+Uso (a partir de backend/):
+    python scripts/benchmark_execution_memory.py --executions 1000 --lines 200
+"""
+
+import argparse
+import asyncio
+import contextlib
+import gc
+import os
+import resource
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import agent  # noqa: E402
+from src.execution import ExecutionLog, ExecutionRecord, ExecutionStatus, LogType  # noqa: E402
+from src.services.execution_ws import execution_ws_manager  # noqa: E402
+
+
+def rss_mb() -> float:
+    """Current resident set size (Linux /proc; peak RSS elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize() / 1024 / 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def legacy_add_log(record, log_type, content):
+    record.logs.append(ExecutionLog(timestamp=datetime.now().isoformat(), type=log_type, content=content))
+
+
+async def run(executions, lines, legacy):
+    registry = {} if legacy else agent.executions
+    samples = []
+    line = "x" * 160
+
+    for n in range(executions):
+        card_id = f"card-{n:05d}"
+        record = ExecutionRecord(
+            cardId=card_id,
+            title=f"Synthetic execution {n}",
+            startedAt=datetime.now().isoformat(),
+            status=ExecutionStatus.RUNNING,
+            logs=[],
+        )
+        registry[card_id] = record
+        for i in range(lines):
+            log_type = LogType.TOOL if i % 5 == 0 else LogType.TEXT
+            if legacy:
+                legacy_add_log(record, log_type, f"{i} {line}")
+            else:
+                agent.add_log(record, log_type, f"{i} {line}")
+        record.status = ExecutionStatus.SUCCESS
+        record.completed_at = datetime.now().isoformat()
+        if not legacy:
+            agent.executions.finish(card_id)
+
+        execution_ws_manager.logs.finish(card_id)
+        await asyncio.sleep(0)  # deixa expirar o ring de replay
+
+        if (n + 1) % max(1, executions // 10) == 0:
+            gc.collect()
+            samples.append((n + 1, rss_mb()))
+    return samples
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--executions", type=int, default=1000)
+    parser.add_argument("--lines", type=int, default=200, help="log lines per execution")
+    parser.add_argument("--max-growth-mb", type=float, default=10.0)
+    parser.add_argument("--legacy", action="store_true", help="unbounded dict of pydantic records")
+    args = parser.parse_args()
+
+    execution_ws_manager.logs.retention_seconds = 0
+    start = rss_mb()
+    # add_log imprime cada linha; o console não faz parte da medição
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        samples = await run(args.executions, args.lines, args.legacy)
+
+    label = "legacy dict" if args.legacy else "bounded registry"
+    print(f"{label}: {args.executions} executions x {args.lines} lines (RSS at start {start:.1f} MB)")
+    for done, rss in samples:
+        print(f"  after {done:>5} executions: {rss:7.1f} MB")
+
+    growth = samples[-1][1] - samples[0][1]
+    print(f"  growth after warm-up: {growth:+.1f} MB (limit {args.max_growth_mb:.1f} MB)")
+    if not args.legacy:
+        print(f"  registry: {agent.executions.stats()}")
+    if growth > args.max_growth_mb:
+        print("FAIL: RSS is not flat")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
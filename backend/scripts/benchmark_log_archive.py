@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the compressed cold storage of execution logs.
+
+Builds a temporary database with synthetic finished executions (repeated
+"Using tool: X" lines and large tool outputs, like real stage logs), then
+archives them with ``ExecutionLogArchiveService`` and reports:
+
+- database file size before and after archiving (after VACUUM, since SQLite
+  only reuses freed pages otherwise);
+- read latency of ``ExecutionRepository.get_logs`` for hot rows vs the
+  compressed archive.
+
+Uso (a partir de backend/):
+    python scripts/benchmark_log_archive.py --executions 200 --lines 300 --codec zlib
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+
+from src.database import Base  # noqa: E402
+from src.models.execution import Execution, ExecutionLog, ExecutionLogArchive, ExecutionStatus  # noqa: E402
+from src.repositories.execution_repository import ExecutionRepository  # noqa: E402
+from src.services.execution_log_archive import ExecutionLogArchiveService  # noqa: E402
+
+TOOLS = ["Read", "Edit", "Bash", "Grep", "Glob", "Write"]
+
+
+def synthetic_line(rng: random.Random, i: int):
+    roll = rng.random()
+    if roll < 0.4:
+        return "tool", f"Using tool: {rng.choice(TOOLS)}"
+    if roll < 0.5:
+        # Saída grande de ferramenta (arquivo lido, resultado de testes)
+        body = "\n".join(f"    {n:4d}  def handler_{n}(request): return process(request, {n})" for n in range(60))
+        return "tool", f"Tool result ({i}):\n{body}"
+    return "text", f"Analisando o passo {i}: ajustando o módulo {rng.choice(TOOLS).lower()}_service.py"
+
+
+async def timed_reads(repo, execution_ids):
+    samples = []
+    for execution_id in execution_ids:
+        start = time.perf_counter()
+        await repo.get_logs(execution_id)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+async def run(args):
+    rng = random.Random(42)
+    tmpdir = tempfile.mkdtemp(prefix="log-archive-")
+    db_path = os.path.join(tmpdir, "database.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(
+            Base.metadata.create_all,
+            tables=[Execution.__table__, ExecutionLog.__table__, ExecutionLogArchive.__table__],
+        )
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    finished_at = datetime.utcnow() - timedelta(days=2)
+
+    async with session_maker() as db:
+        execution_ids = []
+        for n in range(args.executions):
+            execution = Execution(
+                card_id=f"card-{n:05d}", command="/implement", status=ExecutionStatus.SUCCESS,
+                started_at=finished_at, completed_at=finished_at,
+            )
+            db.add(execution)
+            await db.flush()
+            execution_ids.append(execution.id)
+            for i in range(args.lines):
+                log_type, content = synthetic_line(rng, i)
+                db.add(ExecutionLog(
+                    execution_id=execution.id, type=log_type, content=content,
+                    sequence=i + 1, timestamp=finished_at,
+                ))
+        await db.commit()
+
+    async with engine.connect() as conn:
+        await conn.execute(text("VACUUM"))
+    size_before = os.path.getsize(db_path)
+
+    sample = execution_ids[:: max(1, len(execution_ids) // 50)]
+    async with session_maker() as db:
+        hot_median, hot_max = await timed_reads(ExecutionRepository(db), sample)
+
+    async with session_maker() as db:
+        start = time.perf_counter()
+        totals = await ExecutionLogArchiveService(db, codec=args.codec).archive_finished()
+        archive_seconds = time.perf_counter() - start
+
+    async with engine.connect() as conn:
+        await conn.execute(text("VACUUM"))
+    size_after = os.path.getsize(db_path)
+
+    async with session_maker() as db:
+        cold_median, cold_max = await timed_reads(ExecutionRepository(db), sample)
+
+    await engine.dispose()
+
+    mb = 1024 * 1024
+    print(f"{args.executions} executions x {args.lines} lines, codec {args.codec}")
+    print(f"  archived: {totals['executions']} executions, {totals['lines']} lines in {archive_seconds:.2f}s")
+    print(f"  payload: {totals['rawBytes'] / mb:.1f} MB -> {totals['storedBytes'] / mb:.1f} MB")
+    print(f"  database file: {size_before / mb:.1f} MB -> {size_after / mb:.1f} MB "
+          f"({100 * (1 - size_after / size_before):.0f}% smaller, after VACUUM)")
+    print(f"  get_logs hot:      median {hot_median:.2f} ms, max {hot_max:.2f} ms")
+    print(f"  get_logs archived: median {cold_median:.2f} ms, max {cold_max:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--executions", type=int, default=200)
+    parser.add_argument("--lines", type=int, default=300, help="log lines per execution")
+    parser.add_argument("--codec", choices=["zlib", "zstd"], default="zlib")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
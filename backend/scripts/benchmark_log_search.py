@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the execution log full-text search (FTS5) at 1M log lines.
+
+Fills a temporary database with synthetic executions (the insert trigger
+indexes every line, as in production), then times ``LogSearchService.search``
+for rare and common terms, with card/command/time filters and a deep page by
+cursor, against the ``LIKE '%term%'`` scan it replaces.
+
+Uso (a partir de backend/):
+    python scripts/benchmark_log_search.py --lines 1000000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+
+from src.database import Base  # noqa: E402
+from src.models.execution import Execution, ExecutionLog, ExecutionLogArchive  # noqa: E402
+from src.services.log_search import LogSearchService  # noqa: E402
+
+COMMANDS = ["/plan", "/implement", "/test-implementation", "/review"]
+TOOLS = ["Read", "Edit", "Bash", "Grep", "Glob", "Write"]
+WORDS = (
+    "analisando arquivo módulo função teste resultado ajuste rota serviço banco "
+    "cache fila worker token prompt componente estado contexto deploy build"
+).split()
+
+
+def synthetic_line(rng: random.Random, i: int) -> tuple:
+    roll = rng.random()
+    if roll < 0.35:
+        return "tool", f"Using tool: {rng.choice(TOOLS)}"
+    if roll < 0.36:
+        return "error", f"TimeoutError: worker {rng.randint(1, 500)} stalled after {rng.randint(5, 90)}s"
+    return "text", " ".join(rng.choice(WORDS) for _ in range(12)) + f" passo {i}"
+
+
+def populate(db_path: str, lines: int, lines_per_execution: int) -> float:
+    rng = random.Random(7)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    start_time = datetime(2026, 1, 1)
+    started = time.perf_counter()
+
+    for n in range(0, lines, lines_per_execution):
+        execution_id = str(uuid.uuid4())
+        at = start_time + timedelta(minutes=n // lines_per_execution)
+        conn.execute(
+            "INSERT INTO executions (id, card_id, status, command, started_at, is_active) "
+            "VALUES (?, ?, 'success', ?, ?, 0)",
+            (execution_id, f"card-{n // lines_per_execution % 500:04d}", rng.choice(COMMANDS), at.isoformat(sep=" ")),
+        )
+        conn.executemany(
+            "INSERT INTO execution_logs (id, execution_id, timestamp, type, content, sequence) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (str(uuid.uuid4()), execution_id, (at + timedelta(seconds=i)).isoformat(sep=" "), *synthetic_line(rng, i), i + 1)
+                for i in range(min(lines_per_execution, lines - n))
+            ],
+        )
+        if n % 100_000 == 0:
+            conn.commit()
+    conn.commit()
+    conn.close()
+    return time.perf_counter() - started
+
+
+async def timed(label, coro_factory, repeat=5):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = await coro_factory()
+        samples.append((time.perf_counter() - start) * 1000)
+    print(f"  {label:<44} median {statistics.median(samples):8.2f} ms")
+    return result
+
+
+async def run(args):
+    tmpdir = tempfile.mkdtemp(prefix="log-search-")
+    db_path = os.path.join(tmpdir, "database.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(
+            Base.metadata.create_all,
+            tables=[Execution.__table__, ExecutionLog.__table__, ExecutionLogArchive.__table__],
+        )
+
+    seconds = populate(db_path, args.lines, args.lines_per_execution)
+    print(f"{args.lines} log lines indexed in {seconds:.1f}s ({args.lines / seconds:,.0f} lines/s through the trigger)")
+    print(f"  database file: {os.path.getsize(db_path) / 1024 / 1024:.1f} MB")
+
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_maker() as db:
+        service = LogSearchService(db)
+        await service.ensure_index()
+
+        await timed("rare term (TimeoutError, first page)", lambda: service.search("timeouterror"))
+        page = await timed("common term (cache, first page)", lambda: service.search("cache"))
+        for _ in range(20):
+            page = await service.search("cache", cursor=page["nextCursor"])
+        cursor = page["nextCursor"]
+        await timed("common term, page 21 by cursor", lambda: service.search("cache", cursor=cursor))
+        await timed("prefix + card filter (deplo* card-0042)", lambda: service.search("deplo*", card_id="card-0042"))
+        await timed("two terms + command filter", lambda: service.search("worker stalled", command="/review"))
+        since = datetime(2026, 1, 1) + timedelta(minutes=args.lines // args.lines_per_execution // 2)
+        await timed("rare term + time range", lambda: service.search("timeouterror", since=since))
+
+        async def like_scan():
+            result = await db.execute(
+                text("SELECT id FROM execution_logs WHERE content LIKE :q ORDER BY timestamp DESC LIMIT 50"),
+                {"q": "%TimeoutError%"},
+            )
+            return result.all()
+
+        await timed("baseline: LIKE '%TimeoutError%' scan", like_scan, repeat=3)
+
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    parser.add_argument("--lines-per-execution", type=int, default=400)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Benchmark do dashboard de métricas com 20 espectadores concorrentes.
+
+Simula N clientes fazendo polling dos endpoints do dashboard (/trends,
+/insights, /performance, /compare) contra um database temporário,
+com o cache de respostas desligado e ligado. Os clientes reenviam o ETag
+recebido (If-None-Match), e uma execução "termina" periodicamente,
+invalidando a tag do projeto.
+
+Uso (a partir de backend/):
+    python scripts/benchmark_metrics_cache.py --viewers 20 --rounds 10 --executions 20000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+# O database legado precisa apontar para o arquivo temporário antes dos imports
+_tmp_dir = tempfile.mkdtemp(prefix="metrics-bench-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmp_dir}/bench.db"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from src.cache import metrics_response_cache, metrics_cache_tag  # noqa: E402
+from src.database import Base, engine, async_session_maker  # noqa: E402
+# project_metrics.project_id referencia active_project: o modelo precisa estar no metadata do create_all
+from src.models.project import ActiveProject  # noqa: E402,F401
+from src.models.card import Card  # noqa: E402
+from src.models.metrics import ExecutionMetrics  # noqa: E402
+from src.routes.metrics import router as metrics_router  # noqa: E402
+
+PROJECT_ID = "bench-project"
+
+
+async def seed(executions: int) -> None:
+    """Cria cards e execution_metrics sintéticos."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    rng = random.Random(1)
+    now = datetime.utcnow()
+    rows = []
+    for i in range(executions):
+        started_at = now - timedelta(minutes=rng.randint(0, 60 * 24 * 60))
+        duration = rng.randint(5_000, 900_000)
+        rows.append({
+            "id": f"metric-{i}",
+            "execution_id": f"exec-{i}",
+            "card_id": f"card-{i % 200}",
+            "project_id": PROJECT_ID,
+            "command": rng.choice(["/plan", "/implement", "/test-implementation", "/review"]),
+            "model_used": rng.choice(["opus-4.5", "sonnet-4.5", "haiku-4.5"]),
+            "started_at": started_at,
+            "completed_at": started_at + timedelta(milliseconds=duration),
+            "duration_ms": duration,
+            "input_tokens": rng.randint(1_000, 50_000),
+            "output_tokens": rng.randint(100, 10_000),
+            "total_tokens": rng.randint(1_100, 60_000),
+            "estimated_cost_usd": Decimal(str(round(rng.uniform(0.01, 2.0), 6))),
+            "status": "success" if rng.random() > 0.1 else "error",
+            "created_at": now,
+        })
+
+    async with async_session_maker() as session:
+        session.add_all([Card(id=f"card-{i}", title=f"Card {i}") for i in range(200)])
+        await session.commit()
+        await session.execute(insert(ExecutionMetrics.__table__), rows)
+        await session.commit()
+
+
+def dashboard_urls() -> list:
+    today = datetime.utcnow().date()
+    # /roi fica de fora: get_productivity_metrics ainda falha (Card.status)
+    return [
+        f"/api/metrics/trends/{PROJECT_ID}?days=7",
+        f"/api/metrics/insights/{PROJECT_ID}",
+        f"/api/metrics/performance/{PROJECT_ID}",
+        (
+            f"/api/metrics/compare/{PROJECT_ID}"
+            f"?current_start={today - timedelta(days=7)}&current_end={today}"
+            f"&previous_start={today - timedelta(days=14)}&previous_end={today - timedelta(days=7)}"
+        ),
+    ]
+
+
+async def viewer(client: httpx.AsyncClient, rounds: int, latencies: list, statuses: dict) -> None:
+    """Um espectador carregando o dashboard `rounds` vezes, com ETags."""
+    etags = {}
+    for _ in range(rounds):
+        for url in dashboard_urls():
+            headers = {"If-None-Match": etags[url]} if url in etags else {}
+            start = time.perf_counter()
+            response = await client.get(url, headers=headers)
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if "etag" in response.headers:
+                etags[url] = response.headers["etag"]
+
+
+async def finishing_executions(interval: float, counter: list) -> None:
+    """Simula execuções terminando (invalidação por tag) até ser cancelada."""
+    while True:
+        await asyncio.sleep(interval)
+        metrics_response_cache.invalidate_tag(metrics_cache_tag(PROJECT_ID))
+        counter[0] += 1
+
+
+async def run_scenario(app: FastAPI, viewers: int, rounds: int, cache_enabled: bool, invalidate_every: float) -> dict:
+    metrics_response_cache.clear()
+    metrics_response_cache.enabled = cache_enabled
+
+    latencies: list = []
+    statuses: dict = {}
+    invalidations = [0]
+    invalidator = asyncio.create_task(finishing_executions(invalidate_every, invalidations))
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        start = time.perf_counter()
+        await asyncio.gather(*[viewer(client, rounds, latencies, statuses) for _ in range(viewers)])
+        elapsed = time.perf_counter() - start
+
+    invalidator.cancel()
+
+    # Latência de respostas com erro não diz nada sobre o cache
+    errors = {status: count for status, count in statuses.items() if status >= 500}
+    if errors:
+        raise SystemExit(f"server errors during the run: {errors}")
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "elapsed_s": round(elapsed, 2),
+        "req_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 1),
+        "statuses": statuses,
+        "invalidations": invalidations[0],
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--viewers", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--executions", type=int, default=20000)
+    parser.add_argument("--invalidate-every", type=float, default=1.0, help="seconds between finished executions")
+    args = parser.parse_args()
+
+    print(f"Seeding {args.executions} execution metrics in {_tmp_dir} ...")
+    await seed(args.executions)
+
+    app = FastAPI()
+    app.include_router(metrics_router)
+
+    # Aquece os rollups/sketches para que ambos os cenários partam do mesmo estado
+    await run_scenario(app, 1, 1, cache_enabled=False, invalidate_every=3600)
+
+    for enabled in (False, True):
+        result = await run_scenario(app, args.viewers, args.rounds, enabled, args.invalidate_every)
+        label = "cache ON " if enabled else "cache OFF"
+        print(f"{label}: {result}")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the orchestrator log file (write path and recent-log reads).
+
+Fills a JSONL log with ``--lines`` entries and compares reading the last
+``--limit`` entries with ``readlines()`` (previous behaviour) against the
+reverse-seek tail used by ``OrchestratorLogger.read_recent_logs``. Then
+measures how long ``OrchestratorLogger.log`` holds the event loop, now
+that file writes are queued and done from a worker thread.
+
+Uso (a partir de backend/):
+    python scripts/benchmark_orchestrator_log.py --lines 500000 --limit 50
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.services.log_file import AsyncLogFileWriter, read_tail_lines  # noqa: E402
+from src.services.orchestrator_logger import OrchestratorLogger  # noqa: E402
+
+
+def fill(path: Path, lines: int) -> None:
+    entry = {"timestamp": "2026-01-01T00:00:00", "level": "info", "step": "think",
+             "message": "Nenhum goal pendente, aguardando próximo ciclo " + "x" * 80,
+             "goal_id": None, "data": {"cycle": 0}}
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(lines):
+            entry["data"]["cycle"] = i
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def timed(func, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=500_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--writes", type=int, default=5_000)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "orchestrator.log"
+        fill(path, args.lines)
+        size_mb = path.stat().st_size / 1024 / 1024
+
+        def legacy():
+            with open(path, "r", encoding="utf-8") as f:
+                return [json.loads(line) for line in f.readlines()[-args.limit:]]
+
+        def tail():
+            return [json.loads(line) for line in read_tail_lines(path, args.limit)]
+
+        assert legacy() == tail()
+        print(f"read last {args.limit} of {args.lines} lines ({size_mb:.1f} MB)")
+        print(f"  readlines():      {timed(legacy):8.2f} ms")
+        print(f"  reverse-seek tail: {timed(tail):8.2f} ms")
+
+        orch_logger = OrchestratorLogger(str(path))
+        orch_logger._writer = AsyncLogFileWriter(path, max_bytes=1 << 40)
+        worst = 0.0
+        started = time.perf_counter()
+        for i in range(args.writes):
+            call = time.perf_counter()
+            await orch_logger.log_think(f"ciclo {i}")
+            worst = max(worst, time.perf_counter() - call)
+        enqueue_total = time.perf_counter() - started
+        await orch_logger.flush()
+        await orch_logger.close()
+        print(f"{args.writes} log() calls: {enqueue_total * 1000:.1f} ms on the loop, worst call {worst * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
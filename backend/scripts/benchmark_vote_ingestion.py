@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Load test of live voting at a sustained vote rate (default 5,000 votes/s).
+
+Drives VotingService.vote (what POST /api/live/vote calls) against a
+temporary SQLite database and compares with the previous path, which wrote
+every vote in its own transaction and broadcast the counts after each vote.
+
+Reports the achieved rate, per-vote latency, database transactions and vote
+count broadcasts per second.
+
+Uso (a partir de backend/):
+    python scripts/benchmark_vote_ingestion.py --rate 5000 --seconds 10
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import event, func, select, update  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+
+from src.database import Base  # noqa: E402
+from src.models.live import Vote, VoteType, VotingOption, VotingRound  # noqa: E402
+from src.services.voting_service import VotingService  # noqa: E402
+
+
+async def make_database(path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _pragmas(dbapi_conn, _):
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+    async with engine.begin() as conn:
+        await conn.run_sync(
+            Base.metadata.create_all,
+            tables=[Vote.__table__, VotingRound.__table__, VotingOption.__table__],
+        )
+    commits = [0]
+
+    @event.listens_for(engine.sync_engine, "commit")
+    def _count_commit(_):
+        commits[0] += 1
+
+    return engine, async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False), commits
+
+
+async def legacy_vote(db, option, round_id, session_id, ip, broadcasts):
+    """Previous behaviour: one transaction and one broadcast per vote."""
+    db.add(Vote(vote_type=VoteType.PROJECT, target_id=option.id, session_id=session_id,
+                ip_address=ip, voting_round_id=round_id))
+    option.vote_count += 1
+    await db.execute(update(VotingOption).where(VotingOption.id == option.id)
+                     .values(vote_count=option.vote_count))
+    await db.commit()
+    broadcasts.append(time.perf_counter())
+
+
+async def drive(rate, seconds, cast):
+    """Issue votes to keep up with `rate` votes/s; returns per-vote latencies (ms)."""
+    latencies = []
+    start = time.perf_counter()
+    n = 0
+    while (elapsed := time.perf_counter() - start) < seconds:
+        # Alcança o total devido até agora (recupera atrasos de ticks lentos)
+        due = int(rate * elapsed)
+        while n < due and time.perf_counter() - start < seconds:
+            t0 = time.perf_counter()
+            await cast(n)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            n += 1
+        await asyncio.sleep(0.005)
+    return latencies, time.perf_counter() - start
+
+
+def summary(values):
+    values = sorted(values)
+    return (f"p50={statistics.median(values):.3f}ms p99={values[int(len(values) * 0.99) - 1]:.3f}ms "
+            f"max={values[-1]:.1f}ms")
+
+
+async def run_pipeline(path, rate, seconds):
+    engine, sessions, commits = await make_database(path)
+    service = VotingService()
+    service._ingestion.session_factory = sessions
+    broadcasts = []
+
+    async def on_update(votes):
+        broadcasts.append(sum(votes.values()))
+
+    service.on_update(on_update)
+
+    async with sessions() as db:
+        _, options = await service.start_round(db, duration_seconds=seconds + 60)
+        commits[0] = 0
+
+        async def cast(n):
+            ok, _, _ = await service.vote(db, options[n % len(options)].id, f"session-{n}", f"10.0.{n % 250}.{n % 200}")
+            assert ok
+
+        latencies, elapsed = await drive(rate, seconds, cast)
+        await service.end_round(db)
+        stored = await db.scalar(select(func.count()).select_from(Vote))
+        tallied = await db.scalar(select(func.sum(VotingOption.vote_count)))
+
+    await engine.dispose()
+    print(f"pipeline : {len(latencies) / elapsed:,.0f} votes/s over {elapsed:.1f}s; vote() {summary(latencies)}")
+    print(f"           {commits[0]} transactions ({commits[0] / elapsed:.1f}/s), "
+          f"{len(broadcasts)} count broadcasts ({len(broadcasts) / elapsed:.1f}/s); "
+          f"stored={stored} tallied={tallied}")
+    assert stored == tallied, f"tallies drifted from stored votes: stored={stored} tallied={tallied}"
+
+
+async def run_legacy(path, rate, seconds):
+    engine, sessions, commits = await make_database(path)
+    broadcasts = []
+    async with sessions() as db:
+        round_id = "legacy"
+        db.add(VotingRound(id=round_id, ends_at=datetime.utcnow() + timedelta(seconds=seconds + 60), is_active=True))
+        options = [VotingOption(id=f"opt-{i}", voting_round_id=round_id, title=f"Option {i}", vote_count=0)
+                   for i in range(4)]
+        db.add_all(options)
+        await db.commit()
+        commits[0] = 0
+
+        async def cast(n):
+            await legacy_vote(db, options[n % len(options)], round_id, f"session-{n}", "10.0.0.1", broadcasts)
+
+        latencies, elapsed = await drive(rate, seconds, cast)
+
+    await engine.dispose()
+    print(f"legacy   : {len(latencies) / elapsed:,.0f} votes/s over {elapsed:.1f}s; vote() {summary(latencies)}")
+    print(f"           {commits[0]} transactions ({commits[0] / elapsed:.1f}/s), "
+          f"{len(broadcasts)} count broadcasts ({len(broadcasts) / elapsed:.1f}/s)")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=int, default=5000, help="target votes per second")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--legacy-seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    print(f"target {args.rate:,} votes/s")
+    with tempfile.TemporaryDirectory() as tmp:
+        await run_legacy(Path(tmp) / "legacy.db", args.rate, args.legacy_seconds)
+        await run_pipeline(Path(tmp) / "pipeline.db", args.rate, args.seconds)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
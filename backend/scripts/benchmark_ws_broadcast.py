@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Load test of the live broadcast fan-out with 1,000 spectators.
+
+Compares the previous serial loop (`await ws.send_text(json.dumps(...))` for
+each socket) with WebSocketBroadcaster (serialize once, per-client queues).
+The sockets are in-process fakes with configurable send latency, so the
+numbers measure the fan-out itself: how long the emitting coroutine is
+blocked per event and how long fast spectators wait for each message while
+a few spectators are slow or completely stalled.
+
+Uso (a partir de backend/):
+    python scripts/benchmark_ws_broadcast.py --spectators 1000 --events 200
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.services.ws_broadcaster import WebSocketBroadcaster, SlowConsumerPolicy  # noqa: E402
+
+
+class SimulatedSocket:
+    """Fake socket: each send takes `latency` seconds (None: never completes)."""
+
+    def __init__(self, latency, latencies):
+        self.latency = latency
+        self.latencies = latencies
+        self.received = 0
+
+    async def send_text(self, text):
+        if self.latency is None:
+            await asyncio.Event().wait()
+        await asyncio.sleep(self.latency)
+        self.received += 1
+        if self.latencies is not None:
+            sent_at = json.loads(text)["sentAt"]
+            self.latencies.append((time.perf_counter() - sent_at) * 1000)
+
+    async def close(self, code=1000):
+        pass
+
+
+def make_sockets(spectators, slow, stalled, latencies):
+    sockets = []
+    for i in range(spectators):
+        if i < stalled:
+            sockets.append(SimulatedSocket(None, None))
+        elif i < stalled + slow:
+            sockets.append(SimulatedSocket(0.25, None))
+        else:
+            sockets.append(SimulatedSocket(0, latencies))
+    return sockets
+
+
+def event(n):
+    return {
+        "type": "log",
+        "content": f"[Agent] step {n}: " + "x" * 200,
+        "logType": "info",
+        "sentAt": time.perf_counter(),
+    }
+
+
+async def run_serial(sockets, events, interval, stall_timeout):
+    """Previous behaviour: one await per socket inside the emitting coroutine."""
+    blocked = []
+    for n in range(events):
+        start = time.perf_counter()
+        message = event(n)
+        for ws in sockets:
+            try:
+                # Stalled sockets would block forever; bound them like a TCP timeout
+                await asyncio.wait_for(ws.send_text(json.dumps(message)), stall_timeout)
+            except asyncio.TimeoutError:
+                pass
+        blocked.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+    return blocked
+
+
+async def run_broadcaster(sockets, events, interval, policy, max_queue):
+    broadcaster = WebSocketBroadcaster("bench", policy=policy, max_queue=max_queue, send_timeout=5)
+    for ws in sockets:
+        broadcaster.add(ws)
+
+    blocked = []
+    for n in range(events):
+        start = time.perf_counter()
+        broadcaster.publish(event(n))
+        blocked.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+
+    # Let fast clients drain
+    await asyncio.sleep(0.5)
+    stats = broadcaster.stats()
+    await broadcaster.close_all()
+    return blocked, stats
+
+
+def summary(values):
+    values = sorted(values)
+    if not values:
+        return "n/a"
+    return (
+        f"p50={statistics.median(values):.2f}ms "
+        f"p99={values[max(0, int(len(values) * 0.99) - 1)]:.2f}ms "
+        f"max={values[-1]:.2f}ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--spectators", type=int, default=1000)
+    parser.add_argument("--slow", type=int, default=10, help="spectators taking 250ms per send")
+    parser.add_argument("--stalled", type=int, default=2, help="spectators that never read")
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=50.0, help="events per second")
+    parser.add_argument("--serial-events", type=int, default=5, help="events for the (slow) serial baseline")
+    args = parser.parse_args()
+    interval = 1.0 / args.rate
+
+    print(f"{args.spectators} spectators ({args.slow} slow, {args.stalled} stalled), {args.rate:.0f} events/s")
+
+    latencies = []
+    sockets = make_sockets(args.spectators, args.slow, args.stalled, latencies)
+    blocked = await run_serial(sockets, args.serial_events, interval, stall_timeout=1.0)
+    print(f"serial loop   ({args.serial_events} events): emitter blocked {summary(blocked)}; "
+          f"fast delivery {summary(latencies)}")
+
+    for policy in SlowConsumerPolicy:
+        latencies = []
+        sockets = make_sockets(args.spectators, args.slow, args.stalled, latencies)
+        start = time.perf_counter()
+        blocked, stats = await run_broadcaster(sockets, args.events, interval, policy, max_queue=100)
+        elapsed = time.perf_counter() - start
+        print(f"{policy.value:<10} ({args.events} events in {elapsed:.1f}s): emitter blocked {summary(blocked)}; "
+              f"fast delivery {summary(latencies)}; dropped={stats['dropped']} "
+              f"clients_left={stats['clients']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
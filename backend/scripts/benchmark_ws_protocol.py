@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Wire cost of the WebSocket protocol options for board and log streams.
+
+For a stream of card updates (mostly column moves and small field edits on
+realistic card payloads) and a stream of agent log batches, measures bytes
+on the wire and encoder CPU per 1,000 messages for:
+
+- full JSON (previous behaviour)
+- card deltas (only changed fields, ``?delta=1``)
+- MessagePack binary frames (``?encoding=msgpack``)
+
+each with and without permessage-deflate. Deflate is simulated with a raw
+zlib stream per connection (wbits=-15, context takeover), which is what
+browsers and uvicorn negotiate by default.
+
+Uso (a partir de backend/):
+    python scripts/benchmark_ws_protocol.py --messages 5000
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+import zlib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.services import ws_protocol  # noqa: E402
+from src.services.card_ws import CardWebSocketManager  # noqa: E402
+
+COLUMNS = ["backlog", "plan", "implement", "test", "review", "done"]
+
+
+class CountingSocket:
+    """Fake socket that keeps the frames it receives."""
+
+    def __init__(self):
+        self.frames = []
+
+    async def send_text(self, text):
+        self.frames.append(text)
+
+    async def send_bytes(self, data):
+        self.frames.append(data)
+
+    async def close(self, code=1000):
+        pass
+
+
+WORDS = ("user", "login", "token", "cache", "board", "column", "agent", "review", "deploy", "metric",
+         "query", "index", "session", "retry", "timeout", "schema", "route", "worker", "spec", "branch")
+
+
+def make_card(n, rng):
+    return {
+        "id": f"card-{n:04d}",
+        "title": f"Implement feature #{n}",
+        "description": " ".join(rng.choice(WORDS) for _ in range(80)),
+        "columnId": "backlog",
+        "specPath": f"specs/feature-{n}.md",
+        "modelPlan": "opus-4.5", "modelImplement": "opus-4.5",
+        "modelTest": "sonnet-4.5", "modelReview": "sonnet-4.5",
+        "branchName": None, "worktreePath": None,
+        "diffStats": None, "experts": {"backend": {"reason": "API changes"}},
+        "tokenStats": {"totalTokens": 0, "inputTokens": 0, "outputTokens": 0},
+        "createdAt": "2026-01-01T00:00:00", "updatedAt": "2026-01-01T00:00:00",
+    }
+
+
+async def card_stream(messages, seed=7):
+    """Publish `messages` card updates through a manager with three client kinds."""
+    rng = random.Random(seed)
+    manager = CardWebSocketManager()
+    # Mede o protocolo, não a política de consumidor lento
+    manager.broadcaster.max_queue = messages + 100
+    sockets = {
+        "json": CountingSocket(),
+        "json+delta": CountingSocket(),
+        "msgpack+delta": CountingSocket(),
+    }
+    manager.broadcaster.add(sockets["json"])
+    manager.broadcaster.add(sockets["json+delta"], features=frozenset({"delta"}))
+    manager.broadcaster.add(sockets["msgpack+delta"], encoding="msgpack", features=frozenset({"delta"}))
+
+    cards = [make_card(n, rng) for n in range(50)]
+    for card in cards:
+        await manager.broadcast_card_created(card["id"], dict(card))
+
+    for n in range(messages):
+        card = rng.choice(cards)
+        updated_at = f"2026-01-01T00:{n // 60 % 60:02d}:{n % 60:02d}"
+        if rng.random() < 0.6:
+            old = card["columnId"]
+            card["columnId"] = COLUMNS[(COLUMNS.index(old) + 1) % len(COLUMNS)]
+            card["updatedAt"] = updated_at
+            await manager.broadcast_card_moved(card["id"], old, card["columnId"], dict(card))
+        else:
+            card["tokenStats"] = {**card["tokenStats"], "totalTokens": card["tokenStats"]["totalTokens"] + 1500}
+            card["updatedAt"] = updated_at
+            await manager.broadcast_card_updated(card["id"], dict(card))
+        if n % 100 == 0:
+            await asyncio.sleep(0)
+
+    while manager.broadcaster.stats()["queued"]:
+        await asyncio.sleep(0.01)
+    await manager.broadcaster.close_all()
+
+    skip = len(cards)  # ignora os card_created iniciais
+    frames = {name: ws.frames[skip:] for name, ws in sockets.items()}
+    # Variante não medida pelo broadcaster: full card em msgpack
+    frames["msgpack"] = [ws_protocol.encode(ws_protocol.decode(f), "msgpack") for f in frames["json"]]
+    return frames
+
+
+def log_stream(messages, seed=11):
+    """log_batch frames as produced by ExecutionLogStream (5 lines each)."""
+    rng = random.Random(seed)
+    batches, seq = [], 0
+    for n in range(messages):
+        logs = []
+        for _ in range(5):
+            seq += 1
+            logs.append({
+                "seq": seq,
+                "timestamp": f"2026-01-01T00:00:{seq % 60:02d}.{rng.randint(0, 999999):06d}",
+                "logType": rng.choice(["text", "tool", "info"]),
+                "content": f"[Agent] Read src/services/module_{rng.randint(0, 40)}.py ({rng.randint(10, 900)} lines)",
+            })
+        batches.append({"type": "log_batch", "cardId": "card-0001", "epoch": "2026-01-01T00:00:00",
+                        "fromSeq": logs[0]["seq"], "toSeq": seq, "logs": logs})
+    return batches
+
+
+def measure_encode(payloads, encoding):
+    start = time.process_time()
+    frames = [ws_protocol.encode(p, encoding) for p in payloads]
+    return frames, (time.process_time() - start)
+
+
+def wire_cost(frames, deflate):
+    """Total bytes on the wire and compression CPU seconds."""
+    if not deflate:
+        return sum(len(f) for f in frames), 0.0
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+    start = time.process_time()
+    total = 0
+    for frame in frames:
+        data = frame.encode() if isinstance(frame, str) else frame
+        total += len(compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)) - 4
+    return total, time.process_time() - start
+
+
+def report(title, variants, messages, duration):
+    print(f"\n{title} ({messages} messages, as if sent over {duration:.0f}s)")
+    print(f"  {'variant':<22}{'bytes/msg':>10}{'KB/s':>10}{'encode ms/1k':>14}{'deflate ms/1k':>15}")
+    for name, (frames, encode_cpu) in variants.items():
+        for deflate in (False, True):
+            total, deflate_cpu = wire_cost(frames, deflate)
+            label = name + (" +deflate" if deflate else "")
+            print(f"  {label:<22}{total / len(frames):>10.0f}{total / duration / 1024:>10.1f}"
+                  f"{encode_cpu / len(frames) * 1e6:>14.2f}{deflate_cpu / len(frames) * 1e6:>15.2f}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--rate", type=float, default=50.0, help="messages per second (for KB/s)")
+    args = parser.parse_args()
+    duration = args.messages / args.rate
+
+    if not ws_protocol.msgpack_available():
+        sys.exit("msgpack is not installed (pip install msgpack)")
+
+    frames = await card_stream(args.messages)
+    payloads = {name: [ws_protocol.decode(f) for f in fs] for name, fs in frames.items()}
+    variants = {}
+    for name, encoding in (("full json", "json"), ("full msgpack", "msgpack"),
+                           ("delta json", "json"), ("delta msgpack", "msgpack")):
+        source = payloads["json"] if name.startswith("full") else payloads["json+delta"]
+        variants[name] = measure_encode(source, encoding)
+    report("Board stream (card_moved / card_updated)", variants, args.messages, duration)
+
+    batches = log_stream(args.messages)
+    report("Log stream (log_batch, 5 lines)", {
+        "json": measure_encode(batches, "json"),
+        "msgpack": measure_encode(batches, "msgpack"),
+    }, args.messages, duration)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Exportação colunar e consultas offline de métricas.
+
+Exporta (incrementalmente) os databases para Parquet e roda as agregações
+do dashboard sobre os arquivos exportados, para vários projetos de uma vez.
+
+Uso (a partir de backend/):
+    python scripts/metrics_analytics.py export
+    python scripts/metrics_analytics.py export --db /path/projeto/.claude/database.db:meu-projeto
+    python scripts/metrics_analytics.py query projects --start 2024-01-01
+    python scripts/metrics_analytics.py query performance --project abc --command /implement
+
+Sem `--db`, exporta o database principal (DATABASE_URL) e os databases de
+todos os projetos registrados no histórico (.project_data/project_history.db).
+Os databases são abertos somente leitura.
+"""
+
+import argparse
+import asyncio
+import json
+import sqlite3
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy.engine import make_url  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+
+from src.config.settings import get_settings  # noqa: E402
+from src.services.metrics_export_service import MetricsAnalytics, MetricsExportService  # noqa: E402
+
+
+def discover_databases() -> list:
+    """Database principal + databases de projeto do histórico: [(source_id, path)]."""
+    settings = get_settings()
+    sources = []
+
+    main_db = make_url(settings.database_url).database
+    if main_db and Path(main_db).exists():
+        sources.append(("default", Path(main_db)))
+
+    history_db = Path(settings.project_data_dir) / "project_history.db"
+    if history_db.exists():
+        conn = sqlite3.connect(f"file:{history_db}?mode=ro", uri=True)
+        try:
+            for project_id, project_path in conn.execute("SELECT id, path FROM project_history"):
+                db_path = Path(project_path) / ".claude" / "database.db"
+                if db_path.exists():
+                    sources.append((project_id, db_path))
+        finally:
+            conn.close()
+
+    return sources
+
+
+async def export(args) -> None:
+    if args.db:
+        sources = []
+        for spec in args.db:
+            path, _, source_id = spec.partition(":")
+            sources.append((source_id or Path(path).resolve().parent.parent.name, Path(path)))
+    else:
+        sources = discover_databases()
+
+    for source_id, db_path in sources:
+        engine = create_async_engine(f"sqlite+aiosqlite:///file:{db_path.resolve()}?mode=ro&uri=true")
+        session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        start = time.perf_counter()
+        async with session_maker() as session:
+            service = MetricsExportService(session, source_id, args.export_dir)
+            counts = await service.export(chunk_size=args.chunk_size)
+        await engine.dispose()
+
+        print(f"[MetricsExport] {source_id} ({db_path}): {counts} in {time.perf_counter() - start:.2f}s")
+
+
+def query(args) -> None:
+    analytics = MetricsAnalytics(args.export_dir)
+    projects = args.project or None
+
+    start = time.perf_counter()
+    if args.kind == "summary":
+        result = analytics.aggregated_metrics(projects, args.start, args.end)
+    elif args.kind == "projects":
+        result = analytics.by_project(projects, args.start, args.end)
+    elif args.kind == "performance":
+        result = analytics.execution_performance(projects, args.command_filter)
+    elif args.kind == "trends":
+        result = analytics.token_trends(projects, days=args.days)
+    else:
+        result = analytics.hourly_metrics(args.date or date.today(), projects)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    print(json.dumps(result, indent=2, default=str))
+    print(f"[MetricsAnalytics] {args.kind} in {elapsed_ms:.1f} ms", file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--export-dir", type=Path, default=None, help="default: METRICS_EXPORT_DIR")
+    subparsers = parser.add_subparsers(dest="action", required=True)
+
+    export_parser = subparsers.add_parser("export", help="incremental export to Parquet")
+    export_parser.add_argument("--db", action="append", help="PATH[:SOURCE_ID], may repeat")
+    export_parser.add_argument("--chunk-size", type=int, default=50_000)
+
+    query_parser = subparsers.add_parser("query", help="vectorized aggregations over the export")
+    query_parser.add_argument("kind", choices=["summary", "projects", "performance", "trends", "hourly"])
+    query_parser.add_argument("--project", action="append", help="project id, may repeat (default: all)")
+    query_parser.add_argument("--start", type=date.fromisoformat)
+    query_parser.add_argument("--end", type=date.fromisoformat)
+    query_parser.add_argument("--command", dest="command_filter")
+    query_parser.add_argument("--days", type=int, default=7)
+    query_parser.add_argument("--date", type=date.fromisoformat)
+
+    args = parser.parse_args()
+    if args.action == "export":
+        asyncio.run(export(args))
+    else:
+        query(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,18 @@
 import re
 import json
 import asyncio
+import functools
+import inspect
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from claude_agent_sdk import (
-    query,
-    ClaudeAgentOptions,
-    AssistantMessage,
-    TextBlock,
-    ToolUseBlock,
-    ToolResultBlock,
-    ResultMessage,
-)
-
 from .execution import (
     ExecutionLog,
     ExecutionRecord,
+    LogEntry,
     ExecutionStatus,
     LogType,
     PlanResult,
@@ -28,10 +21,20 @@ from .execution import (
 from .repositories.execution_repository import ExecutionRepository
 from .models.execution import ExecutionStatus as DBExecutionStatus
 from .git_workspace import GitWorkspaceManager
+from .services.agent_runner import AgentRunner, RunEvent, RunRequest, get_runner
+from .services.execution_governor import ExecutionCancelled, get_execution_governor
+from .services.execution_registry import ExecutionRegistry
 from .services.execution_ws import execution_ws_manager
+from .services.prompt_builder import (
+    PromptBuilder,
+    images_note,
+    plan_toml_context,
+    working_directory_note,
+)
 
-# Store executions in memory (mantido para compatibilidade durante migração)
-executions: dict[str, ExecutionRecord] = {}
+# Execuções em memória: só as em andamento ficam completas; as finalizadas
+# viram um resumo e os logs são lidos do banco
+executions = ExecutionRegistry()
 
 
 def _is_retryable(error: str) -> bool:
@@ -87,7 +90,7 @@ async def execute_with_retry(
 GEMINI_PLAN_PROMPT = """
 # Plan
 
-Crie um plano de implementação detalhado com base na solicitação do usuário: {arguments}
+Crie um plano de implementação detalhado com base na solicitação do usuário (seção "Solicitação" ao final).
 
 Salve o planejamento em `specs/<nome_descritivo>.md`
 
@@ -160,15 +163,11 @@ Descreva a abordagem técnica, incluindo snippets de código quando relevante.
 GEMINI_IMPLEMENT_PROMPT = """
 # Implement
 
-Implemente o plano especificado.
-
-## Conteúdo do Plano
-
-{spec_content}
+Implemente o plano especificado (seção "Conteúdo do Plano" ao final).
 
 ## Instruções
 
-1. Leia o plano acima cuidadosamente
+1. Leia o plano cuidadosamente
 2. Analise todas as seções do plano
 3. Implemente cada item na ordem definida
 4. Atualize o arquivo de plano marcando checkboxes conforme conclui cada item
@@ -221,15 +220,11 @@ Para cada arquivo listado na seção "Arquivos a Serem Modificados/Criados":
 GEMINI_TEST_IMPLEMENTATION_PROMPT = """
 # Test Implementation
 
-Valide a implementação do plano especificado.
-
-## Conteúdo do Plano
-
-{spec_content}
+Valide a implementação do plano especificado (seção "Conteúdo do Plano" ao final).
 
 ## Instruções
 
-1. Leia o plano acima cuidadosamente
+1. Leia o plano cuidadosamente
 2. Execute todas as fases de validação abaixo
 3. Gere um relatório final de qualidade
 
@@ -300,11 +295,7 @@ Valide a implementação do plano especificado.
 GEMINI_REVIEW_PROMPT = """
 # Review Implementation
 
-Revise a implementação do plano especificado.
-
-## Conteúdo do Plano
-
-{spec_content}
+Revise a implementação do plano especificado (seção "Conteúdo do Plano" ao final).
 
 ## Propósito
 
@@ -480,7 +471,7 @@ async def get_execution(card_id: str, db_session: Optional[AsyncSession] = None)
         repo = ExecutionRepository(db_session)
         return await repo.get_execution_with_logs(card_id)
     else:
-        # Fallback para memória
+        # Fallback para memória (em andamento) ou para a visão da execução finalizada
         record = executions.get(card_id)
         if record:
             return {
@@ -491,6 +482,9 @@ async def get_execution(card_id: str, db_session: Optional[AsyncSession] = None)
                     for log in record.logs
                 ]
             }
+        finished = executions.finished(card_id)
+        if finished:
+            return await finished.load() or finished.to_dict()
         return None
 
 
@@ -501,13 +495,14 @@ def get_all_executions() -> list[ExecutionRecord]:
 
 def add_log(record: ExecutionRecord, log_type: LogType, content: str) -> None:
     """Add a log entry to the execution record."""
-    log = ExecutionLog(
-        timestamp=datetime.now().isoformat(),
-        type=log_type,
-        content=content,
-    )
+    log = LogEntry(datetime.now().isoformat(), log_type, content)
     record.logs.append(log)
 
+    # Stream ao vivo pelo WebSocket de execução (em lotes, com cursor de replay)
+    execution_ws_manager.logs.append(
+        record.card_id, record.started_at, log_type.value, content, log.timestamp
+    )
+
     # Criar prefixo com card_id (primeiros 8 caracteres para brevidade)
     card_id_short = record.card_id[:8] if len(record.card_id) > 8 else record.card_id
 
@@ -521,6 +516,101 @@ def add_log(record: ExecutionRecord, log_type: LogType, content: str) -> None:
     print(f"{card_prefix} [Agent] [{log_type.value.upper()}] {content}")
 
 
+def usage_tokens(usage: Any) -> dict:
+    """
+    Token counts from ResultMessage.usage (a dict). input_tokens excludes
+    the prompt cache: cache reads and writes are reported separately.
+    """
+    if not isinstance(usage, dict):
+        usage = {}
+    input_tokens = usage.get("input_tokens") or 0
+    output_tokens = usage.get("output_tokens") or 0
+    return {
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "total_tokens": input_tokens + output_tokens,
+        "cache_read_tokens": usage.get("cache_read_input_tokens") or 0,
+        "cache_write_tokens": usage.get("cache_creation_input_tokens") or 0,
+    }
+
+
+async def record_token_usage(
+    record: ExecutionRecord,
+    repo: Optional[ExecutionRepository],
+    execution_db: Any,
+    usage: Any,
+    model: str,
+) -> dict:
+    """Log the token usage of a stage and store it on the execution."""
+    token_stats = usage_tokens(usage)
+
+    add_log(record, LogType.INFO,
+        f"Token usage - Input: {token_stats['input_tokens']}, "
+        f"Output: {token_stats['output_tokens']}, "
+        f"Total: {token_stats['total_tokens']}, "
+        f"Cache read: {token_stats['cache_read_tokens']}, "
+        f"Cache write: {token_stats['cache_write_tokens']}")
+
+    if repo and execution_db:
+        await repo.update_token_usage(
+            execution_id=execution_db.id,
+            input_tokens=token_stats["input_tokens"],
+            output_tokens=token_stats["output_tokens"],
+            total_tokens=token_stats["total_tokens"],
+            model_used=model,
+            cache_read_tokens=token_stats["cache_read_tokens"],
+            cache_write_tokens=token_stats["cache_write_tokens"],
+        )
+    return token_stats
+
+
+async def run_stream(
+    runner: AgentRunner,
+    request: RunRequest,
+    record: ExecutionRecord,
+    repo: Optional[ExecutionRepository],
+    execution_db: Any,
+    on_event: Optional[Callable[[RunEvent], None]] = None,
+) -> str:
+    """
+    Run a stage prompt and log its stream (memory, WebSocket and DB).
+
+    Returns the stage result: the final result message when the backend
+    sends one, otherwise the concatenated text.
+    """
+    result_text = ""
+    async for event in runner.stream(request):
+        if event.kind == "text":
+            add_log(record, LogType.TEXT, event.text)
+            # Salva log no banco se disponível
+            if repo and execution_db:
+                await repo.add_log(
+                    execution_id=execution_db.id,
+                    log_type="text",
+                    content=event.text
+                )
+            result_text += event.text + runner.text_separator
+        elif event.kind == "tool":
+            add_log(record, LogType.TOOL, f"Using tool: {event.tool_name}")
+            if repo and execution_db:
+                await repo.add_log(
+                    execution_id=execution_db.id,
+                    log_type="tool",
+                    content=f"Using tool: {event.tool_name}"
+                )
+        elif event.kind == "result":
+            if event.text:
+                result_text = event.text
+                add_log(record, LogType.RESULT, event.text)
+            # Capturar token usage (inclui leituras/escritas do cache de prompt)
+            if event.usage:
+                await record_token_usage(record, repo, execution_db, event.usage, request.model)
+
+        if on_event:
+            on_event(event)
+    return result_text
+
+
 def extract_spec_path(text: str) -> Optional[str]:
     """Extrai o caminho do arquivo de spec do texto de resultado."""
     # Padrões comuns para detectar criação de arquivo de spec
@@ -538,6 +628,62 @@ def extract_spec_path(text: str) -> Optional[str]:
     return None
 
 
+async def mark_execution_cancelled(card_id: str, command: str) -> None:
+    """Close the card's running execution (memory and DB) after a cancellation."""
+    from .database import async_session_maker
+
+    record = executions.get(card_id)
+    if record and record.status == ExecutionStatus.RUNNING:
+        record.status = ExecutionStatus.ERROR
+        record.completed_at = datetime.now().isoformat()
+        add_log(record, LogType.ERROR, "Execution cancelled")
+
+    async with async_session_maker() as session:
+        repo = ExecutionRepository(session)
+        execution_db = await repo.get_active_execution(card_id)
+        if execution_db and execution_db.status == DBExecutionStatus.RUNNING:
+            await repo.update_execution_status(
+                execution_id=execution_db.id,
+                status=DBExecutionStatus.ERROR,
+                result="Execution cancelled"
+            )
+
+    await execution_ws_manager.notify_complete(
+        card_id=card_id,
+        status="cancelled",
+        command=command,
+        error="Execution cancelled"
+    )
+
+
+def governed(command: str):
+    """
+    Run a stage only when the execution governor admits it (global, model
+    and project limits) and turn a cancellation into a failed PlanResult.
+    """
+    def decorator(stage):
+        signature = inspect.signature(stage)
+
+        @functools.wraps(stage)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            card_id, model = bound.arguments["card_id"], bound.arguments["model"]
+            try:
+                async with get_execution_governor().slot(card_id, command, model):
+                    return await stage(*args, **kwargs)
+            except ExecutionCancelled as e:
+                print(f"[Agent] {e}")
+                await mark_execution_cancelled(card_id, command)
+                return PlanResult(success=False, error="Execution cancelled", logs=[])
+            finally:
+                # Os logs já estão no resultado e no banco; libera a memória do registro
+                executions.finish(card_id)
+
+        return wrapper
+    return decorator
+
+
 async def execute_plan_gemini(
     card_id: str,
     title: str,
@@ -548,7 +694,6 @@ async def execute_plan_gemini(
     db_session: Optional[AsyncSession] = None,
 ) -> PlanResult:
     """Execute plan using Gemini CLI."""
-    from .gemini_agent import GeminiAgent
     from .database import async_session_maker
     from .models.project import ActiveProject
     from sqlalchemy import select
@@ -581,17 +726,17 @@ async def execute_plan_gemini(
         else:
             print(f"[Agent] Using project directory (no worktree): {cwd}")
 
-    gemini = GeminiAgent(model=model)
-
     # Usar prompt embutido (Gemini CLI não reconhece comandos em worktrees)
-    arguments = f"{title}: {description}"
-    prompt = GEMINI_PLAN_PROMPT.format(arguments=arguments)
-
-    # Add working directory context to ensure files are saved in the correct location
-    prompt += f"\n\n**IMPORTANTE:** O diretório de trabalho é `{cwd}`. Salve todos os arquivos usando caminhos absolutos baseados neste diretório (ex: `{cwd}/specs/nome.md`)."
-
-    if images:
-        prompt += "\n\n[Imagens anexadas ao card estão disponíveis para análise]"
+    # Instruções e contexto do projeto primeiro; dados do card por último
+    builder = (
+        PromptBuilder()
+        .system(GEMINI_PLAN_PROMPT)
+        .project(plan_toml_context(cwd))
+        .card(f"## Solicitação\n\n{title}: {description}")
+        .card(working_directory_note(cwd))
+        .card(images_note(images, with_paths=False))
+    )
+    prompt = builder.build()
 
     # Usar repository se disponível
     repo = None
@@ -631,19 +776,10 @@ async def execute_plan_gemini(
     # Executa comando via Gemini CLI
     full_response = ""
     try:
-        async for chunk in gemini.execute_command(
-            prompt=prompt,
-            cwd=Path(cwd),
-            stream=True
-        ):
-            full_response += chunk
-            add_log(record, LogType.TEXT, chunk)
-            if repo and execution_db:
-                await repo.add_log(
-                    execution_id=execution_db.id,
-                    log_type="text",
-                    content=chunk
-                )
+        full_response = await run_stream(
+            get_runner(model), RunRequest(prompt=prompt, cwd=cwd, model=model),
+            record, repo, execution_db,
+        )
 
         # Extrai spec_path e retorna resultado
         spec_path = extract_spec_path(full_response)
@@ -721,7 +857,6 @@ async def execute_implement_gemini(
     db_session: Optional[AsyncSession] = None,
 ) -> PlanResult:
     """Execute /implement usando Gemini CLI."""
-    from .gemini_agent import GeminiAgent
     from .database import async_session_maker
     from .models.project import ActiveProject
     from sqlalchemy import select
@@ -754,8 +889,6 @@ async def execute_implement_gemini(
         else:
             print(f"[Agent] Using project directory (no worktree): {cwd}")
 
-    gemini = GeminiAgent(model=model)
-
     # Ler o conteúdo do arquivo de spec
     spec_file = Path(cwd) / spec_path
     if spec_file.exists():
@@ -764,9 +897,14 @@ async def execute_implement_gemini(
         spec_content = f"[Arquivo de spec não encontrado: {spec_path}]"
 
     # Usar prompt embutido (Gemini CLI não reconhece comandos em worktrees)
-    prompt = GEMINI_IMPLEMENT_PROMPT.format(spec_content=spec_content)
-    if images:
-        prompt += "\n\n[Imagens anexadas ao card estão disponíveis para análise]"
+    builder = (
+        PromptBuilder()
+        .system(GEMINI_IMPLEMENT_PROMPT)
+        .project(plan_toml_context(cwd))
+        .card(f"## Conteúdo do Plano\n\n{spec_content}")
+        .card(images_note(images, with_paths=False))
+    )
+    prompt = builder.build()
 
     # Usar spec_path como "título" para contexto visual
     spec_name = Path(spec_path).stem
@@ -809,19 +947,10 @@ async def execute_implement_gemini(
     # Executa comando via Gemini CLI
     full_response = ""
     try:
-        async for chunk in gemini.execute_command(
-            prompt=prompt,
-            cwd=Path(cwd),
-            stream=True
-        ):
-            full_response += chunk
-            add_log(record, LogType.TEXT, chunk)
-            if repo and execution_db:
-                await repo.add_log(
-                    execution_id=execution_db.id,
-                    log_type="text",
-                    content=chunk
-                )
+        full_response = await run_stream(
+            get_runner(model), RunRequest(prompt=prompt, cwd=cwd, model=model),
+            record, repo, execution_db,
+        )
 
         record.completed_at = datetime.now().isoformat()
         record.status = ExecutionStatus.SUCCESS
@@ -892,7 +1021,6 @@ async def execute_test_implementation_gemini(
     db_session: Optional[AsyncSession] = None,
 ) -> PlanResult:
     """Execute /test-implementation usando Gemini CLI."""
-    from .gemini_agent import GeminiAgent
     from .database import async_session_maker
     from .models.project import ActiveProject
     from sqlalchemy import select
@@ -925,8 +1053,6 @@ async def execute_test_implementation_gemini(
         else:
             print(f"[Agent] Using project directory (no worktree): {cwd}")
 
-    gemini = GeminiAgent(model=model)
-
     # Ler o conteúdo do arquivo de spec
     spec_file = Path(cwd) / spec_path
     if spec_file.exists():
@@ -935,9 +1061,14 @@ async def execute_test_implementation_gemini(
         spec_content = f"[Arquivo de spec não encontrado: {spec_path}]"
 
     # Usar prompt embutido (Gemini CLI não reconhece comandos em worktrees)
-    prompt = GEMINI_TEST_IMPLEMENTATION_PROMPT.format(spec_content=spec_content)
-    if images:
-        prompt += "\n\n[Imagens anexadas ao card estão disponíveis para análise]"
+    builder = (
+        PromptBuilder()
+        .system(GEMINI_TEST_IMPLEMENTATION_PROMPT)
+        .project(plan_toml_context(cwd))
+        .card(f"## Conteúdo do Plano\n\n{spec_content}")
+        .card(images_note(images, with_paths=False))
+    )
+    prompt = builder.build()
 
     # Usar spec_path como "título" para contexto visual
     spec_name = Path(spec_path).stem
@@ -980,19 +1111,10 @@ async def execute_test_implementation_gemini(
     # Executa comando via Gemini CLI
     full_response = ""
     try:
-        async for chunk in gemini.execute_command(
-            prompt=prompt,
-            cwd=Path(cwd),
-            stream=True
-        ):
-            full_response += chunk
-            add_log(record, LogType.TEXT, chunk)
-            if repo and execution_db:
-                await repo.add_log(
-                    execution_id=execution_db.id,
-                    log_type="text",
-                    content=chunk
-                )
+        full_response = await run_stream(
+            get_runner(model), RunRequest(prompt=prompt, cwd=cwd, model=model),
+            record, repo, execution_db,
+        )
 
         record.completed_at = datetime.now().isoformat()
         record.status = ExecutionStatus.SUCCESS
@@ -1063,7 +1185,6 @@ async def execute_review_gemini(
     db_session: Optional[AsyncSession] = None,
 ) -> PlanResult:
     """Execute /review usando Gemini CLI."""
-    from .gemini_agent import GeminiAgent
     from .database import async_session_maker
     from .models.project import ActiveProject
     from sqlalchemy import select
@@ -1096,8 +1217,6 @@ async def execute_review_gemini(
         else:
             print(f"[Agent] Using project directory (no worktree): {cwd}")
 
-    gemini = GeminiAgent(model=model)
-
     # Ler o conteúdo do arquivo de spec
     spec_file = Path(cwd) / spec_path
     if spec_file.exists():
@@ -1106,9 +1225,14 @@ async def execute_review_gemini(
         spec_content = f"[Arquivo de spec não encontrado: {spec_path}]"
 
     # Usar prompt embutido (Gemini CLI não reconhece comandos em worktrees)
-    prompt = GEMINI_REVIEW_PROMPT.format(spec_content=spec_content)
-    if images:
-        prompt += "\n\n[Imagens anexadas ao card estão disponíveis para análise]"
+    builder = (
+        PromptBuilder()
+        .system(GEMINI_REVIEW_PROMPT)
+        .project(plan_toml_context(cwd))
+        .card(f"## Conteúdo do Plano\n\n{spec_content}")
+        .card(images_note(images, with_paths=False))
+    )
+    prompt = builder.build()
 
     # Usar spec_path como "título" para contexto visual
     spec_name = Path(spec_path).stem
@@ -1151,19 +1275,10 @@ async def execute_review_gemini(
     # Executa comando via Gemini CLI
     full_response = ""
     try:
-        async for chunk in gemini.execute_command(
-            prompt=prompt,
-            cwd=Path(cwd),
-            stream=True
-        ):
-            full_response += chunk
-            add_log(record, LogType.TEXT, chunk)
-            if repo and execution_db:
-                await repo.add_log(
-                    execution_id=execution_db.id,
-                    log_type="text",
-                    content=chunk
-                )
+        full_response = await run_stream(
+            get_runner(model), RunRequest(prompt=prompt, cwd=cwd, model=model),
+            record, repo, execution_db,
+        )
 
         record.completed_at = datetime.now().isoformat()
         record.status = ExecutionStatus.SUCCESS
@@ -1225,6 +1340,7 @@ async def execute_review_gemini(
         )
 
 
+@governed("/plan")
 async def execute_plan(
     card_id: str,
     title: str,
@@ -1277,35 +1393,25 @@ async def execute_plan(
         else:
             print(f"[Agent] Using project directory (no worktree): {cwd}")
 
-    # Detect provider
-    provider = get_model_provider(model)
-
-    # Mapear nome de modelo para valor do SDK (Claude)
-    model_map = {
-        "opus-4.5": "opus",
-        "sonnet-4.5": "sonnet",
-        "haiku-4.5": "haiku",
-    }
-    sdk_model = model_map.get(model, "opus")
-
-    prompt = f"/plan {title}: {description}"
-
-    # Add working directory context to ensure files are saved in the correct location
-    prompt += f"\n\n**IMPORTANTE:** O diretório de trabalho é `{cwd}`. Salve todos os arquivos usando caminhos absolutos baseados neste diretório (ex: `{cwd}/specs/nome.md`)."
+    # Contexto do projeto (plan.toml, knowledge dos experts) vai no system prompt,
+    # estável entre estágios; dados do card seguem o comando
+    builder = PromptBuilder().project(plan_toml_context(cwd))
 
     # Add expert context if available
     if experts:
-        from .services.expert_triage_service import build_expert_context_for_plan
-        expert_context = build_expert_context_for_plan(experts, cwd)
-        if expert_context:
-            prompt += f"\n\n{expert_context}"
+        from .services.expert_triage_service import build_expert_layers
+        knowledge, matches = build_expert_layers(experts, cwd)
+        builder.project(knowledge).card(matches)
+        if knowledge or matches:
             print(f"[Agent] Injected expert context from {len(experts)} experts")
 
+    # Add working directory context to ensure files are saved in the correct location
+    builder.card(working_directory_note(cwd))
+
     # Add image references if available
-    if images:
-        prompt += "\n\nImagens anexadas neste card:\n"
-        for img in images:
-            prompt += f"- {img.get('filename', 'image')}: {img.get('path', '')}\n"
+    builder.card(images_note(images))
+
+    prompt, system_prompt = builder.claude(f"/plan {title}: {description}")
 
     # Usar repository se disponível, senão usar memória
     repo = None
@@ -1349,139 +1455,35 @@ async def execute_plan(
     add_log(record, LogType.INFO, f"Starting plan execution for: {title}")
     add_log(record, LogType.INFO, f"Working directory: {cwd}")
     add_log(record, LogType.INFO, f"Prompt: {prompt}")
+    add_log(record, LogType.INFO, builder.describe())
 
     result_text = ""
     spec_path: Optional[str] = None
 
-    try:
-        # Configure agent options
-        cwd_path = Path(cwd)
-        print(f"[Agent] Final CWD being used: {cwd_path.absolute()}")
-
-        if provider == "google":
-            # Use Gemini implementation
-            from .services.gemini_service import get_gemini_service
-
-            gemini_service = get_gemini_service()
-
-            # Execute using Gemini
-            async for chunk in gemini_service.execute_command(
-                command="/plan",
-                content=f"{title}: {description}",
-                model_name=model,
-                cwd=str(cwd_path),
-                images=images
-            ):
-                if chunk["type"] == "text":
-                    content = chunk["content"]
-                    add_log(record, LogType.TEXT, content)
-                    # Salva log no banco se disponível
-                    if repo and execution_db:
-                        await repo.add_log(
-                            execution_id=execution_db.id,
-                            log_type="text",
-                            content=content
-                        )
-                    result_text += content + "\n"
-                    # Tentar extrair spec_path do texto
-                    if not spec_path:
-                        spec_path = extract_spec_path(content)
-                elif chunk["type"] == "error":
-                    error_msg = chunk["content"]
-                    add_log(record, LogType.ERROR, error_msg)
-                    if repo and execution_db:
-                        await repo.add_log(
-                            execution_id=execution_db.id,
-                            log_type="error",
-                            content=error_msg
-                        )
-                    raise RuntimeError(error_msg)
+    def track_spec_path(event: RunEvent) -> None:
+        nonlocal spec_path
+        # Se for Write tool em specs/, captura o file_path
+        if event.kind == "tool" and event.tool_name == "Write" and event.tool_input:
+            file_path = event.tool_input.get("file_path")
+            if isinstance(file_path, str) and "specs/" in file_path and file_path.endswith(".md"):
+                spec_path = file_path
+                add_log(record, LogType.INFO, f"Spec file detected: {spec_path}")
+        # Senão, tenta extrair do texto ou do resultado
+        elif event.kind in ("text", "result") and event.text and not spec_path:
+            spec_path = extract_spec_path(event.text)
 
-        else:
-            # Use Claude Agent SDK
-            options = ClaudeAgentOptions(
-                cwd=cwd_path,
-                setting_sources=["user", "project"],  # Load Skills from .claude/skills/
-                allowed_tools=["Skill", "Read", "Write", "Edit", "Bash", "Glob", "Grep", "TodoWrite"],
-                permission_mode="acceptEdits",
-                model=sdk_model,
+    try:
+        print(f"[Agent] Final CWD being used: {Path(cwd).absolute()}")
+        try:
+            result_text = await run_stream(
+                get_runner(model),
+                RunRequest(prompt=prompt, cwd=cwd, model=model, system_prompt=system_prompt),
+                record, repo, execution_db,
+                on_event=track_spec_path,
             )
-
-            # Execute using claude-agent-sdk
-            try:
-                async for message in query(prompt=prompt, options=options):
-                    if isinstance(message, AssistantMessage):
-                        # Handle assistant messages with content blocks
-                        for block in message.content:
-                            if isinstance(block, TextBlock):
-                                add_log(record, LogType.TEXT, block.text)
-                                # Salva log no banco se disponível
-                                if repo and execution_db:
-                                    await repo.add_log(
-                                        execution_id=execution_db.id,
-                                        log_type="text",
-                                        content=block.text
-                                    )
-                                result_text += block.text + "\n"
-                                # Tentar extrair spec_path do texto
-                                if not spec_path:
-                                    spec_path = extract_spec_path(block.text)
-                            elif isinstance(block, ToolUseBlock):
-                                add_log(record, LogType.TOOL, f"Using tool: {block.name}")
-                                # Salva log no banco se disponível
-                                if repo and execution_db:
-                                    await repo.add_log(
-                                        execution_id=execution_db.id,
-                                        log_type="tool",
-                                        content=f"Using tool: {block.name}"
-                                    )
-                                # Se for Write tool, captura o file_path
-                                if block.name == "Write" and hasattr(block, "input"):
-                                    tool_input = block.input
-                                    if isinstance(tool_input, dict) and "file_path" in tool_input:
-                                        file_path = tool_input["file_path"]
-                                        if "specs/" in file_path and file_path.endswith(".md"):
-                                            spec_path = file_path
-                                            add_log(record, LogType.INFO, f"Spec file detected: {spec_path}")
-
-                    elif isinstance(message, ResultMessage):
-                        if hasattr(message, "result") and message.result:
-                            result_text = message.result
-                            add_log(record, LogType.RESULT, message.result)
-                            # Tentar extrair spec_path do resultado
-                            if not spec_path:
-                                spec_path = extract_spec_path(message.result)
-
-                        # DEBUG: Log ResultMessage attributes
-                        print(f"[DEBUG] ResultMessage received. Has usage: {hasattr(message, 'usage')}, usage value: {getattr(message, 'usage', 'N/A')}")
-
-                        # Capturar token usage (usage é um dict, não objeto)
-                        if hasattr(message, 'usage') and message.usage:
-                            usage = message.usage
-                            input_tokens = usage.get('input_tokens', 0) if isinstance(usage, dict) else 0
-                            output_tokens = usage.get('output_tokens', 0) if isinstance(usage, dict) else 0
-                            token_stats = {
-                                "input_tokens": input_tokens,
-                                "output_tokens": output_tokens,
-                                "total_tokens": input_tokens + output_tokens,
-                            }
-
-                            add_log(record, LogType.INFO,
-                                f"Token usage - Input: {token_stats['input_tokens']}, "
-                                f"Output: {token_stats['output_tokens']}, "
-                                f"Total: {token_stats['total_tokens']}")
-
-                            if repo and execution_db:
-                                await repo.update_token_usage(
-                                    execution_id=execution_db.id,
-                                    input_tokens=token_stats["input_tokens"],
-                                    output_tokens=token_stats["output_tokens"],
-                                    total_tokens=token_stats["total_tokens"],
-                                    model_used=model
-                                )
-            except asyncio.CancelledError:
-                add_log(record, LogType.ERROR, "Execution cancelled by client")
-                raise
+        except asyncio.CancelledError:
+            add_log(record, LogType.ERROR, "Execution cancelled by client")
+            raise
 
         # Mark as success
         record.completed_at = datetime.now().isoformat()
@@ -1574,6 +1576,7 @@ async def execute_plan(
         )
 
 
+@governed("/implement")
 async def execute_implement(
     card_id: str,
     spec_path: str,
@@ -1623,21 +1626,9 @@ async def execute_implement(
         else:
             print(f"[Agent] Using project directory (no worktree): {cwd}")
 
-    # Mapear nome de modelo para valor do SDK
-    model_map = {
-        "opus-4.5": "opus",
-        "sonnet-4.5": "sonnet",
-        "haiku-4.5": "haiku",
-    }
-    sdk_model = model_map.get(model, "opus")
-
-    prompt = f"/implement {spec_path}"
-
-    # Add image references if available
-    if images:
-        prompt += "\n\nImagens anexadas neste card:\n"
-        for img in images:
-            prompt += f"- {img.get('filename', 'image')}: {img.get('path', '')}\n"
+    # Contexto do projeto no system prompt (prefixo estável); imagens seguem o comando
+    builder = PromptBuilder().project(plan_toml_context(cwd)).card(images_note(images))
+    prompt, system_prompt = builder.claude(f"/implement {spec_path}")
 
     # Usar spec_path como "título" para contexto visual
     spec_name = Path(spec_path).stem  # Ex: "feature-x" de "specs/feature-x.md"
@@ -1684,72 +1675,16 @@ async def execute_implement(
     add_log(record, LogType.INFO, f"Starting implementation for: {spec_path}")
     add_log(record, LogType.INFO, f"Working directory: {cwd}")
     add_log(record, LogType.INFO, f"Prompt: {prompt}")
+    add_log(record, LogType.INFO, builder.describe())
 
     result_text = ""
 
     try:
-        # Configure agent options
-        options = ClaudeAgentOptions(
-            cwd=Path(cwd),
-            setting_sources=["user", "project"],
-            allowed_tools=["Skill", "Read", "Write", "Edit", "Bash", "Glob", "Grep", "TodoWrite"],
-            permission_mode="acceptEdits",
-            model=sdk_model,
-        )
-
-        # Execute using claude-agent-sdk
-        async for message in query(prompt=prompt, options=options):
-            if isinstance(message, AssistantMessage):
-                for block in message.content:
-                    if isinstance(block, TextBlock):
-                        add_log(record, LogType.TEXT, block.text)
-                        # Salva log no banco se disponível
-                        if repo and execution_db:
-                            await repo.add_log(
-                                execution_id=execution_db.id,
-                                log_type="text",
-                                content=block.text
-                            )
-                        result_text += block.text + "\n"
-                    elif isinstance(block, ToolUseBlock):
-                        add_log(record, LogType.TOOL, f"Using tool: {block.name}")
-                        # Salva log no banco se disponível
-                        if repo and execution_db:
-                            await repo.add_log(
-                                execution_id=execution_db.id,
-                                log_type="tool",
-                                content=f"Using tool: {block.name}"
-                            )
-
-            elif isinstance(message, ResultMessage):
-                if hasattr(message, "result") and message.result:
-                    result_text = message.result
-                    add_log(record, LogType.RESULT, message.result)
-
-                # Capturar token usage (usage é um dict, não objeto)
-                if hasattr(message, 'usage') and message.usage:
-                    usage = message.usage
-                    input_tokens = usage.get('input_tokens', 0) if isinstance(usage, dict) else 0
-                    output_tokens = usage.get('output_tokens', 0) if isinstance(usage, dict) else 0
-                    token_stats = {
-                        "input_tokens": input_tokens,
-                        "output_tokens": output_tokens,
-                        "total_tokens": input_tokens + output_tokens,
-                    }
-
-                    add_log(record, LogType.INFO,
-                        f"Token usage - Input: {token_stats['input_tokens']}, "
-                        f"Output: {token_stats['output_tokens']}, "
-                        f"Total: {token_stats['total_tokens']}")
-
-                    if repo and execution_db:
-                        await repo.update_token_usage(
-                            execution_id=execution_db.id,
-                            input_tokens=token_stats["input_tokens"],
-                            output_tokens=token_stats["output_tokens"],
-                            total_tokens=token_stats["total_tokens"],
-                            model_used=model
-                        )
+        result_text = await run_stream(
+            get_runner(model),
+            RunRequest(prompt=prompt, cwd=cwd, model=model, system_prompt=system_prompt),
+            record, repo, execution_db,
+        )
 
         # Mark as success
         record.completed_at = datetime.now().isoformat()
@@ -1897,6 +1832,7 @@ async def create_fix_card_for_test_failure(
         return None
 
 
+@governed("/test-implementation")
 async def execute_test_implementation(
     card_id: str,
     spec_path: str,
@@ -1946,21 +1882,9 @@ async def execute_test_implementation(
         else:
             print(f"[Agent] Using project directory (no worktree): {cwd}")
 
-    # Mapear nome de modelo para valor do SDK
-    model_map = {
-        "opus-4.5": "opus",
-        "sonnet-4.5": "sonnet",
-        "haiku-4.5": "haiku",
-    }
-    sdk_model = model_map.get(model, "opus")
-
-    prompt = f"/test-implementation {spec_path}"
-
-    # Add image references if available
-    if images:
-        prompt += "\n\nImagens anexadas neste card:\n"
-        for img in images:
-            prompt += f"- {img.get('filename', 'image')}: {img.get('path', '')}\n"
+    # Contexto do projeto no system prompt (prefixo estável); imagens seguem o comando
+    builder = PromptBuilder().project(plan_toml_context(cwd)).card(images_note(images))
+    prompt, system_prompt = builder.claude(f"/test-implementation {spec_path}")
 
     # Usar spec_path como "título" para contexto visual
     spec_name = Path(spec_path).stem  # Ex: "feature-x" de "specs/feature-x.md"
@@ -2007,72 +1931,16 @@ async def execute_test_implementation(
     add_log(record, LogType.INFO, f"Starting test-implementation for: {spec_path}")
     add_log(record, LogType.INFO, f"Working directory: {cwd}")
     add_log(record, LogType.INFO, f"Prompt: {prompt}")
+    add_log(record, LogType.INFO, builder.describe())
 
     result_text = ""
 
     try:
-        # Configure agent options
-        options = ClaudeAgentOptions(
-            cwd=Path(cwd),
-            setting_sources=["user", "project"],
-            allowed_tools=["Skill", "Read", "Write", "Edit", "Bash", "Glob", "Grep", "TodoWrite"],
-            permission_mode="acceptEdits",
-            model=sdk_model,
-        )
-
-        # Execute using claude-agent-sdk
-        async for message in query(prompt=prompt, options=options):
-            if isinstance(message, AssistantMessage):
-                for block in message.content:
-                    if isinstance(block, TextBlock):
-                        add_log(record, LogType.TEXT, block.text)
-                        # Salva log no banco se disponível
-                        if repo and execution_db:
-                            await repo.add_log(
-                                execution_id=execution_db.id,
-                                log_type="text",
-                                content=block.text
-                            )
-                        result_text += block.text + "\n"
-                    elif isinstance(block, ToolUseBlock):
-                        add_log(record, LogType.TOOL, f"Using tool: {block.name}")
-                        # Salva log no banco se disponível
-                        if repo and execution_db:
-                            await repo.add_log(
-                                execution_id=execution_db.id,
-                                log_type="tool",
-                                content=f"Using tool: {block.name}"
-                            )
-
-            elif isinstance(message, ResultMessage):
-                if hasattr(message, "result") and message.result:
-                    result_text = message.result
-                    add_log(record, LogType.RESULT, message.result)
-
-                # Capturar token usage (usage é um dict, não objeto)
-                if hasattr(message, 'usage') and message.usage:
-                    usage = message.usage
-                    input_tokens = usage.get('input_tokens', 0) if isinstance(usage, dict) else 0
-                    output_tokens = usage.get('output_tokens', 0) if isinstance(usage, dict) else 0
-                    token_stats = {
-                        "input_tokens": input_tokens,
-                        "output_tokens": output_tokens,
-                        "total_tokens": input_tokens + output_tokens,
-                    }
-
-                    add_log(record, LogType.INFO,
-                        f"Token usage - Input: {token_stats['input_tokens']}, "
-                        f"Output: {token_stats['output_tokens']}, "
-                        f"Total: {token_stats['total_tokens']}")
-
-                    if repo and execution_db:
-                        await repo.update_token_usage(
-                            execution_id=execution_db.id,
-                            input_tokens=token_stats["input_tokens"],
-                            output_tokens=token_stats["output_tokens"],
-                            total_tokens=token_stats["total_tokens"],
-                            model_used=model
-                        )
+        result_text = await run_stream(
+            get_runner(model),
+            RunRequest(prompt=prompt, cwd=cwd, model=model, system_prompt=system_prompt),
+            record, repo, execution_db,
+        )
 
         # Check if tests failed based on logs
         test_failed = False
@@ -2237,6 +2105,7 @@ async def execute_test_implementation(
         )
 
 
+@governed("/review")
 async def execute_review(
     card_id: str,
     spec_path: str,
@@ -2286,21 +2155,9 @@ async def execute_review(
         else:
             print(f"[Agent] Using project directory (no worktree): {cwd}")
 
-    # Mapear nome de modelo para valor do SDK
-    model_map = {
-        "opus-4.5": "opus",
-        "sonnet-4.5": "sonnet",
-        "haiku-4.5": "haiku",
-    }
-    sdk_model = model_map.get(model, "opus")
-
-    prompt = f"/review {spec_path}"
-
-    # Add image references if available
-    if images:
-        prompt += "\n\nImagens anexadas neste card:\n"
-        for img in images:
-            prompt += f"- {img.get('filename', 'image')}: {img.get('path', '')}\n"
+    # Contexto do projeto no system prompt (prefixo estável); imagens seguem o comando
+    builder = PromptBuilder().project(plan_toml_context(cwd)).card(images_note(images))
+    prompt, system_prompt = builder.claude(f"/review {spec_path}")
 
     # Usar spec_path como "título" para contexto visual
     spec_name = Path(spec_path).stem  # Ex: "feature-x" de "specs/feature-x.md"
@@ -2347,72 +2204,16 @@ async def execute_review(
     add_log(record, LogType.INFO, f"Starting review for: {spec_path}")
     add_log(record, LogType.INFO, f"Working directory: {cwd}")
     add_log(record, LogType.INFO, f"Prompt: {prompt}")
+    add_log(record, LogType.INFO, builder.describe())
 
     result_text = ""
 
     try:
-        # Configure agent options
-        options = ClaudeAgentOptions(
-            cwd=Path(cwd),
-            setting_sources=["user", "project"],
-            allowed_tools=["Skill", "Read", "Write", "Edit", "Bash", "Glob", "Grep", "TodoWrite"],
-            permission_mode="acceptEdits",
-            model=sdk_model,
-        )
-
-        # Execute using claude-agent-sdk
-        async for message in query(prompt=prompt, options=options):
-            if isinstance(message, AssistantMessage):
-                for block in message.content:
-                    if isinstance(block, TextBlock):
-                        add_log(record, LogType.TEXT, block.text)
-                        # Salva log no banco se disponível
-                        if repo and execution_db:
-                            await repo.add_log(
-                                execution_id=execution_db.id,
-                                log_type="text",
-                                content=block.text
-                            )
-                        result_text += block.text + "\n"
-                    elif isinstance(block, ToolUseBlock):
-                        add_log(record, LogType.TOOL, f"Using tool: {block.name}")
-                        # Salva log no banco se disponível
-                        if repo and execution_db:
-                            await repo.add_log(
-                                execution_id=execution_db.id,
-                                log_type="tool",
-                                content=f"Using tool: {block.name}"
-                            )
-
-            elif isinstance(message, ResultMessage):
-                if hasattr(message, "result") and message.result:
-                    result_text = message.result
-                    add_log(record, LogType.RESULT, message.result)
-
-                # Capturar token usage (usage é um dict, não objeto)
-                if hasattr(message, 'usage') and message.usage:
-                    usage = message.usage
-                    input_tokens = usage.get('input_tokens', 0) if isinstance(usage, dict) else 0
-                    output_tokens = usage.get('output_tokens', 0) if isinstance(usage, dict) else 0
-                    token_stats = {
-                        "input_tokens": input_tokens,
-                        "output_tokens": output_tokens,
-                        "total_tokens": input_tokens + output_tokens,
-                    }
-
-                    add_log(record, LogType.INFO,
-                        f"Token usage - Input: {token_stats['input_tokens']}, "
-                        f"Output: {token_stats['output_tokens']}, "
-                        f"Total: {token_stats['total_tokens']}")
-
-                    if repo and execution_db:
-                        await repo.update_token_usage(
-                            execution_id=execution_db.id,
-                            input_tokens=token_stats["input_tokens"],
-                            output_tokens=token_stats["output_tokens"],
-                            total_tokens=token_stats["total_tokens"],
-                            model_used=model
-                        )
+        result_text = await run_stream(
+            get_runner(model),
+            RunRequest(prompt=prompt, cwd=cwd, model=model, system_prompt=system_prompt),
+            record, repo, execution_db,
+        )
 
         # Mark as success
         record.completed_at = datetime.now().isoformat()
@@ -2552,28 +2353,19 @@ async def execute_expert_triage(
     result_text = ""
 
     try:
-        # Configure agent options - use haiku for speed
-        options = ClaudeAgentOptions(
-            cwd=Path(project_path),
-            setting_sources=["user", "project"],
-            allowed_tools=["Read", "Glob"],
-            permission_mode="acceptEdits",
-            model="haiku",
-        )
-
-        # Execute using claude-agent-sdk
-        async for message in query(prompt=prompt, options=options):
-            if isinstance(message, AssistantMessage):
-                for block in message.content:
-                    if isinstance(block, TextBlock):
-                        print(f"[Agent] [TRIAGE] {block.text[:100]}...")
-                        result_text += block.text + "\n"
-                    elif isinstance(block, ToolUseBlock):
-                        print(f"[Agent] [TRIAGE] Using tool: {block.name}")
-
-            elif isinstance(message, ResultMessage):
-                if hasattr(message, "result") and message.result:
-                    result_text = message.result
+        # Use haiku for speed; triage logs only to the console
+        runner = get_runner("haiku-4.5")
+        request = RunRequest(
+            prompt=prompt, cwd=project_path, model="haiku-4.5", allowed_tools=["Read", "Glob"]
+        )
+        async for event in runner.stream(request):
+            if event.kind == "text":
+                print(f"[Agent] [TRIAGE] {event.text[:100]}...")
+                result_text += event.text + runner.text_separator
+            elif event.kind == "tool":
+                print(f"[Agent] [TRIAGE] Using tool: {event.tool_name}")
+            elif event.kind == "result" and event.text:
+                result_text = event.text
 
         # Parse JSON from result
         experts = {}
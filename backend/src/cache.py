@@ -1,6 +1,12 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Set, Callable, Awaitable, Iterable
 from datetime import datetime, timedelta
 import asyncio
+import hashlib
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
 
 class ExecutionCache:
     """Cache em memória para logs de execução com TTL"""
@@ -35,18 +41,172 @@ class ExecutionCache:
             del self._cache[card_id]
             del self._timestamps[card_id]
 
-    async def cleanup(self):
-        """Remove entradas expiradas periodicamente"""
-        while True:
-            await asyncio.sleep(60)  # Limpa a cada minuto
-            now = datetime.utcnow()
-            expired = [
-                card_id
-                for card_id, timestamp in self._timestamps.items()
-                if now - timestamp > self.ttl
-            ]
-            for card_id in expired:
-                self.invalidate(card_id)
+    def purge_expired(self) -> int:
+        """Remove entradas expiradas (job execution_cache_cleanup)"""
+        now = datetime.utcnow()
+        expired = [
+            card_id
+            for card_id, timestamp in self._timestamps.items()
+            if now - timestamp > self.ttl
+        ]
+        for card_id in expired:
+            self.invalidate(card_id)
+        return len(expired)
+
+class CachedResponse:
+    """Resposta serializada em cache com ETag."""
+
+    __slots__ = ("body", "etag", "created_at", "tags")
+
+    def __init__(self, body: bytes, tags: Set[str]):
+        self.body = body
+        self.etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        self.created_at = datetime.utcnow()
+        self.tags = tags
+
+
+class ResponseCache:
+    """
+    Cache de respostas JSON com TTL, invalidação por tags e stale-while-revalidate.
+
+    - Dentro de `ttl` a entrada é servida diretamente.
+    - Entre `ttl` e `ttl + stale_ttl` a entrada antiga é servida e um único
+      recálculo é disparado em background.
+    - Misses concorrentes para a mesma chave compartilham um único cálculo.
+    - `invalidate_tag` remove todas as entradas associadas à tag.
+    """
+
+    def __init__(self, ttl_seconds: int = 30, stale_seconds: int = 120, max_entries: int = 1000):
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.stale = timedelta(seconds=stale_seconds)
+        self.max_entries = max_entries
+        self.enabled = True
+        self._entries: Dict[str, CachedResponse] = {}
+        self._tags: Dict[str, Set[str]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._inflight_tags: Dict[str, Set[str]] = {}
+        self._generation: Dict[str, int] = {}
+        # Referências fortes das tasks de cálculo (o loop só guarda referências fracas)
+        self._tasks: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def make_key(namespace: str, params: Dict[str, Any]) -> str:
+        """Monta uma chave estável a partir do namespace e dos parâmetros."""
+        items = sorted((k, str(v)) for k, v in params.items() if v is not None)
+        return namespace + "?" + "&".join(f"{k}={v}" for k, v in items)
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        tags: Iterable[str] = (),
+        revalidate: Optional[Callable[[], Awaitable[Any]]] = None
+    ) -> CachedResponse:
+        """
+        Retorna a resposta em cache ou calcula uma nova.
+
+        Args:
+            key: Chave da entrada
+            compute: Calcula o payload (serializável em JSON); roda numa task
+                     compartilhada por todos que esperam a chave, então não deve
+                     depender de recursos da requisição que a disparou
+            tags: Tags de dependência para invalidação
+            revalidate: Calcula o payload fora da requisição (stale-while-revalidate);
+                        se omitido, entradas stale são recalculadas em primeiro plano
+        """
+        tags = set(tags)
+        if not self.enabled:
+            return self._serialize(await compute(), tags)
+
+        entry = self._entries.get(key)
+        if entry:
+            age = datetime.utcnow() - entry.created_at
+            if age <= self.ttl:
+                return entry
+            if age <= self.ttl + self.stale and revalidate is not None:
+                if key not in self._inflight:
+                    self._start(key, revalidate, tags)
+                return entry
+
+        if key not in self._inflight:
+            self._start(key, compute, tags)
+        return await asyncio.shield(self._inflight[key])
+
+    def _start(self, key: str, compute: Callable[[], Awaitable[Any]], tags: Set[str]) -> None:
+        """Dispara um cálculo único (single-flight) para a chave."""
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self._inflight_tags[key] = tags
+        generation = self._generation.get(key, 0)
+
+        async def run():
+            try:
+                entry = self._serialize(await compute(), tags)
+                # Invalidação durante o cálculo: não guarda dado possivelmente antigo
+                if self._generation.get(key, 0) == generation:
+                    self._store(key, entry)
+                future.set_result(entry)
+            except Exception as e:
+                logger.warning(f"Response cache compute failed for {key}: {e}")
+                future.set_exception(e)
+                # Evita "Future exception was never retrieved" em revalidações
+                future.exception()
+            finally:
+                self._inflight.pop(key, None)
+                self._inflight_tags.pop(key, None)
+
+        task = asyncio.create_task(run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _serialize(self, payload: Any, tags: Set[str]) -> CachedResponse:
+        body = json.dumps(payload, default=str, separators=(",", ":")).encode()
+        return CachedResponse(body, tags)
+
+    def _store(self, key: str, entry: CachedResponse) -> None:
+        if key not in self._entries and len(self._entries) >= self.max_entries:
+            oldest = min(self._entries, key=lambda k: self._entries[k].created_at)
+            self._remove(oldest)
+
+        self._entries[key] = entry
+        for tag in entry.tags:
+            self._tags.setdefault(tag, set()).add(key)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        self._generation[key] = self._generation.get(key, 0) + 1
+        if entry:
+            for tag in entry.tags:
+                keys = self._tags.get(tag)
+                if keys:
+                    keys.discard(key)
+                    if not keys:
+                        del self._tags[tag]
+
+    def invalidate_tag(self, tag: str) -> int:
+        """Remove todas as entradas com a tag. Retorna quantas foram removidas."""
+        keys = list(self._tags.get(tag, ()))
+        for key in keys:
+            self._remove(key)
+        # Cálculos em andamento com a tag não devem ser gravados
+        for key, inflight_tags in list(self._inflight_tags.items()):
+            if tag in inflight_tags and key not in keys:
+                self._generation[key] = self._generation.get(key, 0) + 1
+        return len(keys)
+
+    def clear(self) -> None:
+        """Remove todas as entradas."""
+        for key in list(self._entries):
+            self._remove(key)
+
+
+def metrics_cache_tag(project_id: str) -> str:
+    """Tag de dependência das respostas de métricas de um projeto."""
+    return f"metrics:{project_id}"
+
 
 # Instância global
-execution_cache = ExecutionCache()
\ No newline at end of file
+execution_cache = ExecutionCache()
+
+# Cache de respostas das rotas de métricas/dashboard
+metrics_response_cache = ResponseCache()
\ No newline at end of file
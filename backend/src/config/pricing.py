@@ -15,14 +15,26 @@ MODEL_PRICING: Dict[str, Tuple[Decimal, Decimal]] = {
     "gemini-3-flash": (Decimal("0.075"), Decimal("0.30")),
 }
 
-
-def calculate_cost(model: str, input_tokens: int, output_tokens: int) -> Decimal:
+# Multiplicadores sobre o preço de input para o cache de prompt
+CACHE_READ_MULTIPLIER = Decimal("0.10")
+CACHE_WRITE_MULTIPLIER = Decimal("1.25")
+
+
+def calculate_cost(
+    model: str,
+    input_tokens: int,
+    output_tokens: int,
+    cache_read_tokens: int = 0,
+    cache_write_tokens: int = 0,
+) -> Decimal:
     """Calcula custo baseado no modelo e tokens.
 
     Args:
         model: Nome do modelo utilizado
-        input_tokens: Quantidade de tokens de entrada
+        input_tokens: Quantidade de tokens de entrada (fora do cache)
         output_tokens: Quantidade de tokens de saída
+        cache_read_tokens: Tokens de entrada lidos do cache de prompt
+        cache_write_tokens: Tokens de entrada gravados no cache de prompt
 
     Returns:
         Custo total em USD como Decimal
@@ -35,5 +47,9 @@ def calculate_cost(model: str, input_tokens: int, output_tokens: int) -> Decimal
     # Converter tokens para milhões e calcular
     input_cost = (Decimal(input_tokens) / 1_000_000) * input_price
     output_cost = (Decimal(output_tokens) / 1_000_000) * output_price
+    cache_cost = (
+        Decimal(cache_read_tokens) * CACHE_READ_MULTIPLIER
+        + Decimal(cache_write_tokens) * CACHE_WRITE_MULTIPLIER
+    ) / 1_000_000 * input_price
 
-    return input_cost + output_cost
+    return input_cost + output_cost + cache_cost
@@ -39,10 +39,86 @@ class Settings(BaseSettings):
     orchestrator_enabled: bool = True
     orchestrator_loop_interval_seconds: int = 180  # 3 minutes
     orchestrator_log_file: str = "orchestrator.log"
+    orchestrator_log_max_bytes: int = 10 * 1024 * 1024  # Rotate (gzip) when the file reaches this size
+    orchestrator_log_rotate_hours: int = 24  # ... or when it is this old
+    orchestrator_log_backup_count: int = 7  # Compressed archives kept
+
+    # Tracing of the orchestrator cycle (GET /api/orchestrator/perf)
+    tracing_enabled: bool = True
+    tracing_sql_spans: bool = True  # SQL statements run inside a cycle become child spans
+    tracing_export_file: str = "orchestrator-traces.jsonl"  # OTLP/JSON, one trace per line ("" = no export)
+    tracing_recent_traces: int = 50  # Finished cycles kept in memory
+
+    # Prometheus-style metrics (GET /metrics)
+    metrics_enabled: bool = True
+    event_loop_lag_interval_ms: int = 500  # Period of the event loop lag probe
     orchestrator_usage_limit_percent: int = 80  # Pause if usage > 80%
 
     # Short-term memory settings
     short_term_memory_retention_hours: int = 24
+    short_term_memory_max_logs_per_goal: int = 1000  # Older entries of a goal (or of idle cycles) are deleted
+    short_term_memory_delete_batch_size: int = 5000  # Rows deleted per transaction by the retention job
+
+    # Metrics rollup settings (project_metrics buckets)
+    metrics_hourly_retention_days: int = 14  # Hourly buckets older than this become daily
+    metrics_daily_retention_days: int = 180  # Daily buckets older than this become weekly
+    metrics_compaction_interval_seconds: int = 3600
+
+    # Execution log streaming over WebSocket
+    execution_log_batch_ms: int = 100  # Log lines are sent in one frame per interval
+    execution_log_ring_size: int = 2000  # Lines kept per card for reconnect backfill
+    execution_registry_max_finished: int = 500  # Finished executions kept in memory as summaries (no logs)
+    execution_log_archive_after_hours: int = 24  # Finished executions older than this get their logs compressed
+    execution_log_archive_codec: str = "zlib"  # "zlib" or "zstd" (requires the zstandard package)
+    execution_log_archive_interval_seconds: int = 3600
+
+    # Background jobs (GET /api/jobs)
+    job_scheduler_enabled: bool = True
+    job_max_jitter_seconds: float = 30.0  # Runs are delayed by up to 10% of their period, capped here
+    auto_cleanup_enabled: bool = True  # Move cards from Done to Completed after auto_cleanup_after_minutes
+    auto_cleanup_after_minutes: int = 30
+    auto_cleanup_interval_seconds: int = 300
+    execution_cache_cleanup_interval_seconds: int = 60
+    orchestrator_log_cleanup_interval_seconds: int = 900  # Expired short-term memory logs
+    image_cleanup_max_age_days: int = 7
+    image_cleanup_cron: str = "30 3 * * *"  # UTC
+    worktree_cleanup_cron: str = "0 */6 * * *"  # Orphan worktrees of the active project (UTC)
+    log_search_reindex_cron: str = "15 4 * * *"  # Drops index terms of executions deleted outside the card repository (UTC)
+
+    # Pub/sub entre workers (WebSockets, presença, votação)
+    backplane_url: str = ""  # "" = em processo; sqlite:///broker.db ou redis://host:6379/0
+
+    # Live voting ingestion
+    vote_flush_interval_ms: int = 1000  # Accepted votes are written in one transaction per interval
+    vote_broadcast_hz: float = 4.0  # Max vote count broadcasts per second
+    vote_max_per_ip: int = 50  # Sessions that may vote from the same IP in a round (NAT)
+    vote_exact_dedup_sessions: int = 200_000  # Beyond this, dedup relies on the bloom filter
+    vote_bloom_capacity: int = 1_000_000  # ~1.8 MB at 0.1% false positives
+
+    # Chat sessions (persisted in the project DB; memory only holds a bounded cache)
+    chat_max_cached_sessions: int = 200  # LRU bound for sessions kept in memory
+    chat_session_ttl_seconds: int = 1800  # Idle sessions leave memory after this
+    chat_session_retention_days: int = 30  # Idle sessions are deleted from the DB after this
+    chat_history_token_budget: int = 6000  # Recent turns sent verbatim with each prompt
+    chat_summary_token_budget: int = 1000  # Rolling summary of the turns before the window
+    kanban_context_max_age_seconds: int = 300  # Board summary is rebuilt from the DB at most this often
+
+    # Agent backend used by the workflow stages
+    agent_runner_backend: str = "auto"  # "auto" (Claude SDK / Gemini CLI by model) or "fake" (replay, no network)
+    agent_runner_fake_script: str = ""  # JSONL stream replayed by the fake backend ("" = built-in script)
+    agent_runner_fake_speed: float = 1.0  # Divides recorded delays; 0 = replay without waiting
+
+    # Execution governor (admission control for agent runs; 0 = unlimited)
+    execution_max_concurrent: int = 10  # Runs at once in this worker (matches MAX_CONCURRENT_WORKTREES)
+    execution_max_per_model: int = 4  # Runs at once on the same model
+    execution_max_per_project: int = 6  # Runs at once on the same project (git/worktrees)
+    execution_starts_per_minute: float = 30.0  # Token bucket refill for run starts, all models
+    execution_model_starts_per_minute: float = 12.0  # Same, per model (provider rate limits)
+    execution_project_starts_per_minute: float = 20.0  # Same, per project
+    execution_start_burst: int = 5  # Starts allowed back to back before the rate applies
+
+    # Columnar export (Parquet) for offline analytics
+    metrics_export_dir: str = ".project_data/analytics"
 
 
 @lru_cache
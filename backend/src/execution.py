@@ -27,11 +27,25 @@ class ExecutionStatus(str, Enum):
 
 
 class ExecutionLog(BaseModel):
+    # from_attributes: aceita LogEntry (registro em memória) nas respostas
+    model_config = ConfigDict(from_attributes=True)
+
     timestamp: str
     type: str  # Pode ser string ou LogType, aceitar ambos
     content: str
 
 
+class LogEntry:
+    """Log line of a running execution (a fraction of an ExecutionLog's memory)."""
+
+    __slots__ = ("timestamp", "type", "content")
+
+    def __init__(self, timestamp: str, type: LogType, content: str):
+        self.timestamp = timestamp
+        self.type = type
+        self.content = content
+
+
 class ExecutionRecord(CamelCaseModel):
     model_config = ConfigDict(
         populate_by_name=True,
@@ -6,6 +6,8 @@ from pathlib import Path
 from typing import Optional, List, Dict
 from dataclasses import dataclass
 
+from .services.tracing import get_tracer
+
 # Limite de worktrees simultaneos
 MAX_CONCURRENT_WORKTREES = 10
 
@@ -43,14 +45,17 @@ class GitWorkspaceManager:
         """
         work_dir = cwd or str(self.project_path)
 
-        process = await asyncio.create_subprocess_exec(
-            *args,
-            cwd=work_dir,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
+        with get_tracer().span("git", command=" ".join(args[1:3])) as span:
+            process = await asyncio.create_subprocess_exec(
+                *args,
+                cwd=work_dir,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
 
-        stdout, stderr = await process.communicate()
+            stdout, stderr = await process.communicate()
+            if span is not None:
+                span.set_attribute("exit_code", process.returncode)
         return process.returncode, stdout.decode(), stderr.decode()
 
     async def _get_default_branch(self) -> str:
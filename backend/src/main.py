@@ -39,7 +39,12 @@ from .routes.settings import router as settings_router
 from .routes.experts import router as experts_router
 from .routes.orchestrator import router as orchestrator_router
 from .routes.live import router as live_router
+from .routes.logs import router as logs_router
+from .routes.jobs import router as jobs_router
+from .routes.telemetry import router as telemetry_router
 from .config.settings import get_settings
+from .services.execution_governor import get_execution_governor
+from .services.telemetry import EventLoopLagMonitor, HTTPMetricsMiddleware, instrument_process
 from .database import get_db, async_session_maker
 from .repositories.card_repository import CardRepository
 from .schemas.card import CardUpdate
@@ -49,6 +54,8 @@ from .models.card import Card  # noqa: F401
 from .models.project import ActiveProject  # noqa: F401
 from .models.orchestrator import Goal, OrchestratorAction, OrchestratorLog  # noqa: F401
 from .models.live import Vote, VotingRound, VotingOption, CompletedProject  # noqa: F401
+from .models.chat import ChatSession, ChatMessage  # noqa: F401
+from .models.execution import ExecutionLogArchive  # noqa: F401
 
 
 # Schema for workflow state update
@@ -63,6 +70,7 @@ import asyncio
 _orchestrator_task: Optional[asyncio.Task] = None
 
 
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan handler."""
@@ -73,8 +81,30 @@ async def lifespan(app: FastAPI):
     await create_tables()
     print("[Server] Database tables created successfully")
 
-    # Start orchestrator if enabled
+    # Pub/sub backplane: WebSocket events, presence and votes across workers
+    from .services.backplane import get_backplane
+    from .services.live_broadcast_service import get_live_broadcast_service
+    from .services.presence_service import get_presence_service
+    backplane = get_backplane()
+    await backplane.start()
+    get_live_broadcast_service()  # subscribes live/presence/voting channels
+    await get_presence_service().start()
+
+    # Start background jobs (cleanups, metrics compaction, log archiving)
+    from .services.background_jobs import register_default_jobs
+    from .services.job_scheduler import get_job_scheduler
     settings = get_settings()
+    job_scheduler = register_default_jobs(get_job_scheduler())
+    if settings.job_scheduler_enabled:
+        job_scheduler.start()
+
+    # Process metrics for GET /metrics (event loop lag, SQLite busy errors, subprocess spawns)
+    lag_monitor = EventLoopLagMonitor(settings.event_loop_lag_interval_ms / 1000)
+    if settings.metrics_enabled:
+        instrument_process()
+        lag_monitor.start()
+
+    # Start orchestrator if enabled
     if settings.orchestrator_enabled:
         print("[Server] Starting orchestrator background task...")
         _orchestrator_task = asyncio.create_task(_run_orchestrator())
@@ -93,6 +123,17 @@ async def lifespan(app: FastAPI):
             pass
         print("[Server] Orchestrator stopped")
 
+    # Logger e tracer também são usados fora do loop do orchestrator
+    from .services.orchestrator_logger import get_orchestrator_logger
+    from .services.tracing import get_tracer
+    await get_orchestrator_logger().close()
+    await get_tracer().close()
+
+    await lag_monitor.stop()
+    await job_scheduler.stop()
+    await get_presence_service().stop()
+    await backplane.stop()
+
 
 async def _run_orchestrator():
     """Run the orchestrator loop as a background task."""
@@ -137,6 +178,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if get_settings().metrics_enabled:
+    app.add_middleware(HTTPMetricsMiddleware)
 
 # Include routers
 app.include_router(cards_router)
@@ -151,6 +194,9 @@ app.include_router(settings_router)
 app.include_router(experts_router)
 app.include_router(orchestrator_router)
 app.include_router(live_router)
+app.include_router(logs_router)
+app.include_router(jobs_router)
+app.include_router(telemetry_router)
 
 
 @app.get("/health", response_model=HealthResponse)
@@ -549,6 +595,21 @@ async def update_workflow_state(
     return {"success": True, "stage": state.stage}
 
 
+@app.get("/api/executions/queue")
+async def get_execution_queue():
+    """Runs admitted and waiting in the execution governor, with its limits"""
+    return get_execution_governor().stats()
+
+
+@app.post("/api/executions/{card_id}/cancel")
+async def cancel_execution(card_id: str):
+    """Cancela as execuções do card (na fila ou em andamento)"""
+    cancelled = get_execution_governor().cancel(card_id)
+    if not cancelled["queued"] and not cancelled["running"]:
+        raise HTTPException(status_code=404, detail="No queued or running execution for this card")
+    return {"success": True, "cardId": card_id, **cancelled}
+
+
 @app.get("/api/logs/{card_id}", response_model=LogsResponse)
 async def get_logs_endpoint(card_id: str, db: AsyncSession = Depends(get_db)):
     """Get execution logs from database"""
@@ -690,16 +751,11 @@ async def list_active_branches(db: AsyncSession = Depends(get_db)):
 async def cleanup_orphan_worktrees(db: AsyncSession = Depends(get_db)):
     """Remove worktrees orfaos."""
 
-    project = await get_active_project(db)
-    if not project:
-        raise HTTPException(status_code=400, detail="No active project")
-
-    # Obter IDs de cards ativos
-    result = await db.execute(select(Card.id))
-    active_card_ids = [row[0] for row in result.fetchall()]
+    from .services.background_jobs import cleanup_orphan_worktrees as remove_orphan_worktrees
 
-    git_manager = GitWorkspaceManager(project.path)
-    removed = await git_manager.cleanup_orphan_worktrees(active_card_ids)
+    removed = await remove_orphan_worktrees(db)
+    if removed is None:
+        raise HTTPException(status_code=400, detail="No active project")
 
     return {"success": True, "removedCount": removed}
 
@@ -745,7 +801,11 @@ def main():
     print(f"[Server] Agent server running on http://localhost:{port}")
     print("[Server] Endpoints:")
     print("  - GET  /health")
+    print("  - GET  /metrics")
     print("  - GET  /api/logs/:cardId")
+    print("  - GET  /api/logs/search")
+    print("  - GET  /api/jobs")
+    print("  - POST /api/jobs/:name/run")
     print("  - GET  /api/executions")
     print("  - POST /api/execute-plan")
     print("  - POST /api/execute-implement")
@@ -770,7 +830,8 @@ def main():
     print("  - GET  /api/branches")
     print("  - POST /api/cleanup-orphan-worktrees")
 
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # permessage-deflate comprime os frames WebSocket quando o navegador oferece a extensão
+    uvicorn.run(app, host="0.0.0.0", port=port, ws_per_message_deflate=True)
 
 
 if __name__ == "__main__":
@@ -2,9 +2,9 @@
 
 from .user import User
 from .card import Card
-from .execution import Execution, ExecutionLog, ExecutionStatus
+from .execution import Execution, ExecutionLog, ExecutionLogArchive, ExecutionStatus
 from .activity_log import ActivityLog, ActivityType
-from .metrics import ProjectMetrics, ExecutionMetrics
+from .metrics import ProjectMetrics, ExecutionMetrics, ExecutionMetricsSketch, MetricsBackfillCheckpoint
 from .orchestrator import (
     Goal, GoalStatus,
     OrchestratorAction, ActionType,
@@ -15,11 +15,14 @@ from .live import (
     VotingRound, VotingOption,
     CompletedProject
 )
+from .chat import ChatSession, ChatMessage
 
 __all__ = [
-    "User", "Card", "Execution", "ExecutionLog", "ExecutionStatus",
+    "User", "Card", "Execution", "ExecutionLog", "ExecutionLogArchive", "ExecutionStatus",
     "ActivityLog", "ActivityType", "ProjectMetrics", "ExecutionMetrics",
+    "ExecutionMetricsSketch", "MetricsBackfillCheckpoint",
     "Goal", "GoalStatus", "OrchestratorAction", "ActionType",
     "OrchestratorLog", "OrchestratorLogType",
-    "Vote", "VoteType", "VotingRound", "VotingOption", "CompletedProject"
+    "Vote", "VoteType", "VotingRound", "VotingOption", "CompletedProject",
+    "ChatSession", "ChatMessage"
 ]
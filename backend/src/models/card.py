@@ -1,7 +1,7 @@
 """Card database model."""
 
 from datetime import datetime
-from sqlalchemy import Boolean, DateTime, JSON, String, Text, ForeignKey
+from sqlalchemy import Boolean, DateTime, JSON, String, Text, ForeignKey, DDL, event
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import List, Dict, Any
 
@@ -101,3 +101,39 @@ class Card(Base):
 
     def __repr__(self) -> str:
         return f"<Card(id={self.id}, title={self.title}, column={self.column_id})>"
+
+
+# Busca full-text dos cards (FTS5) em título, descrição e spec_path.
+# card_search_rows dá a cada card um rowid estável (o rowid implícito de
+# cards pode mudar num VACUUM), usado como rowid no índice.
+CARD_SEARCH_TABLES_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS cards_fts
+       USING fts5(title, description, spec_path, tokenize='unicode61 remove_diacritics 2')""",
+    """CREATE TABLE IF NOT EXISTS card_search_rows (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        card_id VARCHAR(36) NOT NULL UNIQUE
+    )""",
+]
+
+CARD_SEARCH_TRIGGERS_DDL = [
+    """CREATE TRIGGER IF NOT EXISTS cards_fts_insert AFTER INSERT ON cards
+    BEGIN
+        INSERT INTO card_search_rows (card_id) VALUES (new.id);
+        INSERT INTO cards_fts (rowid, title, description, spec_path)
+        VALUES (last_insert_rowid(), new.title, new.description, new.spec_path);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS cards_fts_update AFTER UPDATE OF title, description, spec_path ON cards
+    BEGIN
+        DELETE FROM cards_fts WHERE rowid = (SELECT id FROM card_search_rows WHERE card_id = old.id);
+        INSERT INTO cards_fts (rowid, title, description, spec_path)
+        SELECT id, new.title, new.description, new.spec_path FROM card_search_rows WHERE card_id = new.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS cards_fts_delete AFTER DELETE ON cards
+    BEGIN
+        DELETE FROM cards_fts WHERE rowid = (SELECT id FROM card_search_rows WHERE card_id = old.id);
+        DELETE FROM card_search_rows WHERE card_id = old.id;
+    END""",
+]
+
+for _statement in CARD_SEARCH_TABLES_DDL + CARD_SEARCH_TRIGGERS_DDL:
+    event.listen(Card.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
@@ -0,0 +1,64 @@
+"""Models for persisted chat sessions."""
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, JSON, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..database import Base
+
+
+class ChatSession(Base):
+    """A chat conversation with its rolling summary of older turns."""
+
+    __tablename__ = "chat_sessions"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False, index=True
+    )
+
+    # Resumo das mensagens que saíram da janela do prompt
+    summary: Mapped[str] = mapped_column(Text, default="", nullable=False)
+    summarized_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    message_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<ChatSession(id={self.id}, messages={self.message_count})>"
+
+
+class ChatMessage(Base):
+    """A single message of a chat session."""
+
+    __tablename__ = "chat_messages"
+    __table_args__ = (
+        Index("idx_chat_messages_session_seq", "session_id", "seq"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    session_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("chat_sessions.id", ondelete="CASCADE"), nullable=False
+    )
+    # Position in the conversation (0-based)
+    seq: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    role: Mapped[str] = mapped_column(String(20), nullable=False)  # user | assistant
+    content: Mapped[str] = mapped_column(Text, nullable=False)
+    model: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+    message_id: Mapped[Optional[str]] = mapped_column(String(36), nullable=True)
+
+    # Flags like isGoal/goalId/goalAcknowledgment
+    extra: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<ChatMessage(session={self.session_id}, seq={self.seq}, role={self.role})>"
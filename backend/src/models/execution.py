@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Enum, Integer, Boolean, Numeric
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Enum, Integer, Boolean, Numeric, JSON, LargeBinary, DDL, Index, event
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -33,6 +33,9 @@ class Execution(Base):
     input_tokens = Column(Integer, nullable=True)
     output_tokens = Column(Integer, nullable=True)
     total_tokens = Column(Integer, nullable=True)
+    # Prompt cache (não incluídos em input_tokens)
+    cache_read_tokens = Column(Integer, nullable=True)
+    cache_write_tokens = Column(Integer, nullable=True)
     model_used = Column(String, nullable=True)
 
     # Campo para custo da execução
@@ -41,6 +44,7 @@ class Execution(Base):
     # Relacionamentos
     card = relationship("Card", back_populates="executions")
     logs = relationship("ExecutionLog", back_populates="execution", cascade="all, delete-orphan")
+    log_archive = relationship("ExecutionLogArchive", uselist=False, cascade="all, delete-orphan")
 
 class ExecutionLog(Base):
     __tablename__ = "execution_logs"
@@ -53,4 +57,57 @@ class ExecutionLog(Base):
     sequence = Column(Integer)  # ordem do log
 
     # Relacionamento
-    execution = relationship("Execution", back_populates="logs")
\ No newline at end of file
+    execution = relationship("Execution", back_populates="logs")
+
+    # Mesmo índice da migration 003 (databases criados via create_all não o tinham)
+    __table_args__ = (
+        Index("idx_execution_logs_execution", "execution_id", "sequence"),
+    )
+
+
+class ExecutionLogArchive(Base):
+    """Logs de uma execução finalizada compactados (substituem as linhas de execution_logs)"""
+    __tablename__ = "execution_log_archives"
+
+    execution_id = Column(String, ForeignKey("executions.id"), primary_key=True)
+    codec = Column(String, nullable=False)  # zlib ou zstd
+    line_count = Column(Integer, nullable=False)
+    raw_bytes = Column(Integer, nullable=False)  # tamanho do JSON antes da compressão
+    # Um bloco comprimido a cada N linhas: [[primeira sequence, offset, tamanho], ...]
+    seq_index = Column(JSON, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+
+# Busca full-text dos logs (FTS5). O índice é contentless: o texto continua
+# em execution_logs/execution_log_archives e só os termos ficam no índice, que
+# sobrevive ao arquivamento (apagar as linhas quentes não dispara remoção).
+# execution_log_search_rows liga o rowid do índice à linha de log. O trigger
+# de delete só remove o mapeamento: os termos saem do índice em
+# LogSearchService.remove_executions (precisa do texto) ou no reindex.
+EXECUTION_LOG_SEARCH_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS execution_logs_fts
+       USING fts5(content, content='', tokenize='unicode61 remove_diacritics 2')""",
+    """CREATE TABLE IF NOT EXISTS execution_log_search_rows (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        execution_id VARCHAR NOT NULL,
+        sequence INTEGER NOT NULL,
+        type VARCHAR,
+        timestamp DATETIME
+    )""",
+    """CREATE INDEX IF NOT EXISTS idx_log_search_rows_execution
+       ON execution_log_search_rows(execution_id, sequence)""",
+    """CREATE TRIGGER IF NOT EXISTS execution_logs_fts_insert AFTER INSERT ON execution_logs
+    BEGIN
+        INSERT INTO execution_log_search_rows (execution_id, sequence, type, timestamp)
+        VALUES (new.execution_id, new.sequence, new.type, new.timestamp);
+        INSERT INTO execution_logs_fts (rowid, content) VALUES (last_insert_rowid(), new.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS executions_log_search_delete AFTER DELETE ON executions
+    BEGIN
+        DELETE FROM execution_log_search_rows WHERE execution_id = old.id;
+    END""",
+]
+
+for _statement in EXECUTION_LOG_SEARCH_DDL:
+    event.listen(ExecutionLog.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
@@ -2,7 +2,7 @@
 
 from datetime import datetime
 from enum import Enum
-from sqlalchemy import Boolean, DateTime, Integer, String, Text, ForeignKey
+from sqlalchemy import Boolean, DateTime, Integer, String, Text, ForeignKey, Index, text
 from sqlalchemy.orm import Mapped, mapped_column
 from typing import Optional
 
@@ -19,6 +19,13 @@ class Vote(Base):
     """Vote model for spectator voting system."""
 
     __tablename__ = "votes"
+    __table_args__ = (
+        # One project vote per session and round; batched inserts use OR IGNORE
+        Index(
+            "uq_votes_round_session", "voting_round_id", "session_id",
+            unique=True, sqlite_where=text("vote_type = 'project'"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
 
@@ -1,6 +1,6 @@
 """Modelos de métricas para análise de desempenho e custos."""
 
-from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, Date, Text, JSON, BigInteger, Numeric
+from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, Date, Text, JSON, BigInteger, Numeric, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -11,10 +11,24 @@ class ProjectMetrics(Base):
     """Métricas agregadas por projeto."""
 
     __tablename__ = "project_metrics"
+    __table_args__ = (
+        UniqueConstraint(
+            "project_id", "granularity", "bucket_start", "command", "model_used",
+            name="uq_project_metrics_bucket"
+        ),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     project_id = Column(String, ForeignKey("active_project.id"), nullable=False)
 
+    # Bucket de rollup (ver services/metrics_rollup_service.py)
+    granularity = Column(String, default="hour")  # hour, day, week
+    bucket_start = Column(DateTime)
+    command = Column(String, default="")
+    model_used = Column(String, default="unknown")
+    execution_count = Column(Integer, default=0)
+    successful_executions = Column(Integer, default=0)
+
     # Métricas de Tokens
     total_input_tokens = Column(Integer, default=0)
     total_output_tokens = Column(Integer, default=0)
@@ -48,6 +62,12 @@ class ProjectMetrics(Base):
         return {
             "id": self.id,
             "projectId": self.project_id,
+            "granularity": self.granularity,
+            "bucketStart": self.bucket_start.isoformat() if self.bucket_start else None,
+            "command": self.command,
+            "modelUsed": self.model_used,
+            "executionCount": self.execution_count,
+            "successfulExecutions": self.successful_executions,
             "totalInputTokens": self.total_input_tokens,
             "totalOutputTokens": self.total_output_tokens,
             "totalTokens": self.total_tokens,
@@ -73,7 +93,7 @@ class ExecutionMetrics(Base):
     __tablename__ = "execution_metrics"
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    execution_id = Column(String, ForeignKey("executions.id"), nullable=False)
+    execution_id = Column(String, ForeignKey("executions.id"), nullable=False, index=True)
     card_id = Column(String, ForeignKey("cards.id"), nullable=False)
     project_id = Column(String, ForeignKey("active_project.id"), nullable=False)
 
@@ -125,3 +145,36 @@ class ExecutionMetrics(Base):
             "errorMessage": self.error_message,
             "createdAt": self.created_at.isoformat() if self.created_at else None,
         }
+
+
+class ExecutionMetricsSketch(Base):
+    """Sketch de distribuição de duração por projeto/comando/modelo/dia."""
+
+    __tablename__ = "execution_metrics_sketches"
+    __table_args__ = (
+        UniqueConstraint("project_id", "command", "model_used", "bucket_date", name="uq_execution_metrics_sketch"),
+    )
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    project_id = Column(String, nullable=False, index=True)
+    command = Column(String, nullable=False, default="")
+    model_used = Column(String, nullable=False, default="unknown")
+    bucket_date = Column(Date, nullable=False)
+
+    # DDSketch serializado (ver services/quantile_sketch.py)
+    sketch = Column(JSON, nullable=False)
+    sample_count = Column(Integer, default=0)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class MetricsBackfillCheckpoint(Base):
+    """Checkpoint de um backfill de métricas em andamento (retomável)."""
+
+    __tablename__ = "metrics_backfill_checkpoints"
+
+    project_id = Column(String, primary_key=True)
+    last_rowid = Column(Integer, nullable=False, default=0)  # rowid de executions já processado
+    inserted_count = Column(Integer, default=0)
+    started_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
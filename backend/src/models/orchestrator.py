@@ -3,7 +3,7 @@
 import enum
 from datetime import datetime
 from typing import List, Dict, Any
-from sqlalchemy import Boolean, DateTime, Enum, ForeignKey, JSON, String, Text
+from sqlalchemy import Boolean, DateTime, Enum, ForeignKey, Index, JSON, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from ..database import Base
@@ -139,6 +139,11 @@ class OrchestratorLog(Base):
     """Log model for orchestrator loop execution."""
 
     __tablename__ = "orchestrator_logs"
+    __table_args__ = (
+        Index("idx_logs_timestamp", "timestamp"),
+        Index("idx_logs_expires_at", "expires_at"),
+        Index("idx_logs_goal_timestamp", "goal_id", "timestamp"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
     timestamp: Mapped[datetime] = mapped_column(
@@ -4,7 +4,7 @@ from datetime import datetime, timedelta
 from typing import Any, Optional
 from uuid import uuid4
 
-from sqlalchemy import desc, select
+from sqlalchemy import desc, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models.activity_log import ActivityLog, ActivityType
@@ -62,6 +62,32 @@ class ActivityRepository:
         await self.session.refresh(activity)
         return activity
 
+    async def log_activities(self, activities: list[dict[str, Any]]) -> None:
+        """
+        Log many activities with a single executemany INSERT.
+
+        Args:
+            activities: Dicts with the log_activity arguments (card_id and
+                activity_type required)
+        """
+        if not activities:
+            return
+        now = datetime.utcnow()
+        fields = ("from_column", "to_column", "old_value", "new_value", "user_id", "description")
+        await self.session.execute(
+            insert(ActivityLog),
+            [
+                {
+                    "id": str(uuid4()),
+                    "timestamp": now,
+                    "card_id": activity["card_id"],
+                    "activity_type": activity["activity_type"],
+                    **{field: activity.get(field) for field in fields},
+                }
+                for activity in activities
+            ],
+        )
+
     async def get_recent_activities(
         self, limit: int = 10, offset: int = 0
     ) -> list[dict[str, Any]]:
@@ -1,12 +1,15 @@
 """Card repository for database operations."""
 
-from typing import Optional
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional
 from uuid import uuid4
 
-from sqlalchemy import select
+from sqlalchemy import String, and_, exists, func, insert, or_, select, text, true, tuple_, union_all, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..models.card import Card
+from ..models.card import CARD_SEARCH_TABLES_DDL, CARD_SEARCH_TRIGGERS_DDL, Card
 from ..models.activity_log import ActivityType
 from ..schemas.card import CardCreate, CardUpdate, ColumnId
 
@@ -25,6 +28,28 @@ ALLOWED_TRANSITIONS: dict[str, list[str]] = {
 }
 
 
+# Facetas devolvidas pela busca de cards
+CARD_SEARCH_FACETS = ("column", "model", "isFixCard", "hasWorktree", "expert")
+
+# Databases (url do engine) em que o índice de busca já foi verificado
+_search_ready: set[str] = set()
+
+
+def encode_card_cursor(card: Card) -> str:
+    """Cursor opaco da paginação (created_at, id) da busca."""
+    raw = json.dumps([card.created_at.isoformat(), card.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_card_cursor(cursor: str) -> tuple[datetime, str]:
+    """Raises ValueError se o cursor não foi gerado por encode_card_cursor."""
+    try:
+        created_at, card_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), card_id
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
 class CardRepository:
     """Repository for Card database operations."""
 
@@ -37,6 +62,170 @@ class CardRepository:
         result = await self.session.execute(query)
         return list(result.scalars().all())
 
+    async def ensure_search_index(self) -> None:
+        """Cria e popula o índice FTS5 em databases anteriores a ele (uma vez)."""
+        key = str(self.session.get_bind().url)
+        if key in _search_ready:
+            return
+
+        found = await self.session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE name = 'cards_fts'")
+        )
+        if found.first() is None:
+            for statement in CARD_SEARCH_TABLES_DDL:
+                await self.session.execute(text(statement))
+            await self.session.execute(text(
+                "INSERT OR IGNORE INTO card_search_rows (card_id) SELECT id FROM cards ORDER BY created_at"
+            ))
+            await self.session.execute(text(
+                "INSERT INTO cards_fts (rowid, title, description, spec_path) "
+                "SELECT r.id, c.title, c.description, c.spec_path "
+                "FROM card_search_rows r JOIN cards c ON c.id = r.card_id"
+            ))
+            for statement in CARD_SEARCH_TRIGGERS_DDL:
+                await self.session.execute(text(statement))
+            await self.session.commit()
+        _search_ready.add(key)
+
+    def _search_conditions(self, filters: dict[str, Any], skip: Optional[str] = None) -> list:
+        """Condições WHERE da busca; `skip` omite o filtro da própria faceta."""
+        conditions = []
+        if filters.get("match"):
+            matched = text(
+                "SELECT r.card_id FROM cards_fts "
+                "JOIN card_search_rows r ON r.id = cards_fts.rowid "
+                "WHERE cards_fts MATCH :match"
+            ).bindparams(match=filters["match"]).columns(card_id=String)
+            conditions.append(Card.id.in_(matched))
+        if not filters.get("include_archived", True):
+            conditions.append(Card.archived.is_(False))
+        if filters.get("columns") and skip != "column":
+            conditions.append(Card.column_id.in_(filters["columns"]))
+        if filters.get("model") and skip != "model":
+            model = filters["model"]
+            conditions.append(or_(
+                Card.model_plan == model, Card.model_implement == model,
+                Card.model_test == model, Card.model_review == model,
+            ))
+        if filters.get("is_fix_card") is not None and skip != "isFixCard":
+            conditions.append(Card.is_fix_card.is_(filters["is_fix_card"]))
+        if filters.get("has_worktree") is not None and skip != "hasWorktree":
+            has_worktree = and_(Card.worktree_path.is_not(None), Card.worktree_path != "")
+            conditions.append(has_worktree if filters["has_worktree"] else ~has_worktree)
+        if filters.get("expert") and skip != "expert":
+            experts = func.json_each(Card.experts).table_valued("key")
+            conditions.append(exists(select(1).select_from(experts).where(experts.c.key == filters["expert"])))
+        return conditions
+
+    async def search(
+        self,
+        match: Optional[str] = None,
+        columns: Optional[list[str]] = None,
+        model: Optional[str] = None,
+        is_fix_card: Optional[bool] = None,
+        has_worktree: Optional[bool] = None,
+        expert: Optional[str] = None,
+        include_archived: bool = True,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> tuple[list[Card], Optional[str]]:
+        """
+        Cards que casam com a busca, na ordem do board (created_at, id).
+
+        Args:
+            match: Expressão FTS5 MATCH (ver services.log_search.parse_query)
+            cursor: nextCursor da página anterior
+
+        Returns:
+            (cards da página, cursor da próxima página ou None)
+        """
+        filters = {
+            "match": match, "columns": columns, "model": model, "is_fix_card": is_fix_card,
+            "has_worktree": has_worktree, "expert": expert, "include_archived": include_archived,
+        }
+        query = select(Card).where(*self._search_conditions(filters))
+        if cursor:
+            created_at, card_id = decode_card_cursor(cursor)
+            query = query.where(tuple_(Card.created_at, Card.id) > tuple_(created_at, card_id))
+        query = query.order_by(Card.created_at, Card.id).limit(limit + 1)
+
+        result = await self.session.execute(query)
+        cards = list(result.scalars().all())
+        next_cursor = encode_card_cursor(cards[limit - 1]) if len(cards) > limit else None
+        return cards[:limit], next_cursor
+
+    async def search_facets(self, **filters: Any) -> dict[str, Any]:
+        """
+        Total e contagens por faceta dos cards que casam com a busca.
+
+        Cada faceta ignora o próprio filtro (as outras opções continuam
+        visíveis); o total aplica todos os filtros.
+        """
+        async def grouped(key_query) -> dict[str, int]:
+            rows = (await self.session.execute(key_query)).all()
+            return {str(key): count for key, count in rows if key is not None}
+
+        total = await self.session.scalar(
+            select(func.count()).select_from(Card).where(*self._search_conditions(filters))
+        )
+
+        columns = await grouped(
+            select(Card.column_id, func.count())
+            .where(*self._search_conditions(filters, skip="column"))
+            .group_by(Card.column_id)
+        )
+
+        # Um card conta uma vez por modelo, mesmo se usado em várias etapas
+        stage_models = union_all(*(
+            select(Card.id.label("card_id"), column.label("model"))
+            .where(*self._search_conditions(filters, skip="model"))
+            for column in (Card.model_plan, Card.model_implement, Card.model_test, Card.model_review)
+        )).subquery()
+        models = await grouped(
+            select(stage_models.c.model, func.count(func.distinct(stage_models.c.card_id)))
+            .group_by(stage_models.c.model)
+        )
+
+        is_fix = await grouped(
+            select(Card.is_fix_card, func.count())
+            .where(*self._search_conditions(filters, skip="isFixCard"))
+            .group_by(Card.is_fix_card)
+        )
+
+        worktree_flag = and_(Card.worktree_path.is_not(None), Card.worktree_path != "")
+        has_worktree = await grouped(
+            select(worktree_flag, func.count())
+            .where(*self._search_conditions(filters, skip="hasWorktree"))
+            .group_by(worktree_flag)
+        )
+
+        experts = func.json_each(Card.experts).table_valued("key")
+        expert_counts = await grouped(
+            select(experts.c.key, func.count())
+            .select_from(Card)
+            .join(experts, true())
+            .where(*self._search_conditions(filters, skip="expert"))
+            .group_by(experts.c.key)
+        )
+
+        def flags(counts: dict[str, int]) -> dict[str, int]:
+            # SQLite devolve booleanos como 0/1
+            return {
+                "true": counts.get("1", 0) + counts.get("True", 0),
+                "false": counts.get("0", 0) + counts.get("False", 0),
+            }
+
+        return {
+            "total": total or 0,
+            "facets": {
+                "column": columns,
+                "model": models,
+                "isFixCard": flags(is_fix),
+                "hasWorktree": flags(has_worktree),
+                "expert": expert_counts,
+            },
+        }
+
     async def get_by_id(self, card_id: str) -> Optional[Card]:
         """Get a card by its ID."""
         result = await self.session.execute(
@@ -115,6 +304,12 @@ class CardRepository:
         if not card:
             return False
 
+        # O índice de busca dos logs é contentless: os termos saem antes das linhas
+        from ..models.execution import Execution
+        from ..services.log_search import LogSearchService
+        execution_ids = await self.session.scalars(select(Execution.id).where(Execution.card_id == card_id))
+        await LogSearchService(self.session).remove_executions(execution_ids.all())
+
         await self.session.delete(card)
         await self.session.flush()
         return True
@@ -176,25 +371,197 @@ class CardRepository:
 
         # Run database migrations when card reaches "done"
         if new_column_id == "done":
-            from ..services.migration_service import MigrationService
-            from pathlib import Path
-            try:
-                # Get current project database path
-                claude_db = Path(".claude/database.db")
-                if claude_db.exists():
-                    print(f"[CardRepository] Running migrations for card {card.title} reaching done...")
-                    service = MigrationService(str(claude_db))
-                    success, messages = service.apply_all_pending_migrations()
-                    if success:
-                        print(f"[CardRepository] ✅ Migrations completed: {', '.join(messages)}")
-                    else:
-                        print(f"[CardRepository] ⚠️ Migration warnings: {', '.join(messages)}")
-            except Exception as e:
-                # Don't fail the card move if migrations fail
-                print(f"[CardRepository] ⚠️ Failed to run migrations: {e}")
+            self._run_done_migrations(card.title)
 
         return card, None
 
+    @staticmethod
+    def _run_done_migrations(card_title: str) -> None:
+        """Apply pending migrations to the project database (card reached done)."""
+        from ..services.migration_service import MigrationService
+        from pathlib import Path
+        try:
+            # Get current project database path
+            claude_db = Path(".claude/database.db")
+            if claude_db.exists():
+                print(f"[CardRepository] Running migrations for card {card_title} reaching done...")
+                service = MigrationService(str(claude_db))
+                success, messages = service.apply_all_pending_migrations()
+                if success:
+                    print(f"[CardRepository] ✅ Migrations completed: {', '.join(messages)}")
+                else:
+                    print(f"[CardRepository] ⚠️ Migration warnings: {', '.join(messages)}")
+        except Exception as e:
+            # Don't fail the card move if migrations fail
+            print(f"[CardRepository] ⚠️ Failed to run migrations: {e}")
+
+    async def _get_many(self, card_ids: list[str]) -> dict[str, Card]:
+        """Cards by ID in one SELECT (missing IDs are absent)."""
+        if not card_ids:
+            return {}
+        result = await self.session.execute(select(Card).where(Card.id.in_(card_ids)))
+        return {card.id: card for card in result.scalars().all()}
+
+    async def bulk_create(self, cards_data: list[CardCreate]) -> list[Card]:
+        """
+        Create many cards in the backlog column.
+
+        Cards and their "created" activities are inserted with one
+        executemany each, without a flush/refresh per card.
+        """
+        if not cards_data:
+            return []
+        now = datetime.utcnow()
+        rows = [
+            {
+                "id": str(uuid4()),
+                "title": card_data.title,
+                "description": card_data.description,
+                "column_id": "backlog",
+                "model_plan": card_data.model_plan,
+                "model_implement": card_data.model_implement,
+                "model_test": card_data.model_test,
+                "model_review": card_data.model_review,
+                "images": [image.model_dump() for image in card_data.images] if card_data.images else [],
+                "archived": False,
+                "created_at": now,
+                "updated_at": now,
+                "parent_card_id": card_data.parent_card_id,
+                "is_fix_card": card_data.is_fix_card,
+                "test_error_context": card_data.test_error_context,
+                "base_branch": card_data.base_branch,
+                "dependencies": card_data.dependencies or [],
+            }
+            for card_data in cards_data
+        ]
+        await self.session.execute(insert(Card), rows)
+
+        from .activity_repository import ActivityRepository
+        await ActivityRepository(self.session).log_activities([
+            {
+                "card_id": row["id"],
+                "activity_type": ActivityType.CREATED,
+                "to_column": "backlog",
+                "description": f"Card '{row['title']}' criado",
+            }
+            for row in rows
+        ])
+
+        cards = await self._get_many([row["id"] for row in rows])
+        return [cards[row["id"]] for row in rows]
+
+    async def bulk_move(
+        self, card_ids: list[str], new_column_id: ColumnId
+    ) -> tuple[list[tuple[Card, str]], dict[str, str]]:
+        """
+        Move many cards with the same SDLC validation as move().
+
+        All or nothing: if any card is missing or its transition is not
+        allowed, nothing is changed. Cards already in the target column are
+        left untouched and are not returned.
+
+        Returns:
+            tuple: ([(card, from_column)], {card_id: error}) - errors empty on success
+        """
+        card_ids = list(dict.fromkeys(card_ids))
+        cards = await self._get_many(card_ids)
+
+        errors: dict[str, str] = {}
+        for card_id in card_ids:
+            card = cards.get(card_id)
+            if card is None:
+                errors[card_id] = "Card not found"
+            elif card.column_id != new_column_id and new_column_id not in ALLOWED_TRANSITIONS.get(card.column_id, []):
+                allowed = ALLOWED_TRANSITIONS.get(card.column_id, [])
+                errors[card_id] = f"Invalid transition from '{card.column_id}' to '{new_column_id}'. Allowed: {allowed}"
+        if errors:
+            return [], errors
+
+        # Cards que já estão na coluna de destino não são movidos (nem registrados)
+        card_ids = [card_id for card_id in card_ids if cards[card_id].column_id != new_column_id]
+        if not card_ids:
+            return [], {}
+
+        from_columns = {card_id: cards[card_id].column_id for card_id in card_ids}
+        values = {"column_id": new_column_id, "updated_at": datetime.utcnow()}
+        # Marcar timestamp de conclusão quando movido para Done
+        if new_column_id == "done":
+            values["completed_at"] = values["updated_at"]
+        await self.session.execute(update(Card).where(Card.id.in_(card_ids)).values(**values))
+
+        if new_column_id == "done":
+            activity_type = ActivityType.COMPLETED
+        elif new_column_id == "archived":
+            activity_type = ActivityType.ARCHIVED
+        else:
+            activity_type = ActivityType.MOVED
+
+        from .activity_repository import ActivityRepository
+        await ActivityRepository(self.session).log_activities([
+            {
+                "card_id": card_id,
+                "activity_type": activity_type,
+                "from_column": from_columns[card_id],
+                "to_column": new_column_id,
+                "description": f"Card movido de '{from_columns[card_id]}' para '{new_column_id}'",
+            }
+            for card_id in card_ids
+        ])
+
+        # Os UPDATEs em massa não passam pela identity map: recarrega os cards
+        result = await self.session.execute(
+            select(Card).where(Card.id.in_(card_ids)).execution_options(populate_existing=True)
+        )
+        moved = {card.id: card for card in result.scalars().all()}
+
+        if new_column_id == "done":
+            self._run_done_migrations(f"{len(card_ids)} cards")
+
+        return [(moved[card_id], from_columns[card_id]) for card_id in card_ids], {}
+
+    async def bulk_update(self, updates: dict[str, CardUpdate]) -> tuple[list[Card], list[str]]:
+        """
+        Update many cards, one executemany UPDATE for those with changes.
+
+        Returns:
+            tuple: (updated cards in request order, IDs not found)
+        """
+        cards = await self._get_many(list(updates))
+        missing = [card_id for card_id in updates if card_id not in cards]
+        if missing:
+            return [], missing
+
+        now = datetime.utcnow()
+        rows = []
+        for card_id, card_data in updates.items():
+            card = cards[card_id]
+            values = {
+                field: value
+                for field, value in card_data.model_dump(exclude_unset=True, by_alias=False).items()
+                if value is not None and getattr(card, field, None) != value
+            }
+            if values:
+                rows.append({"id": card_id, "updated_at": now, **values})
+
+        if rows:
+            # Bulk UPDATE por chave primária (agrupado pelo conjunto de campos)
+            await self.session.execute(update(Card), rows)
+            from .activity_repository import ActivityRepository
+            await ActivityRepository(self.session).log_activities([
+                {
+                    "card_id": row["id"],
+                    "activity_type": ActivityType.UPDATED,
+                    "description": f"Card '{row.get('title', cards[row['id']].title)}' atualizado",
+                }
+                for row in rows
+            ])
+
+        result = await self.session.execute(
+            select(Card).where(Card.id.in_(list(updates))).execution_options(populate_existing=True)
+        )
+        updated = {card.id: card for card in result.scalars().all()}
+        return [updated[card_id] for card_id in updates], []
+
     async def update_spec_path(self, card_id: str, spec_path: str) -> Optional[Card]:
         """Update the spec_path for a card."""
         card = await self.get_by_id(card_id)
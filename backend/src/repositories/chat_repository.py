@@ -0,0 +1,100 @@
+"""Repository for chat session persistence."""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.chat import ChatMessage, ChatSession
+
+
+class ChatRepository:
+    """Repository for ChatSession and ChatMessage database operations."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def create_session(self, session_id: str) -> ChatSession:
+        """Create an empty chat session."""
+        chat = ChatSession(id=session_id, summary="", summarized_count=0, message_count=0)
+        self.session.add(chat)
+        await self.session.flush()
+        return chat
+
+    async def get_session(self, session_id: str) -> Optional[ChatSession]:
+        """Get a chat session by ID (without its messages)."""
+        result = await self.session.execute(
+            select(ChatSession).where(ChatSession.id == session_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def delete_session(self, session_id: str) -> bool:
+        """Delete a session and its messages."""
+        await self.session.execute(delete(ChatMessage).where(ChatMessage.session_id == session_id))
+        result = await self.session.execute(delete(ChatSession).where(ChatSession.id == session_id))
+        return result.rowcount > 0
+
+    async def list_session_ids(self, limit: int = 100) -> List[str]:
+        """Most recently active session IDs first."""
+        result = await self.session.execute(
+            select(ChatSession.id).order_by(ChatSession.updated_at.desc()).limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def count_sessions(self) -> int:
+        return await self.session.scalar(select(func.count()).select_from(ChatSession)) or 0
+
+    async def get_messages(self, session_id: str, from_seq: int = 0) -> List[ChatMessage]:
+        """Messages of a session in order, starting at ``from_seq``."""
+        result = await self.session.execute(
+            select(ChatMessage)
+            .where(ChatMessage.session_id == session_id, ChatMessage.seq >= from_seq)
+            .order_by(ChatMessage.seq.asc())
+        )
+        return list(result.scalars().all())
+
+    async def add_messages(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        """
+        Append messages (dicts with seq, role, content, timestamp and
+        optional model/messageId/extra) and bump the session counters.
+        """
+        if not messages:
+            return
+        self.session.add_all([
+            ChatMessage(
+                session_id=session_id,
+                seq=msg["seq"],
+                role=msg["role"],
+                content=msg["content"],
+                model=msg.get("model"),
+                message_id=msg.get("messageId"),
+                extra=msg.get("extra"),
+                created_at=datetime.fromisoformat(msg["timestamp"]),
+            )
+            for msg in messages
+        ])
+        await self.session.execute(
+            update(ChatSession)
+            .where(ChatSession.id == session_id)
+            .values(
+                message_count=max(msg["seq"] for msg in messages) + 1,
+                updated_at=datetime.utcnow(),
+            )
+        )
+        await self.session.flush()
+
+    async def update_summary(self, session_id: str, summary: str, summarized_count: int) -> None:
+        """Store the rolling summary and how many messages it covers."""
+        await self.session.execute(
+            update(ChatSession)
+            .where(ChatSession.id == session_id)
+            .values(summary=summary, summarized_count=summarized_count)
+        )
+
+    async def delete_inactive(self, before: datetime) -> int:
+        """Delete sessions without activity since ``before``; returns how many."""
+        stale = select(ChatSession.id).where(ChatSession.updated_at < before)
+        await self.session.execute(delete(ChatMessage).where(ChatMessage.session_id.in_(stale)))
+        result = await self.session.execute(delete(ChatSession).where(ChatSession.updated_at < before))
+        return result.rowcount or 0
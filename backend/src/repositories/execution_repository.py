@@ -5,7 +5,7 @@ import uuid
 from datetime import datetime
 from decimal import Decimal
 from ..models.execution import Execution, ExecutionLog, ExecutionStatus
-from ..cache import execution_cache
+from ..cache import execution_cache, metrics_response_cache, metrics_cache_tag
 from ..services.cost_calculator import CostCalculator
 
 class ExecutionRepository:
@@ -93,6 +93,25 @@ class ExecutionRepository:
 
         return log
 
+    async def get_logs(self, execution_id: str) -> List[dict]:
+        """Logs da execução em ordem: arquivo comprimido (se houver) + linhas quentes"""
+        from ..services.execution_log_archive import ExecutionLogArchiveService, rows_to_logs
+
+        archived = await ExecutionLogArchiveService(self.db).read_rows(execution_id)
+        logs_result = await self.db.execute(
+            select(ExecutionLog)
+            .where(ExecutionLog.execution_id == execution_id)
+            .order_by(ExecutionLog.sequence)
+        )
+        return rows_to_logs(archived) + [
+            {
+                "timestamp": log.timestamp.isoformat(),
+                "type": log.type,
+                "content": log.content
+            }
+            for log in logs_result.scalars().all()
+        ]
+
     async def get_by_id(self, execution_id: str) -> Optional[Execution]:
         """Busca execução por ID"""
         result = await self.db.execute(
@@ -180,6 +199,9 @@ class ExecutionRepository:
                 # Log erro mas não falha a operação principal
                 print(f"[MetricsCollector] Erro ao coletar métricas: {e}")
 
+            # Respostas de métricas/dashboard do projeto ficam desatualizadas
+            metrics_response_cache.invalidate_tag(metrics_cache_tag(project_id))
+
     async def get_active_execution(self, card_id: str) -> Optional[Execution]:
         """Busca execução ativa de um card (a mais recente)"""
         result = await self.db.execute(
@@ -204,13 +226,7 @@ class ExecutionRepository:
         if not execution:
             return None
 
-        # Busca logs
-        logs_result = await self.db.execute(
-            select(ExecutionLog)
-            .where(ExecutionLog.execution_id == execution.id)
-            .order_by(ExecutionLog.sequence)
-        )
-        logs = logs_result.scalars().all()
+        logs = await self.get_logs(execution.id)
 
         result = {
             "cardId": card_id,
@@ -222,14 +238,7 @@ class ExecutionRepository:
             "startedAt": execution.started_at.isoformat() if execution.started_at else None,
             "completedAt": execution.completed_at.isoformat() if execution.completed_at else None,
             "result": execution.result,
-            "logs": [
-                {
-                    "timestamp": log.timestamp.isoformat(),
-                    "type": log.type,
-                    "content": log.content
-                }
-                for log in logs
-            ]
+            "logs": logs
         }
 
         # Adiciona ao cache se ainda running
@@ -249,12 +258,7 @@ class ExecutionRepository:
 
         history = []
         for execution in executions:
-            logs_result = await self.db.execute(
-                select(ExecutionLog)
-                .where(ExecutionLog.execution_id == execution.id)
-                .order_by(ExecutionLog.sequence)
-            )
-            logs = logs_result.scalars().all()
+            logs = await self.get_logs(execution.id)
 
             history.append({
                 "executionId": execution.id,
@@ -264,14 +268,7 @@ class ExecutionRepository:
                 "workflowStage": execution.workflow_stage,
                 "startedAt": execution.started_at.isoformat(),
                 "completedAt": execution.completed_at.isoformat() if execution.completed_at else None,
-                "logs": [
-                    {
-                        "timestamp": log.timestamp.isoformat(),
-                        "type": log.type,
-                        "content": log.content
-                    }
-                    for log in logs
-                ]
+                "logs": logs
             })
 
         return history
@@ -282,13 +279,17 @@ class ExecutionRepository:
         input_tokens: int,
         output_tokens: int,
         total_tokens: int,
-        model_used: str = None
+        model_used: str = None,
+        cache_read_tokens: int = 0,
+        cache_write_tokens: int = 0,
     ):
         """Atualiza token usage de uma execucao e calcula o custo"""
         values = {
             "input_tokens": input_tokens,
             "output_tokens": output_tokens,
             "total_tokens": total_tokens,
+            "cache_read_tokens": cache_read_tokens,
+            "cache_write_tokens": cache_write_tokens,
         }
         if model_used:
             values["model_used"] = model_used
@@ -302,7 +303,10 @@ class ExecutionRepository:
         if execution and model_used:
             # Calcular custo baseado no modelo e tokens
             from ..config.pricing import calculate_cost
-            cost = calculate_cost(model_used, input_tokens, output_tokens)
+            cost = calculate_cost(
+                model_used, input_tokens, output_tokens,
+                cache_read_tokens=cache_read_tokens, cache_write_tokens=cache_write_tokens,
+            )
             values["execution_cost"] = cost
 
         await self.db.execute(
@@ -319,6 +323,8 @@ class ExecutionRepository:
                 func.sum(Execution.input_tokens).label('total_input'),
                 func.sum(Execution.output_tokens).label('total_output'),
                 func.sum(Execution.total_tokens).label('total_tokens'),
+                func.sum(Execution.cache_read_tokens).label('total_cache_read'),
+                func.sum(Execution.cache_write_tokens).label('total_cache_write'),
                 func.count(Execution.id).label('execution_count')
             ).where(Execution.card_id == card_id)
         )
@@ -328,6 +334,8 @@ class ExecutionRepository:
             "inputTokens": row.total_input or 0,
             "outputTokens": row.total_output or 0,
             "totalTokens": row.total_tokens or 0,
+            "cacheReadTokens": row.total_cache_read or 0,
+            "cacheWriteTokens": row.total_cache_write or 0,
             "executionCount": row.execution_count or 0
         }
 
@@ -1,15 +1,17 @@
 """Repository para operações com métricas."""
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_, desc, asc, case
+from sqlalchemy import select, func, and_, or_, desc, asc, delete
 from typing import Optional, List, Dict, Any, Literal
 from datetime import datetime, date, timedelta
 from decimal import Decimal
 import uuid
 
-from ..models.metrics import ProjectMetrics, ExecutionMetrics
+from ..models.metrics import ProjectMetrics, ExecutionMetrics, ExecutionMetricsSketch
 from ..models.execution import Execution, ExecutionStatus
 from ..models.card import Card
+from ..services.quantile_sketch import DDSketch
+from ..services.metrics_rollup_service import MetricsRollupService, bucket_start_for
 
 
 class MetricsRepository:
@@ -60,6 +62,152 @@ class MetricsRepository:
         await self.db.refresh(metric)
         return metric
 
+    async def add_duration_to_sketch(
+        self,
+        project_id: str,
+        command: str,
+        model_used: str,
+        bucket_date: date,
+        duration_ms: int
+    ) -> None:
+        """Atualiza o sketch de duração da janela (projeto/comando/modelo/dia)."""
+        result = await self.db.execute(
+            select(ExecutionMetricsSketch).where(
+                and_(
+                    ExecutionMetricsSketch.project_id == project_id,
+                    ExecutionMetricsSketch.command == command,
+                    ExecutionMetricsSketch.model_used == model_used,
+                    ExecutionMetricsSketch.bucket_date == bucket_date
+                )
+            )
+        )
+        row = result.scalar_one_or_none()
+
+        sketch = DDSketch.from_dict(row.sketch) if row else DDSketch()
+        sketch.add(duration_ms)
+
+        if row:
+            row.sketch = sketch.to_dict()
+            row.sample_count = sketch.count
+            row.updated_at = datetime.utcnow()
+        else:
+            self.db.add(ExecutionMetricsSketch(
+                id=str(uuid.uuid4()),
+                project_id=project_id,
+                command=command,
+                model_used=model_used,
+                bucket_date=bucket_date,
+                sketch=sketch.to_dict(),
+                sample_count=sketch.count,
+                updated_at=datetime.utcnow()
+            ))
+
+        await self.db.commit()
+
+    async def get_duration_sketch(
+        self,
+        project_id: str,
+        command: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> DDSketch:
+        """Retorna a mescla dos sketches de duração que atendem aos filtros."""
+        query = select(ExecutionMetricsSketch.sketch).where(
+            ExecutionMetricsSketch.project_id == project_id
+        )
+
+        if command:
+            query = query.where(ExecutionMetricsSketch.command == command)
+        if start_date:
+            query = query.where(ExecutionMetricsSketch.bucket_date >= start_date)
+        if end_date:
+            query = query.where(ExecutionMetricsSketch.bucket_date <= end_date)
+
+        result = await self.db.execute(query)
+
+        merged = DDSketch()
+        for (data,) in result.all():
+            merged.merge(DDSketch.from_dict(data))
+        return merged
+
+    async def count_sketched_durations(
+        self,
+        project_id: str,
+        command: Optional[str] = None
+    ) -> Dict[str, int]:
+        """Compara o total de amostras nos sketches com o total de métricas."""
+        sketched_query = select(func.sum(ExecutionMetricsSketch.sample_count)).where(
+            ExecutionMetricsSketch.project_id == project_id
+        )
+        metrics_query = select(func.count(ExecutionMetrics.id)).where(
+            and_(
+                ExecutionMetrics.project_id == project_id,
+                ExecutionMetrics.duration_ms.isnot(None)
+            )
+        )
+
+        if command:
+            sketched_query = sketched_query.where(ExecutionMetricsSketch.command == command)
+            metrics_query = metrics_query.where(ExecutionMetrics.command == command)
+
+        sketched = (await self.db.execute(sketched_query)).scalar() or 0
+        total = (await self.db.execute(metrics_query)).scalar() or 0
+
+        return {"sketched": sketched, "total": total}
+
+    async def rebuild_duration_sketches(self, project_id: str) -> int:
+        """
+        Reconstrói todos os sketches de duração do projeto a partir das métricas brutas.
+
+        Usado para dados anteriores aos sketches ou inseridos fora do
+        MetricsCollector (ex.: backfill). Retorna o número de amostras.
+        """
+        query = select(
+            ExecutionMetrics.command,
+            ExecutionMetrics.model_used,
+            ExecutionMetrics.started_at,
+            ExecutionMetrics.duration_ms
+        ).where(
+            and_(
+                ExecutionMetrics.project_id == project_id,
+                ExecutionMetrics.duration_ms.isnot(None)
+            )
+        )
+
+        sketches: Dict[tuple, DDSketch] = {}
+        result = await self.db.stream(query)
+        async for row in result:
+            started_at = row.started_at or datetime.utcnow()
+            key = (row.command or "", row.model_used or "unknown", started_at.date())
+            sketch = sketches.get(key)
+            if sketch is None:
+                sketch = sketches[key] = DDSketch()
+            sketch.add(row.duration_ms)
+
+        await self.db.execute(
+            delete(ExecutionMetricsSketch).where(ExecutionMetricsSketch.project_id == project_id)
+        )
+
+        now = datetime.utcnow()
+        for (command, model_used, bucket_date), sketch in sketches.items():
+            self.db.add(ExecutionMetricsSketch(
+                id=str(uuid.uuid4()),
+                project_id=project_id,
+                command=command,
+                model_used=model_used,
+                bucket_date=bucket_date,
+                sketch=sketch.to_dict(),
+                sample_count=sketch.count,
+                updated_at=now
+            ))
+
+        await self.db.commit()
+        return sum(sketch.count for sketch in sketches.values())
+
+    async def _ensure_rollups(self, project_id: str) -> None:
+        """Garante que os buckets de `project_metrics` existem para o projeto."""
+        await MetricsRollupService(self.db).ensure_rollups(project_id)
+
     async def get_project_metrics(
         self,
         project_id: str,
@@ -98,44 +246,47 @@ class MetricsRepository:
         else:
             start_date = None
 
-        # Construir query baseado em group_by
+        # Consultas servidas pelos rollups (project_metrics), não pelas métricas brutas
+        await self._ensure_rollups(project_id)
+
         if group_by == "model":
             query = select(
-                ExecutionMetrics.model_used,
-                func.sum(ExecutionMetrics.input_tokens).label('input_tokens'),
-                func.sum(ExecutionMetrics.output_tokens).label('output_tokens'),
-                func.sum(ExecutionMetrics.total_tokens).label('total_tokens'),
-                func.count(ExecutionMetrics.id).label('execution_count')
-            ).where(ExecutionMetrics.project_id == project_id)
+                ProjectMetrics.model_used,
+                func.sum(ProjectMetrics.total_input_tokens).label('input_tokens'),
+                func.sum(ProjectMetrics.total_output_tokens).label('output_tokens'),
+                func.sum(ProjectMetrics.total_tokens).label('total_tokens'),
+                func.sum(ProjectMetrics.execution_count).label('execution_count')
+            ).where(ProjectMetrics.project_id == project_id)
 
             if start_date:
-                query = query.where(ExecutionMetrics.started_at >= start_date)
+                query = query.where(ProjectMetrics.bucket_start >= start_date)
 
-            query = query.group_by(ExecutionMetrics.model_used)
+            query = query.group_by(ProjectMetrics.model_used)
 
         elif group_by == "hour":
+            # Fora da retenção horária os buckets já são diários/semanais
             query = select(
-                func.strftime('%Y-%m-%d %H:00:00', ExecutionMetrics.started_at).label('timestamp'),
-                func.sum(ExecutionMetrics.input_tokens).label('input_tokens'),
-                func.sum(ExecutionMetrics.output_tokens).label('output_tokens'),
-                func.sum(ExecutionMetrics.total_tokens).label('total_tokens')
-            ).where(ExecutionMetrics.project_id == project_id)
+                func.strftime('%Y-%m-%d %H:00:00', ProjectMetrics.bucket_start).label('timestamp'),
+                func.sum(ProjectMetrics.total_input_tokens).label('input_tokens'),
+                func.sum(ProjectMetrics.total_output_tokens).label('output_tokens'),
+                func.sum(ProjectMetrics.total_tokens).label('total_tokens')
+            ).where(ProjectMetrics.project_id == project_id)
 
             if start_date:
-                query = query.where(ExecutionMetrics.started_at >= start_date)
+                query = query.where(ProjectMetrics.bucket_start >= bucket_start_for(start_date, "hour"))
 
             query = query.group_by('timestamp').order_by('timestamp')
 
         else:  # day
             query = select(
-                func.date(ExecutionMetrics.started_at).label('timestamp'),
-                func.sum(ExecutionMetrics.input_tokens).label('input_tokens'),
-                func.sum(ExecutionMetrics.output_tokens).label('output_tokens'),
-                func.sum(ExecutionMetrics.total_tokens).label('total_tokens')
-            ).where(ExecutionMetrics.project_id == project_id)
+                func.date(ProjectMetrics.bucket_start).label('timestamp'),
+                func.sum(ProjectMetrics.total_input_tokens).label('input_tokens'),
+                func.sum(ProjectMetrics.total_output_tokens).label('output_tokens'),
+                func.sum(ProjectMetrics.total_tokens).label('total_tokens')
+            ).where(ProjectMetrics.project_id == project_id)
 
             if start_date:
-                query = query.where(ExecutionMetrics.started_at >= start_date)
+                query = query.where(ProjectMetrics.bucket_start >= bucket_start_for(start_date, "day"))
 
             query = query.group_by('timestamp').order_by('timestamp')
 
@@ -209,34 +360,36 @@ class MetricsRepository:
         group_by: Literal["model", "command", "day"] = "model"
     ) -> List[Dict[str, Any]]:
         """Retorna análise de custos detalhada."""
+        await self._ensure_rollups(project_id)
+
         if group_by == "model":
             query = select(
-                ExecutionMetrics.model_used,
-                func.sum(ExecutionMetrics.estimated_cost_usd).label('total_cost'),
-                func.sum(ExecutionMetrics.total_tokens).label('total_tokens'),
-                func.count(ExecutionMetrics.id).label('execution_count')
+                ProjectMetrics.model_used,
+                func.sum(ProjectMetrics.total_cost_usd).label('total_cost'),
+                func.sum(ProjectMetrics.total_tokens).label('total_tokens'),
+                func.sum(ProjectMetrics.execution_count).label('execution_count')
             ).where(
-                ExecutionMetrics.project_id == project_id
-            ).group_by(ExecutionMetrics.model_used)
+                ProjectMetrics.project_id == project_id
+            ).group_by(ProjectMetrics.model_used)
 
         elif group_by == "command":
             query = select(
-                ExecutionMetrics.command,
-                func.sum(ExecutionMetrics.estimated_cost_usd).label('total_cost'),
-                func.sum(ExecutionMetrics.total_tokens).label('total_tokens'),
-                func.count(ExecutionMetrics.id).label('execution_count')
+                ProjectMetrics.command,
+                func.sum(ProjectMetrics.total_cost_usd).label('total_cost'),
+                func.sum(ProjectMetrics.total_tokens).label('total_tokens'),
+                func.sum(ProjectMetrics.execution_count).label('execution_count')
             ).where(
-                ExecutionMetrics.project_id == project_id
-            ).group_by(ExecutionMetrics.command)
+                ProjectMetrics.project_id == project_id
+            ).group_by(ProjectMetrics.command)
 
         else:  # day
             query = select(
-                func.date(ExecutionMetrics.started_at).label('date'),
-                func.sum(ExecutionMetrics.estimated_cost_usd).label('total_cost'),
-                func.sum(ExecutionMetrics.total_tokens).label('total_tokens'),
-                func.count(ExecutionMetrics.id).label('execution_count')
+                func.date(ProjectMetrics.bucket_start).label('date'),
+                func.sum(ProjectMetrics.total_cost_usd).label('total_cost'),
+                func.sum(ProjectMetrics.total_tokens).label('total_tokens'),
+                func.sum(ProjectMetrics.execution_count).label('execution_count')
             ).where(
-                ExecutionMetrics.project_id == project_id
+                ProjectMetrics.project_id == project_id
             ).group_by('date').order_by('date')
 
         result = await self.db.execute(query)
@@ -283,28 +436,28 @@ class MetricsRepository:
         start_date: Optional[date] = None,
         end_date: Optional[date] = None
     ) -> Dict[str, Any]:
-        """Retorna métricas agregadas do projeto."""
+        """Retorna métricas agregadas do projeto (a partir dos rollups)."""
+        await self._ensure_rollups(project_id)
+
         query = select(
-            func.sum(ExecutionMetrics.input_tokens).label('total_input_tokens'),
-            func.sum(ExecutionMetrics.output_tokens).label('total_output_tokens'),
-            func.sum(ExecutionMetrics.total_tokens).label('total_tokens'),
-            func.sum(ExecutionMetrics.estimated_cost_usd).label('total_cost'),
-            func.avg(ExecutionMetrics.duration_ms).label('avg_execution_time'),
-            func.min(ExecutionMetrics.duration_ms).label('min_execution_time'),
-            func.max(ExecutionMetrics.duration_ms).label('max_execution_time'),
-            func.count(ExecutionMetrics.id).label('total_executions'),
-            func.sum(
-                case(
-                    (ExecutionMetrics.status == 'success', 1),
-                    else_=0
-                )
-            ).label('successful_executions')
-        ).where(ExecutionMetrics.project_id == project_id)
+            func.sum(ProjectMetrics.total_input_tokens).label('total_input_tokens'),
+            func.sum(ProjectMetrics.total_output_tokens).label('total_output_tokens'),
+            func.sum(ProjectMetrics.total_tokens).label('total_tokens'),
+            func.sum(ProjectMetrics.total_cost_usd).label('total_cost'),
+            (
+                func.sum(ProjectMetrics.total_execution_time_ms) * 1.0
+                / func.nullif(func.sum(ProjectMetrics.execution_count), 0)
+            ).label('avg_execution_time'),
+            func.min(ProjectMetrics.min_execution_time_ms).label('min_execution_time'),
+            func.max(ProjectMetrics.max_execution_time_ms).label('max_execution_time'),
+            func.sum(ProjectMetrics.execution_count).label('total_executions'),
+            func.sum(ProjectMetrics.successful_executions).label('successful_executions')
+        ).where(ProjectMetrics.project_id == project_id)
 
         if start_date:
-            query = query.where(func.date(ExecutionMetrics.started_at) >= start_date)
+            query = query.where(func.date(ProjectMetrics.bucket_start) >= start_date)
         if end_date:
-            query = query.where(func.date(ExecutionMetrics.started_at) <= end_date)
+            query = query.where(func.date(ProjectMetrics.bucket_start) <= end_date)
 
         result = await self.db.execute(query)
         row = result.first()
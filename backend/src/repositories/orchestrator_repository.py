@@ -1,10 +1,10 @@
 """Repository for orchestrator database operations."""
 
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from uuid import uuid4
 
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, func, text
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -133,6 +133,20 @@ class GoalRepository:
         await self.session.refresh(goal)
         return goal
 
+    async def add_cards(self, goal_id: str, card_ids: List[str]) -> Optional[Goal]:
+        """Add many cards to a goal's card list with a single flush."""
+        goal = await self.get_by_id(goal_id)
+        if not goal:
+            return None
+
+        current_cards = list(goal.cards) if goal.cards else []
+        current_cards.extend(card_id for card_id in card_ids if card_id not in current_cards)
+        goal.cards = current_cards  # Assigning new list triggers change detection
+
+        await self.session.flush()
+        await self.session.refresh(goal)
+        return goal
+
     async def set_learning(
         self,
         goal_id: str,
@@ -255,6 +269,14 @@ class ActionRepository:
         return action
 
 
+# Mesmos nomes da migration 023 (idempotente em databases criados pelo create_all)
+LOG_RETENTION_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON orchestrator_logs(timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_logs_expires_at ON orchestrator_logs(expires_at)",
+    "CREATE INDEX IF NOT EXISTS idx_logs_goal_timestamp ON orchestrator_logs(goal_id, timestamp)",
+]
+
+
 class LogRepository:
     """Repository for OrchestratorLog database operations."""
 
@@ -278,9 +300,9 @@ class LogRepository:
             goal_id=goal_id,
             expires_at=datetime.utcnow() + timedelta(hours=self.retention_hours),
         )
+        # Todos os campos já estão preenchidos: sem refresh (um SELECT a menos por passo)
         self.session.add(log)
         await self.session.flush()
-        await self.session.refresh(log)
         return log
 
     async def get_recent(
@@ -315,6 +337,95 @@ class LogRepository:
             for log in logs
         ]
 
+    async def ensure_indexes(self) -> None:
+        """Retention indexes for databases created before they were in the model."""
+        for statement in LOG_RETENTION_INDEXES:
+            await self.session.execute(text(statement))
+
+    async def delete_expired_batch(self, limit: int, now: Optional[datetime] = None) -> int:
+        """Delete up to `limit` expired entries (range scan on idx_logs_expires_at)."""
+        expired = (
+            select(OrchestratorLog.id)
+            .where(OrchestratorLog.expires_at < (now or datetime.utcnow()))
+            .limit(limit)
+            .scalar_subquery()
+        )
+        result = await self.session.execute(
+            delete(OrchestratorLog).where(OrchestratorLog.id.in_(expired))
+        )
+        return result.rowcount
+
+    def _goal_filter(self, goal_id: Optional[str]):
+        # Entradas sem goal (ciclos ociosos) formam um único grupo
+        return OrchestratorLog.goal_id.is_(None) if goal_id is None else OrchestratorLog.goal_id == goal_id
+
+    async def over_cap_cutoffs(self, max_per_goal: int) -> List[Tuple[Optional[str], datetime]]:
+        """
+        (goal_id, cutoff) for each goal with more than `max_per_goal` entries.
+
+        The cutoff is the timestamp of the first entry past the cap, read
+        with one ORDER BY timestamp DESC LIMIT 1 OFFSET max_per_goal on
+        idx_logs_goal_timestamp; entries at or before it are over the cap.
+        """
+        over_cap = await self.session.execute(
+            select(OrchestratorLog.goal_id)
+            .group_by(OrchestratorLog.goal_id)
+            .having(func.count() > max_per_goal)
+        )
+        cutoffs = []
+        for goal_id in over_cap.scalars().all():
+            cutoff = await self.session.scalar(
+                select(OrchestratorLog.timestamp)
+                .where(self._goal_filter(goal_id))
+                .order_by(OrchestratorLog.timestamp.desc())
+                .limit(1)
+                .offset(max_per_goal)
+            )
+            if cutoff is not None:
+                cutoffs.append((goal_id, cutoff))
+        return cutoffs
+
+    async def delete_over_cap_batch(self, goal_id: Optional[str], cutoff: datetime, limit: int) -> int:
+        """Delete up to `limit` entries of the goal at or before `cutoff` (range scan on idx_logs_goal_timestamp)."""
+        over_cap = (
+            select(OrchestratorLog.id)
+            .where(self._goal_filter(goal_id), OrchestratorLog.timestamp <= cutoff)
+            .limit(limit)
+            .scalar_subquery()
+        )
+        result = await self.session.execute(
+            delete(OrchestratorLog).where(OrchestratorLog.id.in_(over_cap))
+        )
+        return result.rowcount
+
+    async def purge(self, batch_size: int, max_per_goal: int) -> dict:
+        """
+        Apply retention (expired entries, then the per-goal cap) in batches.
+
+        Each batch is committed on its own, so the write lock is held only
+        for `batch_size` rows at a time. The per-goal cutoffs are computed
+        once, after the expired entries are gone.
+        """
+        await self.ensure_indexes()
+        totals = {"expired": 0, "overCap": 0}
+
+        async def drain(key, delete_batch):
+            while True:
+                deleted = await delete_batch()
+                await self.session.commit()
+                totals[key] += deleted
+                if deleted < batch_size:
+                    break
+
+        await drain("expired", lambda: self.delete_expired_batch(batch_size))
+        for goal_id, cutoff in await self.over_cap_cutoffs(max_per_goal):
+            await drain(
+                "overCap",
+                lambda goal_id=goal_id, cutoff=cutoff: self.delete_over_cap_batch(goal_id, cutoff, batch_size),
+            )
+
+        return totals
+
     async def cleanup_expired(self) -> int:
         """Remove expired log entries."""
         result = await self.session.execute(
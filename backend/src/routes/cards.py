@@ -1,5 +1,7 @@
 """Card routes for the API."""
 
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -8,23 +10,82 @@ from ..database import get_db
 from ..repositories.card_repository import CardRepository
 from ..repositories.execution_repository import ExecutionRepository
 from ..schemas.card import (
+    CardBulkCreate,
+    CardBulkMove,
+    CardBulkUpdate,
     CardCreate,
     CardUpdate,
     CardMove,
     CardResponse,
     CardsListResponse,
+    CardSearchResponse,
     CardSingleResponse,
     CardDeleteResponse,
     ActiveExecution,
     DiffStats,
     TokenStats,
     CostStats,
+    ColumnId,
 )
 from ..services.diff_analyzer import DiffAnalyzer
+from ..services.log_search import parse_query
 
 router = APIRouter(prefix="/api/cards", tags=["cards"])
 
 
+async def _card_with_execution(db: AsyncSession, exec_repo: ExecutionRepository, card) -> CardResponse:
+    """CardResponse com execução ativa, token stats e cost stats."""
+    card_dict = card.__dict__.copy()
+
+    # Buscar execução ativa no banco (usar SQL direto por enquanto)
+    result = await db.execute(
+        select(1).select_from(text("executions"))
+        .where(text("card_id = :card_id AND is_active = 1"))
+        .params(card_id=card.id)
+    )
+    execution = result.first()
+
+    if execution:
+        # Buscar detalhes da execução incluindo workflow state
+        exec_result = await db.execute(
+            text("""
+                SELECT id, status, command, started_at, completed_at, workflow_stage, workflow_error
+                FROM executions
+                WHERE card_id = :card_id AND is_active = 1
+            """).params(card_id=card.id)
+        )
+        exec_data = exec_result.first()
+
+        if exec_data:
+            # started_at e completed_at podem vir como string ou datetime do SQLite
+            started_at = exec_data[3]
+            completed_at = exec_data[4]
+            workflow_stage = exec_data[5]
+            workflow_error = exec_data[6]
+
+            card_dict["activeExecution"] = ActiveExecution(
+                id=exec_data[0],
+                status=exec_data[1],
+                command=exec_data[2],
+                startedAt=started_at if isinstance(started_at, str) else (started_at.isoformat() if started_at else None),
+                completedAt=completed_at if isinstance(completed_at, str) else (completed_at.isoformat() if completed_at else None),
+                workflowStage=workflow_stage,
+                workflowError=workflow_error
+            )
+
+    # Buscar token stats para o card
+    token_stats = await exec_repo.get_token_stats_for_card(card.id)
+    if token_stats.get("totalTokens", 0) > 0:
+        card_dict["tokenStats"] = TokenStats(**token_stats)
+
+    # Buscar cost stats para o card
+    cost_stats = await exec_repo.get_cost_stats_for_card(card.id)
+    if cost_stats.get("totalCost", 0.0) > 0:
+        card_dict["costStats"] = CostStats(**cost_stats)
+
+    return CardResponse.model_validate(card_dict)
+
+
 @router.get("", response_model=CardsListResponse)
 async def get_all_cards(db: AsyncSession = Depends(get_db)):
     """Get all cards with active executions and token stats."""
@@ -33,59 +94,129 @@ async def get_all_cards(db: AsyncSession = Depends(get_db)):
     cards = await repo.get_all()
 
     # Para cada card, buscar execução ativa e token stats
-    cards_with_execution = []
-    for card in cards:
-        card_dict = card.__dict__.copy()
-
-        # Buscar execução ativa no banco (usar SQL direto por enquanto)
-        result = await db.execute(
-            select(1).select_from(text("executions"))
-            .where(text("card_id = :card_id AND is_active = 1"))
-            .params(card_id=card.id)
-        )
-        execution = result.first()
-
-        if execution:
-            # Buscar detalhes da execução incluindo workflow state
-            exec_result = await db.execute(
-                text("""
-                    SELECT id, status, command, started_at, completed_at, workflow_stage, workflow_error
-                    FROM executions
-                    WHERE card_id = :card_id AND is_active = 1
-                """).params(card_id=card.id)
-            )
-            exec_data = exec_result.first()
-
-            if exec_data:
-                # started_at e completed_at podem vir como string ou datetime do SQLite
-                started_at = exec_data[3]
-                completed_at = exec_data[4]
-                workflow_stage = exec_data[5]
-                workflow_error = exec_data[6]
-
-                card_dict["activeExecution"] = ActiveExecution(
-                    id=exec_data[0],
-                    status=exec_data[1],
-                    command=exec_data[2],
-                    startedAt=started_at if isinstance(started_at, str) else (started_at.isoformat() if started_at else None),
-                    completedAt=completed_at if isinstance(completed_at, str) else (completed_at.isoformat() if completed_at else None),
-                    workflowStage=workflow_stage,
-                    workflowError=workflow_error
-                )
+    cards_with_execution = [await _card_with_execution(db, exec_repo, card) for card in cards]
 
-        # Buscar token stats para o card
-        token_stats = await exec_repo.get_token_stats_for_card(card.id)
-        if token_stats.get("totalTokens", 0) > 0:
-            card_dict["tokenStats"] = TokenStats(**token_stats)
+    return CardsListResponse(cards=cards_with_execution)
 
-        # Buscar cost stats para o card
-        cost_stats = await exec_repo.get_cost_stats_for_card(card.id)
-        if cost_stats.get("totalCost", 0.0) > 0:
-            card_dict["costStats"] = CostStats(**cost_stats)
 
-        cards_with_execution.append(CardResponse.model_validate(card_dict))
+@router.get("/search", response_model=CardSearchResponse)
+async def search_cards(
+    q: Optional[str] = Query(None, description="Words to search in title, description and spec path; `term*` matches by prefix"),
+    column: Optional[list[ColumnId]] = Query(None),
+    model: Optional[str] = Query(None, description="Model used in any stage"),
+    is_fix_card: Optional[bool] = Query(None),
+    has_worktree: Optional[bool] = Query(None),
+    expert: Optional[str] = Query(None),
+    include_archived: bool = Query(True),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="nextCursor of the previous page"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Search and filter cards server-side, one page at a time.
+
+    Cards come in board order (creation date) with the same execution and
+    token stats as the full list; facets count the matching cards per
+    column, model, fix flag, worktree and expert.
+    """
+    match = None
+    if q and q.strip():
+        match, _ = parse_query(q)
+        if match is None:
+            raise HTTPException(status_code=400, detail="Search query has no searchable terms")
 
-    return CardsListResponse(cards=cards_with_execution)
+    repo = CardRepository(db)
+    await repo.ensure_search_index()
+    filters = dict(
+        match=match,
+        columns=column,
+        model=model,
+        is_fix_card=is_fix_card,
+        has_worktree=has_worktree,
+        expert=expert,
+        include_archived=include_archived,
+    )
+    try:
+        cards, next_cursor = await repo.search(**filters, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    facets = await repo.search_facets(**filters)
+
+    exec_repo = ExecutionRepository(db)
+    return CardSearchResponse(
+        cards=[await _card_with_execution(db, exec_repo, card) for card in cards],
+        total=facets["total"],
+        facets=facets["facets"],
+        nextCursor=next_cursor,
+    )
+
+
+@router.post("/bulk", response_model=CardsListResponse, status_code=201)
+async def bulk_create_cards(request: CardBulkCreate, db: AsyncSession = Depends(get_db)):
+    """Create many cards in the backlog in one transaction, with one cards_created event."""
+    repo = CardRepository(db)
+    cards = await repo.bulk_create(request.cards)
+    await db.commit()
+
+    from ..services.card_ws import card_ws_manager
+    responses = [CardResponse.model_validate(card) for card in cards]
+    await card_ws_manager.broadcast_cards_created(
+        [response.model_dump(by_alias=True, mode='json') for response in responses]
+    )
+
+    return CardsListResponse(cards=responses)
+
+
+@router.patch("/bulk/move", response_model=CardsListResponse)
+async def bulk_move_cards(request: CardBulkMove, db: AsyncSession = Depends(get_db)):
+    """
+    Move many cards to one column with SDLC validation, with one cards_moved event.
+
+    All or nothing: a missing card or an invalid transition rejects the
+    whole request (400 with the error per card). Diffs are not captured
+    automatically, use POST /api/cards/{card_id}/capture-diff.
+    """
+    repo = CardRepository(db)
+    moved, errors = await repo.bulk_move(request.card_ids, request.column_id)
+    if errors:
+        raise HTTPException(status_code=400, detail={"errors": errors})
+    await db.commit()
+
+    from ..services.card_ws import card_ws_manager
+    responses = [CardResponse.model_validate(card) for card, _ in moved]
+    await card_ws_manager.broadcast_cards_moved([
+        {
+            "cardId": response.id,
+            "fromColumn": from_column,
+            "toColumn": request.column_id,
+            "card": response.model_dump(by_alias=True, mode='json'),
+        }
+        for response, (_, from_column) in zip(responses, moved)
+    ])
+
+    return CardsListResponse(cards=responses)
+
+
+@router.patch("/bulk", response_model=CardsListResponse)
+async def bulk_update_cards(request: CardBulkUpdate, db: AsyncSession = Depends(get_db)):
+    """Update many cards in one transaction, with one cards_updated event."""
+    updates = {
+        item.id: CardUpdate.model_validate(item.model_dump(exclude={"id"}, exclude_unset=True))
+        for item in request.updates
+    }
+    repo = CardRepository(db)
+    cards, missing = await repo.bulk_update(updates)
+    if missing:
+        raise HTTPException(status_code=404, detail={"errors": {card_id: "Card not found" for card_id in missing}})
+    await db.commit()
+
+    from ..services.card_ws import card_ws_manager
+    responses = [CardResponse.model_validate(card) for card in cards]
+    await card_ws_manager.broadcast_cards_updated(
+        [response.model_dump(by_alias=True, mode='json') for response in responses]
+    )
+
+    return CardsListResponse(cards=responses)
 
 
 @router.get("/{card_id}", response_model=CardSingleResponse)
@@ -142,7 +273,15 @@ async def update_card(
     if not card:
         raise HTTPException(status_code=404, detail="Card not found")
 
-    return CardSingleResponse(card=CardResponse.model_validate(card))
+    # Broadcast the change via WebSocket (delta clients receive only changed fields)
+    from ..services.card_ws import card_ws_manager
+    card_response = CardResponse.model_validate(card)
+    await card_ws_manager.broadcast_card_updated(
+        card_id=card.id,
+        card_data=card_response.model_dump(by_alias=True, mode='json')
+    )
+
+    return CardSingleResponse(card=card_response)
 
 
 @router.delete("/{card_id}", response_model=CardDeleteResponse)
@@ -154,6 +293,9 @@ async def delete_card(card_id: str, db: AsyncSession = Depends(get_db)):
     if not deleted:
         raise HTTPException(status_code=404, detail="Card not found")
 
+    from ..services.kanban_context import get_kanban_context
+    get_kanban_context().card_deleted(card_id)
+
     return CardDeleteResponse()
 
 
@@ -1,15 +1,20 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from ..services.card_ws import card_ws_manager
+from ..services import ws_protocol
 
 router = APIRouter(prefix="/api/cards", tags=["cards-ws"])
 
 @router.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    """WebSocket endpoint para notificações de cards"""
+    """WebSocket endpoint para notificações de cards (?encoding=msgpack&delta=1 opcionais)"""
     await card_ws_manager.connect(websocket)
     try:
         while True:
-            # Mantém conexão aberta
-            await websocket.receive_text()
+            # Mantém conexão aberta e responde ping/card_sync
+            message = await ws_protocol.receive(websocket)
+            card_ws_manager.handle_client_message(websocket, message)
     except WebSocketDisconnect:
+        pass
+    finally:
+        # Também cobre sockets fechados pelo broadcaster (consumidor lento)
         card_ws_manager.disconnect(websocket)
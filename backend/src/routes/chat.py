@@ -24,7 +24,7 @@ async def create_chat_session():
         CreateSessionResponse: Session ID and creation timestamp
     """
     chat_service = get_chat_service()
-    session_data = chat_service.create_session()
+    session_data = await chat_service.create_session()
 
     return CreateSessionResponse(
         sessionId=session_data["sessionId"],
@@ -47,7 +47,7 @@ async def get_chat_history(session_id: str):
         HTTPException: 404 if session not found
     """
     chat_service = get_chat_service()
-    session = chat_service.get_session(session_id)
+    session = await chat_service.get_session(session_id)
 
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -84,7 +84,7 @@ async def delete_chat_session(session_id: str):
         HTTPException: 404 if session not found
     """
     chat_service = get_chat_service()
-    success = chat_service.delete_session(session_id)
+    success = await chat_service.delete_session(session_id)
 
     if not success:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -182,18 +182,19 @@ async def chat_websocket(websocket: WebSocket, session_id: str):
 @router.get("/sessions")
 async def list_sessions():
     """
-    List all active chat sessions (for debugging/admin purposes).
+    List the most recently active chat sessions (for debugging/admin purposes).
 
     Returns:
-        JSON: List of session IDs and count
+        JSON: Session IDs, stored session count and in-memory cache stats
     """
     chat_service = get_chat_service()
-    sessions = chat_service.list_sessions()
+    sessions = await chat_service.list_sessions()
 
     return JSONResponse(
         content={
             "sessions": sessions,
-            "count": len(sessions),
+            "count": await chat_service.get_session_count(),
+            "cache": chat_service.cache_stats(),
         },
         status_code=200,
     )
@@ -1,14 +1,53 @@
+from typing import Optional
+
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from ..services.execution_ws import execution_ws_manager
+from ..services import ws_protocol
 
 router = APIRouter(tags=["execution"])
 
 
+def _parse_after_seq(value) -> int:
+    """Client resume cursor; a missing or malformed value means a full backfill (0)."""
+    try:
+        return max(0, int(value or 0))
+    except (TypeError, ValueError):
+        return 0
+
+
 @router.websocket("/api/execution/ws/{card_id}")
-async def execution_websocket(websocket: WebSocket, card_id: str):
+async def execution_websocket(
+    websocket: WebSocket,
+    card_id: str,
+    after_seq: Optional[int] = None,
+    epoch: Optional[str] = None,
+):
+    """
+    Logs da execução em tempo real (log_batch) e execution_complete.
+
+    Backfill: com `?after_seq=N` na URL, ou enviando
+    {"type": "resume", "afterSeq": N, "epoch": "..."} após conectar, o
+    servidor responde um log_backfill com as linhas após N.
+    `?encoding=msgpack` (ou subprotocolo orq.v1.msgpack) usa frames binários.
+    """
     await execution_ws_manager.connect(card_id, websocket)
+    if after_seq is not None:
+        execution_ws_manager.send_backfill(card_id, websocket, after_seq, epoch)
     try:
         while True:
-            await websocket.receive_text()
+            message = await ws_protocol.receive(websocket)
+            if not isinstance(message, dict):
+                continue
+
+            if message.get("type") == "ping":
+                execution_ws_manager.send_pong(websocket)
+            elif message.get("type") == "resume":
+                execution_ws_manager.send_backfill(
+                    card_id, websocket,
+                    _parse_after_seq(message.get("afterSeq")),
+                    message.get("epoch"),
+                )
     except WebSocketDisconnect:
+        pass
+    finally:
         execution_ws_manager.disconnect(card_id, websocket)
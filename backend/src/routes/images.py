@@ -1,5 +1,6 @@
 """Routes for managing card images."""
 
+import asyncio
 import uuid
 from pathlib import Path
 from datetime import datetime
@@ -7,6 +8,7 @@ from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
 from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from ..config.settings import get_settings
 from ..database import async_session_maker
 from ..models.card import Card as CardModel
 
@@ -176,13 +178,11 @@ async def delete_image(image_id: str):
         return {"success": True, "message": "Image deleted successfully"}
 
 
-@router.post("/cleanup")
-async def cleanup_old_images():
-    """Clean up old images from temp directory (older than 7 days)."""
+def remove_old_images(max_age_days: int = 7) -> int:
+    """Delete temp images older than max_age_days. Returns how many were removed."""
     import time
 
-    now = time.time()
-    cutoff = now - (7 * 24 * 60 * 60)  # 7 days ago
+    cutoff = time.time() - (max_age_days * 24 * 60 * 60)
 
     cleaned = 0
     for file_path in TEMP_DIR.glob("*"):
@@ -194,4 +194,11 @@ async def cleanup_old_images():
                 except Exception as e:
                     print(f"Failed to delete old image {file_path}: {e}")
 
+    return cleaned
+
+
+@router.post("/cleanup")
+async def cleanup_old_images():
+    """Clean up old images from temp directory (older than 7 days)."""
+    cleaned = await asyncio.to_thread(remove_old_images, get_settings().image_cleanup_max_age_days)
     return {"success": True, "cleaned": cleaned}
\ No newline at end of file
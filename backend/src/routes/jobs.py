@@ -0,0 +1,35 @@
+"""Background job routes for the API."""
+
+from typing import Any
+
+from fastapi import APIRouter, HTTPException
+
+from ..services.job_scheduler import JobAlreadyRunning, get_job_scheduler
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+
+@router.get("")
+async def list_jobs() -> dict[str, Any]:
+    """Status of the background jobs: schedule, next run, durations, last result or error."""
+    scheduler = get_job_scheduler()
+    return {"success": True, "running": scheduler.started, "jobs": scheduler.status()}
+
+
+@router.post("/{name}/run")
+async def run_job(name: str) -> dict[str, Any]:
+    """
+    Run a job now and wait for it.
+
+    409 if a run of the job is already in progress (scheduled or manual).
+    """
+    scheduler = get_job_scheduler()
+    if name not in scheduler.jobs:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {name}")
+    try:
+        result = await scheduler.trigger(name)
+    except JobAlreadyRunning:
+        raise HTTPException(status_code=409, detail=f"Job {name} is already running")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Job {name} failed: {e}")
+    return {"success": True, "result": result, "job": scheduler.jobs[name].status()}
@@ -11,6 +11,7 @@ from sqlalchemy import select, update, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database import get_db
+from ..services import ws_protocol
 from ..models.card import Card
 from ..models.live import Vote, VoteType, CompletedProject
 from ..schemas.live import (
@@ -420,8 +421,8 @@ async def stop_live_mode():
 
 @router.websocket("/ws")
 async def live_websocket(websocket: WebSocket):
-    """WebSocket endpoint for live spectators."""
-    await websocket.accept()
+    """WebSocket endpoint for live spectators (?encoding=msgpack optional)."""
+    encoding, features = await ws_protocol.accept(websocket)
 
     # Generate session ID
     session_id = str(uuid4())
@@ -431,15 +432,15 @@ async def live_websocket(websocket: WebSocket):
 
     try:
         # Register connection
-        await broadcast.connect(session_id, websocket)
+        await broadcast.connect(session_id, websocket, encoding=encoding)
 
         # Handle messages
         while True:
             try:
-                data = await websocket.receive_json()
+                data = await ws_protocol.receive(websocket)
 
                 # Handle ping
-                if data.get("type") == "ping":
+                if isinstance(data, dict) and data.get("type") == "ping":
                     await broadcast.handle_ping(session_id)
 
             except WebSocketDisconnect:
@@ -0,0 +1,49 @@
+"""Execution log search routes for the API."""
+
+from datetime import datetime
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_db
+from ..services.log_search import MAX_PAGE_SIZE, LogSearchService
+
+router = APIRouter(prefix="/api/logs", tags=["logs"])
+
+
+@router.get("/search")
+async def search_logs(
+    q: str = Query(..., min_length=1, description="Words to search; `term*` matches by prefix"),
+    card_id: Optional[str] = Query(None),
+    command: Optional[str] = Query(None),
+    log_type: Optional[str] = Query(None, alias="type"),
+    since: Optional[datetime] = Query(None),
+    until: Optional[datetime] = Query(None),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[int] = Query(None, description="nextCursor of the previous page"),
+    db: AsyncSession = Depends(get_db),
+) -> dict[str, Any]:
+    """
+    Full-text search over execution logs, archived ones included.
+
+    Results come newest first with a highlighted snippet (<mark>) and are
+    paginated by cursor.
+    """
+    service = LogSearchService(db)
+    await service.ensure_index()
+    try:
+        page = await service.search(
+            q,
+            card_id=card_id,
+            command=command,
+            log_type=log_type,
+            since=since,
+            until=until,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {"success": True, "query": q, **page}
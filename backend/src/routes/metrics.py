@@ -1,12 +1,13 @@
 """Metrics routes for the API."""
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional, Literal
+from typing import Optional, Literal, Any, Callable, Awaitable, Dict
 from datetime import date, datetime, timedelta
 from pydantic import BaseModel
 
-from ..database import get_db
+from ..cache import metrics_response_cache, metrics_cache_tag
+from ..database import get_db, get_session
 from ..repositories.metrics_repository import MetricsRepository
 from ..services.metrics_aggregator import MetricsAggregator
 from ..services.metrics_collector import MetricsCollector
@@ -15,6 +16,51 @@ from ..services.metrics_collector import MetricsCollector
 router = APIRouter(prefix="/api/metrics", tags=["metrics"])
 
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Verifica o header If-None-Match (aceita lista e ETags fracos)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates
+
+
+async def _cached_json(
+    request: Request,
+    project_id: str,
+    params: Dict[str, Any],
+    compute: Callable[[AsyncSession], Awaitable[Any]]
+) -> Response:
+    """
+    Serve a resposta pelo metrics_response_cache, com ETag/304.
+
+    As entradas são invalidadas pela tag do projeto quando uma execução
+    termina; entradas expiradas são servidas enquanto um recálculo roda
+    em background. O cálculo é compartilhado por todos os clientes que
+    esperam a chave, então usa sua própria sessão, não a da requisição
+    que o disparou (que fecha se esse cliente desconectar).
+    """
+    key = metrics_response_cache.make_key(request.url.path, params)
+
+    async def compute_in_session():
+        async with get_session()() as session:
+            return await compute(session)
+
+    entry = await metrics_response_cache.get_or_compute(
+        key,
+        compute_in_session,
+        tags=[metrics_cache_tag(project_id)],
+        revalidate=compute_in_session
+    )
+
+    headers = {"ETag": entry.etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
 # Schemas
 class MetricsResponse(BaseModel):
     """Response model for aggregated metrics."""
@@ -92,10 +138,10 @@ class ProductivityResponse(BaseModel):
 
 @router.get("/project/{project_id}", response_model=MetricsResponse)
 async def get_project_metrics(
+    request: Request,
     project_id: str,
     start_date: Optional[date] = Query(None),
-    end_date: Optional[date] = Query(None),
-    db: AsyncSession = Depends(get_db)
+    end_date: Optional[date] = Query(None)
 ):
     """
     Retorna métricas agregadas do projeto.
@@ -105,18 +151,21 @@ async def get_project_metrics(
         start_date: Data inicial (opcional)
         end_date: Data final (opcional)
     """
-    repo = MetricsRepository(db)
-    metrics = await repo.get_aggregated_metrics(project_id, start_date, end_date)
+    async def compute(session: AsyncSession):
+        repo = MetricsRepository(session)
+        metrics = await repo.get_aggregated_metrics(project_id, start_date, end_date)
+        return MetricsResponse(**metrics).model_dump()
 
-    return MetricsResponse(**metrics)
+    params = {"start_date": start_date, "end_date": end_date}
+    return await _cached_json(request, project_id, params, compute)
 
 
 @router.get("/tokens/{project_id}", response_model=TokenUsageResponse)
 async def get_token_usage(
+    request: Request,
     project_id: str,
     period: Literal["24h", "7d", "30d", "all"] = Query("7d"),
-    group_by: Literal["hour", "day", "model"] = Query("day"),
-    db: AsyncSession = Depends(get_db)
+    group_by: Literal["hour", "day", "model"] = Query("day")
 ):
     """
     Retorna uso de tokens agregado por período.
@@ -126,18 +175,21 @@ async def get_token_usage(
         period: Período de análise (24h, 7d, 30d, all)
         group_by: Agrupamento (hour, day, model)
     """
-    repo = MetricsRepository(db)
-    data = await repo.get_token_usage(project_id, period, group_by)
+    async def compute(session: AsyncSession):
+        repo = MetricsRepository(session)
+        data = await repo.get_token_usage(project_id, period, group_by)
+        return TokenUsageResponse(data=data).model_dump()
 
-    return TokenUsageResponse(data=data)
+    params = {"period": period, "group_by": group_by}
+    return await _cached_json(request, project_id, params, compute)
 
 
 @router.get("/execution-time/{project_id}", response_model=ExecutionTimeResponse)
 async def get_execution_times(
+    request: Request,
     project_id: str,
     command: Optional[str] = Query(None),
-    limit: int = Query(100),
-    db: AsyncSession = Depends(get_db)
+    limit: int = Query(100)
 ):
     """
     Retorna tempos de execução por card/comando.
@@ -147,17 +199,20 @@ async def get_execution_times(
         command: Filtrar por comando específico (opcional)
         limit: Limite de resultados
     """
-    repo = MetricsRepository(db)
-    data = await repo.get_execution_times(project_id, command, limit)
+    async def compute(session: AsyncSession):
+        repo = MetricsRepository(session)
+        data = await repo.get_execution_times(project_id, command, limit)
+        return ExecutionTimeResponse(data=data).model_dump()
 
-    return ExecutionTimeResponse(data=data)
+    params = {"command": command, "limit": limit}
+    return await _cached_json(request, project_id, params, compute)
 
 
 @router.get("/costs/{project_id}", response_model=CostAnalysisResponse)
 async def get_cost_analysis(
+    request: Request,
     project_id: str,
-    group_by: Literal["model", "command", "day"] = Query("model"),
-    db: AsyncSession = Depends(get_db)
+    group_by: Literal["model", "command", "day"] = Query("model")
 ):
     """
     Retorna análise de custos detalhada.
@@ -166,17 +221,20 @@ async def get_cost_analysis(
         project_id: ID do projeto
         group_by: Agrupamento (model, command, day)
     """
-    repo = MetricsRepository(db)
-    data = await repo.get_cost_analysis(project_id, group_by)
+    async def compute(session: AsyncSession):
+        repo = MetricsRepository(session)
+        data = await repo.get_cost_analysis(project_id, group_by)
+        return CostAnalysisResponse(data=data).model_dump()
 
-    return CostAnalysisResponse(data=data)
+    params = {"group_by": group_by}
+    return await _cached_json(request, project_id, params, compute)
 
 
 @router.get("/trends/{project_id}", response_model=TrendsResponse)
 async def get_token_trends(
+    request: Request,
     project_id: str,
-    days: int = Query(7, ge=1, le=90),
-    db: AsyncSession = Depends(get_db)
+    days: int = Query(7, ge=1, le=90)
 ):
     """
     Calcula tendências de uso de tokens.
@@ -185,17 +243,20 @@ async def get_token_trends(
         project_id: ID do projeto
         days: Número de dias para análise (1-90)
     """
-    aggregator = MetricsAggregator(db)
-    trends = await aggregator.calculate_token_trends(project_id, days)
+    async def compute(session: AsyncSession):
+        aggregator = MetricsAggregator(session)
+        trends = await aggregator.calculate_token_trends(project_id, days)
+        return TrendsResponse(**trends).model_dump()
 
-    return TrendsResponse(**trends)
+    params = {"days": days}
+    return await _cached_json(request, project_id, params, compute)
 
 
 @router.get("/performance/{project_id}", response_model=PerformanceResponse)
 async def get_execution_performance(
+    request: Request,
     project_id: str,
-    command: Optional[str] = Query(None),
-    db: AsyncSession = Depends(get_db)
+    command: Optional[str] = Query(None)
 ):
     """
     Analisa performance de execuções (percentis, outliers).
@@ -204,16 +265,19 @@ async def get_execution_performance(
         project_id: ID do projeto
         command: Filtrar por comando específico (opcional)
     """
-    aggregator = MetricsAggregator(db)
-    performance = await aggregator.analyze_execution_performance(project_id, command)
+    async def compute(session: AsyncSession):
+        aggregator = MetricsAggregator(session)
+        performance = await aggregator.analyze_execution_performance(project_id, command)
+        return PerformanceResponse(**performance).model_dump()
 
-    return PerformanceResponse(**performance)
+    params = {"command": command}
+    return await _cached_json(request, project_id, params, compute)
 
 
 @router.get("/roi/{project_id}", response_model=ROIResponse)
 async def get_roi_metrics(
-    project_id: str,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    project_id: str
 ):
     """
     Calcula métricas de ROI (custo por card, eficiência, economia de tempo).
@@ -221,10 +285,12 @@ async def get_roi_metrics(
     Args:
         project_id: ID do projeto
     """
-    aggregator = MetricsAggregator(db)
-    roi = await aggregator.calculate_roi_metrics(project_id)
+    async def compute(session: AsyncSession):
+        aggregator = MetricsAggregator(session)
+        roi = await aggregator.calculate_roi_metrics(project_id)
+        return ROIResponse(**roi).model_dump()
 
-    return ROIResponse(**roi)
+    return await _cached_json(request, project_id, {}, compute)
 
 
 @router.get("/productivity/{project_id}", response_model=ProductivityResponse)
@@ -250,8 +316,8 @@ async def get_productivity_metrics(
 
 @router.get("/insights/{project_id}", response_model=InsightsResponse)
 async def get_insights(
-    project_id: str,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    project_id: str
 ):
     """
     Gera insights automáticos sobre as métricas.
@@ -259,17 +325,19 @@ async def get_insights(
     Args:
         project_id: ID do projeto
     """
-    aggregator = MetricsAggregator(db)
-    insights = await aggregator.generate_insights(project_id)
+    async def compute(session: AsyncSession):
+        aggregator = MetricsAggregator(session)
+        insights = await aggregator.generate_insights(project_id)
+        return InsightsResponse(insights=insights).model_dump()
 
-    return InsightsResponse(insights=insights)
+    return await _cached_json(request, project_id, {}, compute)
 
 
 @router.get("/hourly/{project_id}")
 async def get_hourly_metrics(
+    request: Request,
     project_id: str,
-    target_date: date = Query(default_factory=lambda: datetime.utcnow().date()),
-    db: AsyncSession = Depends(get_db)
+    target_date: date = Query(default_factory=lambda: datetime.utcnow().date())
 ):
     """
     Retorna métricas agregadas por hora para um dia específico.
@@ -278,16 +346,21 @@ async def get_hourly_metrics(
         project_id: ID do projeto
         target_date: Data alvo (padrão: hoje)
     """
-    aggregator = MetricsAggregator(db)
-    hourly_data = await aggregator.aggregate_hourly_metrics(project_id, target_date)
+    async def compute(session: AsyncSession):
+        aggregator = MetricsAggregator(session)
+        hourly_data = await aggregator.aggregate_hourly_metrics(project_id, target_date)
+        return {"data": hourly_data}
 
-    return {"data": hourly_data}
+    params = {"target_date": target_date}
+    return await _cached_json(request, project_id, params, compute)
 
 
 @router.post("/backfill/{project_id}")
 async def backfill_metrics(
     project_id: str,
     start_date: Optional[datetime] = Query(None),
+    dry_run: bool = Query(False),
+    chunk_size: int = Query(5000, ge=100, le=100000),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -296,9 +369,33 @@ async def backfill_metrics(
     Args:
         project_id: ID do projeto
         start_date: Data inicial para backfill (opcional)
+        dry_run: Apenas conta quantas métricas seriam criadas
+        chunk_size: Execuções varridas por transação
     """
     collector = MetricsCollector(db)
-    count = await collector.backfill_metrics(project_id, start_date)
+
+    async def report_progress(progress: dict) -> None:
+        print(
+            f"[Metrics] Backfill {project_id}: rowid {progress['scannedRowid']}/{progress['maxRowid']}, "
+            f"{progress['inserted']}/{progress['pending']} métricas inseridas"
+        )
+
+    count = await collector.backfill_metrics(
+        project_id,
+        start_date,
+        chunk_size=chunk_size,
+        dry_run=dry_run,
+        progress_callback=report_progress
+    )
+
+    if dry_run:
+        return {
+            "message": "Dry run: no metrics were created",
+            "pendingCount": count
+        }
+
+    if count:
+        metrics_response_cache.invalidate_tag(metrics_cache_tag(project_id))
 
     return {
         "message": f"Backfill completed successfully",
@@ -308,12 +405,12 @@ async def backfill_metrics(
 
 @router.get("/compare/{project_id}")
 async def compare_periods(
+    request: Request,
     project_id: str,
     current_start: date = Query(...),
     current_end: date = Query(...),
     previous_start: date = Query(...),
-    previous_end: date = Query(...),
-    db: AsyncSession = Depends(get_db)
+    previous_end: date = Query(...)
 ):
     """
     Compara métricas entre dois períodos.
@@ -325,13 +422,20 @@ async def compare_periods(
         previous_start: Data inicial do período anterior
         previous_end: Data final do período anterior
     """
-    aggregator = MetricsAggregator(db)
-    comparison = await aggregator.compare_periods(
-        project_id,
-        current_start,
-        current_end,
-        previous_start,
-        previous_end
-    )
-
-    return comparison
+    async def compute(session: AsyncSession):
+        aggregator = MetricsAggregator(session)
+        return await aggregator.compare_periods(
+            project_id,
+            current_start,
+            current_end,
+            previous_start,
+            previous_end
+        )
+
+    params = {
+        "current_start": current_start,
+        "current_end": current_end,
+        "previous_start": previous_start,
+        "previous_end": previous_end,
+    }
+    return await _cached_json(request, project_id, params, compute)
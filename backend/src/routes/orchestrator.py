@@ -1,7 +1,8 @@
 """Routes for orchestrator API."""
 
+import asyncio
 import logging
-from typing import Optional
+from typing import Any, Dict, Optional
 from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -24,6 +25,7 @@ from ..schemas.orchestrator import (
 )
 from ..services.orchestrator_service import get_orchestrator_service
 from ..services.orchestrator_logger import get_orchestrator_logger
+from ..services.tracing import get_tracer
 from ..services.qdrant_service import get_qdrant_service
 from ..repositories.orchestrator_repository import GoalRepository, ActionRepository
 
@@ -167,7 +169,7 @@ async def get_logs(
 ):
     """Get recent orchestrator logs."""
     orch_logger = get_orchestrator_logger()
-    logs = orch_logger.read_recent_logs(limit=limit)
+    logs = await asyncio.to_thread(orch_logger.read_recent_logs, limit)
 
     return LogListResponse(
         logs=[
@@ -223,6 +225,25 @@ async def get_learning_stats():
     return qdrant.get_collection_stats()
 
 
+# ==================== PERFORMANCE ====================
+
+@router.get("/perf")
+async def get_perf(recent: int = 20, reset: bool = False) -> Dict[str, Any]:
+    """
+    Cycle tracing summary.
+
+    Per-span-name duration histograms (orchestrator steps, agent stages,
+    usage check, Qdrant embed/search, git commands, SQL statements) and the
+    step breakdown of the most recent cycles. `reset=true` clears the
+    histograms after returning them.
+    """
+    tracer = get_tracer()
+    perf = tracer.perf(recent=max(0, min(recent, 200)))
+    if reset:
+        tracer.reset()
+    return perf
+
+
 # ==================== WEBSOCKET ====================
 
 @router.websocket("/ws")
@@ -4,6 +4,8 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional
 
+from ..config.settings import get_settings
+
 router = APIRouter(prefix="/api/settings", tags=["settings"])
 
 
@@ -28,11 +30,16 @@ class UpdateAutoCleanupRequest(BaseModel):
 
 # Em memória por enquanto (pode ser movido para DB/config file depois)
 _auto_cleanup_settings = AutoCleanupSettings(
-    enabled=True,
-    cleanup_after_minutes=30
+    enabled=get_settings().auto_cleanup_enabled,
+    cleanup_after_minutes=get_settings().auto_cleanup_after_minutes
 )
 
 
+def current_auto_cleanup_settings() -> AutoCleanupSettings:
+    """Settings in effect, read by the auto_cleanup background job."""
+    return _auto_cleanup_settings
+
+
 @router.get("/auto-cleanup", response_model=AutoCleanupResponse)
 async def get_auto_cleanup_settings():
     """Get current auto-cleanup settings."""
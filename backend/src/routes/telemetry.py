@@ -0,0 +1,16 @@
+"""Prometheus scrape endpoint."""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ..services.telemetry import get_metrics_registry
+
+router = APIRouter(tags=["telemetry"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Process metrics in the Prometheus text exposition format."""
+    return PlainTextResponse(get_metrics_registry().render(), media_type=CONTENT_TYPE)
@@ -39,6 +39,8 @@ class TokenStats(BaseModel):
     inputTokens: int = 0
     outputTokens: int = 0
     totalTokens: int = 0
+    cacheReadTokens: int = 0
+    cacheWriteTokens: int = 0
     executionCount: int = 0
 
 
@@ -132,6 +134,34 @@ class CardMove(BaseModel):
         populate_by_name = True
 
 
+class CardBulkCreate(BaseModel):
+    """Schema for creating many cards in one request."""
+
+    cards: List[CardCreate] = Field(..., min_length=1, max_length=500)
+
+
+class CardBulkMove(BaseModel):
+    """Schema for moving many cards to the same column."""
+
+    card_ids: List[str] = Field(..., alias="cardIds", min_length=1, max_length=1000)
+    column_id: ColumnId = Field(..., alias="columnId")
+
+    class Config:
+        populate_by_name = True
+
+
+class CardBulkUpdateItem(CardUpdate):
+    """Fields to update on one card of a bulk update."""
+
+    id: str
+
+
+class CardBulkUpdate(BaseModel):
+    """Schema for updating many cards in one request."""
+
+    updates: List[CardBulkUpdateItem] = Field(..., min_length=1, max_length=1000)
+
+
 class CardResponse(BaseModel):
     """Schema for card response."""
 
@@ -188,6 +218,19 @@ class CardsListResponse(BaseModel):
     cards: list[CardResponse]
 
 
+class CardSearchResponse(BaseModel):
+    """Schema for one page of card search results."""
+
+    success: bool = True
+    cards: list[CardResponse]
+    total: int
+    facets: Dict[str, Dict[str, int]]
+    next_cursor: Optional[str] = Field(None, alias="nextCursor")
+
+    class Config:
+        populate_by_name = True
+
+
 class CardSingleResponse(BaseModel):
     """Schema for single card response."""
 
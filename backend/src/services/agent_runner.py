@@ -0,0 +1,228 @@
+"""Agent backends behind one streaming interface.
+
+Every workflow stage (plan/implement/test/review) sends a prompt to an agent
+and consumes its stream the same way: text goes to the execution logs, tool
+calls are logged, and the final result carries the token usage. Runners turn
+each backend's stream into ``RunEvent``s so that loop lives in one place
+(``agent.run_stream``).
+
+Backends (``agent_runner_backend`` setting):
+
+- ``auto`` (default): Claude Agent SDK for Claude models, Gemini CLI for
+  ``gemini-*`` models
+- ``fake``: replays a recorded stream (JSONL, one event per line) or a short
+  built-in script, with no network or subprocess. ``agent_runner_fake_speed``
+  scales the recorded delays (0 = as fast as possible), which makes the
+  stages usable in load tests and CI
+
+``RecordingRunner`` wraps a real runner and writes the stream it sees in the
+format the fake runner replays.
+"""
+
+import asyncio
+import json
+import time
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from ..config.settings import get_settings
+
+DEFAULT_ALLOWED_TOOLS = ["Skill", "Read", "Write", "Edit", "Bash", "Glob", "Grep", "TodoWrite"]
+
+# Nome de modelo da UI -> valor aceito pelo SDK
+SDK_MODELS = {
+    "opus-4.5": "opus",
+    "sonnet-4.5": "sonnet",
+    "haiku-4.5": "haiku",
+}
+
+
+@dataclass
+class RunEvent:
+    """One item of an agent stream."""
+    kind: str  # "text", "tool" ou "result"
+    text: str = ""
+    tool_name: str = ""
+    tool_input: Optional[Dict[str, Any]] = None
+    usage: Optional[Dict[str, Any]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: value for key, value in asdict(self).items() if value not in ("", None)}
+
+
+@dataclass
+class RunRequest:
+    """What a stage asks the agent to do."""
+    prompt: str
+    cwd: str
+    model: str
+    system_prompt: Optional[str] = None
+    allowed_tools: List[str] = field(default_factory=lambda: list(DEFAULT_ALLOWED_TOOLS))
+    permission_mode: str = "acceptEdits"
+
+
+class AgentRunner(ABC):
+    """Streams ``RunEvent``s for a request; subclasses wrap a backend."""
+
+    name = "base"
+    # Separador usado ao concatenar os textos no resultado da etapa
+    text_separator = ""
+
+    @abstractmethod
+    def stream(self, request: RunRequest) -> AsyncIterator[RunEvent]:
+        """Async generator of the run's events."""
+
+
+class ClaudeSDKRunner(AgentRunner):
+    """Claude Agent SDK (``query``), loading skills/commands from .claude/."""
+
+    name = "claude"
+    text_separator = "\n"
+
+    async def stream(self, request: RunRequest) -> AsyncIterator[RunEvent]:
+        from claude_agent_sdk import (
+            AssistantMessage,
+            ClaudeAgentOptions,
+            ResultMessage,
+            TextBlock,
+            ToolUseBlock,
+            query,
+        )
+
+        options = ClaudeAgentOptions(
+            cwd=Path(request.cwd),
+            setting_sources=["user", "project"],  # Load Skills from .claude/skills/
+            allowed_tools=request.allowed_tools,
+            permission_mode=request.permission_mode,
+            model=SDK_MODELS.get(request.model, "opus"),
+            system_prompt=request.system_prompt,
+        )
+
+        async for message in query(prompt=request.prompt, options=options):
+            if isinstance(message, AssistantMessage):
+                for block in message.content:
+                    if isinstance(block, TextBlock):
+                        yield RunEvent("text", text=block.text)
+                    elif isinstance(block, ToolUseBlock):
+                        tool_input = block.input if isinstance(block.input, dict) else None
+                        yield RunEvent("tool", tool_name=block.name, tool_input=tool_input)
+            elif isinstance(message, ResultMessage):
+                yield RunEvent("result", text=message.result or "", usage=message.usage or None)
+
+
+class GeminiCLIRunner(AgentRunner):
+    """Gemini CLI subprocess; chunks are raw stdout, so they are joined as-is."""
+
+    name = "gemini"
+
+    async def stream(self, request: RunRequest) -> AsyncIterator[RunEvent]:
+        from ..gemini_agent import GeminiAgent
+
+        gemini = GeminiAgent(model=request.model)
+        async for chunk in gemini.execute_command(
+            prompt=request.prompt,
+            cwd=Path(request.cwd),
+            stream=True
+        ):
+            yield RunEvent("text", text=chunk)
+
+
+def default_fake_script(request: RunRequest) -> List[Dict[str, Any]]:
+    """Small plausible stream used when no recording is configured."""
+    command = request.prompt.split(maxsplit=1)[0] if request.prompt else ""
+    script: List[Dict[str, Any]] = [
+        {"kind": "text", "text": f"Analisando a solicitação ({command or 'prompt'})", "delay_ms": 200},
+        {"kind": "tool", "tool_name": "Glob", "tool_input": {"pattern": "**/*.py"}, "delay_ms": 100},
+        {"kind": "tool", "tool_name": "Read", "tool_input": {"file_path": "README.md"}, "delay_ms": 100},
+    ]
+    if command == "/plan":
+        spec = f"{request.cwd}/specs/fake-plan.md"
+        script.append({"kind": "tool", "tool_name": "Write", "tool_input": {"file_path": spec}, "delay_ms": 150})
+    script += [
+        {"kind": "text", "text": "Alterações aplicadas.", "delay_ms": 200},
+        {
+            "kind": "result",
+            "text": "Concluído.",
+            "usage": {"input_tokens": 1200, "output_tokens": 300, "cache_read_input_tokens": 8000},
+            "delay_ms": 50,
+        },
+    ]
+    return script
+
+
+def load_script(path: str) -> List[Dict[str, Any]]:
+    """Read a recorded stream (JSONL, one event per line)."""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class FakeRunner(AgentRunner):
+    """Deterministic backend replaying a recorded stream.
+
+    ``speed`` divides the recorded ``delay_ms`` of each event (2.0 = twice
+    as fast); 0 replays without waiting.
+    """
+
+    name = "fake"
+
+    def __init__(self, script: Optional[List[Dict[str, Any]]] = None,
+                 speed: float = 1.0, text_separator: str = "\n"):
+        self.script = script
+        self.speed = speed
+        self.text_separator = text_separator
+        self.runs = 0
+
+    async def stream(self, request: RunRequest) -> AsyncIterator[RunEvent]:
+        self.runs += 1
+        for item in self.script if self.script is not None else default_fake_script(request):
+            delay_ms = item.get("delay_ms", 0)
+            if self.speed > 0 and delay_ms > 0:
+                await asyncio.sleep(delay_ms / 1000 / self.speed)
+            elif self.speed <= 0:
+                # Cede o loop para não monopolizá-lo em replays instantâneos
+                await asyncio.sleep(0)
+            yield RunEvent(
+                item["kind"],
+                text=item.get("text", ""),
+                tool_name=item.get("tool_name", ""),
+                tool_input=item.get("tool_input"),
+                usage=item.get("usage"),
+            )
+
+
+class RecordingRunner(AgentRunner):
+    """Passes another runner's stream through and appends it to a JSONL file."""
+
+    def __init__(self, inner: AgentRunner, path: str):
+        self.inner = inner
+        self.path = path
+        self.name = f"recording:{inner.name}"
+        self.text_separator = inner.text_separator
+
+    async def stream(self, request: RunRequest) -> AsyncIterator[RunEvent]:
+        lines = []
+        last = time.monotonic()
+        try:
+            async for event in self.inner.stream(request):
+                now = time.monotonic()
+                lines.append({**event.to_dict(), "delay_ms": round((now - last) * 1000)})
+                last = now
+                yield event
+        finally:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as f:
+                for line in lines:
+                    f.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+
+def get_runner(model: str) -> AgentRunner:
+    """Runner for a stage model according to ``agent_runner_backend``."""
+    settings = get_settings()
+    if settings.agent_runner_backend == "fake":
+        script = load_script(settings.agent_runner_fake_script) if settings.agent_runner_fake_script else None
+        return FakeRunner(script=script, speed=settings.agent_runner_fake_speed)
+    if model.startswith("gemini"):
+        return GeminiCLIRunner()
+    return ClaudeSDKRunner()
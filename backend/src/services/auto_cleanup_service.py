@@ -1,11 +1,12 @@
 """Auto cleanup service for moving old cards from Done to Completed."""
 
 from datetime import datetime, timedelta
+from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
-import asyncio
+from sqlalchemy import update
 import logging
 
+from ..config.settings import get_settings
 from ..models.card import Card
 
 logger = logging.getLogger(__name__)
@@ -14,56 +15,47 @@ logger = logging.getLogger(__name__)
 class AutoCleanupService:
     """Service for automatically cleaning up Done cards."""
 
-    def __init__(self, db_session: AsyncSession):
+    def __init__(self, db_session: AsyncSession, cleanup_after_minutes: Optional[int] = None,
+                 enabled: Optional[bool] = None):
+        settings = get_settings()
         self.db = db_session
-        self.cleanup_after_minutes = 30  # Configurável
-        self.enabled = True  # Configurável
+        self.cleanup_after_minutes = (
+            cleanup_after_minutes if cleanup_after_minutes is not None else settings.auto_cleanup_after_minutes
+        )
+        self.enabled = enabled if enabled is not None else settings.auto_cleanup_enabled
 
-    async def cleanup_done_cards(self) -> int:
-        """Move cards antigos de Done para Completed.
+    async def move_done_cards(self) -> List[str]:
+        """Move cards antigos de Done para Completed num único UPDATE.
 
         Returns:
-            Number of cards moved.
+            IDs of the cards moved.
         """
         if not self.enabled:
             logger.info("Auto-cleanup is disabled")
-            return 0
+            return []
 
-        cutoff_date = datetime.utcnow() - timedelta(minutes=self.cleanup_after_minutes)
+        now = datetime.utcnow()
+        cutoff_date = now - timedelta(minutes=self.cleanup_after_minutes)
 
-        # Buscar cards em Done há mais tempo que o configurado
+        # Um UPDATE ... RETURNING em vez de SELECT + um UPDATE por card
         result = await self.db.execute(
-            select(Card).where(
-                Card.column_id == "done",
-                Card.completed_at < cutoff_date
-            )
+            update(Card)
+            .where(Card.column_id == "done", Card.completed_at < cutoff_date)
+            .values(column_id="completed", updated_at=now)
+            .returning(Card.id)
+            .execution_options(synchronize_session=False)
         )
-        old_cards = result.scalars().all()
-
-        # Mover para Completed
-        moved_count = 0
-        for card in old_cards:
-            await self.db.execute(
-                update(Card).where(Card.id == card.id).values(
-                    column_id="completed",
-                    updated_at=datetime.utcnow()
-                )
-            )
-            logger.info(f"Auto-moved card {card.id} from Done to Completed")
-            moved_count += 1
-
+        moved_ids = [row[0] for row in result.all()]
         await self.db.commit()
-        return moved_count
 
-    async def run_periodic_cleanup(self):
-        """Executa limpeza periodicamente (1x por dia)."""
-        while True:
-            try:
-                moved_count = await self.cleanup_done_cards()
-                if moved_count > 0:
-                    logger.info(f"Auto-cleanup moved {moved_count} cards to Completed")
-            except Exception as e:
-                logger.error(f"Error in auto-cleanup: {e}")
+        if moved_ids:
+            logger.info(f"Auto-moved {len(moved_ids)} cards from Done to Completed")
+        return moved_ids
 
-            # Executar uma vez por dia
-            await asyncio.sleep(86400)
+    async def cleanup_done_cards(self) -> int:
+        """Move cards antigos de Done para Completed.
+
+        Returns:
+            Number of cards moved.
+        """
+        return len(await self.move_done_cards())
@@ -0,0 +1,188 @@
+"""Jobs periódicos registrados no JobScheduler.
+
+Cada job é uma corrotina sem argumentos que percorre os databases
+carregados (legado + projetos) e retorna um resumo do que fez, exibido em
+`GET /api/jobs`. As limpezas são feitas com um UPDATE/DELETE por database,
+sem carregar as linhas.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config.settings import get_settings
+from .job_scheduler import JobScheduler
+
+
+def _session_factories() -> List[Any]:
+    from ..database import async_session_maker
+    from ..database_manager import db_manager
+
+    return [async_session_maker] + list(db_manager.sessions.values())
+
+
+async def auto_cleanup_done_cards() -> Dict[str, int]:
+    """Move os cards antigos de Done para Completed em todos os databases."""
+    from ..database import get_session
+    from ..repositories.card_repository import CardRepository
+    from ..routes.settings import current_auto_cleanup_settings
+    from ..schemas.card import CardResponse
+    from .auto_cleanup_service import AutoCleanupService
+    from .card_ws import card_ws_manager
+
+    config = current_auto_cleanup_settings()
+    if not config.enabled:
+        return {"moved": 0}
+
+    current = get_session()
+    moved = 0
+    for session_factory in _session_factories():
+        async with session_factory() as session:
+            service = AutoCleanupService(session, config.cleanup_after_minutes, config.enabled)
+            moved_ids = await service.move_done_cards()
+            moved += len(moved_ids)
+
+            # O board aberto é o do projeto atual: um único cards_moved
+            if moved_ids and session_factory is current:
+                cards = await CardRepository(session)._get_many(moved_ids)
+                await card_ws_manager.broadcast_cards_moved([
+                    {
+                        "cardId": card.id,
+                        "fromColumn": "done",
+                        "toColumn": "completed",
+                        "card": CardResponse.model_validate(card).model_dump(by_alias=True, mode='json'),
+                    }
+                    for card in cards.values()
+                ])
+
+    return {"moved": moved}
+
+
+async def cleanup_execution_cache() -> Dict[str, int]:
+    """Remove do cache de execuções as entradas expiradas."""
+    from ..cache import execution_cache
+
+    return {"expired": execution_cache.purge_expired()}
+
+
+async def cleanup_orchestrator_logs() -> Dict[str, int]:
+    """Apaga os logs de memória de curto prazo expirados ou acima do limite por goal."""
+    from ..repositories.orchestrator_repository import LogRepository
+
+    settings = get_settings()
+    totals = {"expired": 0, "overCap": 0}
+    for session_factory in _session_factories():
+        async with session_factory() as session:
+            result = await LogRepository(session).purge(
+                batch_size=settings.short_term_memory_delete_batch_size,
+                max_per_goal=settings.short_term_memory_max_logs_per_goal,
+            )
+            for key in totals:
+                totals[key] += result[key]
+    return totals
+
+
+async def cleanup_images() -> Dict[str, int]:
+    """Apaga as imagens temporárias antigas (fora do event loop)."""
+    from ..routes.images import remove_old_images
+
+    removed = await asyncio.to_thread(remove_old_images, get_settings().image_cleanup_max_age_days)
+    return {"removed": removed}
+
+
+async def cleanup_orphan_worktrees(db: AsyncSession) -> Optional[int]:
+    """
+    Remove os worktrees sem card do projeto ativo.
+
+    Returns:
+        Número de worktrees removidos, ou None se não há projeto ativo
+    """
+    from ..git_workspace import GitWorkspaceManager
+    from ..models.card import Card
+    from ..models.project import ActiveProject
+
+    result = await db.execute(
+        select(ActiveProject).order_by(ActiveProject.loaded_at.desc()).limit(1)
+    )
+    project = result.scalar_one_or_none()
+    if not project:
+        return None
+
+    result = await db.execute(select(Card.id))
+    active_card_ids = [row[0] for row in result.fetchall()]
+    return await GitWorkspaceManager(project.path).cleanup_orphan_worktrees(active_card_ids)
+
+
+async def cleanup_orphan_worktrees_job() -> Dict[str, Any]:
+    from ..database import get_session
+
+    async with get_session()() as session:
+        removed = await cleanup_orphan_worktrees(session)
+    return {"removed": removed or 0}
+
+
+async def compact_metrics() -> Dict[str, int]:
+    from .metrics_rollup_service import compact_all_databases
+
+    results = await compact_all_databases()
+    return {"projects": len(results)}
+
+
+async def archive_execution_logs() -> Dict[str, int]:
+    from .execution_log_archive import archive_all_databases
+
+    return await archive_all_databases()
+
+
+async def reindex_log_search() -> Dict[str, int]:
+    """Recria o índice de busca dos logs nos databases com termos órfãos."""
+    from .log_search import LogSearchService
+
+    totals = {"orphaned": 0, "reindexed": 0}
+    for session_factory in _session_factories():
+        async with session_factory() as session:
+            result = await LogSearchService(session).reindex_if_orphaned()
+            for key in totals:
+                totals[key] += result[key]
+    return totals
+
+
+def register_default_jobs(scheduler: JobScheduler) -> JobScheduler:
+    """Registra os jobs de manutenção com os intervalos das settings."""
+    settings = get_settings()
+
+    scheduler.register(
+        "auto_cleanup", auto_cleanup_done_cards, settings.auto_cleanup_interval_seconds,
+        description="Move cards from Done to Completed",
+    )
+    scheduler.register(
+        "execution_cache_cleanup", cleanup_execution_cache, settings.execution_cache_cleanup_interval_seconds,
+        description="Drop expired execution cache entries",
+    )
+    scheduler.register(
+        "orchestrator_logs_cleanup", cleanup_orchestrator_logs, settings.orchestrator_log_cleanup_interval_seconds,
+        description="Delete expired orchestrator short-term memory",
+    )
+    scheduler.register(
+        "image_cleanup", cleanup_images, settings.image_cleanup_cron,
+        description="Delete old temporary images",
+    )
+    scheduler.register(
+        "orphan_worktrees", cleanup_orphan_worktrees_job, settings.worktree_cleanup_cron,
+        description="Remove git worktrees without a card",
+    )
+    scheduler.register(
+        "metrics_compaction", compact_metrics, settings.metrics_compaction_interval_seconds,
+        run_on_start=True, description="Verify and compact metrics rollups",
+    )
+    scheduler.register(
+        "execution_log_archive", archive_execution_logs, settings.execution_log_archive_interval_seconds,
+        run_on_start=True, description="Compress logs of finished executions",
+    )
+    scheduler.register(
+        "log_search_reindex", reindex_log_search, settings.log_search_reindex_cron,
+        description="Rebuild the execution log search index when it has orphaned terms",
+    )
+    return scheduler
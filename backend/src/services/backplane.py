@@ -0,0 +1,333 @@
+"""Pub/sub backplane shared by the WebSocket services of every worker.
+
+Each uvicorn worker only holds its own sockets. Services publish events on a
+named channel and every worker delivers them to the sockets it holds, so a
+spectator connected to worker B sees what worker A emitted.
+
+Backends (``backplane_url`` setting):
+
+- ``""`` / ``memory://``: in-process only (single worker, default)
+- ``sqlite:///path/to/broker.db``: a SQLite file polled by every worker on
+  the same host (no extra service; also used by the tests)
+- ``redis://host:6379/0``: Redis pub/sub (requires the ``redis`` package)
+
+``publish`` never blocks: the message is delivered to local subscribers
+immediately (``local=True``) and queued for the other workers, which receive
+it with ``local=False``. Messages must be JSON-compatible dicts.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from ..config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Dict[str, Any], bool], None]
+
+
+class Backplane:
+    """Channel subscriptions with local delivery; subclasses add transport."""
+
+    def __init__(self):
+        self.node_id = uuid4().hex[:12]
+        self._handlers: Dict[str, List[Handler]] = {}
+        self.published = 0
+        self.received = 0
+
+    def subscribe(self, channel: str, handler: Handler) -> None:
+        """Call ``handler(message, local)`` for every message on the channel."""
+        self._handlers.setdefault(channel, []).append(handler)
+
+    def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        """Deliver to this worker's subscribers now and queue for the others."""
+        self.published += 1
+        self._dispatch(channel, message, local=True)
+        self._send(channel, message)
+
+    def _send(self, channel: str, message: Dict[str, Any]) -> None:
+        """Forward to other workers (no-op for the in-process backplane)."""
+
+    def _dispatch(self, channel: str, message: Dict[str, Any], local: bool) -> None:
+        for handler in self._handlers.get(channel, ()):
+            try:
+                handler(message, local)
+            except Exception as e:
+                logger.error(f"Backplane handler for '{channel}' failed: {e}")
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self).__name__,
+            "nodeId": self.node_id,
+            "published": self.published,
+            "received": self.received,
+        }
+
+
+class InProcessBackplane(Backplane):
+    """Single worker: local delivery only."""
+
+
+class _RemoteBackplane(Backplane, ABC):
+    """Backplane with an outbound queue drained by a background pump."""
+
+    # Mensagens guardadas enquanto o transporte não está disponível
+    max_pending = 10_000
+
+    def __init__(self):
+        super().__init__()
+        self._outbox: Deque[Tuple[str, str]] = deque(maxlen=self.max_pending)
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def _envelope(self, channel: str, message: Dict[str, Any]) -> Tuple[str, str]:
+        return channel, json.dumps({"origin": self.node_id, "data": message})
+
+    def _send(self, channel: str, message: Dict[str, Any]) -> None:
+        self._outbox.append(self._envelope(channel, message))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _receive(self, channel: str, payload: str) -> None:
+        envelope = json.loads(payload)
+        if envelope.get("origin") == self.node_id:
+            return  # já entregue localmente no publish
+        self.received += 1
+        self._dispatch(channel, envelope["data"], local=False)
+
+    async def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        await self._connect()
+        self._tasks = [
+            asyncio.create_task(self._pump()),
+            asyncio.create_task(self._listen()),
+        ]
+        logger.info(f"{type(self).__name__} started (node {self.node_id})")
+
+    async def stop(self) -> None:
+        # Última tentativa de entregar o que ficou na fila
+        if self._outbox:
+            try:
+                await self._flush()
+            except Exception as e:
+                logger.warning(f"Backplane flush on stop failed: {e}")
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        await self._disconnect()
+
+    async def _pump(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            try:
+                await self._flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Backplane publish failed, retrying: {e}")
+                await asyncio.sleep(1)
+                self._wakeup.set()
+
+    def _take_outbox(self) -> List[Tuple[str, str]]:
+        batch = list(self._outbox)
+        self._outbox.clear()
+        return batch
+
+    @abstractmethod
+    async def _connect(self) -> None:
+        """Open the transport before the pump and listener start."""
+
+    @abstractmethod
+    async def _disconnect(self) -> None:
+        """Close the transport after the background tasks stop."""
+
+    @abstractmethod
+    async def _flush(self) -> None:
+        """Send the queued messages to the other workers."""
+
+    @abstractmethod
+    async def _listen(self) -> None:
+        """Receive messages from the other workers until cancelled."""
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "pending": len(self._outbox)}
+
+
+class SQLiteBackplane(_RemoteBackplane):
+    """
+    Broker table in a SQLite file shared by the workers of one host.
+
+    Publishers append rows; every worker polls for rows after its cursor.
+    Rows older than ``retention_seconds`` are pruned.
+    """
+
+    def __init__(self, path: str, poll_interval: float = 0.05, retention_seconds: float = 60.0):
+        super().__init__()
+        self.path = path
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+        self._db = None
+        self._cursor = 0
+
+    async def _connect(self) -> None:
+        import aiosqlite
+
+        self._db = await aiosqlite.connect(self.path)
+        await self._db.execute("PRAGMA journal_mode=WAL")
+        await self._db.execute("PRAGMA busy_timeout=5000")
+        await self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS backplane_messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                channel TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        await self._db.commit()
+        # Só interessam mensagens publicadas a partir de agora
+        async with self._db.execute("SELECT COALESCE(MAX(id), 0) FROM backplane_messages") as cursor:
+            self._cursor = (await cursor.fetchone())[0]
+
+    async def _disconnect(self) -> None:
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+    async def _flush(self) -> None:
+        batch = self._take_outbox()
+        if not batch:
+            return
+        now = time.time()
+        try:
+            await self._db.executemany(
+                "INSERT INTO backplane_messages (channel, payload, created_at) VALUES (?, ?, ?)",
+                [(channel, payload, now) for channel, payload in batch],
+            )
+            await self._db.commit()
+        except Exception:
+            self._outbox.extendleft(reversed(batch))
+            raise
+
+    async def _listen(self) -> None:
+        last_prune = time.monotonic()
+        while True:
+            rows = []
+            try:
+                async with self._db.execute(
+                    "SELECT id, channel, payload FROM backplane_messages WHERE id > ? ORDER BY id LIMIT 1000",
+                    (self._cursor,),
+                ) as cursor:
+                    rows = await cursor.fetchall()
+                for row_id, channel, payload in rows:
+                    self._cursor = row_id
+                    self._receive(channel, payload)
+
+                if time.monotonic() - last_prune > self.retention_seconds:
+                    last_prune = time.monotonic()
+                    await self._db.execute(
+                        "DELETE FROM backplane_messages WHERE created_at < ?",
+                        (time.time() - self.retention_seconds,),
+                    )
+                    await self._db.commit()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Backplane poll failed: {e}")
+
+            if len(rows) < 1000:
+                await asyncio.sleep(self.poll_interval)
+
+
+class RedisBackplane(_RemoteBackplane):
+    """Redis pub/sub; channels are prefixed to share a Redis with other apps."""
+
+    prefix = "orq:"
+
+    def __init__(self, url: str):
+        super().__init__()
+        self.url = url
+        self._redis = None
+        self._pubsub = None
+
+    async def _connect(self) -> None:
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("backplane_url is redis:// but the 'redis' package is not installed") from e
+
+        self._redis = redis.from_url(self.url)
+        self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.psubscribe(f"{self.prefix}*")
+
+    async def _disconnect(self) -> None:
+        if self._pubsub is not None:
+            await self._pubsub.close()
+        if self._redis is not None:
+            await self._redis.close()
+
+    async def _flush(self) -> None:
+        batch = self._take_outbox()
+        if not batch:
+            return
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for channel, payload in batch:
+                    pipe.publish(f"{self.prefix}{channel}", payload)
+                await pipe.execute()
+        except Exception:
+            self._outbox.extendleft(reversed(batch))
+            raise
+
+    async def _listen(self) -> None:
+        async for message in self._pubsub.listen():
+            if message.get("type") != "pmessage":
+                continue
+            channel = message["channel"]
+            if isinstance(channel, bytes):
+                channel = channel.decode()
+            try:
+                self._receive(channel[len(self.prefix):], message["data"])
+            except Exception as e:
+                logger.error(f"Backplane message dropped: {e}")
+
+
+def create_backplane(url: str) -> Backplane:
+    """Build the backplane for a ``backplane_url`` setting value."""
+    if not url or url.startswith("memory://"):
+        return InProcessBackplane()
+    if url.startswith("sqlite:///"):
+        return SQLiteBackplane(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackplane(url)
+    raise ValueError(f"Unsupported backplane_url: {url}")
+
+
+_backplane: Optional[Backplane] = None
+
+
+def get_backplane() -> Backplane:
+    """Get the process-wide backplane."""
+    global _backplane
+    if _backplane is None:
+        _backplane = create_backplane(get_settings().backplane_url)
+    return _backplane
@@ -1,21 +1,102 @@
 """WebSocket manager para notificações de mudanças em cards"""
-from typing import Dict, Set
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
 from fastapi import WebSocket
-import json
 from datetime import datetime
 
+from . import ws_protocol
+from .backplane import Backplane, get_backplane
+from .ws_broadcaster import WebSocketBroadcaster, SlowConsumerPolicy
+
+# Quantos snapshots de card manter para calcular deltas
+MAX_CARD_SNAPSHOTS = 5000
+
+
+def card_diff(old: Dict[str, Any], new: Dict[str, Any]):
+    """Top-level fields that changed (or appeared) and fields that were removed."""
+    changes = {key: value for key, value in new.items() if key not in old or old[key] != value}
+    removed = [key for key in old if key not in new]
+    return changes, removed
+
 
 class CardWebSocketManager:
-    def __init__(self):
-        # Conexões globais para broadcast geral
-        self.global_connections: Set[WebSocket] = set()
+    def __init__(self, backplane: Optional[Backplane] = None):
+        # Conexões globais para broadcast geral. Perder um card_moved deixaria
+        # o board inconsistente: cliente lento é desconectado e recarrega
+        self.broadcaster = WebSocketBroadcaster(
+            "cards", policy=SlowConsumerPolicy.DISCONNECT, max_queue=500
+        )
+        # Versões partem do relógio em ms para continuarem crescentes após restart
+        self._clock = int(time.time() * 1000)
+        self._snapshots: "OrderedDict[str, tuple]" = OrderedDict()
+        # Mensagens de qualquer worker chegam aos clientes de todos os workers
+        self._backplane = backplane or get_backplane()
+        self._backplane.subscribe("cards", self._on_backplane_message)
 
     async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.global_connections.add(websocket)
+        encoding, features = await ws_protocol.accept(websocket)
+        self.broadcaster.add(websocket, encoding=encoding, features=features)
 
     def disconnect(self, websocket: WebSocket):
-        self.global_connections.discard(websocket)
+        self.broadcaster.remove(id(websocket))
+
+    def handle_client_message(self, websocket: WebSocket, message: Any) -> None:
+        """Respond to client requests: ping and card_sync (delta resync)."""
+        if not isinstance(message, dict):
+            return
+        if message.get("type") == "ping":
+            self.broadcaster.send_to(id(websocket), {"type": "pong"})
+        elif message.get("type") == "card_sync":
+            card_id = message.get("cardId")
+            snapshot = self._snapshots.get(card_id)
+            if snapshot is None:
+                return
+            version, card = snapshot
+            self.broadcaster.send_to(id(websocket), {
+                "type": "card_updated",
+                "cardId": card_id,
+                "card": card,
+                "version": version,
+                "timestamp": datetime.now().isoformat()
+            })
+
+    def _next_version(self) -> int:
+        self._clock += 1
+        return self._clock
+
+    def _record(self, card_id: str, card_data: Optional[dict], version: int):
+        """Store the card snapshot at this version; return the previous one (or None)."""
+        # Mantém o relógio local à frente das versões vindas de outros workers
+        self._clock = max(self._clock, version)
+        previous = self._snapshots.pop(card_id, None)
+        if card_data is not None:
+            self._snapshots[card_id] = (version, card_data)
+            if len(self._snapshots) > MAX_CARD_SNAPSHOTS:
+                self._snapshots.popitem(last=False)
+        return previous
+
+    def _delta(self, message: dict, previous, event: str) -> Optional[dict]:
+        """card_delta variant of a full message, if the previous version is known."""
+        if previous is None or message["card"] is None:
+            return None
+        base_version, base_card = previous
+        changes, removed = card_diff(base_card, message["card"])
+        delta = {
+            "type": "card_delta",
+            "event": event,
+            "cardId": message["cardId"],
+            "baseVersion": base_version,
+            "version": message["version"],
+            "changes": changes,
+            "removed": removed,
+            "timestamp": message["timestamp"],
+        }
+        if event == "moved":
+            delta["fromColumn"] = message["fromColumn"]
+            delta["toColumn"] = message["toColumn"]
+        return delta
 
     async def broadcast_card_moved(self, card_id: str,
                                    from_column: str,
@@ -28,6 +109,7 @@ class CardWebSocketManager:
             "fromColumn": from_column,
             "toColumn": to_column,
             "card": card_data,
+            "version": self._next_version(),
             "timestamp": datetime.now().isoformat()
         }
 
@@ -39,6 +121,7 @@ class CardWebSocketManager:
             "type": "card_updated",
             "cardId": card_id,
             "card": card_data,
+            "version": self._next_version(),
             "timestamp": datetime.now().isoformat()
         }
 
@@ -50,23 +133,61 @@ class CardWebSocketManager:
             "type": "card_created",
             "cardId": card_id,
             "card": card_data,
+            "version": self._next_version(),
+            "timestamp": datetime.now().isoformat()
+        }
+
+        await self._broadcast_to_all(message)
+
+    async def broadcast_cards_created(self, cards: List[dict]):
+        """Um único evento para vários cards criados (operações em massa)"""
+        await self._broadcast_batch("cards_created", [
+            {"cardId": card["id"], "card": card} for card in cards
+        ])
+
+    async def broadcast_cards_moved(self, moves: List[dict]):
+        """Um único evento para vários cards movidos: itens com cardId, fromColumn, toColumn, card"""
+        await self._broadcast_batch("cards_moved", moves)
+
+    async def broadcast_cards_updated(self, cards: List[dict]):
+        """Um único evento para vários cards atualizados"""
+        await self._broadcast_batch("cards_updated", [
+            {"cardId": card["id"], "card": card} for card in cards
+        ])
+
+    async def _broadcast_batch(self, event_type: str, items: List[dict]):
+        # Cada card recebe sua própria versão, como nos eventos individuais
+        if not items:
+            return
+        message = {
+            "type": event_type,
+            "cards": [{**item, "version": self._next_version()} for item in items],
             "timestamp": datetime.now().isoformat()
         }
 
         await self._broadcast_to_all(message)
 
     async def _broadcast_to_all(self, message: dict):
-        """Envia mensagem para todos os clientes conectados"""
-        dead = set()
-        for ws in self.global_connections:
-            try:
-                await ws.send_text(json.dumps(message))
-            except:
-                dead.add(ws)
-
-        # Remove conexões mortas
-        for ws in dead:
-            self.global_connections.discard(ws)
+        """Publica no backplane; cada worker entrega aos seus clientes"""
+        self._backplane.publish("cards", message)
+
+    def _on_backplane_message(self, message: dict, local: bool) -> None:
+        """Record the snapshot and queue the message (or its delta) for this worker's clients"""
+        if "cards" in message:
+            # Lote: sempre cards completos, sem variante delta
+            for item in message["cards"]:
+                self._record(item["cardId"], item["card"], item["version"])
+            self.broadcaster.publish(message)
+            return
+
+        previous = self._record(message["cardId"], message["card"], message["version"])
+        delta = None
+        if message["type"] == "card_moved":
+            delta = self._delta(message, previous, "moved")
+        elif message["type"] == "card_updated":
+            delta = self._delta(message, previous, "updated")
+        # Serializada uma vez por variante/encoding para todos os clientes
+        self.broadcaster.publish(message, variants={"delta": delta} if delta else None)
 
 
 card_ws_manager = CardWebSocketManager()
@@ -0,0 +1,78 @@
+"""Token-budgeted history window and rolling summary for chat prompts.
+
+Each turn sends the system prompt, a rolling summary of older turns and the
+most recent turns verbatim, so prompt size stays roughly constant however
+long the conversation gets:
+
+    [system prompt + kanban]  [summary <= summary budget]  [recent <= history budget]
+
+Messages that no longer fit the history budget are folded into the summary.
+The summary is extractive (one clipped line per message, oldest lines
+dropped past its budget): it costs no extra model call per turn.
+"""
+
+from typing import Dict, List, Tuple
+
+# Aproximação comum para texto em inglês/português: ~4 caracteres por token
+CHARS_PER_TOKEN = 4
+# Custo fixo por mensagem (papel, separadores)
+MESSAGE_OVERHEAD_TOKENS = 4
+SUMMARY_LINE_CHARS = 240
+OMITTED_MARKER = "- (earlier turns omitted)"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting (no tokenizer dependency)."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def message_tokens(message: Dict) -> int:
+    return estimate_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+
+def split_window(messages: List[Dict], budget: int) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Split messages into (older, window) where the window is the longest
+    suffix that fits ``budget`` tokens. The last message is always kept,
+    even if it alone exceeds the budget.
+    """
+    used = 0
+    start = len(messages)
+    while start > 0:
+        cost = message_tokens(messages[start - 1])
+        if used + cost > budget and start < len(messages):
+            break
+        used += cost
+        start -= 1
+    return messages[:start], messages[start:]
+
+
+def _summary_line(message: Dict) -> str:
+    role = "User" if message["role"] == "user" else "Assistant"
+    text = " ".join(message["content"].split())
+    if len(text) > SUMMARY_LINE_CHARS:
+        text = text[:SUMMARY_LINE_CHARS - 3] + "..."
+    return f"- {role}: {text}"
+
+
+def fold_into_summary(summary: str, messages: List[Dict], budget: int) -> str:
+    """Append ``messages`` to the rolling summary, trimming its oldest lines to ``budget`` tokens."""
+    lines = [line for line in summary.splitlines() if line and line != OMITTED_MARKER]
+    lines.extend(_summary_line(message) for message in messages)
+
+    trimmed = False
+    total = sum(estimate_tokens(line) for line in lines)
+    while lines and total > budget:
+        total -= estimate_tokens(lines.pop(0))
+        trimmed = True
+
+    if trimmed or summary.startswith(OMITTED_MARKER):
+        lines.insert(0, OMITTED_MARKER)
+    return "\n".join(lines)
+
+
+def build_system_prompt(system_prompt: str, summary: str) -> str:
+    """Attach the rolling summary to the system prompt."""
+    if not summary:
+        return system_prompt
+    return f"{system_prompt}\n\n=== EARLIER IN THIS CONVERSATION (summary) ===\n{summary}"
@@ -1,46 +1,220 @@
 """
 Chat service for managing chat sessions and conversations.
-Stores sessions in memory (runtime only, no persistence).
+Sessions are persisted in the project database; memory holds a bounded
+cache (LRU + idle TTL) with only the turns still inside the prompt window.
 Integrates with Kanban to provide context about tasks and activities.
 Detects goals and routes them to the orchestrator.
 """
-from typing import Dict, List, AsyncGenerator, Optional
-from datetime import datetime, timezone
+from collections import OrderedDict
+from typing import Callable, Dict, List, AsyncGenerator, Optional
+from datetime import datetime, timedelta
+import time
 import uuid
 from ..agent_chat import get_claude_agent, DEFAULT_SYSTEM_PROMPT
-from ..database import async_session_maker
-from ..repositories.card_repository import CardRepository
-from ..repositories.activity_repository import ActivityRepository
+from ..config.settings import get_settings
+from ..database import async_session_maker, get_session
+from ..repositories.chat_repository import ChatRepository
+from .chat_history import build_system_prompt, fold_into_summary, split_window
+from .kanban_context import get_kanban_context
 from .goal_classifier_service import get_goal_classifier_service, MessageIntent
 
+# Intervalo mínimo entre limpezas de sessões antigas no banco
+PURGE_INTERVAL_SECONDS = 3600
+
+
+class CachedSession:
+    """In-memory state of a session: summary plus the turns not yet summarized."""
+
+    __slots__ = (
+        "session_id", "session_factory", "summary", "summarized_count",
+        "message_count", "recent", "last_access",
+    )
+
+    def __init__(self, session_id: str, session_factory: Callable, summary: str = "",
+                 summarized_count: int = 0, message_count: int = 0,
+                 recent: Optional[List[dict]] = None):
+        self.session_id = session_id
+        self.session_factory = session_factory
+        self.summary = summary
+        self.summarized_count = summarized_count
+        self.message_count = message_count
+        self.recent: List[dict] = recent or []
+        self.last_access = time.monotonic()
+
+
+def _message_to_dict(msg) -> dict:
+    """ChatMessage row -> the message dict used by the service."""
+    data = {
+        "seq": msg.seq,
+        "role": msg.role,
+        "content": msg.content,
+        "timestamp": msg.created_at.isoformat(),
+        "model": msg.model,
+    }
+    if msg.message_id:
+        data["messageId"] = msg.message_id
+    if msg.extra:
+        data.update(msg.extra)
+    return data
+
 
 class ChatService:
     """Service for managing chat sessions and interactions"""
 
-    def __init__(self):
-        """Initialize the chat service with in-memory storage"""
-        # Store sessions in memory: session_id -> list of messages
-        self.sessions: Dict[str, List[dict]] = {}
+    def __init__(
+        self,
+        session_factory: Optional[Callable] = None,
+        max_cached_sessions: Optional[int] = None,
+        session_ttl_seconds: Optional[float] = None,
+        history_token_budget: Optional[int] = None,
+        summary_token_budget: Optional[int] = None,
+    ):
+        """Initialize the chat service with a bounded session cache"""
+        settings = get_settings()
+        # None = banco do projeto atual (resolvido a cada uso)
+        self._session_factory = session_factory
+        self.max_cached_sessions = max_cached_sessions or settings.chat_max_cached_sessions
+        self.session_ttl_seconds = session_ttl_seconds or settings.chat_session_ttl_seconds
+        self.history_token_budget = history_token_budget or settings.chat_history_token_budget
+        self.summary_token_budget = summary_token_budget or settings.chat_summary_token_budget
+        self.retention_days = settings.chat_session_retention_days
+
+        # session_id -> CachedSession, least recently used first
+        self.sessions: "OrderedDict[str, CachedSession]" = OrderedDict()
+        self.evicted = 0
+        self._last_purge = 0.0
         self.claude_agent = get_claude_agent()
         self.goal_classifier = get_goal_classifier_service()
         self._orchestrator_enabled = True  # Can be toggled
 
-    def create_session(self) -> dict:
+    def _factory(self) -> Callable:
+        return self._session_factory or get_session()
+
+    # =========================================================================
+    # Session cache
+    # =========================================================================
+
+    def _evict(self) -> None:
+        """Drop idle sessions and the least recently used beyond the limit."""
+        deadline = time.monotonic() - self.session_ttl_seconds
+        while self.sessions:
+            session_id, cached = next(iter(self.sessions.items()))
+            if cached.last_access >= deadline and len(self.sessions) <= self.max_cached_sessions:
+                break
+            del self.sessions[session_id]
+            self.evicted += 1
+
+    def _cache(self, cached: CachedSession) -> CachedSession:
+        self.sessions[cached.session_id] = cached
+        self.sessions.move_to_end(cached.session_id)
+        self._evict()
+        return cached
+
+    async def _load(self, session_id: str, create: bool = False) -> Optional[CachedSession]:
+        """Get a session from the cache or the database (optionally creating it)."""
+        factory = self._factory()
+        cached = self.sessions.get(session_id)
+        # Troca de projeto: a entrada pertence a outro banco
+        if cached is not None and cached.session_factory is factory:
+            cached.last_access = time.monotonic()
+            self.sessions.move_to_end(session_id)
+            return cached
+
+        async with factory() as db:
+            repo = ChatRepository(db)
+            chat = await repo.get_session(session_id)
+            if chat is None:
+                if not create:
+                    return None
+                await repo.create_session(session_id)
+                await db.commit()
+                return self._cache(CachedSession(session_id, factory))
+
+            recent = await repo.get_messages(session_id, from_seq=chat.summarized_count)
+            return self._cache(CachedSession(
+                session_id,
+                factory,
+                summary=chat.summary,
+                summarized_count=chat.summarized_count,
+                message_count=chat.message_count,
+                recent=[_message_to_dict(msg) for msg in recent],
+            ))
+
+    async def _append(self, cached: CachedSession, *messages: dict) -> None:
+        """Persist messages, then fold what left the prompt window into the summary."""
+        for msg in messages:
+            msg["seq"] = cached.message_count
+            cached.message_count += 1
+            cached.recent.append(msg)
+
+        older, window = split_window(cached.recent, self.history_token_budget)
+        summary_changed = bool(older)
+        if older:
+            cached.summary = fold_into_summary(cached.summary, older, self.summary_token_budget)
+            cached.summarized_count += len(older)
+            cached.recent = window
+
+        async with cached.session_factory() as db:
+            repo = ChatRepository(db)
+            await repo.add_messages(cached.session_id, [
+                {
+                    "seq": msg["seq"],
+                    "role": msg["role"],
+                    "content": msg["content"],
+                    "timestamp": msg["timestamp"],
+                    "model": msg.get("model"),
+                    "messageId": msg.get("messageId"),
+                    "extra": {
+                        key: value for key, value in msg.items()
+                        if key in ("isGoal", "goalId", "goalAcknowledgment")
+                    } or None,
+                }
+                for msg in messages
+            ])
+            if summary_changed:
+                await repo.update_summary(cached.session_id, cached.summary, cached.summarized_count)
+            await db.commit()
+
+    def prompt_messages(self, cached: CachedSession) -> List[dict]:
+        """Recent turns sent verbatim (role and content only)."""
+        _, window = split_window(cached.recent, self.history_token_budget)
+        return [{"role": msg["role"], "content": msg["content"]} for msg in window]
+
+    async def purge_expired_sessions(self) -> int:
+        """Delete sessions idle for longer than the retention period."""
+        self._last_purge = time.monotonic()
+        before = datetime.utcnow() - timedelta(days=self.retention_days)
+        async with self._factory()() as db:
+            deleted = await ChatRepository(db).delete_inactive(before)
+            await db.commit()
+        return deleted
+
+    # =========================================================================
+    # Sessions API
+    # =========================================================================
+
+    async def create_session(self) -> dict:
         """
         Create a new chat session.
 
         Returns:
             dict: Session information with id and createdAt timestamp
         """
+        if time.monotonic() - self._last_purge > PURGE_INTERVAL_SECONDS:
+            try:
+                await self.purge_expired_sessions()
+            except Exception as e:
+                print(f"[ChatService] Error purging old sessions: {e}")
+
         session_id = str(uuid.uuid4())
-        self.sessions[session_id] = []
+        await self._load(session_id, create=True)
 
         return {
             "sessionId": session_id,
             "createdAt": datetime.now(),
         }
 
-    def get_session(self, session_id: str) -> dict | None:
+    async def get_session(self, session_id: str) -> dict | None:
         """
         Get a chat session by ID.
 
@@ -48,17 +222,20 @@ class ChatService:
             session_id: The session ID to retrieve
 
         Returns:
-            dict | None: Session data with messages, or None if not found
+            dict | None: Session data with the full message history, or None if not found
         """
-        if session_id not in self.sessions:
-            return None
+        async with self._factory()() as db:
+            repo = ChatRepository(db)
+            if await repo.get_session(session_id) is None:
+                return None
+            messages = await repo.get_messages(session_id)
 
         return {
             "sessionId": session_id,
-            "messages": self.sessions[session_id],
+            "messages": [_message_to_dict(msg) for msg in messages],
         }
 
-    def delete_session(self, session_id: str) -> bool:
+    async def delete_session(self, session_id: str) -> bool:
         """
         Delete a chat session.
 
@@ -68,116 +245,16 @@ class ChatService:
         Returns:
             bool: True if deleted, False if not found
         """
-        if session_id in self.sessions:
-            del self.sessions[session_id]
-            return True
-        return False
-
-    def _format_relative_time(self, dt: datetime) -> str:
-        """Format datetime as relative time (e.g., 'ha 2 dias')"""
-        now = datetime.now(timezone.utc)
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=timezone.utc)
-
-        diff = now - dt
-
-        if diff.days > 0:
-            return f"ha {diff.days} dia{'s' if diff.days > 1 else ''}"
-
-        hours = diff.seconds // 3600
-        if hours > 0:
-            return f"ha {hours}h"
-
-        minutes = diff.seconds // 60
-        if minutes > 0:
-            return f"ha {minutes}min"
-
-        return "agora"
-
-    def _truncate(self, text: str, max_length: int = 80) -> str:
-        """Truncate text adding ... if needed"""
-        if not text:
-            return ""
-        text = text.replace('\n', ' ').strip()
-        if len(text) <= max_length:
-            return text
-        return text[:max_length - 3] + "..."
+        self.sessions.pop(session_id, None)
+        async with self._factory()() as db:
+            deleted = await ChatRepository(db).delete_session(session_id)
+            await db.commit()
+        return deleted
 
     async def _get_kanban_context(self) -> str:
-        """Fetch current kanban state and format as context"""
+        """Current board summary (cached snapshot, see services/kanban_context.py)"""
         try:
-            async with async_session_maker() as session:
-                card_repo = CardRepository(session)
-                activity_repo = ActivityRepository(session)
-
-                # Fetch all cards
-                cards = await card_repo.get_all()
-
-                # Fetch recent activities
-                activities = await activity_repo.get_recent_activities(limit=5)
-
-                # Group cards by column
-                columns: Dict[str, List] = {
-                    "backlog": [], "plan": [], "implement": [],
-                    "test": [], "review": [], "done": [],
-                    "completed": [], "archived": [], "cancelado": []
-                }
-
-                for card in cards:
-                    if card.column_id in columns:
-                        columns[card.column_id].append(card)
-
-                # Build context
-                lines = ["=== KANBAN STATUS ==="]
-
-                # Active columns (excluding completed, archived, cancelado)
-                column_config = [
-                    ("backlog", "Backlog", "📋"),
-                    ("plan", "Plan", "📝"),
-                    ("implement", "Implement", "🔨"),
-                    ("test", "Test", "🧪"),
-                    ("review", "Review", "👀"),
-                    ("done", "Done", "✅"),
-                ]
-
-                for col_id, col_name, emoji in column_config:
-                    col_cards = columns[col_id]
-                    if col_cards:
-                        lines.append(f"\n{emoji} {col_name} ({len(col_cards)}):")
-                        for card in col_cards[:5]:  # Limit to 5 cards per column
-                            time_str = self._format_relative_time(card.created_at)
-                            lines.append(f"  - \"{card.title}\" ({time_str})")
-                            if card.description:
-                                desc = self._truncate(card.description, 60)
-                                lines.append(f"    -> {desc}")
-
-                # Summary
-                active_cols = ["backlog", "plan", "implement", "test", "review", "done"]
-                summary = " | ".join([f"{len(columns[c])} {c}" for c in active_cols])
-                lines.append(f"\n📊 Resumo: {summary}")
-
-                # Recent activities
-                if activities:
-                    lines.append("\n🕐 Ultimas atividades:")
-                    for act in activities[:5]:
-                        time_str = self._format_relative_time(
-                            datetime.fromisoformat(act["timestamp"])
-                        )
-                        card_title = self._truncate(act["cardTitle"], 30)
-
-                        if act["type"] == "moved":
-                            lines.append(f"  - \"{card_title}\" movido para {act['toColumn']} ({time_str})")
-                        elif act["type"] == "completed":
-                            lines.append(f"  - \"{card_title}\" concluido ({time_str})")
-                        elif act["type"] == "created":
-                            lines.append(f"  - \"{card_title}\" criado ({time_str})")
-                        else:
-                            lines.append(f"  - \"{card_title}\" {act['type']} ({time_str})")
-
-                lines.append("===================")
-
-                return "\n".join(lines)
-
+            return await get_kanban_context().get_context()
         except Exception as e:
             print(f"[ChatService] Error getting kanban context: {e}")
             return ""
@@ -232,8 +309,7 @@ class ChatService:
             dict: Stream chunks with type, content, and messageId
         """
         # Create session if it doesn't exist
-        if session_id not in self.sessions:
-            self.sessions[session_id] = []
+        cached = await self._load(session_id, create=True)
 
         # Check if message is a goal
         if self._orchestrator_enabled:
@@ -255,15 +331,14 @@ class ChatService:
                         "messageId": str(uuid.uuid4()),
                     }
 
-                    # Add to history
-                    self.sessions[session_id].append({
+                    user_message = {
                         "role": "user",
                         "content": message,
                         "timestamp": datetime.now().isoformat(),
                         "model": model,
                         "isGoal": True,
                         "goalId": goal_result["id"],
-                    })
+                    }
 
                     # Send acknowledgment as assistant message
                     ack_message = (
@@ -280,7 +355,7 @@ class ChatService:
                         "messageId": assistant_message_id,
                     }
 
-                    self.sessions[session_id].append({
+                    await self._append(cached, user_message, {
                         "role": "assistant",
                         "content": ack_message,
                         "timestamp": datetime.now().isoformat(),
@@ -302,21 +377,18 @@ class ChatService:
             "timestamp": datetime.now().isoformat(),
             "model": model,
         }
-        self.sessions[session_id].append(user_message)
+        await self._append(cached, user_message)
 
         # Generate assistant response ID
         assistant_message_id = str(uuid.uuid4())
         assistant_content = ""
 
         try:
-            # Prepare messages for Claude (only role and content)
-            claude_messages = [
-                {"role": msg["role"], "content": msg["content"]}
-                for msg in self.sessions[session_id]
-            ]
+            # Prompt: recent turns within the token budget (ending with this message)
+            claude_messages = self.prompt_messages(cached)
 
-            # Get system prompt with kanban context
-            system_prompt = await self.get_system_prompt()
+            # System prompt with kanban context and the summary of older turns
+            system_prompt = build_system_prompt(await self.get_system_prompt(), cached.summary)
 
             # Stream response from Claude with selected model
             async for chunk in self.claude_agent.stream_response(
@@ -341,7 +413,7 @@ class ChatService:
                 "model": model,
                 "messageId": assistant_message_id,
             }
-            self.sessions[session_id].append(assistant_message)
+            await self._append(cached, assistant_message)
 
             # Yield end signal
             yield {
@@ -360,23 +432,35 @@ class ChatService:
                 "messageId": assistant_message_id,
             }
 
-    def list_sessions(self) -> List[str]:
+    async def list_sessions(self, limit: int = 100) -> List[str]:
         """
-        List all active session IDs.
+        List session IDs, most recently active first.
 
         Returns:
             List[str]: List of session IDs
         """
-        return list(self.sessions.keys())
+        async with self._factory()() as db:
+            return await ChatRepository(db).list_session_ids(limit)
 
-    def get_session_count(self) -> int:
+    async def get_session_count(self) -> int:
         """
-        Get the total number of active sessions.
+        Get the total number of stored sessions.
 
         Returns:
             int: Number of sessions
         """
-        return len(self.sessions)
+        async with self._factory()() as db:
+            return await ChatRepository(db).count_sessions()
+
+    def cache_stats(self) -> Dict[str, int]:
+        """In-memory cache size and evictions (for diagnostics)."""
+        self._evict()
+        return {
+            "cached": len(self.sessions),
+            "maxCached": self.max_cached_sessions,
+            "evicted": self.evicted,
+            "cachedMessages": sum(len(c.recent) for c in self.sessions.values()),
+        }
 
 
 # Singleton instance
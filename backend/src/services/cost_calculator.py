@@ -26,7 +26,11 @@ class CostCalculator:
         input_tokens = execution.input_tokens or 0
         output_tokens = execution.output_tokens or 0
 
-        return calculate_cost(execution.model_used, input_tokens, output_tokens)
+        return calculate_cost(
+            execution.model_used, input_tokens, output_tokens,
+            cache_read_tokens=execution.cache_read_tokens or 0,
+            cache_write_tokens=execution.cache_write_tokens or 0,
+        )
 
     @staticmethod
     def calculate_total_cost(executions: List[Execution]) -> Decimal:
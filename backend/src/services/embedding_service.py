@@ -4,6 +4,8 @@ import logging
 from typing import List
 from functools import lru_cache
 
+from .telemetry import get_metrics_registry
+
 logger = logging.getLogger(__name__)
 
 # Lazy loading to avoid importing heavy model at startup
@@ -47,7 +49,8 @@ class EmbeddingService:
         Returns:
             List of floats representing the embedding vector
         """
-        embedding = self.model.encode(text, convert_to_numpy=True)
+        with get_metrics_registry().metrics["embedding_inference_seconds"].time(kind="single"):
+            embedding = self.model.encode(text, convert_to_numpy=True)
         return embedding.tolist()
 
     def embed_texts(self, texts: List[str]) -> List[List[float]]:
@@ -60,7 +63,8 @@ class EmbeddingService:
         Returns:
             List of embedding vectors
         """
-        embeddings = self.model.encode(texts, convert_to_numpy=True)
+        with get_metrics_registry().metrics["embedding_inference_seconds"].time(kind="batch"):
+            embeddings = self.model.encode(texts, convert_to_numpy=True)
         return embeddings.tolist()
 
     def get_vector_size(self) -> int:
@@ -0,0 +1,351 @@
+"""Admission control for agent executions.
+
+Every workflow stage run (HTTP endpoints and the orchestrator alike) asks the
+governor for a slot before it starts. A run needs room in three scopes: the
+whole process, its model and its project. Each scope caps the runs active at
+once and meters run starts with a token bucket, so a burst of clicks cannot
+oversubscribe the host CPU, git or the provider's rate limits.
+
+Runs that cannot start wait in a FIFO queue. A run blocked only by its own
+model/project scope does not hold back runs of other models/projects. While
+queued, the card's execution WebSocket receives ``execution_queued`` with the
+current position, then ``execution_admitted`` when the run starts.
+
+``cancel(card_id)`` drops queued runs of the card and cancels its running
+ones; the caller of ``slot()`` gets ``ExecutionCancelled``.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from ..config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+Notify = Callable[[str, Dict[str, Any]], None]
+
+
+class ExecutionCancelled(Exception):
+    """The run was cancelled while queued or running."""
+
+
+class TokenBucket:
+    """Start-rate limit: ``burst`` starts back to back, refilled at ``rate_per_minute``."""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate_per_minute: float, burst: int, now: float):
+        self.rate = rate_per_minute / 60
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = now
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= 1
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until the next token."""
+        self._refill(now)
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+
+class ScopeLimit:
+    """Concurrency cap plus start bucket for one scope (0 = unlimited)."""
+
+    __slots__ = ("name", "max_active", "active", "bucket")
+
+    def __init__(self, name: str, max_active: int, rate_per_minute: float, burst: int, now: float):
+        self.name = name
+        self.max_active = max_active
+        self.active = 0
+        self.bucket = TokenBucket(rate_per_minute, burst, now) if rate_per_minute > 0 else None
+
+    @property
+    def full(self) -> bool:
+        return self.max_active > 0 and self.active >= self.max_active
+
+    def blocked_by(self, now: float) -> Optional[str]:
+        """Why a start is not possible now ("concurrency"/"rate"), or None."""
+        if self.full:
+            return "concurrency"
+        if self.bucket is not None and not self.bucket.available(now):
+            return "rate"
+        return None
+
+
+class Ticket:
+    """A run waiting for, or holding, a slot."""
+
+    __slots__ = ("card_id", "command", "model", "project_id", "scopes", "enqueued_at",
+                 "admitted", "cancelled", "task", "event", "position", "reason")
+
+    def __init__(self, card_id: str, command: str, model: str, project_id: str,
+                 scopes: List[ScopeLimit], now: float):
+        self.card_id = card_id
+        self.command = command
+        self.model = model
+        self.project_id = project_id
+        self.scopes = scopes
+        self.enqueued_at = now
+        self.admitted = False
+        self.cancelled = False
+        self.task: Optional[asyncio.Task] = None
+        self.event = asyncio.Event()
+        self.position = 0
+        self.reason = ""
+
+    def to_dict(self, now: float) -> Dict[str, Any]:
+        data = {
+            "cardId": self.card_id,
+            "command": self.command,
+            "model": self.model,
+            "projectId": self.project_id,
+            "waitedMs": round((now - self.enqueued_at) * 1000),
+        }
+        if not self.admitted:
+            data.update(position=self.position, reason=self.reason)
+        return data
+
+
+def _current_project() -> str:
+    from ..database_manager import db_manager
+
+    return db_manager.current_project_id or "default"
+
+
+class ExecutionGovernor:
+    """Global, per-model and per-project limits with a FIFO admission queue."""
+
+    def __init__(
+        self,
+        max_concurrent: Optional[int] = None,
+        max_per_model: Optional[int] = None,
+        max_per_project: Optional[int] = None,
+        starts_per_minute: Optional[float] = None,
+        model_starts_per_minute: Optional[float] = None,
+        project_starts_per_minute: Optional[float] = None,
+        start_burst: Optional[int] = None,
+        notify: Optional[Notify] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        settings = get_settings()
+
+        def pick(value, default):
+            return default if value is None else value
+
+        self.max_concurrent = pick(max_concurrent, settings.execution_max_concurrent)
+        self.max_per_model = pick(max_per_model, settings.execution_max_per_model)
+        self.max_per_project = pick(max_per_project, settings.execution_max_per_project)
+        self.starts_per_minute = pick(starts_per_minute, settings.execution_starts_per_minute)
+        self.model_starts_per_minute = pick(model_starts_per_minute, settings.execution_model_starts_per_minute)
+        self.project_starts_per_minute = pick(project_starts_per_minute, settings.execution_project_starts_per_minute)
+        self.start_burst = pick(start_burst, settings.execution_start_burst)
+        self._notify = notify or _notify_execution_ws
+        self._clock = clock
+
+        self._scopes: Dict[str, ScopeLimit] = {}
+        self._global = self._scope("global")
+        self._queue: List[Ticket] = []
+        self._running: List[Ticket] = []
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+        self.admitted = 0
+        self.cancelled = 0
+
+    # =========================================================================
+    # Scopes
+    # =========================================================================
+
+    def _scope(self, key: str) -> ScopeLimit:
+        scope = self._scopes.get(key)
+        if scope is None:
+            kind = key.split(":", 1)[0]
+            if kind == "model":
+                limits = (self.max_per_model, self.model_starts_per_minute)
+            elif kind == "project":
+                limits = (self.max_per_project, self.project_starts_per_minute)
+            else:
+                limits = (self.max_concurrent, self.starts_per_minute)
+            scope = ScopeLimit(key, limits[0], limits[1], self.start_burst, self._clock())
+            self._scopes[key] = scope
+        return scope
+
+    # =========================================================================
+    # Admission
+    # =========================================================================
+
+    def _pump(self) -> None:
+        """Admit every queued run that fits, in FIFO order."""
+        self._wakeup = None
+        now = self._clock()
+        retry_in: Optional[float] = None
+
+        for ticket in list(self._queue):
+            if self._global.full:
+                ticket.reason = "global"
+                continue
+            blocked = [(scope, scope.blocked_by(now)) for scope in ticket.scopes]
+            blocked = [(scope, why) for scope, why in blocked if why]
+            if not blocked:
+                self._admit(ticket, now)
+                continue
+
+            scope, why = blocked[0]
+            ticket.reason = scope.name.split(":", 1)[0] if why == "concurrency" else "rate"
+            # Só limites de taxa liberam sozinhos; concorrência libera no release
+            if all(why == "rate" for _, why in blocked):
+                wait = max(scope.bucket.wait_time(now) for scope, _ in blocked)
+                retry_in = wait if retry_in is None else min(retry_in, wait)
+
+        self._publish_positions(now)
+        if retry_in is not None:
+            self._wakeup = asyncio.get_running_loop().call_later(retry_in + 0.001, self._pump)
+
+    def _admit(self, ticket: Ticket, now: float) -> None:
+        for scope in ticket.scopes:
+            scope.active += 1
+            if scope.bucket is not None:
+                scope.bucket.take(now)
+        self._queue.remove(ticket)
+        self._running.append(ticket)
+        ticket.admitted = True
+        ticket.event.set()
+        self.admitted += 1
+        self._notify(ticket.card_id, {"type": "execution_admitted", **ticket.to_dict(now)})
+
+    def _release(self, ticket: Ticket) -> None:
+        if ticket in self._running:
+            self._running.remove(ticket)
+            for scope in ticket.scopes:
+                scope.active -= 1
+        self._schedule_pump()
+
+    def _schedule_pump(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+        self._pump()
+
+    def _publish_positions(self, now: float) -> None:
+        for position, ticket in enumerate(self._queue, start=1):
+            if ticket.position != position:
+                ticket.position = position
+                self._notify(ticket.card_id, {
+                    "type": "execution_queued",
+                    "queued": len(self._queue),
+                    **ticket.to_dict(now),
+                })
+
+    @asynccontextmanager
+    async def slot(self, card_id: str, command: str, model: str,
+                   project_id: Optional[str] = None) -> AsyncIterator[Ticket]:
+        """Wait for a slot, hold it while the block runs, release it after."""
+        project_id = project_id or _current_project()
+        scopes = [self._global, self._scope(f"model:{model}"), self._scope(f"project:{project_id}")]
+        ticket = Ticket(card_id, command, model, project_id, scopes, self._clock())
+        self._queue.append(ticket)
+        self._schedule_pump()
+
+        try:
+            await ticket.event.wait()
+        except asyncio.CancelledError:
+            # Cliente desconectou/tarefa cancelada enquanto esperava
+            if ticket.admitted:
+                self._release(ticket)
+            elif ticket in self._queue:
+                self._queue.remove(ticket)
+                self._schedule_pump()
+            raise
+        if ticket.cancelled:
+            # cancel() entre a admissão e o despertar: a vaga já foi ocupada
+            if ticket.admitted:
+                self._release(ticket)
+            raise ExecutionCancelled(f"{command} for card {card_id} cancelled while queued")
+
+        ticket.task = asyncio.current_task()
+        try:
+            yield ticket
+        except asyncio.CancelledError:
+            if not ticket.cancelled:
+                raise
+            # Cancelamento pedido via cancel(): vira erro normal da etapa
+            uncancel = getattr(ticket.task, "uncancel", None)
+            if uncancel is not None:
+                uncancel()
+            raise ExecutionCancelled(f"{command} for card {card_id} cancelled") from None
+        finally:
+            self._release(ticket)
+
+    # =========================================================================
+    # Cancellation and status
+    # =========================================================================
+
+    def cancel(self, card_id: str) -> Dict[str, int]:
+        """Drop the card's queued runs and cancel its running ones."""
+        queued = [ticket for ticket in self._queue if ticket.card_id == card_id]
+        for ticket in queued:
+            ticket.cancelled = True
+            self._queue.remove(ticket)
+            ticket.event.set()
+
+        running = [ticket for ticket in self._running if ticket.card_id == card_id and not ticket.cancelled]
+        for ticket in running:
+            ticket.cancelled = True
+            if ticket.task is not None:
+                ticket.task.cancel()
+
+        self.cancelled += len(queued) + len(running)
+        if queued:
+            self._schedule_pump()
+        return {"queued": len(queued), "running": len(running)}
+
+    def position(self, card_id: str) -> Optional[int]:
+        for position, ticket in enumerate(self._queue, start=1):
+            if ticket.card_id == card_id:
+                return position
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        now = self._clock()
+        return {
+            "limits": {
+                "maxConcurrent": self.max_concurrent,
+                "maxPerModel": self.max_per_model,
+                "maxPerProject": self.max_per_project,
+                "startsPerMinute": self.starts_per_minute,
+                "modelStartsPerMinute": self.model_starts_per_minute,
+                "projectStartsPerMinute": self.project_starts_per_minute,
+                "startBurst": self.start_burst,
+            },
+            "running": [ticket.to_dict(now) for ticket in self._running],
+            "queued": [ticket.to_dict(now) for ticket in self._queue],
+            "admitted": self.admitted,
+            "cancelled": self.cancelled,
+        }
+
+
+def _notify_execution_ws(card_id: str, message: Dict[str, Any]) -> None:
+    from .execution_ws import execution_ws_manager
+
+    execution_ws_manager.publish(card_id, message)
+
+
+_governor: Optional[ExecutionGovernor] = None
+
+
+def get_execution_governor() -> ExecutionGovernor:
+    """Get the process-wide execution governor."""
+    global _governor
+    if _governor is None:
+        _governor = ExecutionGovernor()
+    return _governor
@@ -0,0 +1,189 @@
+"""Armazenamento frio (comprimido) dos logs de execuções finalizadas.
+
+`execution_logs` guarda uma linha por log, com UUID como chave; saídas
+grandes de ferramentas e linhas repetidas ("Using tool: X") dominam o
+tamanho do `.claude/database.db` de cada projeto. Depois que uma execução
+termina e passa de `execution_log_archive_after_hours`, o job
+`execution_log_archive` (JobScheduler) empacota seus logs em
+`execution_log_archives`: blocos de `ARCHIVE_BLOCK_LINES` linhas (JSON)
+comprimidos com zlib ou zstd, com um índice de sequence por bloco, e apaga
+as linhas quentes.
+
+A leitura é transparente: o ExecutionRepository junta o arquivo e eventuais
+linhas quentes. As páginas liberadas são reaproveitadas pelo SQLite; o
+arquivo só encolhe com VACUUM.
+"""
+
+import json
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, exists, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config.settings import get_settings
+from ..models.execution import Execution, ExecutionLog, ExecutionLogArchive, ExecutionStatus
+
+# Linhas por bloco comprimido (ler o fim do log descomprime só o último bloco)
+ARCHIVE_BLOCK_LINES = 256
+# Execuções arquivadas por transação
+ARCHIVE_BATCH_SIZE = 50
+
+LogRow = Tuple[int, str, str, str]  # sequence, timestamp ISO, type, content
+
+
+def _codec(name: str) -> Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]:
+    """(compress, decompress) do codec; zstd requer o pacote zstandard."""
+    if name == "zstd":
+        import zstandard
+
+        return zstandard.ZstdCompressor(level=10).compress, zstandard.ZstdDecompressor().decompress
+    if name == "zlib":
+        return (lambda data: zlib.compress(data, 9)), zlib.decompress
+    raise ValueError(f"Unknown log archive codec: {name}")
+
+
+def pack_logs(rows: Sequence[LogRow], codec: str = "zlib") -> Tuple[bytes, List[List[int]], int]:
+    """Comprime as linhas em blocos. Retorna (blob, índice, bytes sem compressão)."""
+    compress, _ = _codec(codec)
+    parts: List[bytes] = []
+    index: List[List[int]] = []
+    offset = raw_bytes = 0
+
+    for start in range(0, len(rows), ARCHIVE_BLOCK_LINES):
+        block = rows[start:start + ARCHIVE_BLOCK_LINES]
+        raw = json.dumps([list(row) for row in block], ensure_ascii=False, separators=(",", ":")).encode()
+        packed = compress(raw)
+        index.append([block[0][0], offset, len(packed)])
+        parts.append(packed)
+        offset += len(packed)
+        raw_bytes += len(raw)
+
+    return b"".join(parts), index, raw_bytes
+
+
+def unpack_logs(data: bytes, index: Sequence[Sequence[int]], codec: str = "zlib",
+                after_seq: int = 0) -> List[LogRow]:
+    """Linhas com sequence > after_seq, descomprimindo só os blocos necessários."""
+    _, decompress = _codec(codec)
+    rows: List[LogRow] = []
+    for i, (first_seq, offset, length) in enumerate(index):
+        next_first = index[i + 1][0] if i + 1 < len(index) else None
+        if next_first is not None and next_first <= after_seq + 1:
+            continue  # bloco inteiro antes do cursor
+        block = json.loads(decompress(data[offset:offset + length]))
+        rows.extend(tuple(row) for row in block if row[0] > after_seq)
+    return rows
+
+
+def rows_to_logs(rows: Sequence[LogRow]) -> List[Dict[str, Any]]:
+    """Mesmo formato de log usado pelo ExecutionRepository."""
+    return [{"timestamp": ts, "type": log_type, "content": content} for _, ts, log_type, content in rows]
+
+
+class ExecutionLogArchiveService:
+    """Arquiva e lê os logs comprimidos das execuções de um database."""
+
+    def __init__(self, db: AsyncSession, codec: Optional[str] = None):
+        self.db = db
+        self.codec = codec or get_settings().execution_log_archive_codec
+
+    async def _hot_rows(self, execution_id: str) -> List[ExecutionLog]:
+        result = await self.db.execute(
+            select(ExecutionLog)
+            .where(ExecutionLog.execution_id == execution_id)
+            .order_by(ExecutionLog.sequence)
+        )
+        return list(result.scalars().all())
+
+    async def archive_execution(self, execution_id: str) -> Optional[Dict[str, int]]:
+        """Empacota as linhas quentes da execução (sem commit). None se não há linhas."""
+        hot = await self._hot_rows(execution_id)
+        if not hot:
+            return None
+
+        archive = await self.db.get(ExecutionLogArchive, execution_id)
+        rows: List[LogRow] = []
+        if archive is not None:
+            # Linhas que chegaram depois do arquivamento: reempacota tudo,
+            # renumerando-as após o arquivo (add_log só vê as linhas quentes)
+            rows = unpack_logs(archive.data, archive.seq_index, archive.codec)
+        last_seq = rows[-1][0] if rows else 0
+        for log in hot:
+            seq = log.sequence or 0
+            if seq <= last_seq:
+                seq = last_seq + 1
+            last_seq = seq
+            rows.append((seq, log.timestamp.isoformat() if log.timestamp else "", log.type or "", log.content or ""))
+
+        data, index, raw_bytes = pack_logs(rows, self.codec)
+        if archive is None:
+            archive = ExecutionLogArchive(execution_id=execution_id)
+            self.db.add(archive)
+        archive.codec = self.codec
+        archive.line_count = len(rows)
+        archive.raw_bytes = raw_bytes
+        archive.seq_index = index
+        archive.data = data
+        archive.archived_at = datetime.utcnow()
+
+        await self.db.execute(delete(ExecutionLog).where(ExecutionLog.execution_id == execution_id))
+        return {"lines": len(hot), "rawBytes": raw_bytes, "storedBytes": len(data)}
+
+    async def archive_finished(self, now: Optional[datetime] = None,
+                               older_than_hours: Optional[int] = None) -> Dict[str, int]:
+        """Arquiva as execuções finalizadas há mais tempo que o limite."""
+        hours = older_than_hours if older_than_hours is not None else get_settings().execution_log_archive_after_hours
+        cutoff = (now or datetime.utcnow()) - timedelta(hours=hours)
+        totals = {"executions": 0, "lines": 0, "rawBytes": 0, "storedBytes": 0}
+
+        while True:
+            result = await self.db.execute(
+                select(Execution.id)
+                .where(
+                    Execution.status.in_([ExecutionStatus.SUCCESS, ExecutionStatus.ERROR]),
+                    func.coalesce(Execution.completed_at, Execution.started_at) < cutoff,
+                    exists().where(ExecutionLog.execution_id == Execution.id),
+                )
+                .limit(ARCHIVE_BATCH_SIZE)
+            )
+            execution_ids = [row[0] for row in result.all()]
+            if not execution_ids:
+                break
+
+            for execution_id in execution_ids:
+                stats = await self.archive_execution(execution_id)
+                if stats:
+                    totals["executions"] += 1
+                    totals["lines"] += stats["lines"]
+                    totals["rawBytes"] += stats["rawBytes"]
+                    totals["storedBytes"] += stats["storedBytes"]
+            await self.db.commit()
+
+        return totals
+
+    async def read_rows(self, execution_id: str, after_seq: int = 0) -> List[LogRow]:
+        """Linhas arquivadas da execução (lista vazia se não foi arquivada)."""
+        archive = await self.db.get(ExecutionLogArchive, execution_id)
+        if archive is None:
+            return []
+        return unpack_logs(archive.data, archive.seq_index, archive.codec, after_seq)
+
+
+async def archive_all_databases() -> Dict[str, int]:
+    """Arquiva os logs antigos de todos os databases carregados."""
+    from ..database import async_session_maker
+    from ..database_manager import db_manager
+
+    session_factories = [async_session_maker] + list(db_manager.sessions.values())
+    totals = {"executions": 0, "lines": 0, "rawBytes": 0, "storedBytes": 0}
+
+    for session_factory in session_factories:
+        async with session_factory() as session:
+            result = await ExecutionLogArchiveService(session).archive_finished()
+            for key in totals:
+                totals[key] += result[key]
+
+    return totals
+
@@ -0,0 +1,204 @@
+"""Per-card live log stream for the execution WebSocket.
+
+Agent log lines are numbered with a per-execution sequence, buffered for a
+short interval and published as a single ``log_batch`` frame. Flushed lines
+are kept in a bounded replay ring, so a subscriber that (re)connects asks for
+everything after its last seen sequence instead of refetching the full log
+over HTTP.
+
+Frames:
+    {"type": "log_batch", "cardId", "epoch", "fromSeq", "toSeq", "logs": [...]}
+    {"type": "log_backfill", "cardId", "epoch", "lastSeq", "truncated", "logs": [...]}
+
+``epoch`` identifies the execution (its start timestamp); sequences restart
+at 1 for each new execution of the card. ``truncated`` means the ring no
+longer holds everything after the requested cursor.
+"""
+
+import asyncio
+from collections import deque
+from datetime import datetime
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from ..config.settings import get_settings
+
+
+class _CardLogStream:
+    """Sequence counter, pending batch and replay ring of one card."""
+
+    __slots__ = ("epoch", "seq", "ring", "pending", "flush_handle", "expire_handle")
+
+    def __init__(self, epoch: Optional[str], ring_size: int):
+        self.epoch = epoch
+        self.seq = 0
+        self.ring: Deque[Dict[str, Any]] = deque(maxlen=ring_size)
+        self.pending: List[Dict[str, Any]] = []
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+        self.expire_handle: Optional[asyncio.TimerHandle] = None
+
+
+class ExecutionLogStream:
+    """Batches agent logs per card and serves backfills from a replay ring."""
+
+    def __init__(
+        self,
+        publish: Callable[[str, Dict[str, Any]], Any],
+        batch_interval_ms: Optional[int] = None,
+        ring_size: Optional[int] = None,
+        max_batch: int = 200,
+        retention_seconds: float = 300.0,
+    ):
+        settings = get_settings()
+        self._publish = publish
+        self.batch_interval = (
+            batch_interval_ms if batch_interval_ms is not None else settings.execution_log_batch_ms
+        ) / 1000
+        self.ring_size = ring_size or settings.execution_log_ring_size
+        self.max_batch = max_batch
+        self.retention_seconds = retention_seconds
+        self._streams: Dict[str, _CardLogStream] = {}
+
+    def append(
+        self,
+        card_id: str,
+        epoch: Optional[str],
+        log_type: str,
+        content: str,
+        timestamp: Optional[str] = None,
+    ) -> int:
+        """Number a log line and schedule its batch. Returns its sequence."""
+        stream = self._streams.get(card_id)
+        if stream is None or (epoch is not None and epoch != stream.epoch):
+            # Nova execução do card: descarta o replay da anterior
+            if stream is not None:
+                self._cancel_timers(stream)
+            stream = _CardLogStream(epoch, self.ring_size)
+            self._streams[card_id] = stream
+        elif stream.expire_handle:
+            stream.expire_handle.cancel()
+            stream.expire_handle = None
+
+        stream.seq += 1
+        stream.pending.append({
+            "seq": stream.seq,
+            "timestamp": timestamp or datetime.now().isoformat(),
+            "logType": log_type,
+            "content": content,
+        })
+
+        if len(stream.pending) >= self.max_batch:
+            self.flush(card_id)
+        elif stream.flush_handle is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                # Fora do event loop (ex.: scripts/testes síncronos): publica direto
+                self.flush(card_id)
+            else:
+                stream.flush_handle = loop.call_later(self.batch_interval, self.flush, card_id)
+
+        return stream.seq
+
+    def flush(self, card_id: str) -> int:
+        """Publish the pending lines of a card as one frame. Returns how many."""
+        stream = self._streams.get(card_id)
+        if stream is None:
+            return 0
+        if stream.flush_handle:
+            stream.flush_handle.cancel()
+            stream.flush_handle = None
+        if not stream.pending:
+            return 0
+
+        batch, stream.pending = stream.pending, []
+        stream.ring.extend(batch)
+        self._publish(card_id, {
+            "type": "log_batch",
+            "cardId": card_id,
+            "epoch": stream.epoch,
+            "fromSeq": batch[0]["seq"],
+            "toSeq": batch[-1]["seq"],
+            "logs": batch,
+        })
+        return len(batch)
+
+    def ingest(self, frame: Dict[str, Any]) -> None:
+        """Add a log_batch published by another worker to the replay ring."""
+        card_id = frame["cardId"]
+        stream = self._streams.get(card_id)
+        if stream is None or frame["epoch"] != stream.epoch:
+            if stream is not None:
+                self._cancel_timers(stream)
+            stream = _CardLogStream(frame["epoch"], self.ring_size)
+            self._streams[card_id] = stream
+        elif stream.expire_handle:
+            stream.expire_handle.cancel()
+            stream.expire_handle = None
+        if frame["fromSeq"] <= stream.seq:
+            return  # lote repetido
+        if frame["fromSeq"] != stream.seq + 1:
+            # Lacuna (lote perdido): o ring precisa ser contíguo para o backfill
+            stream.ring.clear()
+        stream.ring.extend(frame["logs"])
+        stream.seq = frame["toSeq"]
+
+    def finish(self, card_id: str) -> None:
+        """Flush and keep the replay ring only for a while after completion."""
+        self.flush(card_id)
+        stream = self._streams.get(card_id)
+        if stream is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if stream.expire_handle:
+            stream.expire_handle.cancel()
+        stream.expire_handle = loop.call_later(self.retention_seconds, self._expire, card_id, stream)
+
+    def _expire(self, card_id: str, stream: _CardLogStream) -> None:
+        if self._streams.get(card_id) is stream:
+            del self._streams[card_id]
+
+    @staticmethod
+    def _cancel_timers(stream: _CardLogStream) -> None:
+        for handle in (stream.flush_handle, stream.expire_handle):
+            if handle:
+                handle.cancel()
+
+    def backfill(self, card_id: str, after_seq: int = 0, epoch: Optional[str] = None) -> Dict[str, Any]:
+        """Flushed lines after the cursor (all of them if the epoch changed)."""
+        stream = self._streams.get(card_id)
+        if stream is None:
+            return {
+                "type": "log_backfill",
+                "cardId": card_id,
+                "epoch": None,
+                "lastSeq": 0,
+                "truncated": False,
+                "logs": [],
+            }
+
+        if epoch is not None and epoch != stream.epoch:
+            after_seq = 0
+
+        # Sequências são contíguas no ring: fatiar pela posição evita comparar linha a linha
+        flushed_seq = stream.seq - len(stream.pending)
+        oldest = stream.ring[0]["seq"] if stream.ring else flushed_seq + 1
+        logs = list(islice(stream.ring, max(0, after_seq - oldest + 1), None))
+
+        return {
+            "type": "log_backfill",
+            "cardId": card_id,
+            "epoch": stream.epoch,
+            "lastSeq": logs[-1]["seq"] if logs else min(after_seq, flushed_seq),
+            "truncated": after_seq + 1 < oldest,
+            "logs": logs,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cards": len(self._streams),
+            "bufferedLines": sum(len(s.ring) + len(s.pending) for s in self._streams.values()),
+        }
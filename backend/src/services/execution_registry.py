@@ -0,0 +1,101 @@
+"""In-memory registry of agent executions (``agent.executions``).
+
+Only running executions are held in full (record plus ``LogEntry`` lines).
+When a stage returns, its record is replaced by a ``FinishedExecution``: a
+small summary without logs, kept for the most recent
+``execution_registry_max_finished`` cards. The full log of a finished
+execution is read from the database on demand, where the stages persist it.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from ..config.settings import get_settings
+from ..execution import ExecutionRecord
+
+
+class FinishedExecution:
+    """Summary of a finished execution; its logs live in the database."""
+
+    __slots__ = ("card_id", "title", "status", "started_at", "completed_at", "log_count")
+
+    def __init__(self, record: ExecutionRecord):
+        self.card_id = record.card_id
+        self.title = record.title
+        self.status = record.status
+        self.started_at = record.started_at
+        self.completed_at = record.completed_at
+        self.log_count = len(record.logs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "cardId": self.card_id,
+            "title": self.title,
+            "status": self.status.value,
+            "startedAt": self.started_at,
+            "completedAt": self.completed_at,
+            "logCount": self.log_count,
+        }
+
+    async def load(self, session_factory=None) -> Optional[dict]:
+        """Execution with logs from the database (same shape as the logs API)."""
+        from ..database import async_session_maker
+        from ..repositories.execution_repository import ExecutionRepository
+
+        async with (session_factory or async_session_maker)() as session:
+            return await ExecutionRepository(session).get_execution_with_logs(self.card_id)
+
+
+class ExecutionRegistry:
+    """Running executions by card, plus a bounded LRU of finished summaries."""
+
+    def __init__(self, max_finished: Optional[int] = None):
+        self.max_finished = (
+            max_finished if max_finished is not None
+            else get_settings().execution_registry_max_finished
+        )
+        self._running: Dict[str, ExecutionRecord] = {}
+        self._finished: "OrderedDict[str, FinishedExecution]" = OrderedDict()
+        self.evicted = 0
+
+    def __setitem__(self, card_id: str, record: ExecutionRecord) -> None:
+        self._finished.pop(card_id, None)
+        self._running[card_id] = record
+
+    def __contains__(self, card_id: str) -> bool:
+        return card_id in self._running
+
+    def __len__(self) -> int:
+        return len(self._running)
+
+    def get(self, card_id: str) -> Optional[ExecutionRecord]:
+        """Record of a running execution (None once it finished)."""
+        return self._running.get(card_id)
+
+    def values(self) -> List[ExecutionRecord]:
+        return list(self._running.values())
+
+    def finished(self, card_id: str) -> Optional[FinishedExecution]:
+        return self._finished.get(card_id)
+
+    def finish(self, card_id: str) -> Optional[FinishedExecution]:
+        """Drop the running record (and its logs), keeping only a summary."""
+        record = self._running.pop(card_id, None)
+        if record is None:
+            return None
+        summary = FinishedExecution(record)
+        self._finished[card_id] = summary
+        self._finished.move_to_end(card_id)
+        while len(self._finished) > self.max_finished:
+            self._finished.popitem(last=False)
+            self.evicted += 1
+        return summary
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": len(self._running),
+            "runningLogLines": sum(len(record.logs) for record in self._running.values()),
+            "finished": len(self._finished),
+            "maxFinished": self.max_finished,
+            "evicted": self.evicted,
+        }
@@ -1,40 +1,66 @@
 """WebSocket manager para notificacoes de execucao em tempo real"""
-from typing import Dict, Set
 from fastapi import WebSocket
-import json
 from datetime import datetime
+from typing import Optional
+
+from . import ws_protocol
+from .backplane import Backplane, get_backplane
+from .ws_broadcaster import WebSocketBroadcaster, SlowConsumerPolicy
+from .execution_log_stream import ExecutionLogStream
 
 
 class ExecutionWebSocketManager:
-    def __init__(self):
-        self.connections: Dict[str, Set[WebSocket]] = {}
+    def __init__(self, backplane: Optional[Backplane] = None):
+        # Um grupo por card; logs perdidos confundiriam o cliente, então um
+        # consumidor lento é desconectado e reconecta/ressincroniza
+        self.broadcaster = WebSocketBroadcaster(
+            "execution", policy=SlowConsumerPolicy.DISCONNECT, max_queue=1000
+        )
+        # O agente roda em um worker; os espectadores do card podem estar em outro
+        self._backplane = backplane or get_backplane()
+        self._backplane.subscribe("execution", self._on_backplane_message)
+        # Logs do agente em lotes por card, com ring de replay para reconexões
+        self.logs = ExecutionLogStream(
+            lambda card_id, frame: self._backplane.publish(
+                "execution", {"cardId": card_id, "message": frame}
+            )
+        )
 
     async def connect(self, card_id: str, websocket: WebSocket):
-        await websocket.accept()
-        if card_id not in self.connections:
-            self.connections[card_id] = set()
-        self.connections[card_id].add(websocket)
+        encoding, features = await ws_protocol.accept(websocket)
+        self.broadcaster.add(websocket, group=card_id, encoding=encoding, features=features)
 
     def disconnect(self, card_id: str, websocket: WebSocket):
-        if card_id in self.connections:
-            self.connections[card_id].discard(websocket)
+        self.broadcaster.remove(id(websocket))
 
-    async def broadcast(self, card_id: str, message: dict):
-        if card_id not in self.connections:
-            return
+    def send_backfill(self, card_id: str, websocket: WebSocket, after_seq: int = 0, epoch: str = None):
+        """Envia ao cliente as linhas de log após o cursor (seq) que ele já viu"""
+        self.broadcaster.send_to(id(websocket), self.logs.backfill(card_id, after_seq, epoch))
+
+    def send_pong(self, websocket: WebSocket):
+        self.broadcaster.send_to(id(websocket), {"type": "pong"})
 
-        dead = set()
-        for ws in self.connections[card_id]:
-            try:
-                await ws.send_text(json.dumps(message))
-            except:
-                dead.add(ws)
+    def publish(self, card_id: str, message: dict) -> None:
+        # Apenas enfileira: quem emite o evento (o agente) nunca espera sockets
+        self._backplane.publish("execution", {"cardId": card_id, "message": message})
+
+    async def broadcast(self, card_id: str, message: dict):
+        self.publish(card_id, message)
 
-        for ws in dead:
-            self.connections[card_id].discard(ws)
+    def _on_backplane_message(self, data: dict, local: bool) -> None:
+        card_id, message = data["cardId"], data["message"]
+        if not local:
+            # Espelha o ring de replay para servir backfill neste worker também
+            if message.get("type") == "log_batch":
+                self.logs.ingest(message)
+            elif message.get("type") == "execution_complete":
+                self.logs.finish(card_id)
+        self.broadcaster.publish(message, group=card_id)
 
     async def notify_complete(self, card_id: str, status: str, command: str,
                               token_stats: dict = None, cost_stats: dict = None, error: str = None):
+        # Logs pendentes saem antes da mensagem de conclusão
+        self.logs.finish(card_id)
         await self.broadcast(card_id, {
             "type": "execution_complete",
             "cardId": card_id,
@@ -46,14 +72,9 @@ class ExecutionWebSocketManager:
             "timestamp": datetime.now().isoformat()
         })
 
-    async def notify_log(self, card_id: str, log_type: str, content: str):
-        await self.broadcast(card_id, {
-            "type": "log",
-            "cardId": card_id,
-            "logType": log_type,
-            "content": content,
-            "timestamp": datetime.now().isoformat()
-        })
+    async def notify_log(self, card_id: str, log_type: str, content: str, epoch: str = None):
+        """Adiciona uma linha ao stream do card (enviada no próximo log_batch)"""
+        self.logs.append(card_id, epoch, log_type, content)
 
 
 execution_ws_manager = ExecutionWebSocketManager()
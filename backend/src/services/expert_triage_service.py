@@ -205,34 +205,36 @@ def get_expert_knowledge_content(
         return None
 
 
-def build_expert_context_for_plan(
+def build_expert_layers(
     experts: Dict[str, ExpertMatch | dict],
     cwd: str,
     project_path: Optional[str] = None
-) -> str:
+) -> Tuple[str, str]:
     """
-    Build context string from identified experts to inject into plan prompt.
+    Split expert context into (knowledge, matches).
 
-    Args:
-        experts: Dict of identified experts (ExpertMatch objects or plain dicts)
-        cwd: Working directory (project root)
-        project_path: Path do projeto carregado (None = orquestrador)
+    The knowledge part (KNOWLEDGE.md of each expert, ordered by expert id)
+    only depends on which experts were picked and is stable across stages,
+    so it can be part of a cached prompt prefix. The matches part holds the
+    per-card confidence and reason.
 
     Returns:
-        Formatted string with expert context for the plan prompt
+        Tuple of (knowledge layer, matches layer); empty strings if no experts
     """
     if not experts:
-        return ""
+        return "", ""
 
     # Obter experts disponíveis para este contexto
     available_experts = get_experts(project_path)
 
-    context_parts = ["## Contexto dos Experts Relevantes\n"]
+    knowledge_parts = []
+    match_parts = []
 
-    for expert_id, match in experts.items():
+    for expert_id in sorted(experts):
         config = available_experts.get(expert_id)
         if not config:
             continue
+        match = experts[expert_id]
 
         # Handle both ExpertMatch objects and plain dicts
         if isinstance(match, dict):
@@ -242,8 +244,7 @@ def build_expert_context_for_plan(
             confidence = match.confidence
             reason = match.reason
 
-        context_parts.append(f"### {config['name']} (confidence: {confidence})")
-        context_parts.append(f"**Identificado porque:** {reason}\n")
+        match_parts.append(f"- **{config['name']}** (confidence: {confidence}): {reason}")
 
         # Read and include knowledge content
         knowledge = get_expert_knowledge_content(expert_id, cwd, project_path)
@@ -251,7 +252,30 @@ def build_expert_context_for_plan(
             # Truncate if too long (keep first ~2000 chars)
             if len(knowledge) > 2000:
                 knowledge = knowledge[:2000] + "\n\n[... truncado para brevidade ...]"
-            context_parts.append("**Knowledge Base:**")
-            context_parts.append(f"```\n{knowledge}\n```\n")
+            knowledge_parts.append(f"### {config['name']}")
+            knowledge_parts.append(f"```\n{knowledge}\n```\n")
+
+    knowledge_layer = ""
+    if knowledge_parts:
+        knowledge_layer = "\n".join(["## Knowledge Base dos Experts\n"] + knowledge_parts)
+    matches_layer = ""
+    if match_parts:
+        matches_layer = "\n".join(["## Experts Relevantes para este Card\n"] + match_parts)
+    return knowledge_layer, matches_layer
+
 
-    return "\n".join(context_parts)
+def build_expert_context_for_plan(
+    experts: Dict[str, ExpertMatch | dict],
+    cwd: str,
+    project_path: Optional[str] = None
+) -> str:
+    """
+    Build context string from identified experts to inject into plan prompt.
+
+    Same layers as build_expert_layers (matches first), as a single string.
+
+    Returns:
+        Formatted string with expert context for the plan prompt
+    """
+    knowledge, matches = build_expert_layers(experts, cwd, project_path)
+    return "\n\n".join(part for part in (matches, knowledge) if part)
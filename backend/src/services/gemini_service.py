@@ -4,9 +4,9 @@ Gemini service for managing AI interactions with Google Gemini models.
 import os
 import subprocess
 import asyncio
-from pathlib import Path
 from typing import AsyncGenerator, Dict, Any, Optional
-import toml
+
+from .prompt_builder import plan_toml_context
 
 
 class GeminiService:
@@ -26,19 +26,7 @@ class GeminiService:
         Returns:
             str: Formatted plan context or empty string
         """
-        plan_path = Path(cwd) / "plan.toml"
-        if not plan_path.exists():
-            return ""
-
-        try:
-            plan_data = toml.load(plan_path)
-            context = "\n# Project Configuration (plan.toml)\n"
-            for key, value in plan_data.items():
-                context += f"{key}: {value}\n"
-            return context
-        except Exception as e:
-            print(f"[GeminiService] Error reading plan.toml: {e}")
-            return ""
+        return plan_toml_context(cwd)
 
     def _get_model(self, model_name: str) -> str:
         """
@@ -0,0 +1,295 @@
+"""Background job scheduler.
+
+Periodic maintenance (metrics compaction, log archiving, cleanups) used to
+be a mix of ad-hoc ``while True: ...; sleep`` loops, some never started.
+Jobs are now registered here with an interval or a cron expression and run
+by one scheduler started in the app lifespan:
+
+- each run is delayed by a random jitter so jobs (and workers) don't fire
+  in lockstep;
+- single-flight: a run never starts while the previous one of the same job
+  is still going, whether it was scheduled or triggered by hand;
+- duration, result and error of the recent runs are kept for
+  ``GET /api/jobs``.
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Union
+
+from ..config.settings import get_settings
+
+# Execuções recentes mantidas por job para as métricas de duração
+RECENT_RUNS = 50
+
+JobFunc = Callable[[], Awaitable[Any]]
+
+
+class JobAlreadyRunning(Exception):
+    """Raised when a job is triggered while a run of it is in progress."""
+
+
+def _parse_cron_field(field: str, low: int, high: int) -> Set[int]:
+    values: Set[int] = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start_text, end_text = part.split("-", 1)
+            start, end = int(start_text), int(end_text)
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        if start < low or end > high or start > end or step < 1:
+            raise ValueError(f"Cron field out of range: {field}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """
+    Five-field cron expression: minute hour day-of-month month day-of-week.
+
+    Fields accept ``*``, ``a``, ``a-b``, ``a,b`` and ``/step``; day-of-week
+    is 0-6 with 0 = Sunday. Times are UTC.
+    """
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+        self.expression = expression
+        self.minutes = _parse_cron_field(fields[0], 0, 59)
+        self.hours = _parse_cron_field(fields[1], 0, 23)
+        self.days = _parse_cron_field(fields[2], 1, 31)
+        self.months = _parse_cron_field(fields[3], 1, 12)
+        self.weekdays = _parse_cron_field(fields[4], 0, 6)
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        # Como no cron: com os dois campos restritos, basta um casar
+        if self._any_day or self._any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, moment: datetime) -> datetime:
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 4)
+        while candidate < limit:
+            if candidate.month not in self.months or not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+            elif candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron expression never fires: {self.expression!r}")
+
+    @property
+    def period_seconds(self) -> float:
+        """Rough spacing between runs (used to bound the jitter)."""
+        now = datetime.utcnow()
+        first = self.next_after(now)
+        return (self.next_after(first) - first).total_seconds()
+
+    def describe(self) -> str:
+        return f"cron {self.expression}"
+
+
+class IntervalSchedule:
+    """Fixed interval between the end of a run and the next one."""
+
+    def __init__(self, seconds: float):
+        if seconds <= 0:
+            raise ValueError("Interval must be positive")
+        self.seconds = seconds
+
+    def next_after(self, moment: datetime) -> datetime:
+        return moment + timedelta(seconds=self.seconds)
+
+    @property
+    def period_seconds(self) -> float:
+        return self.seconds
+
+    def describe(self) -> str:
+        return f"every {self.seconds:g}s"
+
+
+def make_schedule(schedule: Union[int, float, str]):
+    """Interval in seconds or cron expression."""
+    if isinstance(schedule, str):
+        return CronSchedule(schedule)
+    return IntervalSchedule(schedule)
+
+
+class Job:
+    """A registered job and the metrics of its recent runs."""
+
+    def __init__(self, name: str, func: JobFunc, schedule: Union[int, float, str],
+                 jitter_seconds: Optional[float] = None, run_on_start: bool = False,
+                 description: str = ""):
+        self.name = name
+        self.func = func
+        self.schedule = make_schedule(schedule)
+        if jitter_seconds is None:
+            # Até 10% do período, limitado pelo máximo configurado
+            jitter_seconds = min(get_settings().job_max_jitter_seconds, self.schedule.period_seconds * 0.1)
+        self.jitter_seconds = jitter_seconds
+        self.run_on_start = run_on_start
+        self.description = description
+
+        self.lock = asyncio.Lock()
+        self.next_run: Optional[datetime] = None
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.last_started: Optional[datetime] = None
+        self.last_finished: Optional[datetime] = None
+        self.last_result: Any = None
+        self.last_error: Optional[str] = None
+        self.durations: Deque[float] = deque(maxlen=RECENT_RUNS)
+
+    @property
+    def running(self) -> bool:
+        return self.lock.locked()
+
+    def schedule_next(self, now: Optional[datetime] = None) -> datetime:
+        jitter = random.uniform(0, self.jitter_seconds) if self.jitter_seconds > 0 else 0.0
+        self.next_run = self.schedule.next_after(now or datetime.utcnow()) + timedelta(seconds=jitter)
+        return self.next_run
+
+    async def run(self) -> Any:
+        """Run once (single-flight). Raises JobAlreadyRunning if a run is in progress."""
+        if self.lock.locked():
+            self.skipped += 1
+            raise JobAlreadyRunning(self.name)
+
+        async with self.lock:
+            self.last_started = datetime.utcnow()
+            started = time.perf_counter()
+            try:
+                result = await self.func()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failures += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+                raise
+            else:
+                self.last_result = result
+                self.last_error = None
+                return result
+            finally:
+                self.runs += 1
+                self.durations.append(time.perf_counter() - started)
+                self.last_finished = datetime.utcnow()
+
+    def status(self) -> Dict[str, Any]:
+        durations = sorted(self.durations)
+        return {
+            "name": self.name,
+            "description": self.description,
+            "schedule": self.schedule.describe(),
+            "jitterSeconds": round(self.jitter_seconds, 1),
+            "running": self.running,
+            "nextRun": self.next_run.isoformat() if self.next_run else None,
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "lastStarted": self.last_started.isoformat() if self.last_started else None,
+            "lastFinished": self.last_finished.isoformat() if self.last_finished else None,
+            "lastDurationMs": round(self.durations[-1] * 1000, 1) if durations else None,
+            "p50DurationMs": round(durations[len(durations) // 2] * 1000, 1) if durations else None,
+            "maxDurationMs": round(durations[-1] * 1000, 1) if durations else None,
+            "lastResult": self.last_result if isinstance(self.last_result, (dict, int, float, str, type(None))) else str(self.last_result),
+            "lastError": self.last_error,
+        }
+
+
+class JobScheduler:
+    """Runs registered jobs on their schedules, one asyncio task per job."""
+
+    def __init__(self):
+        self.jobs: Dict[str, Job] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    @property
+    def started(self) -> bool:
+        return bool(self._tasks)
+
+    def register(self, name: str, func: JobFunc, schedule: Union[int, float, str], **options: Any) -> Job:
+        """Add a job; replaces a job with the same name (before start)."""
+        job = Job(name, func, schedule, **options)
+        self.jobs[name] = job
+        return job
+
+    def start(self) -> None:
+        for name, job in self.jobs.items():
+            if name not in self._tasks:
+                self._tasks[name] = asyncio.create_task(self._loop(job), name=f"job:{name}")
+
+    async def stop(self) -> None:
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _loop(self, job: Job) -> None:
+        if job.run_on_start:
+            job.next_run = datetime.utcnow() + timedelta(seconds=random.uniform(0, job.jitter_seconds))
+        else:
+            job.schedule_next()
+
+        while True:
+            delay = (job.next_run - datetime.utcnow()).total_seconds()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                await job.run()
+            except JobAlreadyRunning:
+                pass  # disparado manualmente e ainda rodando
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[JobScheduler] Job {job.name} failed: {e}")
+            job.schedule_next()
+
+    async def trigger(self, name: str) -> Any:
+        """
+        Run a job now, outside its schedule.
+
+        Raises:
+            KeyError: Unknown job
+            JobAlreadyRunning: A run of the job is in progress
+        """
+        return await self.jobs[name].run()
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [job.status() for job in self.jobs.values()]
+
+
+_job_scheduler: Optional[JobScheduler] = None
+
+
+def get_job_scheduler() -> JobScheduler:
+    """Get the singleton job scheduler."""
+    global _job_scheduler
+    if _job_scheduler is None:
+        _job_scheduler = JobScheduler()
+    return _job_scheduler
@@ -0,0 +1,354 @@
+"""Cached board summary used as kanban context in chat system prompts.
+
+The snapshot is loaded once per project from the database and then kept up
+to date from the card events already published on the backplane "cards"
+channel (created / moved / updated, from any worker). Deletions are
+announced on the "kanban" channel. Each column's section is rendered only
+when that column changed (or when relative times roll over to the next
+minute), so a chat turn costs no database query.
+
+A full reload happens when the active project changes and, as a safety net
+for changes that emit no event, after ``kanban_context_max_age_seconds``.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from ..config.settings import get_settings
+from ..database import get_session
+from ..repositories.activity_repository import ActivityRepository
+from ..repositories.card_repository import CardRepository
+from .backplane import Backplane, get_backplane
+
+logger = logging.getLogger(__name__)
+
+# Colunas exibidas no contexto (completed, archived e cancelado ficam de fora)
+COLUMN_CONFIG = [
+    ("backlog", "Backlog", "📋"),
+    ("plan", "Plan", "📝"),
+    ("implement", "Implement", "🔨"),
+    ("test", "Test", "🧪"),
+    ("review", "Review", "👀"),
+    ("done", "Done", "✅"),
+]
+ACTIVE_COLUMNS = [col_id for col_id, _, _ in COLUMN_CONFIG]
+CARDS_PER_COLUMN = 5
+RECENT_ACTIVITIES = 5
+
+
+def format_relative_time(dt: datetime) -> str:
+    """Format datetime as relative time (e.g., 'ha 2 dias')"""
+    now = datetime.now(timezone.utc)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+
+    diff = now - dt
+
+    if diff.days > 0:
+        return f"ha {diff.days} dia{'s' if diff.days > 1 else ''}"
+
+    hours = diff.seconds // 3600
+    if hours > 0:
+        return f"ha {hours}h"
+
+    minutes = diff.seconds // 60
+    if minutes > 0:
+        return f"ha {minutes}min"
+
+    return "agora"
+
+
+def truncate(text: str, max_length: int = 80) -> str:
+    """Truncate text adding ... if needed"""
+    if not text:
+        return ""
+    text = text.replace('\n', ' ').strip()
+    if len(text) <= max_length:
+        return text
+    return text[:max_length - 3] + "..."
+
+
+def _parse_datetime(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return datetime.utcnow()
+
+
+class CardEntry:
+    """What the board summary needs from a card."""
+
+    __slots__ = ("card_id", "title", "description", "column_id", "created_at", "archived")
+
+    def __init__(self, card_id: str, title: str, description: Optional[str],
+                 column_id: str, created_at: datetime, archived: bool = False):
+        self.card_id = card_id
+        self.title = title
+        self.description = truncate(description or "", 60)
+        self.column_id = column_id
+        self.created_at = created_at
+        self.archived = archived
+
+    @classmethod
+    def from_event(cls, card: Dict[str, Any]) -> "CardEntry":
+        """Build from the camelCase card dict carried by card WebSocket events."""
+        return cls(
+            card["id"],
+            card.get("title") or "",
+            card.get("description"),
+            card.get("columnId") or "backlog",
+            _parse_datetime(card.get("createdAt")),
+            bool(card.get("archived")),
+        )
+
+
+class KanbanContextSnapshot:
+    """Versioned board summary kept current by card events."""
+
+    def __init__(self, backplane: Optional[Backplane] = None, max_age_seconds: Optional[float] = None):
+        self.max_age_seconds = (
+            max_age_seconds if max_age_seconds is not None
+            else get_settings().kanban_context_max_age_seconds
+        )
+        self.version = 0
+        self.loads = 0
+        self._project: Optional[str] = None
+        self._loaded_at = 0.0
+        self._cards: Dict[str, CardEntry] = {}
+        self._activities: Deque[Dict[str, Any]] = deque(maxlen=RECENT_ACTIVITIES)
+        # Seções renderizadas por coluna: col_id -> (minuto, texto)
+        self._sections: Dict[str, Tuple[int, str]] = {}
+        self._rendered: Optional[Tuple[int, int, str]] = None
+        self._lock = asyncio.Lock()
+        # Eventos recebidos durante um reload são reaplicados sobre o estado novo
+        self._loading_events: Optional[List[Tuple[str, Dict[str, Any]]]] = None
+
+        self._backplane = backplane or get_backplane()
+        self._backplane.subscribe("cards", self._on_card_event)
+        self._backplane.subscribe("kanban", self._on_kanban_event)
+
+    # =========================================================================
+    # Loading
+    # =========================================================================
+
+    @staticmethod
+    def _current_project() -> str:
+        from ..database_manager import db_manager
+
+        return db_manager.current_project_id or "default"
+
+    def _is_stale(self) -> bool:
+        if self._project != self._current_project():
+            return True
+        return time.monotonic() - self._loaded_at > self.max_age_seconds
+
+    def invalidate(self) -> None:
+        """Force a reload on the next read."""
+        self._loaded_at = 0.0
+
+    async def _load(self) -> None:
+        project = self._current_project()
+        self._loading_events = []
+        try:
+            async with get_session()() as session:
+                cards = await CardRepository(session).get_all()
+                activities = await ActivityRepository(session).get_recent_activities(
+                    limit=RECENT_ACTIVITIES
+                )
+        except Exception:
+            self._loading_events = None
+            raise
+
+        self._project = project
+        self._cards = {
+            card.id: CardEntry(card.id, card.title, card.description, card.column_id,
+                               card.created_at, bool(card.archived))
+            for card in cards
+        }
+        self._activities = deque(
+            (
+                {
+                    "type": act["type"],
+                    "cardId": act["cardId"],
+                    "cardTitle": act["cardTitle"],
+                    "toColumn": act["toColumn"],
+                    "timestamp": datetime.fromisoformat(act["timestamp"]),
+                }
+                for act in reversed(activities)
+            ),
+            maxlen=RECENT_ACTIVITIES,
+        )
+        self._sections = {}
+        self._loaded_at = time.monotonic()
+        self.version += 1
+        self.loads += 1
+
+        pending, self._loading_events = self._loading_events, None
+        for channel, message in pending:
+            self._apply(channel, message)
+
+    # =========================================================================
+    # Events
+    # =========================================================================
+
+    def _on_card_event(self, message: Dict[str, Any], local: bool) -> None:
+        self._receive("cards", message)
+
+    def _on_kanban_event(self, message: Dict[str, Any], local: bool) -> None:
+        self._receive("kanban", message)
+
+    def _receive(self, channel: str, message: Dict[str, Any]) -> None:
+        if "cards" in message:
+            # Evento em lote (cards_created/cards_moved/cards_updated): um por card
+            single_type = message["type"].replace("cards_", "card_", 1)
+            for item in message["cards"]:
+                self._receive(channel, {**item, "type": single_type})
+            return
+        if self._loading_events is not None:
+            self._loading_events.append((channel, message))
+        elif self._project is not None and self._project == self._current_project():
+            self._apply(channel, message)
+
+    def _apply(self, channel: str, message: Dict[str, Any]) -> None:
+        dirty: Set[str] = set()
+        card_id = message.get("cardId")
+        previous = self._cards.get(card_id)
+        if previous is not None:
+            dirty.add(previous.column_id)
+
+        if channel == "kanban":
+            if message.get("event") == "deleted" and previous is not None:
+                del self._cards[card_id]
+                self._activities = deque(
+                    (act for act in self._activities if act.get("cardId") != card_id),
+                    maxlen=RECENT_ACTIVITIES,
+                )
+        else:
+            card = message.get("card")
+            if card is not None:
+                entry = CardEntry.from_event(card)
+            elif previous is not None and message.get("toColumn"):
+                entry = previous
+                entry.column_id = message["toColumn"]
+            else:
+                entry = None
+
+            if entry is not None:
+                self._cards[card_id] = entry
+                dirty.add(entry.column_id)
+                if not entry.archived:
+                    self._record_activity(message, entry)
+
+        for col_id in dirty:
+            self._sections.pop(col_id, None)
+        self.version += 1
+
+    def _record_activity(self, message: Dict[str, Any], entry: CardEntry) -> None:
+        # Mesmos tipos que o CardRepository registra em activity_logs
+        event_type = message.get("type")
+        if event_type == "card_created":
+            activity_type = "created"
+        elif event_type == "card_moved":
+            to_column = message.get("toColumn")
+            activity_type = {"done": "completed", "archived": "archived"}.get(to_column, "moved")
+        else:
+            activity_type = "updated"
+        self._activities.append({
+            "type": activity_type,
+            "cardId": entry.card_id,
+            "cardTitle": entry.title,
+            "toColumn": message.get("toColumn"),
+            "timestamp": datetime.utcnow(),
+        })
+
+    def card_deleted(self, card_id: str) -> None:
+        """Announce a deleted card to every worker (card events don't cover deletes)."""
+        self._backplane.publish("kanban", {"event": "deleted", "cardId": card_id})
+
+    # =========================================================================
+    # Rendering
+    # =========================================================================
+
+    def _render_column(self, col_id: str, col_name: str, emoji: str, minute: int) -> str:
+        cached = self._sections.get(col_id)
+        if cached is not None and cached[0] == minute:
+            return cached[1]
+
+        col_cards = sorted(
+            (card for card in self._cards.values() if card.column_id == col_id),
+            key=lambda card: card.created_at,
+        )
+        lines = []
+        if col_cards:
+            lines.append(f"\n{emoji} {col_name} ({len(col_cards)}):")
+            for card in col_cards[:CARDS_PER_COLUMN]:
+                lines.append(f"  - \"{card.title}\" ({format_relative_time(card.created_at)})")
+                if card.description:
+                    lines.append(f"    -> {card.description}")
+        text = "\n".join(lines)
+        self._sections[col_id] = (minute, text)
+        return text
+
+    def _render(self) -> str:
+        # Tempos relativos têm resolução de minuto: reaproveita o texto dentro do minuto
+        minute = int(time.time() // 60)
+        if self._rendered is not None and self._rendered[:2] == (self.version, minute):
+            return self._rendered[2]
+
+        lines = ["=== KANBAN STATUS ==="]
+        for col_id, col_name, emoji in COLUMN_CONFIG:
+            section = self._render_column(col_id, col_name, emoji, minute)
+            if section:
+                lines.append(section)
+
+        counts = {col_id: 0 for col_id in ACTIVE_COLUMNS}
+        for card in self._cards.values():
+            if card.column_id in counts:
+                counts[card.column_id] += 1
+        summary = " | ".join(f"{counts[c]} {c}" for c in ACTIVE_COLUMNS)
+        lines.append(f"\n📊 Resumo: {summary}")
+
+        if self._activities:
+            lines.append("\n🕐 Ultimas atividades:")
+            for act in reversed(self._activities):
+                time_str = format_relative_time(act["timestamp"])
+                card_title = truncate(act["cardTitle"], 30)
+
+                if act["type"] == "moved":
+                    lines.append(f"  - \"{card_title}\" movido para {act['toColumn']} ({time_str})")
+                elif act["type"] == "completed":
+                    lines.append(f"  - \"{card_title}\" concluido ({time_str})")
+                elif act["type"] == "created":
+                    lines.append(f"  - \"{card_title}\" criado ({time_str})")
+                else:
+                    lines.append(f"  - \"{card_title}\" {act['type']} ({time_str})")
+
+        lines.append("===================")
+        text = "\n".join(lines)
+        self._rendered = (self.version, minute, text)
+        return text
+
+    async def get_context(self) -> str:
+        """Board summary for the active project (DB only on first use / reload)."""
+        if self._is_stale():
+            async with self._lock:
+                if self._is_stale():
+                    await self._load()
+        return self._render()
+
+
+_snapshot: Optional[KanbanContextSnapshot] = None
+
+
+def get_kanban_context() -> KanbanContextSnapshot:
+    """Get the process-wide kanban context snapshot."""
+    global _snapshot
+    if _snapshot is None:
+        _snapshot = KanbanContextSnapshot()
+    return _snapshot
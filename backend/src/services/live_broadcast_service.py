@@ -1,14 +1,15 @@
 """Live broadcast service for aggregating and sending events to spectators."""
 
-import asyncio
 import json
 from datetime import datetime
 from typing import Optional, Dict, Any, Set, List
 from fastapi import WebSocket
 import logging
 
+from .backplane import get_backplane
 from .presence_service import get_presence_service
 from .voting_service import get_voting_service
+from .ws_broadcaster import WebSocketBroadcaster, SlowConsumerPolicy, to_payload
 from ..schemas.live import (
     WSPresenceUpdate, WSStatusUpdate, WSCardUpdate,
     WSLogEntry, WSVotingStarted, WSVotingUpdate, WSVotingEnded,
@@ -34,8 +35,12 @@ class LiveBroadcastService:
             return
         self._initialized = True
 
-        # Active WebSocket connections
-        self._connections: Dict[str, WebSocket] = {}
+        # Active WebSocket connections, each with its own bounded send queue.
+        # Presence/status/vote updates coalesce (only the latest matters);
+        # logs are dropped oldest-first for spectators that fall behind.
+        self._broadcaster = WebSocketBroadcaster(
+            "live", policy=SlowConsumerPolicy.COALESCE, max_queue=100
+        )
 
         # Current AI status
         self._current_status: Dict[str, Any] = {
@@ -49,12 +54,13 @@ class LiveBroadcastService:
         self._recent_logs: List[Dict[str, Any]] = []
         self._max_recent_logs = 50
 
-        # Lock for thread safety
-        self._lock = asyncio.Lock()
-
         # Setup callbacks from other services
         self._setup_callbacks()
 
+        # Events emitted by any worker reach the spectators of every worker
+        self._backplane = get_backplane()
+        self._backplane.subscribe("live", self._on_backplane_message)
+
         logger.info("LiveBroadcastService initialized")
 
     def _setup_callbacks(self):
@@ -70,42 +76,40 @@ class LiveBroadcastService:
         voting.on_update(self._on_voting_update)
         voting.on_ended(self._on_voting_ended)
 
-    async def connect(self, session_id: str, websocket: WebSocket) -> None:
-        """Register a new WebSocket connection."""
-        async with self._lock:
-            self._connections[session_id] = websocket
-            logger.info(f"Live WS connected: {session_id[:8]}... Total: {len(self._connections)}")
+    async def connect(self, session_id: str, websocket: WebSocket, encoding: str = "json") -> None:
+        """Register a new (already accepted) WebSocket connection."""
+        self._broadcaster.add(websocket, key=session_id, encoding=encoding)
+        logger.info(f"Live WS connected: {session_id[:8]}... Total: {self._broadcaster.count()}")
 
         # Register with presence service
         presence = get_presence_service()
         await presence.connect(session_id)
 
         # Send initial state
-        await self._send_initial_state(session_id, websocket)
+        self._send_initial_state(session_id)
 
     async def disconnect(self, session_id: str) -> None:
         """Remove a WebSocket connection."""
-        async with self._lock:
-            self._connections.pop(session_id, None)
-            logger.info(f"Live WS disconnected: {session_id[:8]}... Total: {len(self._connections)}")
+        self._broadcaster.remove(session_id)
+        logger.info(f"Live WS disconnected: {session_id[:8]}... Total: {self._broadcaster.count()}")
 
         # Unregister from presence service
         presence = get_presence_service()
         await presence.disconnect(session_id)
 
-    async def _send_initial_state(self, session_id: str, websocket: WebSocket) -> None:
-        """Send initial state to a new connection."""
+    def _send_initial_state(self, session_id: str) -> None:
+        """Queue initial state for a new connection (ahead of later broadcasts)."""
         try:
             presence = get_presence_service()
             voting = get_voting_service()
 
             # Send presence count
-            await self._send_to_one(websocket, WSPresenceUpdate(
+            self._send_to_one(session_id, WSPresenceUpdate(
                 spectator_count=presence.count
             ))
 
             # Send current status
-            await self._send_to_one(websocket, WSStatusUpdate(
+            self._send_to_one(session_id, WSStatusUpdate(
                 is_working=self._current_status["is_working"],
                 current_stage=self._current_status.get("current_stage"),
                 current_card=self._current_status.get("current_card"),
@@ -115,7 +119,7 @@ class LiveBroadcastService:
             # Send voting state if active
             if voting.is_active:
                 state = voting.get_state()
-                await self._send_to_one(websocket, WSVotingStarted(
+                self._send_to_one(session_id, WSVotingStarted(
                     round_id=state.round_id,
                     options=state.options,
                     ends_at=state.ends_at,
@@ -124,7 +128,7 @@ class LiveBroadcastService:
 
             # Send recent logs
             for log in self._recent_logs[-20:]:  # Last 20 logs
-                await self._send_to_one(websocket, WSLogEntry(
+                self._send_to_one(session_id, WSLogEntry(
                     content=log["content"],
                     log_type=log.get("log_type"),
                     timestamp=log.get("timestamp", datetime.utcnow())
@@ -133,45 +137,53 @@ class LiveBroadcastService:
         except Exception as e:
             logger.error(f"Error sending initial state: {e}")
 
-    async def _send_to_one(self, websocket: WebSocket, message: Any) -> bool:
-        """Send message to a single connection."""
-        try:
-            if hasattr(message, 'model_dump'):
-                data = message.model_dump(mode='json')
-            else:
-                data = message
-            await websocket.send_json(data)
-            return True
-        except Exception as e:
-            logger.error(f"Error sending to WebSocket: {e}")
-            return False
-
-    async def broadcast(self, message: Any) -> int:
-        """Broadcast message to all connected spectators."""
-        if hasattr(message, 'model_dump'):
-            data = message.model_dump(mode='json')
-        else:
-            data = message
-
-        sent = 0
-        failed = []
-
-        async with self._lock:
-            connections = list(self._connections.items())
-
-        for session_id, ws in connections:
-            try:
-                await ws.send_json(data)
-                sent += 1
-            except Exception as e:
-                logger.error(f"Error broadcasting to {session_id[:8]}...: {e}")
-                failed.append(session_id)
-
-        # Cleanup failed connections
-        for session_id in failed:
-            await self.disconnect(session_id)
-
-        return sent
+    def _send_to_one(self, session_id: str, message: Any) -> bool:
+        """Queue message for a single connection."""
+        return self._broadcaster.send_to(session_id, message)
+
+    async def broadcast(self, message: Any, coalesce_key: Optional[str] = None) -> None:
+        """
+        Broadcast message to the spectators of every worker.
+
+        Goes through the backplane; each worker queues it for its own
+        spectators (see _broadcast_local). Never waits on a socket.
+        """
+        self._backplane.publish("live", {
+            "message": to_payload(message),
+            "coalesceKey": coalesce_key,
+        })
+
+    def _broadcast_local(self, message: Any, coalesce_key: Optional[str] = None) -> int:
+        """Queue a message for this worker's spectators only."""
+        return self._broadcaster.publish(message, coalesce_key=coalesce_key)
+
+    def _on_backplane_message(self, data: Dict[str, Any], local: bool) -> None:
+        """Mirror status/recent logs and fan out to this worker's spectators."""
+        message = data["message"]
+        kind = message.get("type")
+
+        if kind == "status_update":
+            self._current_status = {
+                "is_working": message.get("is_working", False),
+                "current_stage": message.get("current_stage"),
+                "current_card": message.get("current_card"),
+                "progress": message.get("progress"),
+            }
+        elif kind == "log_entry":
+            # Recent logs (replayed to new connections)
+            self._recent_logs.append({
+                "content": message.get("content"),
+                "log_type": message.get("log_type"),
+                "timestamp": message.get("timestamp") or datetime.utcnow(),
+            })
+            if len(self._recent_logs) > self._max_recent_logs:
+                self._recent_logs = self._recent_logs[-self._max_recent_logs:]
+
+        self._broadcast_local(message, data.get("coalesceKey"))
+
+    def stats(self) -> Dict[str, Any]:
+        """Send queue diagnostics (clients, depth, dropped messages)."""
+        return self._broadcaster.stats()
 
     # =========================================================================
     # Status Updates
@@ -184,20 +196,13 @@ class LiveBroadcastService:
         current_card: Optional[Dict[str, Any]] = None,
         progress: Optional[int] = None
     ) -> None:
-        """Update AI status and broadcast to spectators."""
-        self._current_status = {
-            "is_working": is_working,
-            "current_stage": current_stage,
-            "current_card": current_card,
-            "progress": progress
-        }
-
+        """Update AI status and broadcast to spectators (every worker mirrors it)."""
         await self.broadcast(WSStatusUpdate(
             is_working=is_working,
             current_stage=current_stage,
             current_card=current_card,
             progress=progress
-        ))
+        ), coalesce_key="status")
 
     # =========================================================================
     # Card Updates
@@ -245,18 +250,7 @@ class LiveBroadcastService:
     # =========================================================================
 
     async def broadcast_log(self, content: str, log_type: Optional[str] = None) -> None:
-        """Broadcast log entry to spectators."""
-        log_entry = {
-            "content": content,
-            "log_type": log_type,
-            "timestamp": datetime.utcnow()
-        }
-
-        # Store in recent logs
-        self._recent_logs.append(log_entry)
-        if len(self._recent_logs) > self._max_recent_logs:
-            self._recent_logs = self._recent_logs[-self._max_recent_logs:]
-
+        """Broadcast log entry to spectators (every worker keeps it in recent logs)."""
         await self.broadcast(WSLogEntry(
             content=content,
             log_type=log_type
@@ -266,9 +260,12 @@ class LiveBroadcastService:
     # Presence Callbacks
     # =========================================================================
 
+    # Presence and voting services replicate their state through the backplane
+    # and fire these callbacks in every worker, so fan-out here is local only.
+
     async def _on_presence_change(self, count: int) -> None:
         """Handle presence count change."""
-        await self.broadcast(WSPresenceUpdate(spectator_count=count))
+        self._broadcast_local(WSPresenceUpdate(spectator_count=count), coalesce_key="presence")
 
     # =========================================================================
     # Voting Callbacks
@@ -276,7 +273,7 @@ class LiveBroadcastService:
 
     async def _on_voting_started(self, round, options) -> None:
         """Handle voting started."""
-        await self.broadcast(WSVotingStarted(
+        self._broadcast_local(WSVotingStarted(
             round_id=round.id,
             options=[
                 VotingOptionSchema(
@@ -294,7 +291,7 @@ class LiveBroadcastService:
 
     async def _on_voting_update(self, votes: Dict[str, int]) -> None:
         """Handle vote count update."""
-        await self.broadcast(WSVotingUpdate(votes=votes))
+        self._broadcast_local(WSVotingUpdate(votes=votes), coalesce_key="votes")
 
     async def _on_voting_ended(self, winner, all_options) -> None:
         """Handle voting ended."""
@@ -309,7 +306,7 @@ class LiveBroadcastService:
         else:
             winner_schema = None
 
-        await self.broadcast(WSVotingEnded(
+        self._broadcast_local(WSVotingEnded(
             round_id="",  # Will be set properly
             winner=winner_schema,
             results=[
@@ -345,13 +342,7 @@ class LiveBroadcastService:
         await presence.heartbeat(session_id)
 
         # Send pong
-        async with self._lock:
-            ws = self._connections.get(session_id)
-            if ws:
-                try:
-                    await ws.send_json({"type": "pong"})
-                except:
-                    pass
+        self._send_to_one(session_id, {"type": "pong"})
 
 
 # Singleton instance
@@ -0,0 +1,178 @@
+"""Append-only JSONL log file: async writer with rotation, and tail reads.
+
+`AsyncLogFileWriter.write` only enqueues the line; one background task
+drains the queue and appends whole batches from a worker thread, so the
+event loop never blocks on disk. The file is rotated when it reaches
+`max_bytes` or after `rotate_seconds`: the current file is renamed to
+`<name>.<YYYYmmdd-HHMMSS-ffffff>` and gzip-compressed, keeping
+`backup_count` archives.
+
+`read_tail_lines` seeks backwards from the end of the file in fixed-size
+chunks and stops as soon as it has enough lines, so reading the last N
+lines costs O(N) no matter how big the file is.
+"""
+
+import asyncio
+import gzip
+import logging
+import os
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bytes lidos por seek no tail
+TAIL_CHUNK_BYTES = 64 * 1024
+# Linhas escritas por lote (um write + flush por lote)
+WRITE_BATCH_LINES = 500
+
+
+def read_tail_lines(path: Path, limit: int, chunk_size: int = TAIL_CHUNK_BYTES) -> List[str]:
+    """Last `limit` non-empty lines of the file, oldest first."""
+    if limit <= 0:
+        return []
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return []
+
+    with f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b""
+        # limit + 1 quebras garantem que a primeira linha do trecho está completa
+        while position > 0 and data.count(b"\n") <= limit:
+            step = min(chunk_size, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+
+    lines = [line for line in data.split(b"\n") if line.strip()]
+    if position > 0:
+        lines = lines[1:]  # começa no meio de uma linha
+    return [line.decode("utf-8", errors="replace") for line in lines[-limit:]]
+
+
+def read_archive_tail(path: Path, limit: int) -> List[str]:
+    """Last `limit` lines of the newest rotated archive (bounded by max_bytes)."""
+    archives = rotated_files(path)
+    if not archives or limit <= 0:
+        return []
+    with gzip.open(archives[-1], "rt", encoding="utf-8", errors="replace") as f:
+        lines = [line.rstrip("\n") for line in f if line.strip()]
+    return lines[-limit:]
+
+
+def rotated_files(path: Path) -> List[Path]:
+    """Compressed archives of the log, oldest first."""
+    return sorted(path.parent.glob(f"{path.name}.*.gz"))
+
+
+class AsyncLogFileWriter:
+    """Queued, rotating appender for one log file."""
+
+    def __init__(self, path: Path, max_bytes: int = 10 * 1024 * 1024,
+                 rotate_seconds: float = 24 * 3600, backup_count: int = 7,
+                 max_queue: int = 10_000):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.backup_count = backup_count
+        self.max_queue = max_queue
+        self.dropped = 0
+        self.rotations = 0
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._file = None
+        self._size = 0
+        self._period_start = 0.0
+
+    # ==================== ENQUEUE ====================
+
+    def write(self, line: str) -> None:
+        """Enqueue a line (without the newline). Never blocks; drops when the queue is full."""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        try:
+            self._queue.put_nowait(line)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def flush(self) -> None:
+        """Wait until every queued line is on disk."""
+        if self._queue is not None and self._task is not None and not self._task.done():
+            await self._queue.join()
+
+    async def close(self) -> None:
+        """Flush, stop the writer task and close the file."""
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._file is not None:
+            await asyncio.to_thread(self._file.close)
+            self._file = None
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    # ==================== WRITER TASK ====================
+
+    async def _run(self) -> None:
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < WRITE_BATCH_LINES and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+            except Exception as e:
+                logger.error(f"Failed to write to log file: {e}")
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        stat = os.stat(self.path)
+        self._size = stat.st_size
+        # Arquivo já existente: o período conta da última escrita
+        self._period_start = stat.st_mtime if stat.st_size else time.time()
+
+    def _write_batch(self, lines: List[str]) -> None:
+        if self._file is None:
+            self._open()
+        if self._size and (
+            self._size >= self.max_bytes or time.time() - self._period_start >= self.rotate_seconds
+        ):
+            self._rotate()
+
+        data = "".join(line + "\n" for line in lines)
+        self._file.write(data)
+        self._file.flush()
+        self._size += len(data.encode("utf-8"))
+
+    def _rotate(self) -> None:
+        self._file.close()
+        target = self.path.with_name(f"{self.path.name}.{datetime.utcnow().strftime('%Y%m%d-%H%M%S-%f')}")
+        os.replace(self.path, target)
+        with open(target, "rb") as src, gzip.open(f"{target}.gz", "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        target.unlink()
+        self.rotations += 1
+
+        for old in rotated_files(self.path)[:-self.backup_count or None]:
+            old.unlink(missing_ok=True)
+        self._open()
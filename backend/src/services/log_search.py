@@ -0,0 +1,346 @@
+"""Busca full-text nos logs de execução (SQLite FTS5).
+
+Cada linha gravada em `execution_logs` entra, por trigger, no índice
+contentless `execution_logs_fts` e em `execution_log_search_rows` (execução,
+sequence, tipo, timestamp). O índice guarda só os termos: o texto continua
+nas linhas quentes ou no arquivo comprimido, de onde os snippets são
+montados apenas para a página retornada. Como o arquivamento não remove
+nada do índice, logs arquivados continuam pesquisáveis.
+
+Os resultados vêm do mais recente para o mais antigo (ordem de rowid do
+índice), paginados por cursor: `cursor` é o rowid do último resultado.
+
+Num índice contentless o FTS5 só remove termos com o comando 'delete' e o
+texto original, que o trigger de `executions` já não alcança (as linhas
+quentes saem antes, em cascata, e o arquivo é comprimido). Por isso
+`remove_executions` tira os termos antes de o card ser apagado, e o job
+`log_search_reindex` recria o índice quando sobram termos sem linha
+(execuções apagadas por outro caminho).
+"""
+
+import html
+import re
+import unicodedata
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.execution import EXECUTION_LOG_SEARCH_DDL, ExecutionLog, ExecutionLogArchive
+from .execution_log_archive import unpack_logs
+
+# Caracteres de contexto em volta do primeiro termo encontrado
+SNIPPET_CHARS = 160
+MAX_PAGE_SIZE = 200
+
+_TOKEN_RE = re.compile(r"\w+\*?", re.UNICODE)
+
+# Databases (url do engine) em que o índice já foi verificado
+_ready: Set[str] = set()
+
+
+def _fold(value: str) -> str:
+    """Minúsculas sem acento, caractere a caractere (mantém os offsets)."""
+    return "".join(unicodedata.normalize("NFD", ch)[0].lower() for ch in value)
+
+
+def parse_query(query: str) -> Tuple[Optional[str], List[Tuple[str, bool]]]:
+    """
+    Converte o texto digitado numa expressão MATCH segura.
+
+    Cada palavra vira uma frase entre aspas (AND implícito); `termo*` faz
+    busca por prefixo. Retorna (expressão, [(termo normalizado, prefixo)]).
+    """
+    terms = []
+    for token in _TOKEN_RE.findall(query):
+        prefix = token.endswith("*")
+        word = token.rstrip("*")
+        if word:
+            terms.append((_fold(word), prefix))
+    if not terms:
+        return None, []
+    match = " ".join(f'"{word}"*' if prefix else f'"{word}"' for word, prefix in terms)
+    return match, terms
+
+
+def make_snippet(content: str, terms: Iterable[Tuple[str, bool]], width: int = SNIPPET_CHARS) -> str:
+    """Trecho em volta do primeiro termo, com os termos em <mark> (HTML escapado)."""
+    patterns = [
+        rf"(?<!\w){re.escape(word)}\w*" if prefix else rf"(?<!\w){re.escape(word)}(?!\w)"
+        for word, prefix in terms
+    ]
+    folded = _fold(content)
+    matches = list(re.finditer("|".join(patterns), folded)) if patterns else []
+
+    center = matches[0].start() if matches else 0
+    start = max(0, center - width // 3)
+    end = min(len(content), start + width)
+
+    parts = ["…" if start > 0 else ""]
+    cursor = start
+    for match in matches:
+        if match.end() <= start or match.start() >= end:
+            continue
+        m_start, m_end = max(match.start(), start), min(match.end(), end)
+        parts.append(html.escape(content[cursor:m_start]))
+        parts.append(f"<mark>{html.escape(content[m_start:m_end])}</mark>")
+        cursor = m_end
+    parts.append(html.escape(content[cursor:end]))
+    parts.append("…" if end < len(content) else "")
+    return "".join(parts)
+
+
+class LogSearchService:
+    """Consulta o índice FTS5 dos logs de um database."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def ensure_index(self) -> None:
+        """Cria o índice em databases antigos e indexa os logs existentes (uma vez)."""
+        bind = self.db.get_bind()
+        key = str(bind.url)
+        if key in _ready:
+            return
+
+        # Os snippets buscam linhas por (execution_id, sequence)
+        await self.db.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_execution_logs_execution ON execution_logs(execution_id, sequence)"
+        ))
+        exists = await self.db.execute(
+            text("SELECT 1 FROM sqlite_master WHERE name = 'execution_logs_fts'")
+        )
+        if exists.first() is None:
+            for statement in EXECUTION_LOG_SEARCH_DDL[:3]:
+                await self.db.execute(text(statement))
+            await self._backfill()
+            # Os triggers só depois do backfill, para não indexar duas vezes
+            for statement in EXECUTION_LOG_SEARCH_DDL[3:]:
+                await self.db.execute(text(statement))
+        await self.db.commit()
+        _ready.add(key)
+
+    async def _backfill(self) -> None:
+        archives = await self.db.execute(select(ExecutionLogArchive))
+        for archive in archives.scalars().all():
+            rows = unpack_logs(archive.data, archive.seq_index, archive.codec)
+            for sequence, timestamp, log_type, content in rows:
+                await self._index_line(archive.execution_id, sequence, log_type, timestamp, content)
+
+        hot = await self.db.execute(
+            select(ExecutionLog).order_by(ExecutionLog.timestamp, ExecutionLog.execution_id, ExecutionLog.sequence)
+        )
+        for log in hot.scalars().all():
+            await self._index_line(log.execution_id, log.sequence, log.type, log.timestamp, log.content)
+
+    async def _index_line(self, execution_id, sequence, log_type, timestamp, content) -> None:
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.isoformat(sep=" ")
+        elif timestamp:
+            timestamp = timestamp.replace("T", " ", 1)  # ISO do arquivo
+        result = await self.db.execute(
+            text(
+                "INSERT INTO execution_log_search_rows (execution_id, sequence, type, timestamp) "
+                "VALUES (:execution_id, :sequence, :type, :timestamp)"
+            ),
+            {"execution_id": execution_id, "sequence": sequence, "type": log_type, "timestamp": timestamp},
+        )
+        await self.db.execute(
+            text("INSERT INTO execution_logs_fts (rowid, content) VALUES (:rowid, :content)"),
+            {"rowid": result.lastrowid, "content": content or ""},
+        )
+
+    async def search(
+        self,
+        query: str,
+        card_id: Optional[str] = None,
+        command: Optional[str] = None,
+        log_type: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 50,
+        cursor: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Busca linhas de log, das mais recentes para as mais antigas.
+
+        Raises:
+            ValueError: Se a busca não tem nenhum termo pesquisável
+        """
+        match, terms = parse_query(query)
+        if match is None:
+            raise ValueError("Search query has no searchable terms")
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        conditions = ["execution_logs_fts MATCH :match"]
+        params: Dict[str, Any] = {"match": match, "limit": limit + 1}
+        if cursor is not None:
+            conditions.append("f.rowid < :cursor")
+            params["cursor"] = cursor
+        if card_id:
+            conditions.append("e.card_id = :card_id")
+            params["card_id"] = card_id
+        if command:
+            conditions.append("e.command = :command")
+            params["command"] = command
+        if log_type:
+            conditions.append("r.type = :log_type")
+            params["log_type"] = log_type
+        # Mesmo formato texto em que o SQLAlchemy grava DateTime no SQLite
+        if since:
+            conditions.append("r.timestamp >= :since")
+            params["since"] = since.isoformat(sep=" ")
+        if until:
+            conditions.append("r.timestamp < :until")
+            params["until"] = until.isoformat(sep=" ")
+
+        result = await self.db.execute(
+            text(
+                "SELECT f.rowid, r.execution_id, r.sequence, r.type, r.timestamp, e.card_id, e.command "
+                "FROM execution_logs_fts f "
+                "JOIN execution_log_search_rows r ON r.id = f.rowid "
+                "JOIN executions e ON e.id = r.execution_id "
+                f"WHERE {' AND '.join(conditions)} "
+                "ORDER BY f.rowid DESC LIMIT :limit"
+            ),
+            params,
+        )
+        rows = result.all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        contents = await self._load_contents(rows)
+        results = [
+            {
+                "id": row.rowid,
+                "executionId": row.execution_id,
+                "cardId": row.card_id,
+                "command": row.command,
+                "type": row.type,
+                "timestamp": str(row.timestamp).replace(" ", "T") if row.timestamp else None,
+                "sequence": row.sequence,
+                "snippet": make_snippet(contents.get((row.execution_id, row.sequence), ""), terms),
+            }
+            for row in rows
+        ]
+        return {
+            "results": results,
+            "nextCursor": rows[-1].rowid if has_more else None,
+        }
+
+    async def _load_contents(self, rows) -> Dict[Tuple[str, int], str]:
+        """Texto das linhas da página: das linhas quentes ou do arquivo comprimido."""
+        wanted: Dict[str, Set[int]] = {}
+        for row in rows:
+            wanted.setdefault(row.execution_id, set()).add(row.sequence)
+
+        contents: Dict[Tuple[str, int], str] = {}
+        for execution_id, sequences in wanted.items():
+            for sequence, content in (await self._execution_contents(execution_id, sequences)).items():
+                contents[(execution_id, sequence)] = content
+        return contents
+
+    async def _execution_contents(self, execution_id: str, sequences: Optional[Set[int]] = None) -> Dict[int, str]:
+        """Texto das linhas de uma execução (todas, se `sequences` é None), quentes ou arquivadas."""
+        query = select(ExecutionLog.sequence, ExecutionLog.content).where(ExecutionLog.execution_id == execution_id)
+        if sequences is not None:
+            query = query.where(ExecutionLog.sequence.in_(sequences))
+        contents = {sequence: content or "" for sequence, content in (await self.db.execute(query)).all()}
+
+        if sequences is None or sequences - contents.keys():
+            archive = await self.db.get(ExecutionLogArchive, execution_id)
+            if archive is not None:
+                # Descomprime só a partir do bloco da menor sequence pedida
+                after_seq = min(sequences - contents.keys()) - 1 if sequences is not None else -1
+                for sequence, _, _, content in unpack_logs(
+                    archive.data, archive.seq_index, archive.codec, after_seq=after_seq
+                ):
+                    if sequence not in contents and (sequences is None or sequence in sequences):
+                        contents[sequence] = content
+        return contents
+
+    # ==================== MANUTENÇÃO ====================
+
+    async def _index_exists(self) -> bool:
+        result = await self.db.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'execution_logs_fts'"))
+        return result.first() is not None
+
+    async def remove_executions(self, execution_ids: Iterable[str]) -> int:
+        """
+        Tira do índice as linhas das execuções; chamar antes de apagá-las.
+
+        Linhas cujo texto não é encontrado ficam órfãs no índice (um 'delete'
+        com texto diferente do indexado corromperia o índice) e saem no reindex.
+
+        Returns:
+            Número de linhas removidas do índice
+        """
+        if not await self._index_exists():
+            return 0
+
+        removed = 0
+        for execution_id in execution_ids:
+            result = await self.db.execute(
+                text("SELECT id, sequence FROM execution_log_search_rows WHERE execution_id = :execution_id"),
+                {"execution_id": execution_id},
+            )
+            rows = result.all()
+            if not rows:
+                continue
+            contents = await self._execution_contents(execution_id)
+            params = [
+                {"rowid": rowid, "content": contents[sequence]}
+                for rowid, sequence in rows
+                if sequence in contents
+            ]
+            if params:
+                await self.db.execute(
+                    text(
+                        "INSERT INTO execution_logs_fts (execution_logs_fts, rowid, content) "
+                        "VALUES ('delete', :rowid, :content)"
+                    ),
+                    params,
+                )
+            await self.db.execute(
+                text("DELETE FROM execution_log_search_rows WHERE execution_id = :execution_id"),
+                {"execution_id": execution_id},
+            )
+            removed += len(params)
+        return removed
+
+    async def reindex_if_orphaned(self) -> Dict[str, int]:
+        """
+        Recria o índice quando há termos sem linha em execution_log_search_rows.
+
+        O FTS5 não aceita 'rebuild' em tabela contentless: o índice é apagado
+        e refeito a partir das linhas mapeadas, com os mesmos rowids (cursores
+        de paginação continuam válidos).
+        """
+        if not await self._index_exists():
+            return {"orphaned": 0, "reindexed": 0}
+
+        indexed = (await self.db.execute(text("SELECT count(*) FROM execution_logs_fts"))).scalar_one()
+        mapped = (await self.db.execute(text("SELECT count(*) FROM execution_log_search_rows"))).scalar_one()
+        orphaned = indexed - mapped
+        if orphaned <= 0:
+            return {"orphaned": 0, "reindexed": 0}
+
+        await self.db.execute(text("DROP TABLE execution_logs_fts"))
+        await self.db.execute(text(EXECUTION_LOG_SEARCH_DDL[0]))
+        result = await self.db.execute(text("SELECT DISTINCT execution_id FROM execution_log_search_rows"))
+        reindexed = 0
+        for (execution_id,) in result.all():
+            rows = await self.db.execute(
+                text("SELECT id, sequence FROM execution_log_search_rows WHERE execution_id = :execution_id"),
+                {"execution_id": execution_id},
+            )
+            contents = await self._execution_contents(execution_id)
+            params = [{"rowid": rowid, "content": contents.get(sequence, "")} for rowid, sequence in rows.all()]
+            if params:
+                await self.db.execute(
+                    text("INSERT INTO execution_logs_fts (rowid, content) VALUES (:rowid, :content)"), params
+                )
+            reindexed += len(params)
+        await self.db.commit()
+        return {"orphaned": orphaned, "reindexed": reindexed}
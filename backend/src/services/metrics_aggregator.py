@@ -2,13 +2,20 @@
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_, desc
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Set
 from datetime import datetime, timedelta, date
 from decimal import Decimal
 import statistics
+import weakref
 
-from ..models.metrics import ExecutionMetrics
+from ..models.metrics import ExecutionMetrics, ProjectMetrics
 from ..repositories.metrics_repository import MetricsRepository
+from .metrics_rollup_service import MetricsRollupService, bucket_start_for
+
+
+# Projetos com sketches de duração já conferidos por engine neste processo;
+# depois disso o MetricsCollector mantém os sketches em dia
+_sketches_verified: "weakref.WeakKeyDictionary[Any, Set[str]]" = weakref.WeakKeyDictionary()
 
 
 class MetricsAggregator:
@@ -23,6 +30,42 @@ class MetricsAggregator:
         start_datetime = datetime.combine(target_date, datetime.min.time())
         end_datetime = start_datetime + timedelta(days=1)
 
+        rollups = MetricsRollupService(self.db)
+
+        # Dias já compactados em buckets diários não têm mais resolução horária
+        if rollups.granularity_for(start_datetime) != "hour":
+            return await self._aggregate_hourly_from_raw(project_id, start_datetime, end_datetime)
+
+        await rollups.ensure_rollups(project_id)
+
+        query = select(
+            ProjectMetrics.metrics_hour.label('hour'),
+            func.sum(ProjectMetrics.execution_count).label('execution_count'),
+            func.sum(ProjectMetrics.total_tokens).label('total_tokens'),
+            func.sum(ProjectMetrics.total_cost_usd).label('total_cost'),
+            (
+                func.sum(ProjectMetrics.total_execution_time_ms) * 1.0
+                / func.nullif(func.sum(ProjectMetrics.execution_count), 0)
+            ).label('avg_duration')
+        ).where(
+            and_(
+                ProjectMetrics.project_id == project_id,
+                ProjectMetrics.granularity == "hour",
+                ProjectMetrics.bucket_start >= start_datetime,
+                ProjectMetrics.bucket_start < end_datetime
+            )
+        ).group_by(ProjectMetrics.metrics_hour).order_by(ProjectMetrics.metrics_hour)
+
+        result = await self.db.execute(query)
+        return self._format_hourly_rows(result.all())
+
+    async def _aggregate_hourly_from_raw(
+        self,
+        project_id: str,
+        start_datetime: datetime,
+        end_datetime: datetime
+    ) -> List[Dict[str, Any]]:
+        """Agregação horária direto de execution_metrics (dias fora da retenção)."""
         query = select(
             func.extract('hour', ExecutionMetrics.started_at).label('hour'),
             func.count(ExecutionMetrics.id).label('execution_count'),
@@ -38,8 +81,10 @@ class MetricsAggregator:
         ).group_by('hour').order_by('hour')
 
         result = await self.db.execute(query)
-        rows = result.all()
+        return self._format_hourly_rows(result.all())
 
+    @staticmethod
+    def _format_hourly_rows(rows) -> List[Dict[str, Any]]:
         return [
             {
                 "hour": int(row.hour),
@@ -58,23 +103,30 @@ class MetricsAggregator:
     ) -> Dict[str, Any]:
         """Calcula tendências de uso de tokens."""
         end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=days)
+        start_date = bucket_start_for(end_date - timedelta(days=days), "day")
+
+        await MetricsRollupService(self.db).ensure_rollups(project_id)
 
-        # Buscar dados diários
+        # Buscar dados diários (rollups)
         query = select(
-            func.date(ExecutionMetrics.started_at).label('date'),
-            func.sum(ExecutionMetrics.total_tokens).label('total_tokens')
+            func.date(ProjectMetrics.bucket_start).label('date'),
+            func.sum(ProjectMetrics.total_tokens).label('total_tokens')
         ).where(
             and_(
-                ExecutionMetrics.project_id == project_id,
-                ExecutionMetrics.started_at >= start_date
+                ProjectMetrics.project_id == project_id,
+                ProjectMetrics.bucket_start >= start_date
             )
         ).group_by('date').order_by('date')
 
         result = await self.db.execute(query)
-        rows = result.all()
+        return self.summarize_daily_tokens(
+            [(row.date, row.total_tokens or 0) for row in result.all()]
+        )
 
-        if not rows:
+    @staticmethod
+    def summarize_daily_tokens(daily: List[tuple]) -> Dict[str, Any]:
+        """Média móvel, pico, tendência e projeção a partir de (data, tokens) por dia."""
+        if not daily:
             return {
                 "movingAverage": 0,
                 "peakUsage": {"date": None, "tokens": 0},
@@ -83,14 +135,14 @@ class MetricsAggregator:
             }
 
         # Calcular média móvel
-        token_values = [row.total_tokens or 0 for row in rows]
+        token_values = [tokens for _, tokens in daily]
         moving_avg = statistics.mean(token_values) if token_values else 0
 
         # Identificar pico de uso
-        peak_row = max(rows, key=lambda r: r.total_tokens or 0)
+        peak_date, peak_tokens = max(daily, key=lambda day: day[1])
         peak_usage = {
-            "date": peak_row.date if peak_row.date else None,
-            "tokens": peak_row.total_tokens or 0
+            "date": peak_date if peak_date else None,
+            "tokens": peak_tokens
         }
 
         # Calcular tendência (comparação primeira vs última metade)
@@ -113,10 +165,10 @@ class MetricsAggregator:
             "projection": projection,
             "dailyData": [
                 {
-                    "date": row.date if row.date else None,
-                    "tokens": row.total_tokens or 0
+                    "date": day if day else None,
+                    "tokens": tokens
                 }
-                for row in rows
+                for day, tokens in daily
             ]
         }
 
@@ -125,18 +177,18 @@ class MetricsAggregator:
         project_id: str,
         command: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Analisa performance de execuções."""
-        query = select(ExecutionMetrics.duration_ms).where(
-            ExecutionMetrics.project_id == project_id
-        )
-
-        if command:
-            query = query.where(ExecutionMetrics.command == command)
-
-        result = await self.db.execute(query)
-        durations = [row[0] for row in result.all() if row[0] is not None]
-
-        if not durations:
+        """
+        Analisa performance de execuções.
+
+        Percentis, média e desvio padrão vêm dos sketches de duração
+        persistidos (DDSketch, erro relativo de 1%), sem carregar as
+        durações brutas. Se os sketches estiverem defasados em relação às
+        métricas (dados antigos ou backfill), são reconstruídos uma vez.
+        """
+        await self._ensure_duration_sketches(project_id)
+        sketch = await self.repo.get_duration_sketch(project_id, command)
+
+        if sketch.count == 0:
             return {
                 "p50": 0,
                 "p95": 0,
@@ -149,37 +201,34 @@ class MetricsAggregator:
                 "outlierThreshold": 0
             }
 
-        durations_sorted = sorted(durations)
-        count = len(durations_sorted)
-
-        # Calcular percentis
-        p50_index = int(count * 0.50)
-        p95_index = int(count * 0.95)
-        p99_index = int(count * 0.99)
-
-        p50 = durations_sorted[p50_index] if p50_index < count else durations_sorted[-1]
-        p95 = durations_sorted[p95_index] if p95_index < count else durations_sorted[-1]
-        p99 = durations_sorted[p99_index] if p99_index < count else durations_sorted[-1]
-
-        mean = statistics.mean(durations)
-        std_dev = statistics.stdev(durations) if len(durations) > 1 else 0
+        mean = sketch.mean
+        std_dev = sketch.stdev
 
         # Identificar outliers (valores > 2 desvios padrão da média)
         outlier_threshold = mean + (2 * std_dev)
-        outliers = [d for d in durations if d > outlier_threshold]
 
         return {
-            "p50": int(p50),
-            "p95": int(p95),
-            "p99": int(p99),
+            "p50": int(sketch.quantile(0.50)),
+            "p95": int(sketch.quantile(0.95)),
+            "p99": int(sketch.quantile(0.99)),
             "mean": int(mean),
-            "min": min(durations),
-            "max": max(durations),
+            "min": int(sketch.min),
+            "max": int(sketch.max),
             "stdDev": int(std_dev),
-            "outlierCount": len(outliers),
+            "outlierCount": sketch.count_above(outlier_threshold),
             "outlierThreshold": int(outlier_threshold)
         }
 
+    async def _ensure_duration_sketches(self, project_id: str) -> None:
+        """Confere os sketches do projeto uma vez por engine neste processo."""
+        verified = _sketches_verified.setdefault(self.db.get_bind(), set())
+        if project_id in verified:
+            return
+        counts = await self.repo.count_sketched_durations(project_id)
+        if counts["sketched"] != counts["total"]:
+            await self.repo.rebuild_duration_sketches(project_id)
+        verified.add(project_id)
+
     async def calculate_roi_metrics(self, project_id: str) -> Dict[str, Any]:
         """Calcula métricas de ROI."""
         # Buscar métricas agregadas
@@ -1,12 +1,26 @@
 """Serviço de coleta automática de métricas."""
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
+from sqlalchemy import select, insert, exists, func, and_, cast, literal, literal_column, Integer, DateTime
+from typing import Optional, Callable, Awaitable, Dict
 from datetime import datetime
 from decimal import Decimal
 
-from ..models.execution import Execution
+from ..models.execution import Execution, ExecutionStatus
+from ..models.metrics import ExecutionMetrics, MetricsBackfillCheckpoint
 from ..repositories.metrics_repository import MetricsRepository
+from .metrics_rollup_service import MetricsRollupService
+
+
+BACKFILL_CHUNK_SIZE = 5000
+
+# UUID v4 gerado no SQLite, no mesmo formato de str(uuid.uuid4())
+_UUID4_SQL = (
+    "lower(hex(randomblob(4))) || '-' || lower(hex(randomblob(2))) || '-4' || "
+    "substr(lower(hex(randomblob(2))), 2) || '-' || "
+    "substr('89ab', 1 + (abs(random()) % 4), 1) || "
+    "substr(lower(hex(randomblob(2))), 2) || '-' || lower(hex(randomblob(6)))"
+)
 
 
 class MetricsCollector:
@@ -63,6 +77,29 @@ class MetricsCollector:
             error_message=execution.workflow_error
         )
 
+        # Atualizar sketch de duração (percentis em O(1) no dashboard)
+        await self.repo.add_duration_to_sketch(
+            project_id=project_id,
+            command=execution.command or "",
+            model_used=execution.model_used or "unknown",
+            bucket_date=execution.started_at.date(),
+            duration_ms=duration_ms
+        )
+
+        # Somar ao bucket horário de project_metrics (rollups do dashboard)
+        await MetricsRollupService(self.db).record_execution(
+            project_id=project_id,
+            command=execution.command or "",
+            model_used=execution.model_used or "unknown",
+            started_at=execution.started_at,
+            duration_ms=duration_ms,
+            input_tokens=execution.input_tokens or 0,
+            output_tokens=execution.output_tokens or 0,
+            total_tokens=execution.total_tokens or 0,
+            estimated_cost_usd=execution.execution_cost or Decimal(0),
+            status=status
+        )
+
     async def collect_batch(
         self,
         executions: list[Execution],
@@ -91,48 +128,148 @@ class MetricsCollector:
 
         return collected_count
 
+    def _pending_executions_filter(
+        self,
+        start_date: Optional[datetime] = None
+    ):
+        """Condições de execuções finalizadas que ainda não têm métrica (anti-join)."""
+        conditions = [
+            Execution.status.in_([ExecutionStatus.SUCCESS, ExecutionStatus.ERROR]),
+            Execution.started_at.isnot(None),
+            Execution.completed_at.isnot(None),
+            ~exists().where(ExecutionMetrics.execution_id == Execution.id),
+        ]
+
+        if start_date:
+            conditions.append(Execution.started_at >= start_date)
+
+        return and_(*conditions)
+
+    async def count_pending_backfill(
+        self,
+        start_date: Optional[datetime] = None
+    ) -> int:
+        """Conta execuções que o backfill inseriria (dry-run)."""
+        result = await self.db.execute(
+            select(func.count()).select_from(Execution).where(
+                self._pending_executions_filter(start_date)
+            )
+        )
+        return result.scalar() or 0
+
     async def backfill_metrics(
         self,
         project_id: str,
-        start_date: Optional[datetime] = None
+        start_date: Optional[datetime] = None,
+        chunk_size: int = BACKFILL_CHUNK_SIZE,
+        dry_run: bool = False,
+        progress_callback: Optional[Callable[[Dict[str, int]], Awaitable[None]]] = None
     ) -> int:
         """
         Preenche métricas retroativamente para execuções existentes.
 
+        Cada chunk é um único INSERT ... SELECT ... WHERE NOT EXISTS sobre uma
+        faixa de rowid de `executions`, feito no próprio SQLite. O rowid do
+        último chunk é salvo em `metrics_backfill_checkpoints` na mesma
+        transação, então um backfill interrompido continua de onde parou.
+
         Args:
             project_id: ID do projeto
             start_date: Data inicial para backfill (opcional)
+            chunk_size: Número de execuções varridas por transação
+            dry_run: Apenas conta as execuções pendentes, sem inserir
+            progress_callback: Chamado após cada chunk com o progresso
 
         Returns:
-            Número de métricas criadas
+            Número de métricas criadas (ou pendentes, em dry-run)
         """
-        from sqlalchemy import select
-        from ..models.execution import Execution, ExecutionStatus
-        from ..models.metrics import ExecutionMetrics
+        total_pending = await self.count_pending_backfill(start_date)
+        if dry_run or total_pending == 0:
+            return total_pending
 
-        # Buscar execuções que ainda não têm métricas
-        query = select(Execution).where(
-            Execution.status.in_([ExecutionStatus.SUCCESS, ExecutionStatus.ERROR])
-        )
+        checkpoint = await self.db.get(MetricsBackfillCheckpoint, project_id)
+        if checkpoint is None:
+            checkpoint = MetricsBackfillCheckpoint(
+                project_id=project_id,
+                last_rowid=0,
+                inserted_count=0,
+                started_at=datetime.utcnow()
+            )
+            self.db.add(checkpoint)
+        else:
+            print(f"[MetricsCollector] Retomando backfill a partir do rowid {checkpoint.last_rowid}")
 
-        if start_date:
-            query = query.where(Execution.started_at >= start_date)
+        executions_rowid = literal_column("executions.rowid")
+        max_rowid = (await self.db.execute(select(func.max(executions_rowid)).select_from(Execution))).scalar() or 0
+        inserted_total = 0
 
-        result = await self.db.execute(query)
-        executions = result.scalars().all()
+        while checkpoint.last_rowid < max_rowid:
+            lower = checkpoint.last_rowid
+            upper = min(lower + chunk_size, max_rowid)
 
-        # Filtrar apenas execuções que ainda não têm métricas
-        executions_to_process = []
-        for execution in executions:
-            # Verificar se já existe métrica
-            check_query = select(ExecutionMetrics).where(
-                ExecutionMetrics.execution_id == execution.id
+            source = select(
+                literal_column(_UUID4_SQL),
+                Execution.id,
+                Execution.card_id,
+                literal(project_id),
+                func.coalesce(Execution.command, ""),
+                func.coalesce(Execution.model_used, "unknown"),
+                Execution.started_at,
+                Execution.completed_at,
+                cast(
+                    func.round(
+                        (func.julianday(Execution.completed_at) - func.julianday(Execution.started_at)) * 86400000
+                    ),
+                    Integer
+                ),
+                func.coalesce(Execution.input_tokens, 0),
+                func.coalesce(Execution.output_tokens, 0),
+                func.coalesce(Execution.total_tokens, 0),
+                func.coalesce(Execution.execution_cost, 0),
+                Execution.status,
+                Execution.workflow_error,
+                literal(datetime.utcnow(), DateTime),
+            ).where(
+                and_(
+                    executions_rowid > lower,
+                    executions_rowid <= upper,
+                    self._pending_executions_filter(start_date)
+                )
             )
-            check_result = await self.db.execute(check_query)
-            existing = check_result.scalar_one_or_none()
 
-            if not existing:
-                executions_to_process.append(execution)
+            result = await self.db.execute(
+                insert(ExecutionMetrics).from_select(
+                    [
+                        "id", "execution_id", "card_id", "project_id", "command",
+                        "model_used", "started_at", "completed_at", "duration_ms",
+                        "input_tokens", "output_tokens", "total_tokens",
+                        "estimated_cost_usd", "status", "error_message", "created_at",
+                    ],
+                    source
+                )
+            )
+
+            inserted_total += max(result.rowcount, 0)
+            checkpoint.last_rowid = upper
+            checkpoint.inserted_count = (checkpoint.inserted_count or 0) + max(result.rowcount, 0)
+            checkpoint.updated_at = datetime.utcnow()
+            await self.db.commit()
+
+            if progress_callback:
+                await progress_callback({
+                    "scannedRowid": upper,
+                    "maxRowid": max_rowid,
+                    "inserted": inserted_total,
+                    "pending": total_pending,
+                })
+
+        # Backfill completo: o próximo recomeça do início
+        await self.db.delete(checkpoint)
+        await self.db.commit()
+
+        if inserted_total:
+            # Sketches e rollups derivados são reconstruídos de forma agregada
+            await self.repo.rebuild_duration_sketches(project_id)
+            await MetricsRollupService(self.db).rebuild(project_id)
 
-        # Processar em batch
-        return await self.collect_batch(executions_to_process, project_id)
+        return inserted_total
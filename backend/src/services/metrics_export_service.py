@@ -0,0 +1,576 @@
+"""
+Exportação colunar de métricas para análise offline.
+
+Copia `execution_metrics`, `executions` e `activity_logs` de cada database
+para arquivos Parquet particionados por projeto/mês (layout Hive):
+
+    <export_dir>/<tabela>/project_id=<id>/month=YYYY-MM/part-*.parquet
+
+A exportação é incremental: cada database guarda em `_watermarks.json` o
+último rowid exportado (ou `completed_at`, no caso de `executions`, que só
+são exportadas depois de finalizadas). Os arquivos de um chunk recebem o
+nome da sua posição inicial, então repetir um chunk interrompido sobrescreve
+os mesmos arquivos em vez de duplicar linhas.
+
+`MetricsAnalytics` executa as agregações do `MetricsAggregator` de forma
+vetorizada (Arrow/NumPy) sobre esses arquivos, para vários projetos de uma
+vez, sem tocar nos SQLite em uso.
+"""
+
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime, date, timedelta
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Table, and_, literal_column, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config.settings import get_settings
+from ..models.activity_log import ActivityLog
+from ..models.execution import Execution
+from ..models.metrics import ExecutionMetrics
+from .metrics_aggregator import MetricsAggregator
+
+EXPORT_CHUNK_SIZE = 50_000
+WATERMARKS_FILE = "_watermarks.json"
+UNKNOWN_MONTH = "unknown"
+
+
+def _pa():
+    """Importa pyarrow sob demanda (dependência pesada, só usada aqui)."""
+    import pyarrow
+    import pyarrow.compute  # noqa: F401
+    import pyarrow.dataset  # noqa: F401
+    import pyarrow.parquet  # noqa: F401
+
+    return pyarrow
+
+
+@dataclass(frozen=True)
+class ExportTable:
+    """Descrição de uma tabela exportada."""
+
+    name: str
+    table: Table
+    columns: Tuple[Tuple[str, str], ...]  # (coluna, tipo arrow)
+    month_column: str
+    project_column: Optional[str] = None  # None: usa o id do database de origem
+    completed_only: bool = False  # watermark por (completed_at, rowid)
+
+
+EXPORT_TABLES: Tuple[ExportTable, ...] = (
+    ExportTable(
+        name="execution_metrics",
+        table=ExecutionMetrics.__table__,
+        columns=(
+            ("id", "string"),
+            ("execution_id", "string"),
+            ("card_id", "string"),
+            ("project_id", "string"),
+            ("command", "string"),
+            ("model_used", "string"),
+            ("started_at", "timestamp"),
+            ("completed_at", "timestamp"),
+            ("duration_ms", "int64"),
+            ("input_tokens", "int64"),
+            ("output_tokens", "int64"),
+            ("total_tokens", "int64"),
+            ("estimated_cost_usd", "float64"),
+            ("status", "string"),
+        ),
+        month_column="started_at",
+        project_column="project_id",
+    ),
+    ExportTable(
+        name="executions",
+        table=Execution.__table__,
+        columns=(
+            ("id", "string"),
+            ("card_id", "string"),
+            ("status", "string"),
+            ("command", "string"),
+            ("started_at", "timestamp"),
+            ("completed_at", "timestamp"),
+            ("duration", "int64"),
+            ("workflow_stage", "string"),
+            ("input_tokens", "int64"),
+            ("output_tokens", "int64"),
+            ("total_tokens", "int64"),
+            ("model_used", "string"),
+            ("execution_cost", "float64"),
+        ),
+        month_column="started_at",
+        completed_only=True,
+    ),
+    ExportTable(
+        name="activity_logs",
+        table=ActivityLog.__table__,
+        columns=(
+            ("id", "string"),
+            ("card_id", "string"),
+            ("activity_type", "string"),
+            ("timestamp", "timestamp"),
+            ("from_column", "string"),
+            ("to_column", "string"),
+            ("user_id", "string"),
+        ),
+        month_column="timestamp",
+    ),
+)
+
+
+def _arrow_type(pa, name: str):
+    return {
+        "string": pa.string(),
+        "int64": pa.int64(),
+        "float64": pa.float64(),
+        "timestamp": pa.timestamp("us"),
+    }[name]
+
+
+def _to_plain(values: Sequence[Any], arrow_type: str) -> List[Any]:
+    """Converte Decimal/Enum do SQLAlchemy para tipos aceitos pelo Arrow."""
+    if arrow_type == "float64":
+        return [float(v) if v is not None else None for v in values]
+    if arrow_type == "string":
+        return [v.value if isinstance(v, Enum) else v for v in values]
+    return list(values)
+
+
+def get_export_dir() -> Path:
+    """Diretório raiz da exportação colunar."""
+    return Path(get_settings().metrics_export_dir)
+
+
+class MetricsExportService:
+    """Exporta as tabelas de métricas de um database para Parquet."""
+
+    def __init__(self, db: AsyncSession, source_id: str, export_dir: Optional[Path] = None):
+        self.db = db
+        self.source_id = source_id
+        self.export_dir = Path(export_dir) if export_dir else get_export_dir()
+
+    # ------------------------------------------------------------------
+    # High-water marks
+    # ------------------------------------------------------------------
+
+    def _watermarks_path(self) -> Path:
+        return self.export_dir / WATERMARKS_FILE
+
+    def load_watermarks(self) -> Dict[str, Dict[str, Any]]:
+        """Watermarks deste database, por tabela."""
+        path = self._watermarks_path()
+        if not path.exists():
+            return {}
+        return json.loads(path.read_text()).get(self.source_id, {})
+
+    def _save_watermark(self, table_name: str, mark: Dict[str, Any]) -> None:
+        path = self._watermarks_path()
+        data = json.loads(path.read_text()) if path.exists() else {}
+        data.setdefault(self.source_id, {})[table_name] = mark
+
+        # Escrita atômica: um crash nunca deixa o arquivo pela metade
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(data, indent=2, sort_keys=True))
+        os.replace(tmp_path, path)
+
+    # ------------------------------------------------------------------
+    # Exportação
+    # ------------------------------------------------------------------
+
+    def _chunk_query(self, spec: ExportTable, mark: Dict[str, Any], chunk_size: int):
+        rowid = literal_column(f"{spec.table.name}.rowid")
+        columns = [spec.table.c[name] for name, _ in spec.columns]
+        last_rowid = mark.get("rowid", 0)
+
+        query = select(rowid.label("_rowid"), *columns)
+
+        if spec.completed_only:
+            completed_at = spec.table.c.completed_at
+            query = query.where(completed_at.is_not(None)).order_by(completed_at, rowid)
+            if mark.get("completed_at"):
+                last_completed = datetime.fromisoformat(mark["completed_at"])
+                query = query.where(or_(
+                    completed_at > last_completed,
+                    and_(completed_at == last_completed, rowid > last_rowid),
+                ))
+        else:
+            query = query.where(rowid > last_rowid).order_by(rowid)
+
+        return query.limit(chunk_size)
+
+    def _write_chunk(self, spec: ExportTable, rows: List[Any], part_name: str) -> None:
+        pa = _pa()
+
+        fields = []
+        arrays = []
+        for index, (name, arrow_type) in enumerate(spec.columns, start=1):
+            values = _to_plain([row[index] for row in rows], arrow_type)
+            fields.append(pa.field(name, _arrow_type(pa, arrow_type)))
+            arrays.append(pa.array(values, type=fields[-1].type))
+
+        table = pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+        month = pa.compute.strftime(table[spec.month_column], format="%Y-%m")
+        month = pa.compute.fill_null(month, UNKNOWN_MONTH)
+        if spec.project_column:
+            project = pa.compute.fill_null(table[spec.project_column], self.source_id)
+            table = table.drop_columns([spec.project_column])
+        else:
+            project = pa.array([self.source_id] * len(rows), type=pa.string())
+        table = table.append_column("project_id", project).append_column("month", month)
+
+        pa.parquet.write_to_dataset(
+            table,
+            root_path=str(self.export_dir / spec.name),
+            partition_cols=["project_id", "month"],
+            basename_template=f"part-{part_name}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+
+    async def export_table(
+        self,
+        spec: ExportTable,
+        chunk_size: int = EXPORT_CHUNK_SIZE,
+        progress_callback: Optional[Callable] = None,
+    ) -> int:
+        """Exporta as linhas novas de uma tabela. Retorna quantas foram escritas."""
+        mark = dict(self.load_watermarks().get(spec.name, {}))
+        exported = 0
+
+        while True:
+            rows = (await self.db.execute(self._chunk_query(spec, mark, chunk_size))).all()
+            if not rows:
+                break
+
+            start_key = mark.get("completed_at", "").replace(":", "") + f"r{mark.get('rowid', 0)}"
+            self._write_chunk(spec, rows, f"{self.source_id}-{start_key}")
+
+            last = rows[-1]
+            mark["rowid"] = last._rowid
+            if spec.completed_only:
+                mark["completed_at"] = last.completed_at.isoformat()
+            mark["exportedAt"] = datetime.utcnow().isoformat()
+            self._save_watermark(spec.name, mark)
+
+            exported += len(rows)
+            if progress_callback:
+                await progress_callback({"table": spec.name, "exported": exported})
+
+            if len(rows) < chunk_size:
+                break
+
+        return exported
+
+    def compact_partitions(self, spec: ExportTable) -> int:
+        """
+        Junta os arquivos de cada partição em um só.
+
+        Cada exportação incremental cria arquivos novos; com o tempo, abrir
+        centenas de arquivos pequenos domina o tempo das consultas.
+        Retorna quantas partições foram compactadas.
+        """
+        pa = _pa()
+        root = self.export_dir / spec.name
+        if not root.exists():
+            return 0
+
+        compacted = 0
+        for partition in root.glob("project_id=*/month=*"):
+            parts = sorted(partition.glob("*.parquet"))
+            if len(parts) < 2:
+                continue
+
+            table = pa.concat_tables([pa.parquet.read_table(part, partitioning=None) for part in parts])
+            target = partition / f"compacted-{datetime.utcnow():%Y%m%dT%H%M%S%f}.parquet"
+            tmp_target = target.with_suffix(".tmp")
+            pa.parquet.write_table(table, tmp_target)
+            os.replace(tmp_target, target)
+            for part in parts:
+                part.unlink()
+            compacted += 1
+
+        return compacted
+
+    async def export(
+        self,
+        chunk_size: int = EXPORT_CHUNK_SIZE,
+        progress_callback: Optional[Callable] = None,
+    ) -> Dict[str, int]:
+        """Exporta todas as tabelas deste database e compacta as partições tocadas."""
+        self.export_dir.mkdir(parents=True, exist_ok=True)
+        results = {}
+        for spec in EXPORT_TABLES:
+            results[spec.name] = await self.export_table(spec, chunk_size, progress_callback)
+            if results[spec.name]:
+                self.compact_partitions(spec)
+        return results
+
+
+async def export_all_databases(export_dir: Optional[Path] = None) -> Dict[str, Dict[str, int]]:
+    """Exporta o database legado e todos os databases de projeto carregados."""
+    from ..database import async_session_maker
+    from ..database_manager import db_manager
+
+    sources = [("default", async_session_maker)] + list(db_manager.sessions.items())
+    results: Dict[str, Dict[str, int]] = {}
+
+    for source_id, session_factory in sources:
+        async with session_factory() as session:
+            results[source_id] = await MetricsExportService(session, source_id, export_dir).export()
+
+    return results
+
+
+class MetricsAnalytics:
+    """
+    Consultas vetorizadas sobre a exportação colunar.
+
+    Os métodos espelham o `MetricsAggregator`/`MetricsRepository` (mesmos
+    formatos de retorno), mas aceitam vários projetos e leem só as partições
+    necessárias (poda por project_id/mês).
+    """
+
+    def __init__(self, export_dir: Optional[Path] = None):
+        self.export_dir = Path(export_dir) if export_dir else get_export_dir()
+
+    def load(
+        self,
+        table_name: str = "execution_metrics",
+        project_ids: Optional[Sequence[str]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        columns: Optional[List[str]] = None,
+    ):
+        """Carrega uma tabela exportada como `pyarrow.Table`, já filtrada."""
+        pa = _pa()
+        ds = pa.dataset
+        spec = next(s for s in EXPORT_TABLES if s.name == table_name)
+
+        path = self.export_dir / table_name
+        if not path.exists():
+            schema = pa.schema(
+                [pa.field(name, _arrow_type(pa, kind)) for name, kind in spec.columns
+                 if name != spec.project_column]
+                + [pa.field("project_id", pa.string()), pa.field("month", pa.string())]
+            )
+            empty = schema.empty_table()
+            return empty.select(columns) if columns else empty
+
+        dataset = ds.dataset(
+            str(path),
+            format="parquet",
+            partitioning=ds.partitioning(
+                pa.schema([("project_id", pa.string()), ("month", pa.string())]),
+                flavor="hive",
+            ),
+        )
+
+        timestamp = ds.field(spec.month_column)
+        month = ds.field("month")
+        expression = None
+
+        def add(condition):
+            nonlocal expression
+            expression = condition if expression is None else expression & condition
+
+        if project_ids:
+            add(ds.field("project_id").isin(list(project_ids)))
+        if start:
+            add((month >= start.strftime("%Y-%m")) & (timestamp >= pa.scalar(start, pa.timestamp("us"))))
+        if end:
+            add((month <= end.strftime("%Y-%m")) & (timestamp < pa.scalar(end, pa.timestamp("us"))))
+
+        return dataset.to_table(columns=columns, filter=expression)
+
+    def aggregated_metrics(
+        self,
+        project_ids: Optional[Sequence[str]] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> Dict[str, Any]:
+        """Equivalente a `MetricsRepository.get_aggregated_metrics` (intervalo fechado em dias)."""
+        pc = _pa().compute
+        start = datetime.combine(start_date, datetime.min.time()) if start_date else None
+        end = datetime.combine(end_date + timedelta(days=1), datetime.min.time()) if end_date else None
+
+        table = self.load(
+            project_ids=project_ids, start=start, end=end,
+            columns=["input_tokens", "output_tokens", "total_tokens", "estimated_cost_usd",
+                     "duration_ms", "status"],
+        )
+        return self._summarize(table, pc)
+
+    @staticmethod
+    def _summarize(table, pc) -> Dict[str, Any]:
+        total = table.num_rows
+        if total == 0:
+            return {
+                "totalInputTokens": 0,
+                "totalOutputTokens": 0,
+                "totalTokens": 0,
+                "totalCost": 0,
+                "avgExecutionTimeMs": 0,
+                "minExecutionTimeMs": 0,
+                "maxExecutionTimeMs": 0,
+                "totalExecutions": 0,
+                "successfulExecutions": 0,
+                "successRate": 0
+            }
+
+        def total_of(column):
+            return pc.sum(table[column]).as_py() or 0
+
+        durations = table["duration_ms"]
+        successful = pc.sum(pc.equal(table["status"], "success").cast("int64")).as_py() or 0
+
+        return {
+            "totalInputTokens": total_of("input_tokens"),
+            "totalOutputTokens": total_of("output_tokens"),
+            "totalTokens": total_of("total_tokens"),
+            "totalCost": float(total_of("estimated_cost_usd")),
+            "avgExecutionTimeMs": int(pc.mean(durations).as_py() or 0),
+            "minExecutionTimeMs": pc.min(durations).as_py() or 0,
+            "maxExecutionTimeMs": pc.max(durations).as_py() or 0,
+            "totalExecutions": total,
+            "successfulExecutions": successful,
+            "successRate": round(successful / total * 100, 2)
+        }
+
+    def by_project(
+        self,
+        project_ids: Optional[Sequence[str]] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> List[Dict[str, Any]]:
+        """Rollup multi-projeto: tokens, custo, duração e sucesso por projeto."""
+        pc = _pa().compute
+        start = datetime.combine(start_date, datetime.min.time()) if start_date else None
+        end = datetime.combine(end_date + timedelta(days=1), datetime.min.time()) if end_date else None
+
+        table = self.load(
+            project_ids=project_ids, start=start, end=end,
+            columns=["project_id", "total_tokens", "estimated_cost_usd", "duration_ms", "status"],
+        )
+        table = table.append_column("success", pc.equal(table["status"], "success").cast("int64"))
+        grouped = table.group_by("project_id").aggregate([
+            ("total_tokens", "sum"),
+            ("estimated_cost_usd", "sum"),
+            ("duration_ms", "mean"),
+            ("success", "sum"),
+            ("project_id", "count"),
+        ]).to_pylist()
+
+        return sorted(
+            (
+                {
+                    "projectId": row["project_id"],
+                    "totalExecutions": row["project_id_count"],
+                    "totalTokens": row["total_tokens_sum"] or 0,
+                    "totalCost": float(row["estimated_cost_usd_sum"] or 0),
+                    "avgExecutionTimeMs": int(row["duration_ms_mean"] or 0),
+                    "successRate": round(row["success_sum"] / row["project_id_count"] * 100, 2),
+                }
+                for row in grouped
+            ),
+            key=lambda row: row["totalCost"],
+            reverse=True,
+        )
+
+    def execution_performance(
+        self,
+        project_ids: Optional[Sequence[str]] = None,
+        command: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Equivalente a `MetricsAggregator.analyze_execution_performance`, com percentis exatos."""
+        import numpy as np
+
+        pc = _pa().compute
+        table = self.load(project_ids=project_ids, columns=["command", "duration_ms"])
+        if command:
+            table = table.filter(pc.equal(table["command"], command))
+
+        durations = table["duration_ms"].drop_null().to_numpy()
+        if durations.size == 0:
+            return {
+                "p50": 0,
+                "p95": 0,
+                "p99": 0,
+                "mean": 0,
+                "min": 0,
+                "max": 0,
+                "stdDev": 0,
+                "outlierCount": 0,
+                "outlierThreshold": 0
+            }
+
+        p50, p95, p99 = np.percentile(durations, [50, 95, 99])
+        mean = float(durations.mean())
+        std_dev = float(durations.std(ddof=1)) if durations.size > 1 else 0.0
+        outlier_threshold = mean + (2 * std_dev)
+
+        return {
+            "p50": int(p50),
+            "p95": int(p95),
+            "p99": int(p99),
+            "mean": int(mean),
+            "min": int(durations.min()),
+            "max": int(durations.max()),
+            "stdDev": int(std_dev),
+            "outlierCount": int((durations > outlier_threshold).sum()),
+            "outlierThreshold": int(outlier_threshold)
+        }
+
+    def token_trends(
+        self,
+        project_ids: Optional[Sequence[str]] = None,
+        days: int = 7,
+        now: Optional[datetime] = None,
+    ) -> Dict[str, Any]:
+        """Equivalente a `MetricsAggregator.calculate_token_trends`."""
+        pc = _pa().compute
+        end = now or datetime.utcnow()
+        start = datetime.combine((end - timedelta(days=days)).date(), datetime.min.time())
+
+        table = self.load(project_ids=project_ids, start=start, columns=["started_at", "total_tokens"])
+        table = table.append_column("date", pc.strftime(table["started_at"], format="%Y-%m-%d"))
+        daily = table.group_by("date").aggregate([("total_tokens", "sum")]).sort_by("date")
+
+        return MetricsAggregator.summarize_daily_tokens(list(zip(
+            daily["date"].to_pylist(),
+            [tokens or 0 for tokens in daily["total_tokens_sum"].to_pylist()],
+        )))
+
+    def hourly_metrics(
+        self,
+        target_date: date,
+        project_ids: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Equivalente a `MetricsAggregator.aggregate_hourly_metrics`."""
+        pc = _pa().compute
+        start = datetime.combine(target_date, datetime.min.time())
+        table = self.load(
+            project_ids=project_ids, start=start, end=start + timedelta(days=1),
+            columns=["started_at", "total_tokens", "estimated_cost_usd", "duration_ms"],
+        )
+        table = table.append_column("hour", pc.hour(table["started_at"]))
+        grouped = table.group_by("hour").aggregate([
+            ("hour", "count"),
+            ("total_tokens", "sum"),
+            ("estimated_cost_usd", "sum"),
+            ("duration_ms", "mean"),
+        ]).sort_by("hour").to_pylist()
+
+        return [
+            {
+                "hour": row["hour"],
+                "executionCount": row["hour_count"],
+                "totalTokens": row["total_tokens_sum"] or 0,
+                "totalCost": float(row["estimated_cost_usd_sum"] or 0),
+                "avgDuration": int(row["duration_ms_mean"] or 0),
+            }
+            for row in grouped
+        ]
@@ -0,0 +1,394 @@
+"""Serviço de rollups de métricas em buckets de tempo (hora/dia/semana).
+
+Cada execução finalizada é somada incrementalmente ao bucket horário
+correspondente em `project_metrics`. Um job em background compacta buckets
+horários em diários e diários em semanais após as janelas de retenção, de
+forma que o número de linhas por projeto fica limitado e as consultas do
+dashboard não dependem do tamanho do histórico em `execution_metrics`.
+"""
+
+import uuid
+import weakref
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select, func, and_, case, delete
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config.settings import get_settings
+from ..models.metrics import ProjectMetrics, ExecutionMetrics
+
+
+GRANULARITIES = ("hour", "day", "week")
+
+# Campos somáveis de um bucket
+_SUM_FIELDS = (
+    "execution_count",
+    "successful_executions",
+    "total_input_tokens",
+    "total_output_tokens",
+    "total_tokens",
+    "total_execution_time_ms",
+    "total_cost_usd",
+)
+
+COMPACTION_CHUNK_SIZE = 500
+
+# Projetos já verificados por engine neste processo; depois disso
+# record_execution mantém os rollups em dia
+_verified: "weakref.WeakKeyDictionary[Any, Set[str]]" = weakref.WeakKeyDictionary()
+
+
+def bucket_start_for(timestamp: datetime, granularity: str) -> datetime:
+    """Retorna o início do bucket (hora, dia ou semana iniciando na segunda)."""
+    if granularity == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+
+    day = timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return day
+    return day - timedelta(days=day.weekday())
+
+
+def _empty_bucket() -> Dict[str, Any]:
+    bucket: Dict[str, Any] = {field: 0 for field in _SUM_FIELDS}
+    bucket["total_cost_usd"] = Decimal(0)
+    bucket["min_execution_time_ms"] = None
+    bucket["max_execution_time_ms"] = None
+    return bucket
+
+
+def _fold(target: Dict[str, Any], source: Dict[str, Any]) -> None:
+    """Soma os valores de source no bucket target."""
+    for field in _SUM_FIELDS:
+        value = source.get(field) or 0
+        if field == "total_cost_usd":
+            value = Decimal(str(value))
+        target[field] += value
+
+    for field, pick in (("min_execution_time_ms", min), ("max_execution_time_ms", max)):
+        value = source.get(field)
+        if value is not None:
+            target[field] = value if target[field] is None else pick(target[field], value)
+
+
+class MetricsRollupService:
+    """Mantém os buckets de `project_metrics` a partir de `execution_metrics`."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.settings = get_settings()
+
+    def _cutoffs(self, now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+        """Retorna os limites (hora->dia, dia->semana), alinhados ao bucket de destino."""
+        now = now or datetime.utcnow()
+        hour_cutoff = bucket_start_for(
+            now - timedelta(days=self.settings.metrics_hourly_retention_days), "day"
+        )
+        day_cutoff = bucket_start_for(
+            now - timedelta(days=self.settings.metrics_daily_retention_days), "week"
+        )
+        return hour_cutoff, day_cutoff
+
+    def granularity_for(self, timestamp: datetime, now: Optional[datetime] = None) -> str:
+        """Granularidade em que um timestamp deve ser armazenado hoje."""
+        hour_cutoff, day_cutoff = self._cutoffs(now)
+        if timestamp < day_cutoff:
+            return "week"
+        if timestamp < hour_cutoff:
+            return "day"
+        return "hour"
+
+    async def upsert_bucket(
+        self,
+        project_id: str,
+        granularity: str,
+        bucket_start: datetime,
+        command: str,
+        model_used: str,
+        values: Dict[str, Any]
+    ) -> None:
+        """Soma values ao bucket, criando-o se necessário (INSERT ... ON CONFLICT)."""
+        count = values["execution_count"] or 0
+        successful = values["successful_executions"] or 0
+        total_time = values["total_execution_time_ms"] or 0
+        now = datetime.utcnow()
+
+        stmt = sqlite_insert(ProjectMetrics).values(
+            id=str(uuid.uuid4()),
+            project_id=project_id,
+            granularity=granularity,
+            bucket_start=bucket_start,
+            command=command,
+            model_used=model_used,
+            metrics_date=bucket_start.date(),
+            metrics_hour=bucket_start.hour if granularity == "hour" else None,
+            execution_count=count,
+            successful_executions=successful,
+            total_input_tokens=values["total_input_tokens"] or 0,
+            total_output_tokens=values["total_output_tokens"] or 0,
+            total_tokens=values["total_tokens"] or 0,
+            total_execution_time_ms=total_time,
+            min_execution_time_ms=values["min_execution_time_ms"],
+            max_execution_time_ms=values["max_execution_time_ms"],
+            avg_execution_time_ms=int(total_time / count) if count else 0,
+            total_cost_usd=values["total_cost_usd"] or Decimal(0),
+            success_rate=(successful / count * 100) if count else 0,
+            created_at=now,
+            updated_at=now,
+        )
+
+        excluded = stmt.excluded
+        merged_count = ProjectMetrics.execution_count + excluded.execution_count
+        merged_time = ProjectMetrics.total_execution_time_ms + excluded.total_execution_time_ms
+        merged_success = ProjectMetrics.successful_executions + excluded.successful_executions
+
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[
+                ProjectMetrics.project_id,
+                ProjectMetrics.granularity,
+                ProjectMetrics.bucket_start,
+                ProjectMetrics.command,
+                ProjectMetrics.model_used,
+            ],
+            set_={
+                "execution_count": merged_count,
+                "successful_executions": merged_success,
+                "total_input_tokens": ProjectMetrics.total_input_tokens + excluded.total_input_tokens,
+                "total_output_tokens": ProjectMetrics.total_output_tokens + excluded.total_output_tokens,
+                "total_tokens": ProjectMetrics.total_tokens + excluded.total_tokens,
+                "total_execution_time_ms": merged_time,
+                "total_cost_usd": ProjectMetrics.total_cost_usd + excluded.total_cost_usd,
+                "min_execution_time_ms": func.min(
+                    func.coalesce(ProjectMetrics.min_execution_time_ms, excluded.min_execution_time_ms),
+                    func.coalesce(excluded.min_execution_time_ms, ProjectMetrics.min_execution_time_ms),
+                ),
+                "max_execution_time_ms": func.max(
+                    func.coalesce(ProjectMetrics.max_execution_time_ms, excluded.max_execution_time_ms),
+                    func.coalesce(excluded.max_execution_time_ms, ProjectMetrics.max_execution_time_ms),
+                ),
+                "avg_execution_time_ms": merged_time / func.nullif(merged_count, 0),
+                "success_rate": merged_success * 100.0 / func.nullif(merged_count, 0),
+                "updated_at": now,
+            },
+        )
+
+        await self.db.execute(stmt)
+
+    async def record_execution(
+        self,
+        project_id: str,
+        command: str,
+        model_used: str,
+        started_at: datetime,
+        duration_ms: int,
+        input_tokens: int,
+        output_tokens: int,
+        total_tokens: int,
+        estimated_cost_usd: Decimal,
+        status: str
+    ) -> None:
+        """Soma uma execução ao bucket correspondente."""
+        granularity = self.granularity_for(started_at)
+        values = _empty_bucket()
+        _fold(values, {
+            "execution_count": 1,
+            "successful_executions": 1 if status == "success" else 0,
+            "total_input_tokens": input_tokens,
+            "total_output_tokens": output_tokens,
+            "total_tokens": total_tokens,
+            "total_execution_time_ms": duration_ms,
+            "total_cost_usd": estimated_cost_usd,
+            "min_execution_time_ms": duration_ms,
+            "max_execution_time_ms": duration_ms,
+        })
+
+        await self.upsert_bucket(
+            project_id=project_id,
+            granularity=granularity,
+            bucket_start=bucket_start_for(started_at, granularity),
+            command=command,
+            model_used=model_used,
+            values=values,
+        )
+        await self.db.commit()
+
+    async def rebuild(self, project_id: str) -> int:
+        """
+        Reconstrói todos os buckets do projeto a partir de `execution_metrics`.
+
+        A agregação por hora é feita no SQLite; apenas as linhas agregadas
+        são trazidas para o Python. Retorna o número de execuções cobertas.
+        """
+        hour = func.strftime('%Y-%m-%d %H:00:00', ExecutionMetrics.started_at).label('hour')
+        query = select(
+            hour,
+            ExecutionMetrics.command,
+            ExecutionMetrics.model_used,
+            func.count(ExecutionMetrics.id).label('execution_count'),
+            func.sum(case((ExecutionMetrics.status == 'success', 1), else_=0)).label('successful_executions'),
+            func.sum(ExecutionMetrics.input_tokens).label('total_input_tokens'),
+            func.sum(ExecutionMetrics.output_tokens).label('total_output_tokens'),
+            func.sum(ExecutionMetrics.total_tokens).label('total_tokens'),
+            func.sum(ExecutionMetrics.duration_ms).label('total_execution_time_ms'),
+            func.min(ExecutionMetrics.duration_ms).label('min_execution_time_ms'),
+            func.max(ExecutionMetrics.duration_ms).label('max_execution_time_ms'),
+            func.sum(ExecutionMetrics.estimated_cost_usd).label('total_cost_usd'),
+        ).where(
+            and_(
+                ExecutionMetrics.project_id == project_id,
+                ExecutionMetrics.started_at.isnot(None)
+            )
+        ).group_by(hour, ExecutionMetrics.command, ExecutionMetrics.model_used)
+
+        now = datetime.utcnow()
+        buckets: Dict[tuple, Dict[str, Any]] = {}
+        covered = 0
+
+        result = await self.db.stream(query)
+        async for row in result:
+            started_at = datetime.strptime(row.hour, "%Y-%m-%d %H:%M:%S")
+            granularity = self.granularity_for(started_at, now)
+            key = (
+                granularity,
+                bucket_start_for(started_at, granularity),
+                row.command or "",
+                row.model_used or "unknown",
+            )
+            if key not in buckets:
+                buckets[key] = _empty_bucket()
+            _fold(buckets[key], row._mapping)
+            covered += row.execution_count
+
+        await self.db.execute(
+            delete(ProjectMetrics).where(ProjectMetrics.project_id == project_id)
+        )
+
+        for (granularity, bucket_start, command, model_used), values in buckets.items():
+            await self.upsert_bucket(project_id, granularity, bucket_start, command, model_used, values)
+
+        await self.db.commit()
+        return covered
+
+    async def ensure_rollups(self, project_id: str) -> None:
+        """
+        Garante, na primeira leitura do projeto neste processo, que os rollups
+        cobrem todas as métricas (mesma contagem de `verify`).
+
+        Basta existir um bucket para o projeto não estar completo: uma execução
+        registrada antes da primeira leitura cria o seu bucket, mas o histórico
+        anterior aos rollups só entra com o rebuild.
+        """
+        verified = _verified.setdefault(self.db.get_bind(), set())
+        if project_id in verified:
+            return
+        await self.verify(project_id)
+        verified.add(project_id)
+
+    async def verify(self, project_id: str) -> bool:
+        """
+        Verifica se os rollups cobrem todas as métricas, reconstruindo se não.
+
+        Retorna True se estava consistente. Usado pelo job de compactação e,
+        no caminho das requisições, por `ensure_rollups` na primeira leitura
+        de cada projeto por engine.
+        """
+        rolled_up = (await self.db.execute(
+            select(func.sum(ProjectMetrics.execution_count)).where(
+                ProjectMetrics.project_id == project_id
+            )
+        )).scalar() or 0
+        total = (await self.db.execute(
+            select(func.count(ExecutionMetrics.id)).where(
+                and_(
+                    ExecutionMetrics.project_id == project_id,
+                    ExecutionMetrics.started_at.isnot(None)
+                )
+            )
+        )).scalar() or 0
+
+        if rolled_up == total:
+            return True
+
+        await self.rebuild(project_id)
+        return False
+
+    async def _compact_level(
+        self,
+        project_id: str,
+        source: str,
+        target: str,
+        cutoff: datetime
+    ) -> int:
+        """Move buckets `source` anteriores a cutoff para buckets `target`."""
+        compacted = 0
+
+        while True:
+            result = await self.db.execute(
+                select(ProjectMetrics).where(
+                    and_(
+                        ProjectMetrics.project_id == project_id,
+                        ProjectMetrics.granularity == source,
+                        ProjectMetrics.bucket_start < cutoff
+                    )
+                ).limit(COMPACTION_CHUNK_SIZE)
+            )
+            rows = result.scalars().all()
+            if not rows:
+                break
+
+            buckets: Dict[tuple, Dict[str, Any]] = {}
+            for row in rows:
+                key = (bucket_start_for(row.bucket_start, target), row.command, row.model_used)
+                if key not in buckets:
+                    buckets[key] = _empty_bucket()
+                _fold(buckets[key], {
+                    field: getattr(row, field)
+                    for field in _SUM_FIELDS + ("min_execution_time_ms", "max_execution_time_ms")
+                })
+
+            for (bucket_start, command, model_used), values in buckets.items():
+                await self.upsert_bucket(project_id, target, bucket_start, command, model_used, values)
+
+            await self.db.execute(
+                delete(ProjectMetrics).where(ProjectMetrics.id.in_([row.id for row in rows]))
+            )
+            await self.db.commit()
+            compacted += len(rows)
+
+        return compacted
+
+    async def compact(self, project_id: str, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Compacta buckets horários em diários e diários em semanais."""
+        hour_cutoff, day_cutoff = self._cutoffs(now)
+
+        return {
+            "hourToDay": await self._compact_level(project_id, "hour", "day", hour_cutoff),
+            "dayToWeek": await self._compact_level(project_id, "day", "week", day_cutoff),
+        }
+
+    async def get_project_ids(self) -> List[str]:
+        """Projetos com métricas neste database."""
+        result = await self.db.execute(select(ExecutionMetrics.project_id).distinct())
+        return [row[0] for row in result.all()]
+
+
+async def compact_all_databases() -> Dict[str, Dict[str, int]]:
+    """Verifica e compacta os rollups de todos os databases carregados."""
+    from ..database import async_session_maker
+    from ..database_manager import db_manager
+
+    session_factories = [async_session_maker] + list(db_manager.sessions.values())
+    results: Dict[str, Dict[str, int]] = {}
+
+    for session_factory in session_factories:
+        async with session_factory() as session:
+            service = MetricsRollupService(session)
+            for project_id in await service.get_project_ids():
+                await service.verify(project_id)
+                results[project_id] = await service.compact(project_id)
+
+    return results
+
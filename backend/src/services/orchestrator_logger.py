@@ -10,6 +10,9 @@ from dataclasses import dataclass, asdict
 
 from fastapi import WebSocket
 
+from ..config.settings import get_settings
+from .log_file import AsyncLogFileWriter, read_archive_tail, read_tail_lines
+
 logger = logging.getLogger(__name__)
 
 
@@ -29,11 +32,19 @@ class OrchestratorLogger:
     Logger for orchestrator that writes to both file and WebSocket.
 
     Provides real-time updates to connected clients while maintaining
-    a persistent log file.
+    a persistent log file. File writes are queued and done off the event
+    loop; the file is rotated by size/age into gzip archives.
     """
 
     def __init__(self, log_file: str = "orchestrator.log"):
+        settings = get_settings()
         self.log_file = Path(log_file)
+        self._writer = AsyncLogFileWriter(
+            self.log_file,
+            max_bytes=settings.orchestrator_log_max_bytes,
+            rotate_seconds=settings.orchestrator_log_rotate_hours * 3600,
+            backup_count=settings.orchestrator_log_backup_count,
+        )
         self._websockets: List[WebSocket] = []
         self._buffer: List[OrchestratorLogEntry] = []
         self._max_buffer_size = 100
@@ -41,30 +52,36 @@ class OrchestratorLogger:
     # ==================== FILE LOGGING ====================
 
     def _write_to_file(self, entry: OrchestratorLogEntry) -> None:
-        """Write a log entry to the file."""
-        try:
-            with open(self.log_file, "a", encoding="utf-8") as f:
-                line = json.dumps(asdict(entry), ensure_ascii=False)
-                f.write(line + "\n")
-        except Exception as e:
-            logger.error(f"Failed to write to log file: {e}")
+        """Queue a log entry for the file writer (no disk I/O here)."""
+        self._writer.write(json.dumps(asdict(entry), ensure_ascii=False))
+
+    async def flush(self) -> None:
+        """Wait until queued entries are written."""
+        await self._writer.flush()
+
+    async def close(self) -> None:
+        """Flush and close the log file."""
+        await self._writer.close()
 
     def read_recent_logs(self, limit: int = 50) -> List[OrchestratorLogEntry]:
-        """Read recent logs from the file."""
+        """
+        Read recent logs from the file, oldest first.
+
+        Seeks back from the end of the file, so the cost depends on
+        `limit`, not on the file size. Right after a rotation the rest
+        comes from the newest archive.
+        """
         entries = []
         try:
-            if not self.log_file.exists():
-                return entries
+            lines = read_tail_lines(self.log_file, limit)
+            if len(lines) < limit:
+                lines = read_archive_tail(self.log_file, limit - len(lines)) + lines
 
-            with open(self.log_file, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-
-            # Get last N lines
-            for line in lines[-limit:]:
+            for line in lines:
                 try:
-                    data = json.loads(line.strip())
+                    data = json.loads(line)
                     entries.append(OrchestratorLogEntry(**data))
-                except json.JSONDecodeError:
+                except (json.JSONDecodeError, TypeError):
                     continue
         except Exception as e:
             logger.error(f"Failed to read log file: {e}")
@@ -186,12 +203,19 @@ class OrchestratorLogger:
 
     # ==================== STATUS ====================
 
+    @property
+    def connection_count(self) -> int:
+        return len(self._websockets)
+
     def get_status(self) -> Dict[str, Any]:
         """Get logger status."""
         return {
             "log_file": str(self.log_file),
             "connected_clients": len(self._websockets),
             "buffer_size": len(self._buffer),
+            "pending_writes": self._writer.pending,
+            "dropped_writes": self._writer.dropped,
+            "rotations": self._writer.rotations,
         }
 
 
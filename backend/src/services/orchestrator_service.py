@@ -18,6 +18,7 @@ from .memory_service import MemoryService
 from .usage_checker_service import get_usage_checker_service, UsageInfo
 from .orchestrator_logger import get_orchestrator_logger
 from .live_broadcast_service import get_live_broadcast_service
+from .tracing import get_tracer
 
 logger = logging.getLogger(__name__)
 
@@ -75,6 +76,7 @@ class OrchestratorService:
         self.settings = get_settings()
         self.usage_checker = get_usage_checker_service(self.settings.orchestrator_usage_limit_percent)
         self.logger = get_orchestrator_logger(self.settings.orchestrator_log_file)
+        self.tracer = get_tracer()
 
         self._running = False
         self._task: Optional[asyncio.Task] = None
@@ -139,7 +141,12 @@ class OrchestratorService:
     # ==================== MAIN CYCLE ====================
 
     async def _execute_cycle(self) -> None:
-        """Execute one cycle of the orchestrator loop."""
+        """Execute one cycle of the orchestrator loop (one trace, one span per step)."""
+        with self.tracer.trace("orchestrator.cycle") as cycle_span:
+            await self._traced_cycle(cycle_span)
+
+    async def _traced_cycle(self, cycle_span) -> None:
+        tracer = self.tracer
         cycle_start = datetime.utcnow()
         await self.logger.log_info(f"Starting cycle at {cycle_start.isoformat()}")
 
@@ -158,34 +165,45 @@ class OrchestratorService:
 
                 # Step 1: READ - Get recent context
                 await self.logger.log_read("Reading short-term memory...")
-                context = await self._step_read(repos)
+                with tracer.span("orchestrator.read"):
+                    context = await self._step_read(repos)
 
                 # Step 2: QUERY - Get relevant learnings
                 await self.logger.log_query("Querying long-term memory...")
-                learnings = await self._step_query(context, repos)
+                with tracer.span("orchestrator.query"):
+                    learnings = await self._step_query(context, repos)
 
                 # Step 3: THINK - Decide action
                 await self.logger.log_think("Deciding next action...")
-                think_result = await self._step_think(context, learnings, repos)
+                with tracer.span("orchestrator.think"):
+                    think_result = await self._step_think(context, learnings, repos)
                 await self.logger.log_think(
                     f"Decision: {think_result.decision.value} - {think_result.reason}",
                     goal_id=think_result.goal_id
                 )
+                if cycle_span is not None:
+                    cycle_span.set_attribute("decision", think_result.decision.value)
+                    if think_result.goal_id:
+                        cycle_span.set_attribute("goal_id", think_result.goal_id)
 
                 # Step 4: ACT - Execute decision
                 await self.logger.log_act(f"Executing {think_result.decision.value}...")
-                act_result = await self._step_act(think_result, repos)
+                with tracer.span("orchestrator.act", decision=think_result.decision.value):
+                    act_result = await self._step_act(think_result, repos)
 
                 # Step 5: RECORD - Save to short-term memory
                 await self.logger.log_record("Recording result...")
-                await self._step_record(think_result, act_result, repos)
+                with tracer.span("orchestrator.record"):
+                    await self._step_record(think_result, act_result, repos)
 
                 # Step 6: LEARN - Store learning if applicable
                 if act_result.should_learn and act_result.learning:
                     await self.logger.log_learn(f"Storing learning: {act_result.learning[:50]}...")
-                    await self._step_learn(think_result, act_result, repos)
+                    with tracer.span("orchestrator.learn"):
+                        await self._step_learn(think_result, act_result, repos)
 
-                await session.commit()
+                with tracer.span("orchestrator.commit"):
+                    await session.commit()
 
             except Exception as e:
                 await session.rollback()
@@ -496,62 +514,62 @@ class OrchestratorService:
                 error=decomposition.error or "Failed to decompose goal"
             )
 
-        # First pass: Create all cards and build order-to-ID mapping
-        created_cards = []
-        order_to_id: Dict[int, str] = {}
-
-        for decomposed_card in decomposition.cards:
-            card_data = CardCreate(
+        # First pass: create all cards in one batch and build order-to-ID mapping
+        cards = await card_repo.bulk_create([
+            CardCreate(
                 title=decomposed_card.title,
                 description=decomposed_card.description,
                 dependencies=[],  # Will be set in second pass
             )
+            for decomposed_card in decomposition.cards
+        ])
+        created_cards = [card.id for card in cards]
+        order_to_id: Dict[int, str] = {
+            decomposed_card.order: card.id
+            for decomposed_card, card in zip(decomposition.cards, cards)
+        }
+        await goal_repo.add_cards(goal_id, created_cards)
 
-            card = await card_repo.create(card_data)
-            created_cards.append(card.id)
-            order_to_id[decomposed_card.order] = card.id
-
-            # Add card to goal
-            await goal_repo.add_card(goal_id, card.id)
-
-            # Broadcast card creation via WebSocket
-            try:
-                from .card_ws import card_ws_manager
-                from ..schemas.card import CardResponse
-
-                card_response = CardResponse.model_validate(card)
-                card_dict = card_response.model_dump(by_alias=True, mode='json')
-                await card_ws_manager.broadcast_card_created(
-                    card_id=card.id,
-                    card_data=card_dict
-                )
-            except Exception as e:
-                logger.warning(f"Failed to broadcast card creation: {e}")
+        await self.logger.log_act(
+            f"Created {len(created_cards)} cards",
+            goal_id=goal_id,
+            data={"card_ids": created_cards}
+        )
 
+        # Second pass: resolve dependency orders to card IDs (one bulk update)
+        from ..schemas.card import CardUpdate
+        dependency_updates: Dict[str, CardUpdate] = {}
+        for decomposed_card in decomposition.cards:
+            card_id = order_to_id.get(decomposed_card.order)
+            resolved_deps = [
+                order_to_id[dep_order]
+                for dep_order in decomposed_card.dependencies or []
+                if dep_order in order_to_id
+            ]
+            if card_id and resolved_deps:
+                dependency_updates[card_id] = CardUpdate(dependencies=resolved_deps)
+
+        if dependency_updates:
+            updated, _ = await card_repo.bulk_update(dependency_updates)
+            by_id = {card.id: card for card in updated}
+            cards = [by_id.get(card.id, card) for card in cards]
             await self.logger.log_act(
-                f"Created card {len(created_cards)}/{len(decomposition.cards)}: {card.title[:40]}...",
+                f"Set dependencies for {len(dependency_updates)} cards",
                 goal_id=goal_id,
-                data={"card_id": card.id, "order": decomposed_card.order}
+                data={card_id: update.dependencies for card_id, update in dependency_updates.items()}
             )
 
-        # Second pass: Update cards with resolved dependency IDs
-        for decomposed_card in decomposition.cards:
-            if decomposed_card.dependencies:
-                card_id = order_to_id.get(decomposed_card.order)
-                if card_id:
-                    # Map order indices to actual card IDs
-                    resolved_deps = [
-                        order_to_id[dep_order]
-                        for dep_order in decomposed_card.dependencies
-                        if dep_order in order_to_id
-                    ]
-                    if resolved_deps:
-                        await card_repo.update_dependencies(card_id, resolved_deps)
-                        await self.logger.log_act(
-                            f"Set dependencies for card {card_id[:8]}: {len(resolved_deps)} deps",
-                            goal_id=goal_id,
-                            data={"card_id": card_id, "dependencies": resolved_deps}
-                        )
+        # Broadcast all new cards in a single WebSocket event
+        try:
+            from .card_ws import card_ws_manager
+            from ..schemas.card import CardResponse
+
+            await card_ws_manager.broadcast_cards_created([
+                CardResponse.model_validate(card).model_dump(by_alias=True, mode='json')
+                for card in cards
+            ])
+        except Exception as e:
+            logger.warning(f"Failed to broadcast card creation: {e}")
 
         await self.logger.log_act(
             f"Decomposition complete: {len(created_cards)} cards created",
@@ -624,13 +642,14 @@ class OrchestratorService:
                 await self.logger.log_act(f"[1/4] Executing PLAN stage...")
                 await self._move_card_with_broadcast(card_id, "plan", card_repo)
 
-                result = await execute_plan(
-                    card_id=card_id,
-                    title=card.title,
-                    description=card.description or "",
-                    cwd=cwd,
-                    model=card.model_plan,
-                )
+                with self.tracer.span("agent.plan", card_id=card_id, model=card.model_plan):
+                    result = await execute_plan(
+                        card_id=card_id,
+                        title=card.title,
+                        description=card.description or "",
+                        cwd=cwd,
+                        model=card.model_plan,
+                    )
 
                 if not result.success:
                     await self.logger.log_error(f"PLAN failed: {result.error}")
@@ -656,12 +675,13 @@ class OrchestratorService:
                 await self.logger.log_act(f"[2/4] Executing IMPLEMENT stage...")
                 await self._move_card_with_broadcast(card_id, "implement", card_repo)
 
-                result = await execute_implement(
-                    card_id=card_id,
-                    spec_path=card.spec_path,
-                    cwd=cwd,
-                    model=card.model_implement,
-                )
+                with self.tracer.span("agent.implement", card_id=card_id, model=card.model_implement):
+                    result = await execute_implement(
+                        card_id=card_id,
+                        spec_path=card.spec_path,
+                        cwd=cwd,
+                        model=card.model_implement,
+                    )
 
                 if not result.success:
                     await self.logger.log_error(f"IMPLEMENT failed: {result.error}")
@@ -679,12 +699,13 @@ class OrchestratorService:
                 await self.logger.log_act(f"[3/4] Executing TEST stage...")
                 await self._move_card_with_broadcast(card_id, "test", card_repo)
 
-                result = await execute_test_implementation(
-                    card_id=card_id,
-                    spec_path=card.spec_path,
-                    cwd=cwd,
-                    model=card.model_test,
-                )
+                with self.tracer.span("agent.test", card_id=card_id, model=card.model_test):
+                    result = await execute_test_implementation(
+                        card_id=card_id,
+                        spec_path=card.spec_path,
+                        cwd=cwd,
+                        model=card.model_test,
+                    )
 
                 if not result.success:
                     await self.logger.log_error(f"TEST failed: {result.error}")
@@ -706,12 +727,13 @@ class OrchestratorService:
                 await self.logger.log_act(f"[4/4] Executing REVIEW stage...")
                 await self._move_card_with_broadcast(card_id, "review", card_repo)
 
-                result = await execute_review(
-                    card_id=card_id,
-                    spec_path=card.spec_path,
-                    cwd=cwd,
-                    model=card.model_review,
-                )
+                with self.tracer.span("agent.review", card_id=card_id, model=card.model_review):
+                    result = await execute_review(
+                        card_id=card_id,
+                        spec_path=card.spec_path,
+                        cwd=cwd,
+                        model=card.model_review,
+                    )
 
                 if not result.success:
                     await self.logger.log_error(f"REVIEW failed: {result.error}")
@@ -1,12 +1,23 @@
-"""Presence service for tracking spectators."""
+"""Presence service for tracking spectators.
+
+Each worker tracks its own connections and announces its count on the
+backplane; the spectator count is the sum over workers heard from recently.
+Workers re-announce periodically so a crashed worker drops out.
+"""
 
 import asyncio
+import time
 from datetime import datetime
-from typing import Set, Dict, Callable, Awaitable
+from typing import Any, Set, Dict, Callable, Awaitable, Optional, Tuple
 import logging
 
+from .backplane import get_backplane
+
 logger = logging.getLogger(__name__)
 
+# Intervalo de reanúncio da contagem local; sem notícias por 3x, o worker some
+ANNOUNCE_INTERVAL_SECONDS = 15.0
+
 
 class PresenceService:
     """Service to track online spectators."""
@@ -36,13 +47,81 @@ class PresenceService:
         # Lock for thread safety
         self._lock = asyncio.Lock()
 
+        # Counts announced by the other workers: node_id -> (count, last heard)
+        self._backplane = get_backplane()
+        self._remote_counts: Dict[str, Tuple[int, float]] = {}
+        self._announce_task: Optional[asyncio.Task] = None
+        # Notificações disparadas por mensagens do backplane (referência forte)
+        self._tasks: Set[asyncio.Task] = set()
+        self._backplane.subscribe("presence", self._on_backplane_message)
+
         logger.info("PresenceService initialized")
 
     @property
-    def count(self) -> int:
-        """Get current spectator count."""
+    def local_count(self) -> int:
+        """Spectators connected to this worker."""
         return len(self._connections)
 
+    @property
+    def count(self) -> int:
+        """Get current spectator count (all workers)."""
+        deadline = time.monotonic() - 3 * ANNOUNCE_INTERVAL_SECONDS
+        return self.local_count + sum(
+            count for count, heard in self._remote_counts.values() if heard >= deadline
+        )
+
+    def _announce(self) -> None:
+        self._backplane.publish("presence", {
+            "node": self._backplane.node_id,
+            "count": self.local_count,
+        })
+
+    def _on_backplane_message(self, message: Dict[str, Any], local: bool) -> None:
+        """Track the counts of the other workers."""
+        if local:
+            return
+        node = message["node"]
+        known = node in self._remote_counts
+        previous = self._remote_counts.get(node, (0, 0.0))[0]
+        self._remote_counts[node] = (message["count"], time.monotonic())
+
+        if not known:
+            # Worker novo: responde com a nossa contagem para ele somar
+            self._announce()
+        if message["count"] != previous:
+            self._spawn(self._notify_change())
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def start(self) -> None:
+        """Announce this worker and keep re-announcing (multi-worker backplanes)."""
+        self._announce()
+        if self._announce_task is None:
+            self._announce_task = asyncio.create_task(self._announce_loop())
+
+    async def stop(self) -> None:
+        if self._announce_task:
+            self._announce_task.cancel()
+            self._announce_task = None
+        # Saída limpa: os outros workers param de contar nossos espectadores
+        self._connections.clear()
+        self._announce()
+
+    async def _announce_loop(self) -> None:
+        while True:
+            await asyncio.sleep(ANNOUNCE_INTERVAL_SECONDS)
+            self._announce()
+            # Descarta workers que pararam de anunciar
+            deadline = time.monotonic() - 3 * ANNOUNCE_INTERVAL_SECONDS
+            stale = [node for node, (_, heard) in self._remote_counts.items() if heard < deadline]
+            for node in stale:
+                del self._remote_counts[node]
+            if stale:
+                await self._notify_change()
+
     async def connect(self, session_id: str) -> int:
         """Register a new spectator connection."""
         async with self._lock:
@@ -51,7 +130,8 @@ class PresenceService:
                 self._last_activity[session_id] = datetime.utcnow()
                 logger.info(f"Spectator connected: {session_id[:8]}... Total: {self.count}")
 
-                # Notify callbacks
+                # Notify other workers and callbacks
+                self._announce()
                 await self._notify_change()
 
         return self.count
@@ -64,7 +144,8 @@ class PresenceService:
                 self._last_activity.pop(session_id, None)
                 logger.info(f"Spectator disconnected: {session_id[:8]}... Total: {self.count}")
 
-                # Notify callbacks
+                # Notify other workers and callbacks
+                self._announce()
                 await self._notify_change()
 
         return self.count
@@ -106,6 +187,7 @@ class PresenceService:
 
             if removed > 0:
                 logger.info(f"Cleaned up {removed} stale connections. Total: {self.count}")
+                self._announce()
                 await self._notify_change()
 
         return removed
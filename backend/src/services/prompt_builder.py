@@ -0,0 +1,124 @@
+"""Layered prompt assembly for the workflow stages (plan/implement/test/review).
+
+Providers cache prompts by prefix, so content is ordered from most to least
+stable and volatile text is never interleaved with stable instructions:
+
+1. system layer: stage instructions (e.g. GEMINI_PLAN_PROMPT), identical
+   for every card
+2. project layer: plan.toml and experts' KNOWLEDGE.md, identical for every
+   stage of a project
+3. card layer: title/description, spec, working directory, images and other
+   per-card details
+
+For Claude, the system and project layers go in the system prompt and the
+card layer follows the slash command in the user prompt. For Gemini (a
+single prompt), the layers are concatenated in order.
+"""
+
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import toml
+
+# plan.toml renderizado por caminho, invalidado pelo mtime do arquivo
+_plan_context_cache: Dict[str, Tuple[float, str]] = {}
+
+
+def plan_toml_context(cwd: str) -> str:
+    """Read plan.toml (if present) and format it as project context."""
+    plan_path = Path(cwd) / "plan.toml"
+    try:
+        mtime = plan_path.stat().st_mtime
+    except OSError:
+        return ""
+
+    cached = _plan_context_cache.get(str(plan_path))
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    try:
+        plan_data = toml.load(plan_path)
+        context = "# Project Configuration (plan.toml)\n"
+        for key, value in plan_data.items():
+            context += f"{key}: {value}\n"
+    except Exception as e:
+        print(f"[PromptBuilder] Error reading plan.toml: {e}")
+        return ""
+
+    _plan_context_cache[str(plan_path)] = (mtime, context)
+    return context
+
+
+def working_directory_note(cwd: str) -> str:
+    return (
+        f"**IMPORTANTE:** O diretório de trabalho é `{cwd}`. Salve todos os arquivos usando "
+        f"caminhos absolutos baseados neste diretório (ex: `{cwd}/specs/nome.md`)."
+    )
+
+
+def images_note(images: Optional[list], with_paths: bool = True) -> str:
+    """Card images; Gemini only gets a notice since it reads them from the card."""
+    if not images:
+        return ""
+    if not with_paths:
+        return "[Imagens anexadas ao card estão disponíveis para análise]"
+    lines = ["Imagens anexadas neste card:"]
+    for img in images:
+        lines.append(f"- {img.get('filename', 'image')}: {img.get('path', '')}")
+    return "\n".join(lines)
+
+
+class PromptBuilder:
+    """Collects system, project and card layers and renders them in that order."""
+
+    def __init__(self):
+        self._system: List[str] = []
+        self._project: List[str] = []
+        self._card: List[str] = []
+
+    @staticmethod
+    def _add(layer: List[str], text: Optional[str]) -> None:
+        text = (text or "").strip()
+        if text:
+            layer.append(text)
+
+    def system(self, text: Optional[str]) -> "PromptBuilder":
+        self._add(self._system, text)
+        return self
+
+    def project(self, text: Optional[str]) -> "PromptBuilder":
+        self._add(self._project, text)
+        return self
+
+    def card(self, text: Optional[str]) -> "PromptBuilder":
+        self._add(self._card, text)
+        return self
+
+    @property
+    def prefix(self) -> str:
+        """System + project layers (the cacheable part)."""
+        return "\n\n".join(self._system + self._project)
+
+    @property
+    def card_text(self) -> str:
+        return "\n\n".join(self._card)
+
+    def prefix_hash(self) -> str:
+        """Short fingerprint of the prefix, logged to check it is stable across stages."""
+        return hashlib.sha256(self.prefix.encode()).hexdigest()[:12]
+
+    def build(self) -> str:
+        """Single prompt: prefix first, card layer last (Gemini)."""
+        return "\n\n".join(part for part in (self.prefix, self.card_text) if part)
+
+    def claude(self, command: str) -> Tuple[str, Optional[str]]:
+        """(user prompt, system prompt) for the Agent SDK; the slash command must lead."""
+        prompt = "\n\n".join(part for part in (command, self.card_text) if part)
+        return prompt, (self.prefix or None)
+
+    def describe(self) -> str:
+        return (
+            f"Prompt layers - prefix {self.prefix_hash()} ({len(self.prefix)} chars), "
+            f"card {len(self.card_text)} chars"
+        )
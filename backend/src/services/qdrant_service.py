@@ -12,6 +12,7 @@ from qdrant_client.http.exceptions import UnexpectedResponse
 
 from ..config.qdrant import get_qdrant_settings
 from .embedding_service import get_embedding_service
+from .tracing import get_tracer
 
 logger = logging.getLogger(__name__)
 
@@ -135,7 +136,9 @@ class QdrantService:
         Returns:
             List of relevant learnings with scores
         """
-        vector = self._embedding_service.embed_text(query_text)
+        tracer = get_tracer()
+        with tracer.span("qdrant.embed"):
+            vector = self._embedding_service.embed_text(query_text)
 
         # Build filter if needed
         query_filter = None
@@ -149,13 +152,14 @@ class QdrantService:
                 ]
             )
 
-        results = self.client.query_points(
-            collection_name=self._settings.collection_name,
-            query=vector,
-            query_filter=query_filter,
-            limit=limit,
-            score_threshold=score_threshold,
-        )
+        with tracer.span("qdrant.search", limit=limit):
+            results = self.client.query_points(
+                collection_name=self._settings.collection_name,
+                query=vector,
+                query_filter=query_filter,
+                limit=limit,
+                score_threshold=score_threshold,
+            )
 
         learnings = []
         for result in results.points:
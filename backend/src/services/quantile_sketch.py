@@ -0,0 +1,151 @@
+"""Sketch de quantis (DDSketch) para distribuições de duração de execuções.
+
+Implementação em Python puro do DDSketch: valores positivos são mapeados para
+buckets logarítmicos, garantindo erro relativo limitado em qualquer quantil.
+Sketches são mescláveis (soma dos buckets), o que permite persistir um sketch
+por janela de tempo e combiná-los sob demanda.
+"""
+
+import math
+from typing import Any, Dict, Optional
+
+
+class DDSketch:
+    """Sketch de quantis com erro relativo garantido."""
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 2048):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.sum_squares = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _key(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, key: int) -> float:
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def add(self, value: float) -> None:
+        """Adiciona um valor ao sketch."""
+        if value <= 0:
+            self.zero_count += 1
+        else:
+            key = self._key(value)
+            self.bins[key] = self.bins.get(key, 0) + 1
+            if len(self.bins) > self.max_bins:
+                self._collapse()
+
+        self.count += 1
+        self.sum += value
+        self.sum_squares += value * value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def _collapse(self) -> None:
+        """Funde os buckets mais baixos para respeitar max_bins."""
+        keys = sorted(self.bins)
+        excess = len(keys) - self.max_bins
+        target = keys[excess]
+        for key in keys[:excess]:
+            self.bins[target] += self.bins.pop(key)
+
+    def merge(self, other: "DDSketch") -> None:
+        """Mescla outro sketch (com mesma precisão) neste."""
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        if other.count == 0:
+            return
+
+        for key, bin_count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + bin_count
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.sum_squares += other.sum_squares
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        """
+        Retorna o valor aproximado do quantil q.
+
+        Usa o mesmo rank da implementação exata anterior (int(count * q)),
+        de forma que o resultado fica a no máximo relative_accuracy do
+        elemento de mesma posição na lista ordenada.
+        """
+        if self.count == 0:
+            return 0.0
+
+        rank = min(int(self.count * q), self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+
+        seen = self.zero_count
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                return min(max(self._value(key), self.min), self.max)
+
+        return self.max
+
+    def count_above(self, threshold: float) -> int:
+        """Estima quantos valores são maiores que threshold."""
+        if self.count == 0 or self.max is None or threshold >= self.max:
+            return 0
+        if threshold <= 0:
+            return self.count - self.zero_count
+
+        # O bucket que contém o threshold conta se seu valor representativo o excede
+        return sum(c for key, c in self.bins.items() if self._value(key) > threshold)
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    @property
+    def stdev(self) -> float:
+        """Desvio padrão amostral (mesma definição de statistics.stdev)."""
+        if self.count < 2:
+            return 0.0
+        variance = (self.sum_squares - self.sum * self.sum / self.count) / (self.count - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializa o sketch para persistência em coluna JSON."""
+        return {
+            "relativeAccuracy": self.relative_accuracy,
+            "bins": {str(key): c for key, c in self.bins.items()},
+            "zeroCount": self.zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "sumSquares": self.sum_squares,
+            "min": self.min,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DDSketch":
+        """Reconstrói um sketch serializado por to_dict."""
+        sketch = cls(relative_accuracy=data.get("relativeAccuracy", 0.01))
+        sketch.bins = {int(key): c for key, c in (data.get("bins") or {}).items()}
+        sketch.zero_count = data.get("zeroCount", 0)
+        sketch.count = data.get("count", 0)
+        sketch.sum = data.get("sum", 0.0)
+        sketch.sum_squares = data.get("sumSquares", 0.0)
+        sketch.min = data.get("min")
+        sketch.max = data.get("max")
+        return sketch
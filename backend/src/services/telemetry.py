@@ -0,0 +1,411 @@
+"""Process telemetry in the Prometheus text format (GET /metrics).
+
+A small in-process registry (no prometheus_client or collector needed):
+counters, gauges and histograms with labels, rendered in the text
+exposition format 0.0.4 that Prometheus, VictoriaMetrics or Grafana Agent
+scrape directly. Gauges that mirror existing state (WebSocket clients,
+pool usage, running executions) read it through callbacks at scrape time,
+so nothing is updated on the hot path.
+
+Sources:
+- `HTTPMetricsMiddleware`: latency per route template, method and status;
+- `EventLoopLagMonitor`: how late a periodic timer fires;
+- SQLAlchemy `handle_error`: SQLite "database is locked" errors;
+- a `sys.addaudithook` on `subprocess.Popen`: every spawned process
+  (git, claude, gemini...), asyncio subprocesses included.
+"""
+
+import asyncio
+import os
+import resource
+import sys
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from ..config.settings import get_settings
+
+# Buckets padrão (segundos) para latências
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[Any], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    @abstractmethod
+    def samples(self) -> List[str]:
+        """Sample lines of the exposition, without HELP/TYPE."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self.values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(self.values.items())
+        ]
+
+
+class Gauge(Metric):
+    """Set directly, or read at scrape time from `callback` ({label values: value} or a number)."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 callback: Optional[Callable[[], Any]] = None):
+        super().__init__(name, help, labelnames)
+        self.values: Dict[LabelValues, float] = {}
+        self.callback = callback
+
+    def set(self, value: float, **labels: Any) -> None:
+        self.values[self._key(labels)] = value
+
+    def collect(self) -> Dict[LabelValues, float]:
+        if self.callback is None:
+            return dict(self.values)
+        result = self.callback()
+        if isinstance(result, dict):
+            return {key if isinstance(key, tuple) else (key,): value for key, value in result.items()}
+        return {(): result}
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(self.collect().items())
+        ]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [contagem por bucket..., +Inf], soma
+        self.values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        entry = self.values.get(key)
+        if entry is None:
+            entry = self.values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = entry
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+        total[0] += value
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: Any) -> int:
+        entry = self.values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(list(self.buckets) + [float("inf")], counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total[0])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics rendered together for /metrics."""
+
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        existing = self.metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = (),
+              callback: Optional[Callable[[], Any]] = None) -> Gauge:
+        return self.register(Gauge(name, help, labelnames, callback))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        blocks = []
+        for metric in self.metrics.values():
+            try:
+                blocks.append(metric.render())
+            except Exception as e:
+                # Um callback com erro não derruba o scrape inteiro
+                blocks.append(f"# {metric.name} unavailable: {_escape(e)}")
+        return "\n".join(blocks) + "\n"
+
+
+_registry: Optional[MetricsRegistry] = None
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Get the singleton registry with the built-in process metrics."""
+    global _registry
+    if _registry is None:
+        _registry = MetricsRegistry()
+        _register_builtin_metrics(_registry)
+    return _registry
+
+
+# ==================== HTTP ====================
+
+class HTTPMetricsMiddleware:
+    """ASGI middleware: request latency per route template (not per raw path)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            get_metrics_registry().metrics["http_request_duration_seconds"].observe(
+                time.perf_counter() - started,
+                method=scope.get("method", ""),
+                route=getattr(route, "path", None) or "unmatched",
+                status=status["code"],
+            )
+
+
+# ==================== EVENT LOOP ====================
+
+class EventLoopLagMonitor:
+    """Measures how late a periodic sleep wakes up (time the loop was busy)."""
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        registry = get_metrics_registry()
+        gauge = registry.metrics["event_loop_lag_seconds"]
+        histogram = registry.metrics["event_loop_lag"]
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - started - self.interval)
+            gauge.set(lag)
+            histogram.observe(lag)
+
+
+# ==================== BUILT-IN SOURCES ====================
+
+def _websocket_connections() -> Dict[str, int]:
+    from .card_ws import card_ws_manager
+    from .execution_ws import execution_ws_manager
+    from .live_broadcast_service import get_live_broadcast_service
+    from .orchestrator_logger import get_orchestrator_logger
+
+    return {
+        "cards": card_ws_manager.broadcaster.count(),
+        "execution": execution_ws_manager.broadcaster.count(),
+        "live": get_live_broadcast_service().stats()["clients"],
+        "orchestrator": get_orchestrator_logger().connection_count,
+    }
+
+
+def _engines() -> Dict[str, Any]:
+    from ..database import engine
+    from ..database_manager import db_manager
+
+    engines = {"main": engine}
+    engines.update(db_manager.engines)
+    if getattr(db_manager, "_history_engine", None) is not None:
+        engines["history"] = db_manager._history_engine
+    return engines
+
+
+def _pool_connections() -> Dict[Tuple[str, str], int]:
+    values = {}
+    for name, engine in _engines().items():
+        pool = engine.pool
+        for state, method in (("checked_out", "checkedout"), ("idle", "checkedin"), ("overflow", "overflow")):
+            if hasattr(pool, method):
+                values[(name, state)] = max(0, getattr(pool, method)())
+    return values
+
+
+def _running_executions() -> int:
+    from ..agent import executions
+
+    return len(executions)
+
+
+def _process_stats() -> Dict[str, float]:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    stats = {"cpu_seconds": usage.ru_utime + usage.ru_stime}
+    try:
+        with open("/proc/self/statm") as f:
+            stats["resident_memory_bytes"] = int(f.read().split()[1]) * resource.getpagesize()
+        stats["open_fds"] = len(os.listdir("/proc/self/fd"))
+    except OSError:
+        stats["resident_memory_bytes"] = usage.ru_maxrss * 1024  # pico, fora do Linux
+    return stats
+
+
+def is_sqlite_busy(error: BaseException) -> bool:
+    message = str(error).lower()
+    return "database is locked" in message or "database is busy" in message
+
+
+def _on_sql_error(exception_context) -> None:
+    if not is_sqlite_busy(exception_context.original_exception):
+        return
+    engine = exception_context.engine
+    database = os.path.basename(engine.url.database or "memory") if engine is not None else "unknown"
+    get_metrics_registry().metrics["sqlite_busy_errors_total"].inc(database=database)
+
+
+def _audit_hook(event: str, args: tuple) -> None:
+    if event == "subprocess.Popen":
+        executable = args[0] if args and args[0] else (args[1][0] if len(args) > 1 and args[1] else "")
+        counter = _registry.metrics.get("subprocess_spawns_total") if _registry else None
+        if counter is not None:
+            counter.inc(executable=os.path.basename(os.fsdecode(executable)))
+
+
+def _register_builtin_metrics(registry: MetricsRegistry) -> None:
+    registry.histogram(
+        "http_request_duration_seconds", "HTTP request latency by route template.",
+        ("method", "route", "status"),
+    )
+    registry.gauge("event_loop_lag_seconds", "Delay of the last event loop lag probe.")
+    registry.histogram("event_loop_lag", "Event loop lag probes (seconds).", buckets=LAG_BUCKETS)
+    registry.gauge(
+        "websocket_connections", "Connected WebSocket clients per manager.", ("manager",),
+        callback=_websocket_connections,
+    )
+    registry.counter("sqlite_busy_errors_total", "SQLite 'database is locked' errors.", ("database",))
+    registry.counter("sqlite_retries_total", "SQLite writes retried after a failure.", ("component",))
+    registry.gauge(
+        "db_pool_connections", "Connections of each engine pool by state.", ("database", "state"),
+        callback=_pool_connections,
+    )
+    registry.gauge("agent_executions_running", "Agent executions in progress.", callback=_running_executions)
+    registry.counter("subprocess_spawns_total", "Processes spawned, by executable.", ("executable",))
+    registry.histogram(
+        "embedding_inference_seconds", "Sentence-transformers encode time.", ("kind",),
+        buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 30.0),
+    )
+    for name, help in (
+        ("cpu_seconds", "Process CPU time (user + system)."),
+        ("resident_memory_bytes", "Process resident memory."),
+        ("open_fds", "Open file descriptors."),
+    ):
+        registry.gauge(f"process_{name}", help, callback=lambda name=name: _process_stats().get(name, 0))
+
+
+_instrumented = False
+
+
+def instrument_process() -> None:
+    """Install the SQL error listener and the subprocess audit hook (once per process)."""
+    global _instrumented
+    if _instrumented or not get_settings().metrics_enabled:
+        return
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    get_metrics_registry()
+    event.listen(Engine, "handle_error", _on_sql_error)
+    sys.addaudithook(_audit_hook)
+    _instrumented = True
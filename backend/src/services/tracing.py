@@ -0,0 +1,331 @@
+"""Lightweight tracing for the orchestrator cycle.
+
+A trace starts with ``tracer.trace(name)`` (one per orchestrator cycle);
+``tracer.span(name)`` opens a child of the current span, tracked in a
+``ContextVar`` so it follows ``await`` and ``asyncio.gather``. SQL
+statements executed inside a trace become child spans through engine
+events. Outside a trace, ``span()`` only feeds the histograms.
+
+Every finished span is added to the duration histogram of its name (a
+DDSketch for quantiles plus fixed buckets), exposed by
+``GET /api/orchestrator/perf``. Finished traces are kept in a small ring
+and appended to ``tracing_export_file`` as one OTLP/JSON ``resourceSpans``
+document per line, readable by OpenTelemetry tooling.
+"""
+
+import asyncio
+import contextvars
+import functools
+import inspect
+import json
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from ..config.settings import get_settings
+from .log_file import AsyncLogFileWriter
+from .quantile_sketch import DDSketch
+
+# Limites superiores (ms) dos buckets fixos dos histogramas
+HISTOGRAM_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 300000, 1800000)
+# Spans guardados por trace (ciclos com muitos SQLs não crescem sem limite)
+MAX_SPANS_PER_TRACE = 2000
+SQL_STATEMENT_CHARS = 200
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+def _new_id(nbytes: int) -> str:
+    return os.urandom(nbytes).hex()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Span:
+    """One timed operation inside a trace."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes",
+                 "error", "_trace")
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else _new_id(16)
+        self.span_id = _new_id(8)
+        self.parent_id = parent.span_id if parent else None
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = dict(attributes or {})
+        self.error: Optional[str] = None
+        # Spans finalizados do trace (compartilhado por todos os spans dele)
+        self._trace: Optional[List["Span"]] = parent._trace if parent else None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span: Dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class DurationHistogram:
+    """Durations (ms) of one span name: quantiles and fixed buckets."""
+
+    def __init__(self):
+        self.sketch = DDSketch(relative_accuracy=0.02)
+        self.buckets = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)  # último = +Inf
+        self.errors = 0
+
+    def add(self, duration_ms: float, error: bool = False) -> None:
+        self.sketch.add(duration_ms)
+        for i, bound in enumerate(HISTOGRAM_BUCKETS_MS):
+            if duration_ms <= bound:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+        if error:
+            self.errors += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        sketch = self.sketch
+        cumulative, buckets = 0, {}
+        for bound, count in zip(list(HISTOGRAM_BUCKETS_MS) + ["+Inf"], self.buckets):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {
+            "count": sketch.count,
+            "errors": self.errors,
+            "totalMs": round(sketch.sum, 2),
+            "avgMs": round(sketch.mean, 2),
+            "p50Ms": round(sketch.quantile(0.5), 2) if sketch.count else None,
+            "p95Ms": round(sketch.quantile(0.95), 2) if sketch.count else None,
+            "p99Ms": round(sketch.quantile(0.99), 2) if sketch.count else None,
+            "maxMs": round(sketch.max, 2) if sketch.max is not None else None,
+            "buckets": buckets,
+        }
+
+
+class Tracer:
+    """Creates spans, aggregates histograms and exports finished traces."""
+
+    def __init__(self, export_path: Optional[str] = None, recent_traces: int = 50, enabled: bool = True):
+        self.enabled = enabled
+        self.histograms: Dict[str, DurationHistogram] = {}
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=recent_traces)
+        self.export_path = Path(export_path) if export_path else None
+        self._writer = AsyncLogFileWriter(self.export_path) if self.export_path else None
+        self.dropped_spans = 0
+
+    # ==================== SPANS ====================
+
+    @contextmanager
+    def trace(self, name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+        """Start a new trace (root span), even inside another one."""
+        if not self.enabled:
+            yield None
+            return
+        span = Span(name, attributes=attributes)
+        span._trace = []
+        with self._activate(span):
+            yield span
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+        """Child span of the current one; outside a trace only the histogram is fed."""
+        if not self.enabled:
+            yield None
+            return
+        span = Span(name, parent=_current_span.get(), attributes=attributes)
+        with self._activate(span):
+            yield span
+
+    @contextmanager
+    def _activate(self, span: Span) -> Iterator[Span]:
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            if not isinstance(e, (asyncio.CancelledError, GeneratorExit)):
+                span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            self.finish(span)
+
+    def start_child(self, name: str, **attributes: Any) -> Optional[Span]:
+        """Child span of the current one without activating it (SQL events). None outside a trace."""
+        parent = _current_span.get()
+        if not self.enabled or parent is None or parent._trace is None:
+            return None
+        return Span(name, parent=parent, attributes=attributes)
+
+    def finish(self, span: Span) -> None:
+        span.end_ns = time.time_ns()
+        histogram = self.histograms.get(span.name)
+        if histogram is None:
+            histogram = self.histograms[span.name] = DurationHistogram()
+        histogram.add(span.duration_ms, error=span.error is not None)
+
+        if span._trace is None:
+            return
+        if len(span._trace) < MAX_SPANS_PER_TRACE or span.parent_id is None:
+            span._trace.append(span)
+        else:
+            self.dropped_spans += 1
+        if span.parent_id is None:
+            self._finish_trace(span)
+
+    def _finish_trace(self, root: Span) -> None:
+        spans = root._trace or []
+        steps: Dict[str, float] = {}
+        for span in spans:
+            if span is not root:
+                steps[span.name] = round(steps.get(span.name, 0.0) + span.duration_ms, 2)
+        self.recent.append({
+            "traceId": root.trace_id,
+            "name": root.name,
+            "startedAt": datetime.utcfromtimestamp(root.start_ns / 1e9).isoformat(),
+            "durationMs": round(root.duration_ms, 2),
+            "error": root.error,
+            "spanCount": len(spans),
+            "attributes": root.attributes,
+            "steps": steps,
+        })
+        if self._writer is not None:
+            document = {"resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "orquestrator-agent"}}]},
+                "scopeSpans": [{"scope": {"name": "orchestrator"}, "spans": [s.to_otlp() for s in spans]}],
+            }]}
+            try:
+                self._writer.write(json.dumps(document, ensure_ascii=False))
+            except RuntimeError:
+                pass  # sem event loop (scripts síncronos)
+
+    # ==================== REPORT ====================
+
+    def perf(self, recent: int = 20) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "steps": {name: hist.to_dict() for name, hist in sorted(self.histograms.items())},
+            "recentTraces": list(self.recent)[-recent:][::-1],
+            "exportFile": str(self.export_path) if self.export_path else None,
+            "droppedSpans": self.dropped_spans,
+        }
+
+    def reset(self) -> None:
+        self.histograms.clear()
+        self.recent.clear()
+        self.dropped_spans = 0
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            await self._writer.close()
+
+
+def traced(name: str):
+    """Decorator: run the function (sync or async) inside `tracer.span(name)`."""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with get_tracer().span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with get_tracer().span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ==================== SQL ====================
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    words = statement.split(None, 1)
+    span = get_tracer().start_child(
+        f"sql.{words[0].lower() if words else 'statement'}",  # sql.select, sql.insert...
+        **{"db.statement": statement[:SQL_STATEMENT_CHARS], "db.executemany": executemany},
+    )
+    if span is not None and context is not None:
+        context._trace_span = span
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    span = getattr(context, "_trace_span", None)
+    if span is not None:
+        context._trace_span = None
+        get_tracer().finish(span)
+
+
+def _handle_error(exception_context):
+    context = exception_context.execution_context
+    span = getattr(context, "_trace_span", None) if context is not None else None
+    if span is not None:
+        context._trace_span = None
+        span.error = f"{type(exception_context.original_exception).__name__}"
+        get_tracer().finish(span)
+
+
+_sql_instrumented = False
+
+
+def instrument_sqlalchemy() -> None:
+    """Trace SQL statements run inside a trace (all engines, once)."""
+    global _sql_instrumented
+    if _sql_instrumented:
+        return
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+    _sql_instrumented = True
+
+
+_tracer: Optional[Tracer] = None
+
+
+def get_tracer() -> Tracer:
+    """Get the singleton tracer."""
+    global _tracer
+    if _tracer is None:
+        settings = get_settings()
+        _tracer = Tracer(
+            export_path=settings.tracing_export_file or None,
+            recent_traces=settings.tracing_recent_traces,
+            enabled=settings.tracing_enabled,
+        )
+        if settings.tracing_enabled and settings.tracing_sql_spans:
+            instrument_sqlalchemy()
+    return _tracer
@@ -6,6 +6,8 @@ import re
 from typing import Dict, Any, Optional
 from dataclasses import dataclass
 
+from .tracing import traced
+
 logger = logging.getLogger(__name__)
 
 
@@ -31,6 +33,7 @@ class UsageCheckerService:
         """
         self.limit_threshold = limit_threshold
 
+    @traced("usage.check")
     async def check_usage(self) -> UsageInfo:
         """
         Check current Claude Code usage by running `claude /usage`.
@@ -0,0 +1,241 @@
+"""In-memory vote ingestion with batched database flushes.
+
+Votes are accepted without touching the database: duplicates are rejected in
+memory (exact session set, a bloom filter once the set is full, and a per-IP
+cap), counts are kept in memory and accepted votes are written in one
+transaction per flush interval.
+
+The flush inserts with ``OR IGNORE`` against the unique (round, session)
+index and counts only the rows actually inserted, so a session that voted on
+two workers within the same interval is counted once.
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import insert, update
+
+from ..config.settings import get_settings
+from ..models.live import Vote, VoteType, VotingOption
+from .telemetry import get_metrics_registry
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Fixed-size bloom filter (no false negatives, tunable false positives)."""
+
+    __slots__ = ("size", "hashes", "bits")
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key: str) -> bool:
+        """Add a key; returns True if it was (probably) already present."""
+        present = True
+        for position in self._positions(key):
+            byte, bit = divmod(position, 8)
+            if not self.bits[byte] & (1 << bit):
+                present = False
+                self.bits[byte] |= 1 << bit
+        return present
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[p // 8] & (1 << (p % 8)) for p in self._positions(key))
+
+
+class VoteIngestion:
+    """Dedup, in-memory tallies and periodic batched flush for one voting round."""
+
+    def __init__(
+        self,
+        session_factory: Callable,
+        flush_interval: Optional[float] = None,
+        max_votes_per_ip: Optional[int] = None,
+        max_exact_sessions: Optional[int] = None,
+        bloom_capacity: Optional[int] = None,
+        on_flushed: Optional[Callable[[Dict[str, int], List[str]], None]] = None,
+    ):
+        settings = get_settings()
+        self.session_factory = session_factory
+        self.flush_interval = (
+            flush_interval if flush_interval is not None else settings.vote_flush_interval_ms / 1000
+        )
+        self.max_votes_per_ip = max_votes_per_ip or settings.vote_max_per_ip
+        self.max_exact_sessions = max_exact_sessions or settings.vote_exact_dedup_sessions
+        self.bloom_capacity = bloom_capacity or settings.vote_bloom_capacity
+        self.on_flushed = on_flushed
+
+        self.round_id: Optional[str] = None
+        self._sessions: Set[str] = set()
+        self._bloom = BloomFilter(self.bloom_capacity)
+        self._ip_counts: Dict[str, int] = {}
+        # Votos aceitos ainda não gravados: (option_id, session_id, ip, created_at)
+        self._pending: List[Tuple[str, str, Optional[str], datetime]] = []
+        self._pending_counts: Dict[str, int] = {}
+        # Contagens confirmadas no banco (de todos os workers)
+        self._flushed_counts: Dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.flushes = 0
+        self.duplicates_discarded = 0
+
+    def start(self, round_id: str, option_ids: List[str]) -> None:
+        """Reset state for a new round and start the flush loop."""
+        self.round_id = round_id
+        self._sessions = set()
+        self._bloom = BloomFilter(self.bloom_capacity)
+        self._ip_counts = {}
+        self._pending = []
+        self._pending_counts = {}
+        self._flushed_counts = {option_id: 0 for option_id in option_ids}
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        """Flush what is left and stop the loop."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    # =========================================================================
+    # Admission
+    # =========================================================================
+
+    def seen(self, session_id: str) -> bool:
+        if session_id in self._sessions:
+            return True
+        # Acima do limite do set exato, a sessão só está no bloom filter
+        return len(self._sessions) >= self.max_exact_sessions and session_id in self._bloom
+
+    def mark_voted(self, session_id: str) -> None:
+        """Remember a session (also used for votes accepted by other workers)."""
+        if len(self._sessions) < self.max_exact_sessions:
+            self._sessions.add(session_id)
+        self._bloom.add(session_id)
+
+    def admit(self, session_id: str, ip_address: Optional[str]) -> Optional[str]:
+        """Return why the vote is rejected, or None if it may be counted."""
+        if self.seen(session_id):
+            return "You have already voted in this round"
+        if ip_address and self._ip_counts.get(ip_address, 0) >= self.max_votes_per_ip:
+            return "Too many votes from this network"
+        return None
+
+    def record(self, option_id: str, session_id: str, ip_address: Optional[str]) -> int:
+        """Count an admitted vote in memory; returns the option's current count."""
+        self.mark_voted(session_id)
+        if ip_address:
+            self._ip_counts[ip_address] = self._ip_counts.get(ip_address, 0) + 1
+        self._pending.append((option_id, session_id, ip_address, datetime.utcnow()))
+        self._pending_counts[option_id] = self._pending_counts.get(option_id, 0) + 1
+        return self.count(option_id)
+
+    def count(self, option_id: str) -> int:
+        """Confirmed count plus this worker's votes not yet flushed."""
+        return self._flushed_counts.get(option_id, 0) + self._pending_counts.get(option_id, 0)
+
+    def counts(self) -> Dict[str, int]:
+        return {option_id: self.count(option_id) for option_id in self._flushed_counts}
+
+    def apply_remote(self, counts: Dict[str, int], sessions: List[str]) -> None:
+        """Merge a flush done by another worker."""
+        for option_id, count in counts.items():
+            # Contagens no banco só crescem: a maior vista é a mais recente
+            self._flushed_counts[option_id] = max(self._flushed_counts.get(option_id, 0), count)
+        for session_id in sessions:
+            self.mark_voted(session_id)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    # =========================================================================
+    # Flush
+    # =========================================================================
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Vote flush failed (will retry): {e}")
+                get_metrics_registry().metrics["sqlite_retries_total"].inc(component="vote_ingestion")
+
+    async def flush(self) -> Optional[Dict[str, int]]:
+        """Write pending votes in one transaction; returns the confirmed counts."""
+        if not self._pending or not self.round_id:
+            return None
+
+        batch, self._pending = self._pending, []
+        batch_counts, self._pending_counts = self._pending_counts, {}
+        round_id = self.round_id
+
+        try:
+            async with self.session_factory() as db:
+                result = await db.execute(
+                    insert(Vote).prefix_with("OR IGNORE").returning(Vote.target_id),
+                    [
+                        {
+                            "vote_type": VoteType.PROJECT,
+                            "target_id": option_id,
+                            "session_id": session_id,
+                            "ip_address": ip,
+                            "voting_round_id": round_id,
+                            "created_at": created_at,
+                        }
+                        for option_id, session_id, ip, created_at in batch
+                    ],
+                )
+                inserted: Dict[str, int] = {}
+                for (option_id,) in result.all():
+                    inserted[option_id] = inserted.get(option_id, 0) + 1
+
+                confirmed: Dict[str, int] = {}
+                for option_id, delta in inserted.items():
+                    new_count = await db.scalar(
+                        update(VotingOption)
+                        .where(VotingOption.id == option_id)
+                        .values(vote_count=VotingOption.vote_count + delta)
+                        .returning(VotingOption.vote_count)
+                    )
+                    if new_count is not None:
+                        confirmed[option_id] = new_count
+                await db.commit()
+        except Exception:
+            # Devolve o lote para a próxima tentativa (na frente dos novos votos)
+            self._pending = batch + self._pending
+            for option_id, delta in batch_counts.items():
+                self._pending_counts[option_id] = self._pending_counts.get(option_id, 0) + delta
+            raise
+
+        if round_id != self.round_id:
+            return None
+
+        self.flushes += 1
+        self.duplicates_discarded += len(batch) - sum(inserted.values())
+        for option_id, count in confirmed.items():
+            self._flushed_counts[option_id] = max(self._flushed_counts.get(option_id, 0), count)
+
+        if self.on_flushed:
+            self.on_flushed(confirmed, [session_id for _, session_id, _, _ in batch])
+        return confirmed
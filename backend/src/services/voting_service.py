@@ -1,15 +1,28 @@
-"""Voting service for spectator voting system."""
+"""Voting service for spectator voting system.
+
+The database is shared by all workers; round start/end and vote counts are
+also published on the backplane so every worker mirrors the active round and
+notifies its own spectators.
+
+Votes go through VoteIngestion (in-memory dedup and tallies, one database
+transaction per flush interval); count broadcasts are throttled to
+``vote_broadcast_hz``.
+"""
 
 import asyncio
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Callable, Awaitable, Tuple
+from typing import Optional, List, Dict, Callable, Awaitable, Set, Tuple
 from uuid import uuid4
 import logging
 
 from sqlalchemy import select, update, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..models.live import Vote, VoteType, VotingRound, VotingOption
+from .backplane import get_backplane
+from .vote_ingestion import VoteIngestion
+from ..config.settings import get_settings
+from ..database import get_session
+from ..models.live import VotingRound, VotingOption
 from ..schemas.live import VotingOptionSchema, VotingStateResponse
 
 logger = logging.getLogger(__name__)
@@ -51,8 +64,22 @@ class VotingService:
         self._on_update_callbacks: list[Callable[[Dict[str, int]], Awaitable[None]]] = []
         self._on_ended_callbacks: list[Callable[[VotingOption, List[VotingOption]], Awaitable[None]]] = []
 
-        # Sessions that voted in current round
-        self._voted_sessions: set[str] = set()
+        # Dedup, in-memory tallies and batched writes of the current round
+        self._ingestion = VoteIngestion(
+            session_factory=lambda: get_session()(),
+            on_flushed=self._on_votes_flushed,
+        )
+
+        # Vote count broadcasts are coalesced to at most N per second
+        self._update_interval = 1.0 / get_settings().vote_broadcast_hz
+        self._update_handle: Optional[asyncio.TimerHandle] = None
+        self._last_update = 0.0
+
+        # Notificações em segundo plano (referência forte até terminarem)
+        self._tasks: Set[asyncio.Task] = set()
+
+        self._backplane = get_backplane()
+        self._backplane.subscribe("voting", self._on_backplane_message)
 
         logger.info("VotingService initialized")
 
@@ -69,6 +96,7 @@ class VotingService:
             return VotingStateResponse(is_active=False)
 
         time_remaining = max(0, int((self._active_round.ends_at - datetime.utcnow()).total_seconds()))
+        self._sync_counts()
 
         return VotingStateResponse(
             is_active=True,
@@ -128,19 +156,37 @@ class VotingService:
 
         await db.commit()
 
+        # Desanexa da sessão: as contagens ao vivo mudam em memória e não
+        # podem sobrescrever o incremento atômico feito pelo VoteIngestion
+        db.expunge(voting_round)
+        for option in voting_options:
+            db.expunge(option)
+
         # Store in memory
         self._active_round = voting_round
         self._active_options = voting_options
-        self._voted_sessions.clear()
+        self._ingestion.start(round_id, [opt.id for opt in voting_options])
 
         logger.info(f"Voting round started: {round_id}, ends at {ends_at}")
 
-        # Notify callbacks
-        for callback in self._on_started_callbacks:
-            try:
-                await callback(voting_round, voting_options)
-            except Exception as e:
-                logger.error(f"Error in voting started callback: {e}")
+        self._backplane.publish("voting", {
+            "event": "started",
+            "round": {
+                "id": voting_round.id,
+                "started_at": voting_round.started_at.isoformat(),
+                "ends_at": voting_round.ends_at.isoformat(),
+            },
+            "options": [
+                {
+                    "id": opt.id,
+                    "title": opt.title,
+                    "description": opt.description,
+                    "category": opt.category,
+                }
+                for opt in voting_options
+            ],
+        })
+        await self._notify_started()
 
         # Start timer
         self._timer_task = asyncio.create_task(self._end_round_timer(db, duration_seconds))
@@ -154,58 +200,68 @@ class VotingService:
         session_id: str,
         ip_address: Optional[str] = None
     ) -> Tuple[bool, str, Optional[int]]:
-        """Cast a vote. Returns (success, message, new_count)."""
+        """
+        Cast a vote. Returns (success, message, new_count).
+
+        The vote is counted in memory and written with the next batched
+        flush (``db`` is not used; kept for the route signature).
+        """
         if not self.is_active:
             return False, "Voting is not active", None
 
-        # Check if already voted
-        if session_id in self._voted_sessions:
-            return False, "You have already voted in this round", None
-
         # Find option
         option = next((o for o in self._active_options if o.id == option_id), None)
         if not option:
             return False, "Invalid option", None
 
-        # Create vote record
-        vote = Vote(
-            vote_type=VoteType.PROJECT,
-            target_id=option_id,
-            session_id=session_id,
-            ip_address=ip_address,
-            voting_round_id=self._active_round.id
-        )
-        db.add(vote)
+        # Check if already voted (session, bloom filter, per-IP cap)
+        rejection = self._ingestion.admit(session_id, ip_address)
+        if rejection:
+            return False, rejection, None
 
-        # Update option count
-        option.vote_count += 1
-        await db.execute(
-            update(VotingOption)
-            .where(VotingOption.id == option_id)
-            .values(vote_count=option.vote_count)
-        )
+        option.vote_count = self._ingestion.record(option_id, session_id, ip_address)
+        self._schedule_update()
 
-        await db.commit()
+        return True, "Vote recorded", option.vote_count
 
-        # Mark as voted
-        self._voted_sessions.add(session_id)
+    def _on_votes_flushed(self, counts: Dict[str, int], sessions: List[str]) -> None:
+        """Share a flush with the other workers and refresh the counts."""
+        self._backplane.publish("voting", {
+            "event": "counts",
+            "round_id": self._active_round.id if self._active_round else None,
+            "counts": counts,
+            "sessions": sessions,
+        })
+        self._schedule_update()
+
+    def _sync_counts(self) -> None:
+        counts = self._ingestion.counts()
+        for option in self._active_options:
+            option.vote_count = counts.get(option.id, option.vote_count)
+
+    def _schedule_update(self) -> None:
+        """Coalesce vote count broadcasts to at most vote_broadcast_hz."""
+        if self._update_handle is not None:
+            return
+        loop = asyncio.get_running_loop()
+        delay = max(0.0, self._last_update + self._update_interval - loop.time())
+        self._update_handle = loop.call_later(delay, self._emit_update)
 
-        logger.info(f"Vote recorded: {session_id[:8]}... -> {option.title} (now {option.vote_count})")
+    def _emit_update(self) -> None:
+        self._update_handle = None
+        self._last_update = asyncio.get_running_loop().time()
+        self._spawn(self._notify_update())
 
-        # Notify callbacks with current counts
-        votes_dict = {opt.id: opt.vote_count for opt in self._active_options}
-        for callback in self._on_update_callbacks:
-            try:
-                await callback(votes_dict)
-            except Exception as e:
-                logger.error(f"Error in voting update callback: {e}")
-
-        return True, "Vote recorded", option.vote_count
+    def _spawn(self, coro) -> None:
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
 
     async def _end_round_timer(self, db: AsyncSession, duration: int):
         """Timer to end the voting round."""
         try:
-            await asyncio.sleep(duration)
+            # Votes stop at ends_at; the grace lets every worker flush its last batch
+            await asyncio.sleep(duration + 2 * self._ingestion.flush_interval)
             await self.end_round(db)
         except asyncio.CancelledError:
             logger.info("Voting timer cancelled")
@@ -216,9 +272,19 @@ class VotingService:
             return None
 
         # Cancel timer if still running
-        if self._timer_task:
+        if self._timer_task and self._timer_task is not asyncio.current_task():
             self._timer_task.cancel()
-            self._timer_task = None
+        self._timer_task = None
+
+        # Final flush, then the database has the tallies of every worker
+        await self._ingestion.stop()
+        result = await db.execute(
+            select(VotingOption.id, VotingOption.vote_count)
+            .where(VotingOption.voting_round_id == self._active_round.id)
+        )
+        stored = dict(result.all())
+        for option in self._active_options:
+            option.vote_count = max(option.vote_count, stored.get(option.id, 0))
 
         # Find winner (highest votes)
         if self._active_options:
@@ -247,21 +313,90 @@ class VotingService:
 
         logger.info(f"Voting round ended. Winner: {winner.title if winner else 'None'}")
 
-        # Notify callbacks
+        self._backplane.publish("voting", {
+            "event": "ended",
+            "round_id": self._active_round.id,
+            "winner_id": winner.id if winner else None,
+            "counts": {opt.id: opt.vote_count for opt in self._active_options},
+        })
+        await self._finish_round(winner)
+
+        return winner
+
+    async def _finish_round(self, winner: Optional[VotingOption]) -> None:
+        """Notify callbacks and clear the in-memory round."""
         for callback in self._on_ended_callbacks:
             try:
                 await callback(winner, self._active_options)
             except Exception as e:
                 logger.error(f"Error in voting ended callback: {e}")
 
-        # Clear memory
-        round_copy = self._active_round
-        options_copy = self._active_options.copy()
+        if self._update_handle:
+            self._update_handle.cancel()
+            self._update_handle = None
         self._active_round = None
         self._active_options = []
-        self._voted_sessions.clear()
 
-        return winner
+    async def _notify_started(self) -> None:
+        for callback in self._on_started_callbacks:
+            try:
+                await callback(self._active_round, self._active_options)
+            except Exception as e:
+                logger.error(f"Error in voting started callback: {e}")
+
+    async def _notify_update(self) -> None:
+        if not self._active_round:
+            return
+        self._sync_counts()
+        votes_dict = {opt.id: opt.vote_count for opt in self._active_options}
+        for callback in self._on_update_callbacks:
+            try:
+                await callback(votes_dict)
+            except Exception as e:
+                logger.error(f"Error in voting update callback: {e}")
+
+    # =========================================================================
+    # Replication from other workers
+    # =========================================================================
+
+    def _on_backplane_message(self, message: Dict, local: bool) -> None:
+        """Mirror a round started, voted on or ended by another worker."""
+        if local:
+            return
+        event = message.get("event")
+
+        if event == "started":
+            round_data = message["round"]
+            self._active_round = VotingRound(
+                id=round_data["id"],
+                started_at=datetime.fromisoformat(round_data["started_at"]),
+                ends_at=datetime.fromisoformat(round_data["ends_at"]),
+                is_active=True,
+            )
+            self._active_options = [
+                VotingOption(voting_round_id=round_data["id"], vote_count=0, **opt)
+                for opt in message["options"]
+            ]
+            self._ingestion.start(round_data["id"], [opt.id for opt in self._active_options])
+            self._spawn(self._notify_started())
+
+        elif event == "counts":
+            if not self._active_round or self._active_round.id != message["round_id"]:
+                return
+            self._ingestion.apply_remote(message["counts"], message["sessions"])
+            self._schedule_update()
+
+        elif event == "ended":
+            if not self._active_round or self._active_round.id != message["round_id"]:
+                return
+            if self._timer_task:
+                self._timer_task.cancel()
+                self._timer_task = None
+            for option in self._active_options:
+                option.vote_count = message["counts"].get(option.id, option.vote_count)
+            winner = next((o for o in self._active_options if o.id == message["winner_id"]), None)
+            self._spawn(self._ingestion.stop())
+            self._spawn(self._finish_round(winner))
 
     def on_started(self, callback: Callable[[VotingRound, List[VotingOption]], Awaitable[None]]) -> None:
         """Register callback for when voting starts."""
@@ -0,0 +1,287 @@
+"""Fan-out WebSocket broadcaster with per-client send queues.
+
+Publishing never awaits a socket: the message is serialized once per wire
+encoding (JSON text or MessagePack, see services/ws_protocol.py) and the same
+frame is appended to every recipient's bounded queue. Each client has its own
+writer task, so a slow spectator only delays itself.
+
+When a client's queue is full the slow-consumer policy decides what happens:
+
+- ``drop``: discard the oldest queued message (the client skips ahead)
+- ``coalesce``: messages with a coalesce key (e.g. presence counts, status)
+  replace the pending message with the same key; otherwise behaves like drop
+- ``disconnect``: close the socket; the client reconnects and resyncs
+"""
+
+import asyncio
+import logging
+from collections import deque
+from enum import Enum
+from typing import Any, Deque, Dict, FrozenSet, Hashable, Optional, Set, Tuple, Union
+
+from fastapi import WebSocket
+
+from .ws_protocol import encode
+
+logger = logging.getLogger(__name__)
+
+ALL_CLIENTS = "*"
+
+
+class SlowConsumerPolicy(str, Enum):
+    """What to do when a client's send queue is full."""
+    DROP = "drop"
+    COALESCE = "coalesce"
+    DISCONNECT = "disconnect"
+
+
+Frame = Union[str, bytes]
+
+
+def to_payload(message: Any) -> Any:
+    """Dicts pass through; pydantic messages are dumped in JSON mode."""
+    if hasattr(message, "model_dump"):
+        return message.model_dump(mode="json")
+    return message
+
+
+def serialize(message: Any, encoding: str = "json") -> Frame:
+    """Serialize a dict or pydantic message for the given wire encoding."""
+    return encode(to_payload(message), encoding)
+
+
+class ClientConnection:
+    """A connected socket with its bounded queue and writer task."""
+
+    __slots__ = (
+        "websocket", "key", "group", "policy", "max_queue", "send_timeout",
+        "queue", "ready", "task", "closed", "sent", "dropped", "on_close",
+        "encoding", "features", "bytes_sent",
+    )
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        key: Hashable,
+        group: str,
+        policy: SlowConsumerPolicy,
+        max_queue: int,
+        send_timeout: float,
+        on_close,
+        encoding: str = "json",
+        features: FrozenSet[str] = frozenset(),
+    ):
+        self.websocket = websocket
+        self.key = key
+        self.group = group
+        self.policy = policy
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.encoding = encoding
+        self.features = features
+        self.bytes_sent = 0
+        self.queue: Deque[Tuple[Optional[str], Frame]] = deque()
+        self.ready = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.closed = False
+        self.sent = 0
+        self.dropped = 0
+        self.on_close = on_close
+
+    def start(self) -> None:
+        self.task = asyncio.create_task(self._writer())
+
+    def enqueue(self, frame: Frame, coalesce_key: Optional[str] = None) -> bool:
+        """Queue a serialized message. Returns False if it was not accepted."""
+        if self.closed:
+            return False
+
+        if coalesce_key is not None and self.policy == SlowConsumerPolicy.COALESCE:
+            for index, (pending_key, _) in enumerate(self.queue):
+                if pending_key == coalesce_key:
+                    self.queue[index] = (coalesce_key, frame)
+                    self.dropped += 1
+                    return True
+
+        if len(self.queue) >= self.max_queue:
+            if self.policy == SlowConsumerPolicy.DISCONNECT:
+                logger.warning(f"Slow WebSocket consumer {self.key}: queue full, disconnecting")
+                self.close()
+                return False
+            self.queue.popleft()
+            self.dropped += 1
+
+        self.queue.append((coalesce_key, frame))
+        self.ready.set()
+        return True
+
+    async def _writer(self) -> None:
+        try:
+            while True:
+                await self.ready.wait()
+                while self.queue:
+                    _, frame = self.queue.popleft()
+                    if isinstance(frame, bytes):
+                        send = self.websocket.send_bytes(frame)
+                    else:
+                        send = self.websocket.send_text(frame)
+                    await asyncio.wait_for(send, self.send_timeout)
+                    self.sent += 1
+                    self.bytes_sent += len(frame)
+                self.ready.clear()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"WebSocket writer for {self.key} stopped: {e}")
+            self.close()
+
+    def close(self) -> None:
+        """Stop the writer and close the socket (idempotent)."""
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.clear()
+        if self.task and self.task is not asyncio.current_task():
+            self.task.cancel()
+        self.on_close(self)
+        asyncio.ensure_future(self._close_socket())
+
+    async def _close_socket(self) -> None:
+        try:
+            await self.websocket.close(code=1013)  # Try again later
+        except Exception:
+            pass
+
+
+class WebSocketBroadcaster:
+    """Groups of client connections with non-blocking fan-out."""
+
+    def __init__(
+        self,
+        name: str,
+        policy: SlowConsumerPolicy = SlowConsumerPolicy.DROP,
+        max_queue: int = 256,
+        send_timeout: float = 10.0,
+    ):
+        self.name = name
+        self.policy = policy
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.groups: Dict[str, Set[ClientConnection]] = {}
+        self.clients: Dict[Hashable, ClientConnection] = {}
+        self.published = 0
+
+    def add(
+        self,
+        websocket: WebSocket,
+        group: str = ALL_CLIENTS,
+        key: Optional[Hashable] = None,
+        encoding: str = "json",
+        features: FrozenSet[str] = frozenset(),
+    ) -> ClientConnection:
+        """Register an accepted socket (with its negotiated protocol) and start its writer."""
+        key = key if key is not None else id(websocket)
+        client = ClientConnection(
+            websocket, key, group, self.policy, self.max_queue, self.send_timeout,
+            on_close=self._forget, encoding=encoding, features=features,
+        )
+        self.clients[key] = client
+        self.groups.setdefault(group, set()).add(client)
+        client.start()
+        return client
+
+    def remove(self, key: Hashable) -> None:
+        """Unregister a client (e.g. after WebSocketDisconnect)."""
+        client = self.clients.get(key)
+        if client is None:
+            return
+        # The socket is already gone; just stop the writer
+        client.closed = True
+        client.queue.clear()
+        if client.task:
+            client.task.cancel()
+        self._forget(client)
+
+    def _forget(self, client: ClientConnection) -> None:
+        if self.clients.get(client.key) is client:
+            del self.clients[client.key]
+        members = self.groups.get(client.group)
+        if members is not None:
+            members.discard(client)
+            if not members:
+                del self.groups[client.group]
+
+    def publish(
+        self,
+        message: Any,
+        group: str = ALL_CLIENTS,
+        coalesce_key: Optional[str] = None,
+        variants: Optional[Dict[str, Any]] = None,
+    ) -> int:
+        """
+        Enqueue a message for every client in the group. Never blocks.
+
+        The message is serialized once per (variant, encoding) actually in
+        use. ``variants`` maps a protocol feature to an alternative message
+        for clients that negotiated it (e.g. {"delta": card_delta}).
+        """
+        members = self.groups.get(group)
+        if not members:
+            return 0
+
+        self.published += 1
+        frames: Dict[Tuple[Optional[str], str], Frame] = {}
+        payloads: Dict[Optional[str], Any] = {}
+        accepted = 0
+
+        for client in list(members):
+            variant = None
+            if variants and client.features:
+                variant = next((f for f in variants if f in client.features), None)
+
+            cache_key = (variant, client.encoding)
+            frame = frames.get(cache_key)
+            if frame is None:
+                if variant not in payloads:
+                    payloads[variant] = to_payload(variants[variant] if variant else message)
+                frame = frames[cache_key] = encode(payloads[variant], client.encoding)
+
+            if client.enqueue(frame, coalesce_key):
+                accepted += 1
+
+        return accepted
+
+    def send_to(self, key: Hashable, message: Any, coalesce_key: Optional[str] = None) -> bool:
+        """Enqueue a message for a single client, keeping order with broadcasts."""
+        client = self.clients.get(key)
+        if client is None:
+            return False
+        return client.enqueue(serialize(message, client.encoding), coalesce_key)
+
+    def count(self, group: Optional[str] = None) -> int:
+        if group is None:
+            return len(self.clients)
+        return len(self.groups.get(group, ()))
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and drop counters for diagnostics."""
+        clients = list(self.clients.values())
+        return {
+            "name": self.name,
+            "policy": self.policy.value,
+            "clients": len(clients),
+            "published": self.published,
+            "queued": sum(len(c.queue) for c in clients),
+            "maxQueueDepth": max((len(c.queue) for c in clients), default=0),
+            "dropped": sum(c.dropped for c in clients),
+            "bytesSent": sum(c.bytes_sent for c in clients),
+            "encodings": {
+                encoding: sum(1 for c in clients if c.encoding == encoding)
+                for encoding in {c.encoding for c in clients}
+            },
+        }
+
+    async def close_all(self) -> None:
+        for client in list(self.clients.values()):
+            client.close()
+        await asyncio.sleep(0)
@@ -0,0 +1,103 @@
+"""WebSocket wire protocol negotiation (encoding and optional features).
+
+Clients pick the encoding and features when connecting, either through the
+WebSocket subprotocol header or query parameters (for clients that cannot
+set subprotocols):
+
+    new WebSocket(url, ["orq.v1.msgpack.delta"])
+    ws://host/api/cards/ws?encoding=msgpack&delta=1
+
+- encoding ``json`` (default, text frames) or ``msgpack`` (binary frames)
+- feature ``delta``: card updates arrive as ``card_delta`` messages with
+  only the changed fields, keyed by card version (see services/card_ws.py)
+
+Transport compression (permessage-deflate) is negotiated by the server
+(uvicorn ``ws_per_message_deflate``) independently of this layer.
+"""
+
+import json
+from typing import Any, FrozenSet, Optional, Tuple, Union
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+SUBPROTOCOL_PREFIX = "orq.v1."
+ENCODINGS = ("json", "msgpack")
+FEATURES = frozenset({"delta"})
+
+
+def msgpack_available() -> bool:
+    try:
+        import msgpack  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def encode(payload: Any, encoding: str = "json") -> Union[str, bytes]:
+    """Encode a JSON-compatible payload for the wire."""
+    if encoding == "msgpack":
+        import msgpack
+
+        return msgpack.packb(payload, use_bin_type=True)
+    return json.dumps(payload)
+
+
+def decode(frame: Union[str, bytes]) -> Any:
+    """Decode a client frame (text JSON or binary MessagePack)."""
+    if isinstance(frame, bytes):
+        import msgpack
+
+        return msgpack.unpackb(frame, raw=False)
+    return json.loads(frame)
+
+
+def _parse_subprotocol(name: str) -> Optional[Tuple[str, FrozenSet[str]]]:
+    if not name.startswith(SUBPROTOCOL_PREFIX):
+        return None
+    encoding, *features = name[len(SUBPROTOCOL_PREFIX):].split(".")
+    if encoding not in ENCODINGS or not FEATURES.issuperset(features):
+        return None
+    if encoding == "msgpack" and not msgpack_available():
+        return None
+    return encoding, frozenset(features)
+
+
+def negotiate(websocket: WebSocket) -> Tuple[Optional[str], str, FrozenSet[str]]:
+    """
+    Pick (subprotocol to accept, encoding, features) for a connecting client.
+
+    The first offered subprotocol we support wins; otherwise the query
+    parameters are used; otherwise plain JSON without features.
+    """
+    for offered in websocket.scope.get("subprotocols") or []:
+        parsed = _parse_subprotocol(offered)
+        if parsed:
+            return offered, parsed[0], parsed[1]
+
+    params = websocket.query_params
+    encoding = params.get("encoding", "json")
+    if encoding not in ENCODINGS or (encoding == "msgpack" and not msgpack_available()):
+        encoding = "json"
+    features = frozenset(
+        feature for feature in FEATURES if params.get(feature) in ("1", "true")
+    )
+    return None, encoding, features
+
+
+async def accept(websocket: WebSocket) -> Tuple[str, FrozenSet[str]]:
+    """Negotiate, accept the socket and return (encoding, features)."""
+    subprotocol, encoding, features = negotiate(websocket)
+    await websocket.accept(subprotocol=subprotocol)
+    return encoding, features
+
+
+async def receive(websocket: WebSocket) -> Any:
+    """Receive and decode the next client message (None if undecodable)."""
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    frame = message.get("text") if message.get("text") is not None else message.get("bytes")
+    try:
+        return decode(frame)
+    except Exception:
+        return None
@@ -0,0 +1,37 @@
+"""Shared fixtures for the backend tests."""
+
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+
+from src.database import Base
+# project_metrics.project_id referencia active_project: o modelo precisa estar no metadata do create_all
+from src.models.project import ActiveProject  # noqa: F401
+
+
+@pytest_asyncio.fixture
+async def async_session():
+    """Create an async test database session (in-memory, all tables)."""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", echo=False)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with session_maker() as session:
+        yield session
+
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def session_maker(tmp_path):
+    """Session factory over a file database (all tables), for code that opens its own sessions."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    await engine.dispose()
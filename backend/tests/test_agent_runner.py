@@ -0,0 +1,76 @@
+"""Tests for the agent runner backends and the shared stage stream loop."""
+
+import time
+
+import pytest
+from sqlalchemy import select
+
+from src.agent import run_stream
+from src.execution import ExecutionRecord, ExecutionStatus, LogType
+from src.models.execution import ExecutionLog
+from src.repositories.execution_repository import ExecutionRepository
+from src.services.agent_runner import FakeRunner, RecordingRunner, RunRequest, load_script
+
+SCRIPT = [
+    {"kind": "text", "text": "Lendo a spec", "delay_ms": 40},
+    {"kind": "tool", "tool_name": "Write", "tool_input": {"file_path": "/w/specs/novo.md"}, "delay_ms": 40},
+    {"kind": "text", "text": "Pronto", "delay_ms": 40},
+    {"kind": "result", "text": "Resumo final", "delay_ms": 40,
+     "usage": {"input_tokens": 100, "output_tokens": 20, "cache_read_input_tokens": 5000}},
+]
+
+
+def make_record(card_id):
+    return ExecutionRecord(cardId=card_id, title="t", status=ExecutionStatus.RUNNING, logs=[])
+
+
+@pytest.mark.asyncio
+class TestAgentRunner:
+    """Test suite for FakeRunner, RecordingRunner and run_stream."""
+
+    async def test_run_stream_logs_events_and_records_usage(self, session_maker):
+        async with session_maker() as db:
+            repo = ExecutionRepository(db)
+            execution_db = await repo.create_execution(card_id="card-1", command="/plan")
+            record = make_record("card-1")
+            seen = []
+
+            result = await run_stream(
+                FakeRunner(SCRIPT, speed=0),
+                RunRequest(prompt="/plan x", cwd="/w", model="sonnet-4.5"),
+                record, repo, execution_db, on_event=seen.append,
+            )
+
+            assert result == "Resumo final"
+            assert [e.kind for e in seen] == ["text", "tool", "text", "result"]
+            assert seen[1].tool_input == {"file_path": "/w/specs/novo.md"}
+            assert [log.type for log in record.logs[:3]] == [LogType.TEXT, LogType.TOOL, LogType.TEXT]
+
+            stored = (await db.execute(
+                select(ExecutionLog.type, ExecutionLog.content).order_by(ExecutionLog.sequence)
+            )).all()
+            assert stored == [("text", "Lendo a spec"), ("tool", "Using tool: Write"), ("text", "Pronto")]
+            execution = await repo.get_by_id(execution_db.id)
+            assert (execution.total_tokens, execution.cache_read_tokens) == (120, 5000)
+            assert execution.execution_cost > 0
+
+        # Sem mensagem de resultado, o texto concatenado é o resultado
+        text_only = await run_stream(
+            FakeRunner(SCRIPT[:3], speed=0, text_separator=""),
+            RunRequest(prompt="", cwd="/w", model="gemini-3-pro"),
+            make_record("card-2"), None, None,
+        )
+        assert text_only == "Lendo a specPronto"
+
+    async def test_recorded_stream_replays_at_configured_speed(self, tmp_path):
+        path = tmp_path / "stream.jsonl"
+        request = RunRequest(prompt="/implement spec.md", cwd="/w", model="opus-4.5")
+
+        recorded = [e async for e in RecordingRunner(FakeRunner(SCRIPT, speed=1), str(path)).stream(request)]
+        script = load_script(str(path))
+        assert len(script) == 4 and all(item["delay_ms"] >= 30 for item in script)
+
+        start = time.perf_counter()
+        replayed = [e async for e in FakeRunner(script, speed=4).stream(request)]
+        assert time.perf_counter() - start < 0.15  # ~160 ms recorded, replayed 4x faster
+        assert replayed == recorded
@@ -0,0 +1,165 @@
+"""Tests for the pub/sub backplane (two workers sharing a SQLite broker)."""
+
+import asyncio
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.database import Base
+from src.models.live import Vote, VotingOption, VotingRound
+from src.services import presence_service as presence_module
+from src.services import voting_service as voting_module
+from src.services.backplane import SQLiteBackplane
+from src.services.card_ws import CardWebSocketManager
+from src.services.execution_ws import ExecutionWebSocketManager
+from src.services.presence_service import PresenceService
+from src.services.voting_service import VotingService
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text):
+        self.sent.append(text)
+
+    async def close(self, code=1000):
+        pass
+
+
+@pytest.fixture
+async def workers(tmp_path):
+    """Two backplanes on the same broker file, like two uvicorn workers."""
+    path = str(tmp_path / "broker.db")
+    nodes = [SQLiteBackplane(path, poll_interval=0.01) for _ in range(2)]
+    for node in nodes:
+        await node.start()
+    yield nodes
+    for node in nodes:
+        await node.stop()
+
+
+async def settle():
+    await asyncio.sleep(0.15)
+
+
+@pytest.mark.asyncio
+class TestBackplane:
+    """Test suite for cross-worker delivery."""
+
+    async def test_publish_reaches_other_worker_once(self, workers):
+        """Local subscribers get the message at once; the other worker via the broker."""
+        a, b = workers
+        seen_a, seen_b = [], []
+        a.subscribe("live", lambda message, local: seen_a.append((message, local)))
+        b.subscribe("live", lambda message, local: seen_b.append((message, local)))
+
+        a.publish("live", {"n": 1})
+        assert seen_a == [({"n": 1}, True)]
+
+        await settle()
+        assert seen_a == [({"n": 1}, True)]
+        assert seen_b == [({"n": 1}, False)]
+
+    async def test_card_events_fan_out_to_every_worker(self, workers):
+        """A card moved on worker A reaches clients of worker B, deltas included."""
+        a, b = workers
+        managers = [CardWebSocketManager(a), CardWebSocketManager(b)]
+        client = FakeWebSocket()
+        managers[1].broadcaster.add(client, features=frozenset({"delta"}))
+
+        card = {"id": "c1", "title": "Login", "columnId": "backlog"}
+        await managers[0].broadcast_card_created("c1", card)
+        await managers[0].broadcast_card_moved("c1", "backlog", "plan", {**card, "columnId": "plan"})
+        await settle()
+
+        assert len(client.sent) == 2
+        assert '"type": "card_delta"' in client.sent[1]
+        assert '"changes": {"columnId": "plan"}' in client.sent[1]
+
+    async def test_log_backfill_served_by_other_worker(self, workers):
+        """Log batches are mirrored, so reconnecting to another worker still resumes."""
+        a, b = workers
+        runner, spectator = ExecutionWebSocketManager(a), ExecutionWebSocketManager(b)
+        runner.logs.batch_interval = 0.01
+        for i in range(3):
+            await runner.notify_log("card-1", "text", f"line {i}", epoch="e1")
+        await settle()
+
+        backfill = spectator.logs.backfill("card-1", after_seq=1, epoch="e1")
+        assert [log["content"] for log in backfill["logs"]] == ["line 1", "line 2"]
+
+    async def test_presence_count_sums_workers(self, workers, monkeypatch):
+        """Each worker reports the spectators connected anywhere."""
+        services = []
+        for node in workers:
+            monkeypatch.setattr(PresenceService, "_instance", None)
+            monkeypatch.setattr(presence_module, "get_backplane", lambda node=node: node)
+            services.append(PresenceService())
+
+        for service in services:
+            await service.start()
+        await services[0].connect("s1")
+        await services[0].connect("s2")
+        await services[1].connect("s3")
+        await settle()
+
+        assert [service.count for service in services] == [3, 3]
+
+        await services[0].disconnect("s1")
+        await settle()
+        assert [service.count for service in services] == [2, 2]
+
+        for service in services:
+            await service.stop()
+
+    async def test_vote_tallies_agree_across_workers(self, workers, monkeypatch, tmp_path):
+        """A round started on one worker accepts votes on both; counts converge."""
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'live.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(
+                Base.metadata.create_all,
+                tables=[Vote.__table__, VotingRound.__table__, VotingOption.__table__],
+            )
+        session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        services = []
+        for node in workers:
+            monkeypatch.setattr(VotingService, "_instance", None)
+            monkeypatch.setattr(voting_module, "get_backplane", lambda node=node: node)
+            service = VotingService()
+            service._ingestion.session_factory = session_maker
+            services.append(service)
+
+        async with session_maker() as db:
+            _, options = await services[0].start_round(db, duration_seconds=60)
+            await settle()
+            assert services[1].is_active
+
+            option_id = options[0].id
+            assert (await services[0].vote(db, option_id, "s1"))[0]
+            assert (await services[1].vote(db, option_id, "s2"))[0]
+            # Same session on both workers before either flushed: counted once
+            assert (await services[1].vote(db, option_id, "s3"))[0]
+            assert (await services[0].vote(db, option_id, "s3"))[0]
+            for service in services:
+                await service._ingestion.flush()
+            await settle()
+
+            # The session that voted on worker A cannot vote again on worker B
+            assert not (await services[1].vote(db, option_id, "s1"))[0]
+
+            counts = [
+                {o.id: o.vote_count for o in service.get_state().options}[option_id]
+                for service in services
+            ]
+            stored = await db.scalar(select(VotingOption.vote_count).where(VotingOption.id == option_id))
+            assert counts == [3, 3]
+            assert stored == 3
+
+            await services[0].end_round(db)
+            await settle()
+            assert not services[1].is_active
+
+        await engine.dispose()
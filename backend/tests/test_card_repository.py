@@ -282,4 +282,48 @@ class TestCardRepository:
         assert updated_card.test_error_context == '{"error_type": "test_failure"}'
         # Updated fields should change
         assert updated_card.title == "[FIX] Updated Title"
-        assert updated_card.description == "Updated description"
\ No newline at end of file
+        assert updated_card.description == "Updated description"
+
+    async def test_bulk_create_move_and_update(self, async_session):
+        """Test bulk operations: activities logged, all-or-nothing moves."""
+        from sqlalchemy import func, select
+        from src.models.activity_log import ActivityLog
+        from src.schemas.card import CardUpdate
+
+        repo = CardRepository(async_session)
+        cards = await repo.bulk_create([CardCreate(title=f"Bulk {i}") for i in range(5)])
+        await async_session.commit()
+
+        assert [card.title for card in cards] == [f"Bulk {i}" for i in range(5)]
+        assert all(card.column_id == "backlog" and card.dependencies == [] for card in cards)
+        activities = await async_session.scalar(select(func.count()).select_from(ActivityLog))
+        assert activities == 5
+
+        ids = [card.id for card in cards]
+        moved, errors = await repo.bulk_move(ids[:3], "plan")
+        assert errors == {}
+        assert [(card.column_id, from_column) for card, from_column in moved] == [("plan", "backlog")] * 3
+
+        # One invalid transition (plan -> done) rejects the whole batch
+        moved, errors = await repo.bulk_move([ids[0], ids[3], "missing"], "implement")
+        assert moved == [] and set(errors) == {ids[3], "missing"}
+        assert (await repo.get_by_id(ids[0])).column_id == "plan"
+
+        # Cards already in the target column are skipped: no update, activity or event
+        before = (await repo.get_by_id(ids[0])).updated_at
+        moved, errors = await repo.bulk_move([ids[0], ids[3]], "plan")
+        await async_session.commit()
+        assert errors == {} and [(card.id, from_column) for card, from_column in moved] == [(ids[3], "backlog")]
+        assert (await repo.get_by_id(ids[0])).updated_at == before
+
+        updated, missing = await repo.bulk_update({
+            ids[0]: CardUpdate(title="Renamed"),
+            ids[1]: CardUpdate(dependencies=[ids[0]]),
+            ids[2]: CardUpdate(title="Bulk 2"),  # unchanged: no activity
+        })
+        await async_session.commit()
+        assert missing == []
+        assert [card.title for card in updated] == ["Renamed", "Bulk 1", "Bulk 2"]
+        assert updated[1].dependencies == [ids[0]]
+        activities = await async_session.scalar(select(func.count()).select_from(ActivityLog))
+        assert activities == 5 + 3 + 1 + 2
@@ -0,0 +1,76 @@
+"""Tests for server-side card search (FTS5, facets, cursor pagination)."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.models.card import Card
+from src.repositories.card_repository import CardRepository
+from src.services.log_search import parse_query
+
+
+def make_card(n, title, **fields):
+    return Card(
+        id=f"card-{n}", title=title, created_at=datetime(2026, 1, 1) + timedelta(minutes=n), **fields
+    )
+
+
+@pytest.mark.asyncio
+class TestCardSearch:
+    """Test suite for CardRepository.search and search_facets."""
+
+    async def test_text_search_follows_updates_and_paginates(self, session_maker):
+        async with session_maker() as db:
+            db.add_all([
+                make_card(1, "Login page", description="Formulário de autenticação"),
+                make_card(2, "Fix login redirect", is_fix_card=True),
+                make_card(3, "Relatório", spec_path="specs/login-audit.md"),
+                make_card(4, "Dashboard"),
+            ])
+            await db.commit()
+            repo = CardRepository(db)
+
+            match, _ = parse_query("login")
+            cards, cursor = await repo.search(match=match, limit=2)
+            assert [c.id for c in cards] == ["card-1", "card-2"] and cursor
+            cards, cursor = await repo.search(match=match, limit=2, cursor=cursor)
+            assert [c.id for c in cards] == ["card-3"] and cursor is None
+
+            assert [c.id for c in (await repo.search(match=parse_query("autenticacao")[0]))[0]] == ["card-1"]
+
+            # Os triggers mantêm o índice em updates e deletes
+            card = await repo.get_by_id("card-4")
+            card.title = "Login metrics"
+            await db.delete(await repo.get_by_id("card-1"))
+            await db.commit()
+            cards, _ = await repo.search(match=match)
+            assert [c.id for c in cards] == ["card-2", "card-3", "card-4"]
+
+            with pytest.raises(ValueError):
+                await repo.search(cursor="not-a-cursor")
+
+    async def test_facets_ignore_their_own_filter(self, session_maker):
+        async with session_maker() as db:
+            db.add_all([
+                make_card(1, "A", column_id="plan", model_plan="sonnet-4.5", experts={"database": {}}),
+                make_card(2, "B", column_id="plan", worktree_path="/tmp/wt-b", experts={"database": {}, "frontend": {}}),
+                make_card(3, "C", column_id="review", is_fix_card=True),
+            ])
+            await db.commit()
+            repo = CardRepository(db)
+
+            filters = dict(columns=["plan"], expert="database")
+            cards, _ = await repo.search(**filters)
+            assert [c.id for c in cards] == ["card-1", "card-2"]
+
+            result = await repo.search_facets(**filters)
+            facets = result["facets"]
+            assert result["total"] == 2
+            assert facets["column"] == {"plan": 2}  # "review" has no database expert
+            assert facets["expert"] == {"database": 2, "frontend": 1}
+            assert facets["model"] == {"opus-4.5": 2, "sonnet-4.5": 1}
+            assert facets["hasWorktree"] == {"true": 1, "false": 1}
+            assert facets["isFixCard"] == {"true": 0, "false": 2}
+
+            cards, _ = await repo.search(model="sonnet-4.5", has_worktree=False)
+            assert [c.id for c in cards] == ["card-1"]
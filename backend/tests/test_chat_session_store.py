@@ -0,0 +1,91 @@
+"""Tests for the persisted chat session store and prompt history window."""
+
+import pytest
+
+from src.services.chat_history import estimate_tokens, fold_into_summary, split_window
+from src.services.chat_service import ChatService
+
+
+class FakeAgent:
+    """Records the prompts it receives and answers with a fixed text."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def stream_response(self, messages, model, system_prompt):
+        self.calls.append((messages, system_prompt))
+        yield "resposta " * 50
+
+
+def make_service(session_maker, **kwargs) -> ChatService:
+    service = ChatService(session_factory=session_maker, **kwargs)
+    service.claude_agent = FakeAgent()
+    service._orchestrator_enabled = False
+
+    async def no_kanban():
+        return "SYSTEM"
+
+    service.get_system_prompt = no_kanban
+    return service
+
+
+async def send(service, session_id, text):
+    return [chunk async for chunk in service.send_message(session_id, text)]
+
+
+@pytest.mark.asyncio
+class TestChatSessionStore:
+    """Test suite for ChatService persistence, eviction and windowing."""
+
+    async def test_window_and_summary_stay_within_budget(self):
+        messages = [{"role": "user", "content": "x" * 400} for _ in range(20)]
+        older, window = split_window(messages, budget=500)
+        assert len(older) + len(window) == 20
+        assert sum(estimate_tokens(m["content"]) for m in window) <= 500
+        # A single oversized message is still sent
+        assert split_window([{"role": "user", "content": "y" * 10_000}], budget=10)[1]
+
+        summary = ""
+        for _ in range(50):
+            summary = fold_into_summary(summary, messages[:2], budget=200)
+        assert sum(estimate_tokens(line) for line in summary.splitlines()) <= 210
+        assert summary.startswith("- (earlier turns omitted)")
+
+    async def test_prompt_size_is_constant_for_long_conversations(self, session_maker):
+        service = make_service(session_maker, history_token_budget=300, summary_token_budget=150)
+        session_id = (await service.create_session())["sessionId"]
+
+        for turn in range(40):
+            await send(service, session_id, f"pergunta {turn} " + "detalhe " * 20)
+
+        sizes = [
+            sum(len(m["content"]) for m in messages) + len(system)
+            for messages, system in service.claude_agent.calls
+        ]
+        assert max(sizes[10:]) < 2 * sizes[10]
+        assert "pergunta 39" in service.claude_agent.calls[-1][0][-1]["content"]
+        assert "summary" in service.claude_agent.calls[-1][1]
+        # Memory keeps only the window; the database keeps everything
+        assert len(service.sessions[session_id].recent) < 10
+        assert len((await service.get_session(session_id))["messages"]) == 80
+
+    async def test_evicted_session_reloads_from_database(self, session_maker):
+        service = make_service(session_maker, max_cached_sessions=2, history_token_budget=300)
+        ids = [(await service.create_session())["sessionId"]]
+        for _ in range(10):
+            await send(service, ids[0], "mensagem " * 30)
+
+        # Two newer sessions push the first one out of the cache
+        ids += [(await service.create_session())["sessionId"] for _ in range(2)]
+        assert ids[0] not in service.sessions
+        assert service.evicted >= 1
+
+        restarted = make_service(session_maker, history_token_budget=300)
+        await send(restarted, ids[0], "de volta")
+        messages, system = restarted.claude_agent.calls[-1]
+        assert messages[-1]["content"] == "de volta"
+        assert len(messages) > 1
+        assert "mensagem" in system  # rolling summary survived the restart
+
+        assert await restarted.delete_session(ids[0]) is True
+        assert await restarted.get_session(ids[0]) is None
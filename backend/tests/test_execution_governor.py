@@ -0,0 +1,115 @@
+"""Tests for the execution governor (admission queue, limits, cancellation)."""
+
+import asyncio
+import time
+
+import pytest
+
+from src.services.execution_governor import ExecutionCancelled, ExecutionGovernor
+
+
+def make_governor(**limits):
+    messages = []
+    defaults = dict(
+        max_concurrent=2, max_per_model=0, max_per_project=0,
+        starts_per_minute=0, model_starts_per_minute=0, project_starts_per_minute=0,
+        start_burst=1,
+    )
+    governor = ExecutionGovernor(
+        **{**defaults, **limits},
+        notify=lambda card_id, message: messages.append((card_id, message)),
+    )
+    return governor, messages
+
+
+async def hold(governor, card_id, model, release, started, project_id="p"):
+    async with governor.slot(card_id, "/implement", model, project_id=project_id):
+        started.append(card_id)
+        await release.wait()
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+class TestExecutionGovernor:
+    """Test suite for ExecutionGovernor."""
+
+    async def test_limits_queue_in_fifo_order_with_positions(self):
+        governor, messages = make_governor(max_concurrent=2, max_per_model=1)
+        release, started = asyncio.Event(), []
+        tasks = [
+            asyncio.create_task(hold(governor, card, model, release, started))
+            for card, model in [("a", "opus"), ("b", "opus"), ("c", "sonnet"), ("d", "haiku")]
+        ]
+        await settle()
+
+        # "b" waits on its model; "c" (another model) is not held back by it
+        assert started == ["a", "c"]
+        queued = {card: msg for card, msg in messages if msg["type"] == "execution_queued"}
+        assert queued["b"]["position"] == 1 and queued["b"]["reason"] == "model"
+        assert queued["d"]["position"] == 2 and queued["d"]["reason"] == "global"
+        assert governor.position("d") == 2
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert sorted(started) == ["a", "b", "c", "d"]
+        assert governor.stats()["running"] == [] and governor.admitted == 4
+
+    async def test_token_bucket_spaces_out_starts(self):
+        governor, _ = make_governor(max_concurrent=0, model_starts_per_minute=600, start_burst=2)
+        release, started = asyncio.Event(), []
+        release.set()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(hold(governor, f"c{i}", "opus", release, started) for i in range(4)))
+        # Burst of 2, then one start every 100 ms
+        assert time.perf_counter() - start >= 0.18
+        assert len(started) == 4
+
+    async def test_cancel_queued_and_running(self):
+        governor, _ = make_governor(max_concurrent=1)
+        release, started = asyncio.Event(), []
+        running = asyncio.create_task(hold(governor, "a", "opus", release, started))
+        queued = asyncio.create_task(hold(governor, "b", "opus", release, started))
+        await settle()
+
+        assert governor.cancel("b") == {"queued": 1, "running": 0}
+        with pytest.raises(ExecutionCancelled):
+            await queued
+
+        assert governor.cancel("a") == {"queued": 0, "running": 1}
+        with pytest.raises(ExecutionCancelled):
+            await running
+        assert started == ["a"]
+
+        # The slot was released: the next run starts right away
+        release.set()
+        await hold(governor, "c", "opus", release, started)
+        assert started == ["a", "c"]
+        assert governor.cancel("zzz") == {"queued": 0, "running": 0}
+
+    async def test_cancel_between_admission_and_wakeup_releases_the_slot(self):
+        governor, _ = make_governor(max_concurrent=1)
+
+        def notify(card_id, message):
+            # cancel() runs right after "b" is admitted, before its waiter wakes up
+            if card_id == "b" and message["type"] == "execution_admitted":
+                assert governor.cancel("b") == {"queued": 0, "running": 1}
+
+        governor._notify = notify
+        release, started = asyncio.Event(), []
+        first = asyncio.create_task(hold(governor, "a", "opus", release, started))
+        second = asyncio.create_task(hold(governor, "b", "opus", release, started))
+        await settle()
+
+        release.set()
+        await first
+        with pytest.raises(ExecutionCancelled):
+            await second
+
+        assert governor._running == [] and governor._global.active == 0
+        await asyncio.wait_for(hold(governor, "c", "opus", release, started), timeout=1)
+        assert started == ["a", "c"]
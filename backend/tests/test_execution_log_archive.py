@@ -0,0 +1,70 @@
+"""Tests for compressed cold storage of finished execution logs."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.database import Base
+from src.models.execution import Execution, ExecutionLog, ExecutionLogArchive, ExecutionStatus
+from src.repositories.execution_repository import ExecutionRepository
+from src.services.execution_log_archive import (
+    ARCHIVE_BLOCK_LINES,
+    ExecutionLogArchiveService,
+    pack_logs,
+    unpack_logs,
+)
+
+
+@pytest.mark.asyncio
+class TestExecutionLogArchive:
+    """Test suite for ExecutionLogArchiveService."""
+
+    async def test_pack_round_trip_skips_blocks_before_cursor(self):
+        rows = [(seq, "2026-01-01T00:00:00", "text", f"Using tool: Read {seq}") for seq in range(1, 601)]
+        data, index, raw_bytes = pack_logs(rows)
+
+        assert len(index) == 3 and len(data) < raw_bytes / 5
+        assert unpack_logs(data, index) == rows
+        tail = unpack_logs(data, index, after_seq=ARCHIVE_BLOCK_LINES * 2 + 10)
+        assert tail == rows[ARCHIVE_BLOCK_LINES * 2 + 10:]
+
+    async def test_archive_finished_moves_logs_and_reads_transparently(self, tmp_path):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'archive.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(
+                Base.metadata.create_all,
+                tables=[Execution.__table__, ExecutionLog.__table__, ExecutionLogArchive.__table__],
+            )
+        session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        async with session_maker() as db:
+            repo = ExecutionRepository(db)
+            old = await repo.create_execution(card_id="archive-old", command="/implement")
+            recent = await repo.create_execution(card_id="archive-recent", command="/implement")
+            for i in range(5):
+                await repo.add_log(execution_id=old.id, log_type="tool", content=f"Using tool: Bash {i}")
+                await repo.add_log(execution_id=recent.id, log_type="text", content=f"linha {i}")
+            for execution in (old, recent):
+                await repo.update_execution_status(execution.id, ExecutionStatus.SUCCESS)
+            old.completed_at = datetime.utcnow() - timedelta(hours=48)
+            await db.commit()
+            before = await repo.get_logs(old.id)
+
+            totals = await ExecutionLogArchiveService(db, codec="zlib").archive_finished(older_than_hours=24)
+            assert totals["executions"] == 1 and totals["lines"] == 5
+
+            hot = await db.execute(select(func.count()).select_from(ExecutionLog).where(ExecutionLog.execution_id == old.id))
+            assert hot.scalar() == 0
+            assert await repo.get_logs(old.id) == before
+            assert len(await repo.get_logs(recent.id)) == 5
+
+            # Lines written after archiving are appended and re-packed in order
+            await repo.add_log(execution_id=old.id, log_type="text", content="tardia")
+            await ExecutionLogArchiveService(db, codec="zlib").archive_execution(old.id)
+            await db.commit()
+            logs = await repo.get_logs(old.id)
+            assert [log["content"] for log in logs] == [log["content"] for log in before] + ["tardia"]
+
+        await engine.dispose()
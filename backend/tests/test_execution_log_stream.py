@@ -0,0 +1,98 @@
+"""Tests for ExecutionLogStream (batched live logs with replay cursor)."""
+
+import asyncio
+
+import pytest
+
+from src.services.execution_log_stream import ExecutionLogStream
+
+
+def make_stream(**kwargs):
+    frames = []
+    stream = ExecutionLogStream(lambda card_id, frame: frames.append(frame), **kwargs)
+    return stream, frames
+
+
+@pytest.mark.asyncio
+class TestExecutionLogStream:
+    """Test suite for ExecutionLogStream."""
+
+    async def test_lines_are_batched_into_one_frame(self):
+        """Lines within the batch interval go out as a single log_batch."""
+        stream, frames = make_stream(batch_interval_ms=10)
+        for i in range(5):
+            stream.append("card-1", "epoch-1", "text", f"line {i}")
+
+        assert frames == []
+        await asyncio.sleep(0.03)
+
+        assert len(frames) == 1
+        assert frames[0]["type"] == "log_batch"
+        assert (frames[0]["fromSeq"], frames[0]["toSeq"]) == (1, 5)
+        assert [log["content"] for log in frames[0]["logs"]] == [f"line {i}" for i in range(5)]
+
+    async def test_full_batch_flushes_immediately(self):
+        """Reaching max_batch publishes without waiting for the timer."""
+        stream, frames = make_stream(batch_interval_ms=1000, max_batch=3)
+        for i in range(7):
+            stream.append("card-1", "epoch-1", "text", f"line {i}")
+
+        assert [(f["fromSeq"], f["toSeq"]) for f in frames] == [(1, 3), (4, 6)]
+        stream.finish("card-1")
+        assert frames[-1]["toSeq"] == 7
+
+    async def test_backfill_after_cursor(self):
+        """Reconnecting clients only receive lines after their last seq."""
+        stream, _ = make_stream(batch_interval_ms=1000)
+        for i in range(10):
+            stream.append("card-1", "epoch-1", "text", f"line {i}")
+        stream.flush("card-1")
+        stream.append("card-1", "epoch-1", "text", "still pending")
+
+        backfill = stream.backfill("card-1", after_seq=7, epoch="epoch-1")
+        assert [log["seq"] for log in backfill["logs"]] == [8, 9, 10]
+        assert backfill["lastSeq"] == 10
+        assert backfill["truncated"] is False
+
+        # A different epoch means a new execution: replay from the start
+        assert len(stream.backfill("card-1", after_seq=7, epoch="old")["logs"]) == 10
+
+    async def test_ring_overflow_marks_backfill_truncated(self):
+        """Cursors older than the ring get what is left, flagged as truncated."""
+        stream, _ = make_stream(batch_interval_ms=1000, ring_size=5)
+        for i in range(12):
+            stream.append("card-1", "epoch-1", "text", f"line {i}")
+        stream.flush("card-1")
+
+        backfill = stream.backfill("card-1", after_seq=2)
+        assert [log["seq"] for log in backfill["logs"]] == [8, 9, 10, 11, 12]
+        assert backfill["truncated"] is True
+
+    async def test_new_execution_restarts_sequence(self):
+        """A new epoch resets the sequence and drops the previous replay."""
+        stream, frames = make_stream(batch_interval_ms=1000)
+        stream.append("card-1", "epoch-1", "text", "first run")
+        stream.flush("card-1")
+        stream.append("card-1", "epoch-2", "text", "second run")
+        stream.flush("card-1")
+
+        assert frames[-1]["epoch"] == "epoch-2"
+        assert frames[-1]["fromSeq"] == 1
+        assert [log["content"] for log in stream.backfill("card-1")["logs"]] == ["second run"]
+
+
+def test_malformed_resume_cursor_keeps_the_socket_open():
+    """A bad afterSeq falls back to a full backfill instead of dropping the connection."""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from src.routes.execution_ws import router
+
+    app = FastAPI()
+    app.include_router(router)
+    with TestClient(app).websocket_connect("/api/execution/ws/card-resume") as ws:
+        for cursor in ("abc", [1], None):
+            ws.send_json({"type": "resume", "afterSeq": cursor})
+            assert ws.receive_json()["type"] == "log_backfill"
+        ws.send_json({"type": "ping"})
+        assert ws.receive_json() == {"type": "pong"}
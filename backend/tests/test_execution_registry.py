@@ -0,0 +1,65 @@
+"""Tests for the bounded in-memory execution registry."""
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.agent import add_log
+from src.database import Base
+from src.execution import ExecutionRecord, ExecutionStatus, LogEntry, LogType, PlanResult
+from src.models.execution import Execution, ExecutionLog, ExecutionLogArchive
+from src.repositories.execution_repository import ExecutionRepository
+from src.services.execution_registry import ExecutionRegistry
+
+
+def make_record(card_id):
+    return ExecutionRecord(cardId=card_id, title=card_id, status=ExecutionStatus.RUNNING, logs=[])
+
+
+@pytest.mark.asyncio
+class TestExecutionRegistry:
+    """Test suite for ExecutionRegistry and LogEntry."""
+
+    async def test_finished_executions_keep_only_bounded_summaries(self):
+        registry = ExecutionRegistry(max_finished=2)
+        for card_id in ("a", "b", "c"):
+            record = make_record(card_id)
+            registry[card_id] = record
+            for i in range(50):
+                add_log(record, LogType.TEXT, f"linha {i}")
+            assert isinstance(record.logs[0], LogEntry)
+            assert registry.get(card_id) is record
+
+            record.status = ExecutionStatus.SUCCESS
+            summary = registry.finish(card_id)
+            assert summary.log_count == 50
+            assert registry.get(card_id) is None and card_id not in registry
+
+        assert registry.finished("a") is None  # oldest summary evicted
+        assert registry.finished("c").to_dict()["status"] == "success"
+        assert registry.stats()["evicted"] == 1 and len(registry) == 0
+
+        # Log entries still validate as API models
+        result = PlanResult(success=True, logs=[LogEntry("t", LogType.ERROR, "boom")])
+        assert result.model_dump()["logs"] == [{"timestamp": "t", "type": "error", "content": "boom"}]
+
+    async def test_finished_view_loads_logs_from_database(self, tmp_path):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'exec.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(
+                Base.metadata.create_all,
+                tables=[Execution.__table__, ExecutionLog.__table__, ExecutionLogArchive.__table__],
+            )
+        session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        async with session_maker() as db:
+            repo = ExecutionRepository(db)
+            execution_db = await repo.create_execution(card_id="view-card", command="/implement")
+            await repo.add_log(execution_id=execution_db.id, log_type="text", content="persistido")
+
+        registry = ExecutionRegistry()
+        registry["view-card"] = make_record("view-card")
+        view = registry.finish("view-card")
+
+        loaded = await view.load(session_maker)
+        assert [log["content"] for log in loaded["logs"]] == ["persistido"]
+        await engine.dispose()
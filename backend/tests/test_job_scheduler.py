@@ -0,0 +1,80 @@
+"""Tests for the background job scheduler and the set-based auto cleanup."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.database import Base
+from src.models.card import Card
+from src.services.auto_cleanup_service import AutoCleanupService
+from src.services.job_scheduler import CronSchedule, JobAlreadyRunning, JobScheduler
+
+
+@pytest.mark.asyncio
+class TestJobScheduler:
+    """Test suite for JobScheduler, CronSchedule and AutoCleanupService."""
+
+    async def test_cron_single_flight_and_run_metrics(self):
+        every_6h = CronSchedule("0 */6 * * *")
+        assert every_6h.next_after(datetime(2026, 3, 1, 6, 0, 30)) == datetime(2026, 3, 1, 12, 0)
+        weekdays = CronSchedule("30 9 * * 1-5")
+        assert weekdays.next_after(datetime(2026, 3, 6, 10, 0)) == datetime(2026, 3, 9, 9, 30)  # sexta -> segunda
+        with pytest.raises(ValueError):
+            CronSchedule("61 * * * *")
+
+        release = asyncio.Event()
+        calls = []
+
+        async def slow_job():
+            calls.append(1)
+            await release.wait()
+            return {"done": len(calls)}
+
+        async def failing_job():
+            raise RuntimeError("boom")
+
+        scheduler = JobScheduler()
+        scheduler.register("slow", slow_job, 3600, jitter_seconds=0)
+        scheduler.register("failing", failing_job, "*/5 * * * *", jitter_seconds=0)
+
+        first = asyncio.create_task(scheduler.trigger("slow"))
+        await asyncio.sleep(0)
+        with pytest.raises(JobAlreadyRunning):
+            await scheduler.trigger("slow")
+        release.set()
+        assert await first == {"done": 1}
+
+        with pytest.raises(RuntimeError):
+            await scheduler.trigger("failing")
+
+        status = {job["name"]: job for job in scheduler.status()}
+        assert status["slow"]["runs"] == 1 and status["slow"]["skipped"] == 1
+        assert status["slow"]["lastResult"] == {"done": 1} and status["slow"]["lastDurationMs"] is not None
+        assert status["failing"]["failures"] == 1 and status["failing"]["lastError"] == "RuntimeError: boom"
+        assert calls == [1]
+
+    async def test_auto_cleanup_moves_stale_done_cards_in_one_update(self, tmp_path):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'cleanup.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=[Card.__table__])
+        session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        now = datetime.utcnow()
+        async with session_maker() as db:
+            db.add_all([
+                Card(id="old", title="Old", column_id="done", completed_at=now - timedelta(hours=2)),
+                Card(id="recent", title="Recent", column_id="done", completed_at=now - timedelta(minutes=5)),
+                Card(id="review", title="Review", column_id="review", completed_at=now - timedelta(hours=2)),
+            ])
+            await db.commit()
+
+            moved = await AutoCleanupService(db, cleanup_after_minutes=30, enabled=True).move_done_cards()
+            assert moved == ["old"]
+            assert await AutoCleanupService(db, enabled=False).cleanup_done_cards() == 0
+
+            columns = dict((await db.execute(select(Card.id, Card.column_id))).all())
+            assert columns == {"old": "completed", "recent": "done", "review": "review"}
+        await engine.dispose()
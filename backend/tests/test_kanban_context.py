@@ -0,0 +1,85 @@
+"""Tests for the cached kanban context snapshot used by chat prompts."""
+
+import pytest
+
+from src.database_manager import db_manager
+from src.repositories.card_repository import CardRepository
+from src.schemas.card import CardCreate, CardResponse
+from src.services import kanban_context as kanban_module
+from src.services.backplane import InProcessBackplane
+from src.services.card_ws import CardWebSocketManager
+from src.services.kanban_context import KanbanContextSnapshot
+
+
+@pytest.fixture
+async def session_maker(session_maker, monkeypatch):
+    monkeypatch.setattr(kanban_module, "get_session", lambda: session_maker)
+    monkeypatch.setattr(db_manager, "current_project_id", "project-a")
+    return session_maker
+
+
+async def create_card(maker, title):
+    async with maker() as session:
+        card = await CardRepository(session).create(CardCreate(title=title, description=f"{title} desc"))
+        await session.commit()
+        return CardResponse.model_validate(card).model_dump(by_alias=True, mode="json")
+
+
+@pytest.mark.asyncio
+class TestKanbanContextSnapshot:
+    """Test suite for KanbanContextSnapshot."""
+
+    async def test_card_events_update_snapshot_without_reload(self, session_maker):
+        await create_card(session_maker, "Existing card")
+        backplane = InProcessBackplane()
+        snapshot = KanbanContextSnapshot(backplane=backplane, max_age_seconds=3600)
+        cards_ws = CardWebSocketManager(backplane=backplane)
+
+        context = await snapshot.get_context()
+        assert "Backlog (1)" in context and '"Existing card"' in context
+        assert snapshot.loads == 1
+
+        created = await create_card(session_maker, "New card")
+        await cards_ws.broadcast_card_created(created["id"], created)
+        moved = {**created, "columnId": "plan"}
+        await cards_ws.broadcast_card_moved(created["id"], "backlog", "plan", moved)
+
+        context = await snapshot.get_context()
+        assert "Backlog (1)" in context and "Plan (1)" in context
+        assert '"New card" movido para plan' in context
+        assert "1 backlog | 1 plan" in context
+        # Unchanged version: the rendered text is reused
+        assert await snapshot.get_context() is context
+
+        snapshot.card_deleted(created["id"])
+        context = await snapshot.get_context()
+        assert "Plan" not in context and '"New card"' not in context
+        assert snapshot.loads == 1
+
+    async def test_batch_events_apply_each_card(self, session_maker):
+        backplane = InProcessBackplane()
+        snapshot = KanbanContextSnapshot(backplane=backplane, max_age_seconds=3600)
+        cards_ws = CardWebSocketManager(backplane=backplane)
+        await snapshot.get_context()
+
+        created = [await create_card(session_maker, f"Batch {i}") for i in range(3)]
+        await cards_ws.broadcast_cards_created(created)
+        await cards_ws.broadcast_cards_moved([
+            {"cardId": card["id"], "fromColumn": "backlog", "toColumn": "plan", "card": {**card, "columnId": "plan"}}
+            for card in created[:2]
+        ])
+
+        context = await snapshot.get_context()
+        assert "Backlog (1)" in context and "Plan (2)" in context
+        assert snapshot.loads == 1
+        # Each card got its own version, so later single updates produce deltas
+        assert cards_ws._snapshots[created[0]["id"]][1]["columnId"] == "plan"
+
+    async def test_project_switch_reloads(self, session_maker, monkeypatch):
+        await create_card(session_maker, "Card A")
+        snapshot = KanbanContextSnapshot(backplane=InProcessBackplane(), max_age_seconds=3600)
+        await snapshot.get_context()
+
+        monkeypatch.setattr(db_manager, "current_project_id", "project-b")
+        await snapshot.get_context()
+        assert snapshot.loads == 2
@@ -0,0 +1,48 @@
+"""Tests for the rotating async log writer and the tail reader."""
+
+import gzip
+import json
+
+import pytest
+
+from src.services.log_file import AsyncLogFileWriter, read_tail_lines, rotated_files
+from src.services.orchestrator_logger import OrchestratorLogger
+
+
+@pytest.mark.asyncio
+class TestLogFile:
+    """Test suite for AsyncLogFileWriter and read_tail_lines."""
+
+    async def test_tail_reads_only_the_end_of_the_file(self, tmp_path):
+        path = tmp_path / "big.log"
+        path.write_text("".join(f"linha {i} " + "x" * (i % 50) + "\n" for i in range(20_000)))
+
+        tail = read_tail_lines(path, 3, chunk_size=128)
+        assert [line.split()[1] for line in tail] == ["19997", "19998", "19999"]
+        assert len(read_tail_lines(path, 50_000)) == 20_000
+        assert read_tail_lines(tmp_path / "missing.log", 10) == []
+
+    async def test_writer_rotates_into_gzip_archives(self, tmp_path):
+        path = tmp_path / "orchestrator.log"
+        writer = AsyncLogFileWriter(path, max_bytes=1000, backup_count=2)
+        for i in range(200):
+            writer.write(json.dumps({"n": i, "pad": "y" * 20}))
+            if i % 20 == 19:
+                await writer.flush()  # lotes separados: a rotação é verificada por lote
+        await writer.close()
+
+        archives = rotated_files(path)
+        assert writer.rotations >= 3 and len(archives) <= 2
+        with gzip.open(archives[-1], "rt") as f:
+            assert json.loads(f.readline())["n"] > 0
+
+        orch_logger = OrchestratorLogger(str(tmp_path / "orch.log"))
+        orch_logger._writer = AsyncLogFileWriter(orch_logger.log_file, max_bytes=1000)
+        for i in range(30):
+            await orch_logger.log_think(f"passo {i}")
+            await orch_logger.flush()
+        recent = orch_logger.read_recent_logs(limit=5)
+        # Logo após uma rotação, o restante vem do arquivo comprimido mais recente
+        assert [entry.message for entry in recent] == [f"passo {i}" for i in range(25, 30)]
+        assert orch_logger.get_status()["rotations"] >= 1
+        await orch_logger.close()
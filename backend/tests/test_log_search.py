@@ -0,0 +1,86 @@
+"""Tests for full-text search over execution logs."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from src.models.execution import ExecutionStatus
+from src.repositories.execution_repository import ExecutionRepository
+from src.services.execution_log_archive import ExecutionLogArchiveService
+from src.services.log_search import LogSearchService, make_snippet, parse_query
+
+
+@pytest.mark.asyncio
+class TestLogSearch:
+    """Test suite for LogSearchService."""
+
+    async def test_query_parsing_and_snippet(self):
+        match, terms = parse_query('Erro "na" funç* ) OR')
+        assert match == '"erro" "na" "func"* "or"'
+        snippet = make_snippet("Falha: <ERRO> na Função build_app()", terms)
+        assert snippet == "Falha: &lt;<mark>ERRO</mark>&gt; <mark>na</mark> <mark>Função</mark> build_app()"
+        assert parse_query("*** ()")[0] is None
+
+    async def test_search_filters_paginates_and_finds_archived_logs(self, session_maker):
+        async with session_maker() as db:
+            repo = ExecutionRepository(db)
+            plan = await repo.create_execution(card_id="search-a", command="/plan")
+            impl = await repo.create_execution(card_id="search-b", command="/implement")
+            for i in range(3):
+                await repo.add_log(execution_id=plan.id, log_type="text", content=f"Planejando timeout {i}")
+                await repo.add_log(execution_id=impl.id, log_type="error", content=f"TimeoutError no teste {i}")
+            await repo.update_execution_status(plan.id, ExecutionStatus.SUCCESS)
+            plan.completed_at = datetime.utcnow() - timedelta(days=2)
+            await db.commit()
+
+            # Logs arquivados continuam pesquisáveis
+            await ExecutionLogArchiveService(db).archive_finished(older_than_hours=24)
+
+            service = LogSearchService(db)
+            await service.ensure_index()
+            page = await service.search("timeout", limit=2)
+            assert len(page["results"]) == 2 and page["nextCursor"] is not None
+            seen = [r["id"] for r in page["results"]]
+            while page["nextCursor"]:
+                page = await service.search("timeout", limit=2, cursor=page["nextCursor"])
+                seen += [r["id"] for r in page["results"]]
+            assert len(seen) == 3 and seen == sorted(seen, reverse=True)
+
+            page = await service.search("planejando", card_id="search-a")
+            assert [r["snippet"] for r in page["results"]] == [
+                f"<mark>Planejando</mark> timeout {i}" for i in (2, 1, 0)
+            ]
+            assert (await service.search("timeout*", command="/implement", log_type="error"))["results"][0][
+                "snippet"
+            ] == "<mark>TimeoutError</mark> no teste 2"
+            future = datetime.utcnow() + timedelta(hours=1)
+            assert (await service.search("timeout*", since=future))["results"] == []
+
+    async def test_removed_and_orphaned_executions_leave_the_index(self, session_maker):
+        async with session_maker() as db:
+            repo = ExecutionRepository(db)
+            archived = await repo.create_execution(card_id="search-a", command="/plan")
+            hot = await repo.create_execution(card_id="search-b", command="/plan")
+            kept = await repo.create_execution(card_id="search-c", command="/plan")
+            for execution in (archived, hot, kept):
+                for i in range(3):
+                    await repo.add_log(execution_id=execution.id, log_type="text", content=f"deploy {execution.card_id} {i}")
+            await repo.update_execution_status(archived.id, ExecutionStatus.SUCCESS)
+            archived.completed_at = datetime.utcnow() - timedelta(days=2)
+            await db.commit()
+            await ExecutionLogArchiveService(db).archive_finished(older_than_hours=24)
+
+            service = LogSearchService(db)
+            await service.ensure_index()
+            assert await service.remove_executions([archived.id]) == 3
+            count = "SELECT count(*) FROM execution_logs_fts"
+            assert (await db.execute(text(count))).scalar_one() == 6
+
+            # Apagada fora do repositório: o trigger só remove o mapeamento
+            await db.execute(text("DELETE FROM executions WHERE id = :id"), {"id": kept.id})
+            await db.commit()
+            assert await service.reindex_if_orphaned() == {"orphaned": 3, "reindexed": 3}
+            assert (await db.execute(text(count))).scalar_one() == 3
+            results = (await service.search("deploy"))["results"]
+            assert {r["cardId"] for r in results} == {"search-b"} and len(results) == 3
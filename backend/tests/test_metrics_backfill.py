@@ -0,0 +1,95 @@
+"""Tests for the set-based MetricsCollector.backfill_metrics."""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, func
+
+from src.models.card import Card
+from src.models.execution import Execution, ExecutionStatus
+from src.models.metrics import ExecutionMetrics, MetricsBackfillCheckpoint, ProjectMetrics
+from src.services.metrics_collector import MetricsCollector
+
+
+@pytest_asyncio.fixture
+async def async_session(async_session):
+    """Session with one card and 30 executions of mixed status."""
+    async_session.add(Card(id="card-1", title="Card"))
+    start = datetime(2024, 3, 1, 12, 0, 0)
+    statuses = [ExecutionStatus.SUCCESS, ExecutionStatus.ERROR, ExecutionStatus.RUNNING]
+    for i in range(30):
+        async_session.add(Execution(
+            id=f"exec-{i:02d}",
+            card_id="card-1",
+            status=statuses[i % 3],
+            command="/plan",
+            started_at=start + timedelta(hours=i),
+            completed_at=start + timedelta(hours=i, seconds=i + 1, milliseconds=250),
+            input_tokens=100,
+            output_tokens=10,
+            total_tokens=110,
+            model_used="opus-4.5",
+            execution_cost=Decimal("0.25"),
+        ))
+    await async_session.commit()
+    yield async_session
+
+
+async def metric_count(session):
+    return (await session.execute(select(func.count(ExecutionMetrics.id)))).scalar()
+
+
+@pytest.mark.asyncio
+class TestMetricsBackfill:
+    """Test suite for the bulk backfill."""
+
+    async def test_dry_run_counts_without_inserting(self, async_session):
+        """Dry run returns the pending count and inserts nothing."""
+        collector = MetricsCollector(async_session)
+
+        assert await collector.backfill_metrics("project-1", dry_run=True) == 20
+        assert await metric_count(async_session) == 0
+
+    async def test_backfill_inserts_missing_metrics(self, async_session):
+        """Finished executions get one metric each, with computed durations."""
+        collector = MetricsCollector(async_session)
+        progress = []
+
+        async def on_progress(data):
+            progress.append(data)
+
+        created = await collector.backfill_metrics("project-1", chunk_size=7, progress_callback=on_progress)
+
+        assert created == 20
+        assert await metric_count(async_session) == 20
+        assert len(progress) == 5
+        assert progress[-1]["inserted"] == 20
+
+        metric = (await async_session.execute(
+            select(ExecutionMetrics).where(ExecutionMetrics.execution_id == "exec-04")
+        )).scalar_one()
+        assert metric.duration_ms == 5250
+        assert metric.status == "error"
+        assert metric.project_id == "project-1"
+        assert len(metric.id) == 36
+
+        # Derived rollups are rebuilt and checkpoint cleared
+        rolled = (await async_session.execute(select(func.sum(ProjectMetrics.execution_count)))).scalar()
+        assert rolled == 20
+        assert await async_session.get(MetricsBackfillCheckpoint, "project-1") is None
+
+        # Idempotent: the anti-join skips executions that already have metrics
+        assert await collector.backfill_metrics("project-1") == 0
+
+    async def test_backfill_resumes_from_checkpoint(self, async_session):
+        """An interrupted backfill continues after the saved rowid."""
+        async_session.add(MetricsBackfillCheckpoint(project_id="project-1", last_rowid=15))
+        await async_session.commit()
+
+        collector = MetricsCollector(async_session)
+        created = await collector.backfill_metrics("project-1", chunk_size=5)
+
+        # Only executions after rowid 15 (exec-15..exec-29) are scanned
+        assert created == 10
@@ -0,0 +1,111 @@
+"""Tests for the columnar metrics export and offline analytics."""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+
+pytest.importorskip("pyarrow")
+
+from src.models.card import Card  # noqa: E402
+from src.models.execution import Execution, ExecutionStatus  # noqa: E402
+from src.models.metrics import ExecutionMetrics  # noqa: E402
+from src.repositories.metrics_repository import MetricsRepository  # noqa: E402
+from src.services.metrics_export_service import MetricsAnalytics, MetricsExportService  # noqa: E402
+
+
+@pytest_asyncio.fixture
+async def async_session(async_session):
+    """Session with one card."""
+    async_session.add(Card(id="card-1", title="Card"))
+    await async_session.commit()
+    yield async_session
+
+
+def add_metrics(session, project_id, count, start, offset=0):
+    for i in range(offset, offset + count):
+        started_at = start + timedelta(days=i * 3)
+        session.add(ExecutionMetrics(
+            execution_id=f"exec-{project_id}-{i}",
+            card_id="card-1",
+            project_id=project_id,
+            command="/plan" if i % 2 else "/implement",
+            model_used="opus-4.5",
+            started_at=started_at,
+            completed_at=started_at + timedelta(seconds=10),
+            duration_ms=1000 * (i + 1),
+            input_tokens=100,
+            output_tokens=50,
+            total_tokens=150,
+            estimated_cost_usd=Decimal("0.250000"),
+            status="success" if i % 4 else "error",
+        ))
+
+
+@pytest.mark.asyncio
+class TestMetricsExport:
+    """Test suite for MetricsExportService and MetricsAnalytics."""
+
+    async def test_export_is_incremental(self, async_session, tmp_path):
+        """Only rows past the high-water marks are exported on later runs."""
+        start = datetime(2024, 1, 1, 9, 0, 0)
+        add_metrics(async_session, "project-1", 20, start)
+        async_session.add(Execution(
+            id="exec-running", card_id="card-1", status=ExecutionStatus.RUNNING,
+            command="/plan", started_at=start,
+        ))
+        await async_session.commit()
+
+        service = MetricsExportService(async_session, "db-1", tmp_path)
+        assert await service.export(chunk_size=7) == {
+            "execution_metrics": 20, "executions": 0, "activity_logs": 0
+        }
+        assert await service.export() == {
+            "execution_metrics": 0, "executions": 0, "activity_logs": 0
+        }
+
+        # Partitioned by project and month
+        months = {p.name for p in (tmp_path / "execution_metrics" / "project_id=project-1").iterdir()}
+        assert months == {"month=2024-01", "month=2024-02"}
+
+        # New metrics and an execution that finished since the last run
+        add_metrics(async_session, "project-1", 5, start, offset=20)
+        execution = await async_session.get(Execution, "exec-running")
+        execution.status = ExecutionStatus.SUCCESS
+        execution.completed_at = start + timedelta(minutes=5)
+        await async_session.commit()
+
+        assert await service.export() == {
+            "execution_metrics": 5, "executions": 1, "activity_logs": 0
+        }
+        assert MetricsAnalytics(tmp_path).load("execution_metrics").num_rows == 25
+
+    async def test_analytics_matches_repository(self, async_session, tmp_path):
+        """Vectorized aggregates match the live SQL aggregates."""
+        start = datetime(2024, 1, 1, 9, 0, 0)
+        add_metrics(async_session, "project-1", 12, start)
+        add_metrics(async_session, "project-2", 8, start)
+        await async_session.commit()
+
+        await MetricsExportService(async_session, "db-1", tmp_path).export()
+        analytics = MetricsAnalytics(tmp_path)
+
+        live = await MetricsRepository(async_session).get_aggregated_metrics("project-1")
+        offline = analytics.aggregated_metrics(["project-1"])
+        assert offline == live
+
+        by_project = {row["projectId"]: row for row in analytics.by_project()}
+        assert by_project["project-1"]["totalExecutions"] == 12
+        assert by_project["project-2"]["totalExecutions"] == 8
+        assert by_project["project-2"]["totalCost"] == pytest.approx(2.0)
+
+        performance = analytics.execution_performance(["project-1"], command="/plan")
+        assert performance["min"] == 2000
+        assert performance["max"] == 12000
+
+        # Date filters prune months outside the range
+        january = analytics.aggregated_metrics(
+            ["project-1"], start.date(), datetime(2024, 1, 31).date()
+        )
+        assert january["totalExecutions"] == 11
@@ -0,0 +1,186 @@
+"""Tests for MetricsRollupService (project_metrics time buckets)."""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select, func
+
+from src.models.metrics import ExecutionMetrics, ProjectMetrics
+from src.repositories.metrics_repository import MetricsRepository
+from src.services.metrics_rollup_service import MetricsRollupService, bucket_start_for
+
+
+def make_metric(index, started_at, model="opus-4.5", command="/plan", status="success"):
+    return ExecutionMetrics(
+        execution_id=f"exec-{index}",
+        card_id="card-1",
+        project_id="project-1",
+        command=command,
+        model_used=model,
+        started_at=started_at,
+        completed_at=started_at + timedelta(seconds=30),
+        duration_ms=1000 * (index + 1),
+        input_tokens=100,
+        output_tokens=50,
+        total_tokens=150,
+        estimated_cost_usd=Decimal("0.010000"),
+        status=status,
+    )
+
+
+async def bucket_counts(session):
+    result = await session.execute(
+        select(ProjectMetrics.granularity, func.sum(ProjectMetrics.execution_count))
+        .group_by(ProjectMetrics.granularity)
+    )
+    return dict(result.all())
+
+
+def test_bucket_start_for():
+    """Buckets align to the hour, day and ISO week (Monday)."""
+    ts = datetime(2024, 5, 16, 13, 45, 12)  # Thursday
+    assert bucket_start_for(ts, "hour") == datetime(2024, 5, 16, 13)
+    assert bucket_start_for(ts, "day") == datetime(2024, 5, 16)
+    assert bucket_start_for(ts, "week") == datetime(2024, 5, 13)
+
+
+@pytest.mark.asyncio
+class TestMetricsRollupService:
+    """Test suite for MetricsRollupService."""
+
+    async def test_rollups_built_from_existing_metrics(self, async_session):
+        """Dashboard reads rebuild rollups once and match raw aggregates."""
+        now = datetime.utcnow()
+        for i in range(6):
+            async_session.add(make_metric(
+                i, now - timedelta(hours=i),
+                model="opus-4.5" if i % 2 else "sonnet-4.5",
+                status="success" if i < 5 else "error",
+            ))
+        await async_session.commit()
+
+        repo = MetricsRepository(async_session)
+        by_model = await repo.get_token_usage("project-1", period="7d", group_by="model")
+        totals = {row["model"]: row["executionCount"] for row in by_model}
+        assert totals == {"opus-4.5": 3, "sonnet-4.5": 3}
+
+        aggregated = await repo.get_aggregated_metrics("project-1")
+        assert aggregated["totalExecutions"] == 6
+        assert aggregated["totalTokens"] == 900
+        assert aggregated["successRate"] == pytest.approx(83.33, abs=0.01)
+        assert aggregated["minExecutionTimeMs"] == 1000
+        assert aggregated["maxExecutionTimeMs"] == 6000
+        assert aggregated["avgExecutionTimeMs"] == 3500
+
+    async def test_first_read_rebuilds_history_after_an_early_execution(self, async_session):
+        """A bucket created by record_execution does not hide the pre-rollup history."""
+        now = datetime.utcnow()
+        for i in range(4):
+            async_session.add(make_metric(i, now - timedelta(days=i + 1)))
+        latest = make_metric(4, now)
+        async_session.add(latest)
+        await async_session.commit()
+
+        await MetricsRollupService(async_session).record_execution(
+            project_id="project-1",
+            command=latest.command,
+            model_used=latest.model_used,
+            started_at=latest.started_at,
+            duration_ms=latest.duration_ms,
+            input_tokens=latest.input_tokens,
+            output_tokens=latest.output_tokens,
+            total_tokens=latest.total_tokens,
+            estimated_cost_usd=latest.estimated_cost_usd,
+            status=latest.status,
+        )
+
+        aggregated = await MetricsRepository(async_session).get_aggregated_metrics("project-1")
+        assert aggregated["totalExecutions"] == 5
+
+    async def test_record_execution_upserts_bucket(self, async_session):
+        """Executions in the same hour/command/model share a single bucket."""
+        service = MetricsRollupService(async_session)
+        started_at = bucket_start_for(datetime.utcnow(), "hour")
+
+        for duration in (100, 300):
+            await service.record_execution(
+                project_id="project-1",
+                command="/implement",
+                model_used="opus-4.5",
+                started_at=started_at,
+                duration_ms=duration,
+                input_tokens=10,
+                output_tokens=5,
+                total_tokens=15,
+                estimated_cost_usd=Decimal("0.5"),
+                status="success",
+            )
+
+        rows = (await async_session.execute(select(ProjectMetrics))).scalars().all()
+        assert len(rows) == 1
+        bucket = rows[0]
+        assert bucket.granularity == "hour"
+        assert bucket.execution_count == 2
+        assert bucket.total_tokens == 30
+        assert bucket.min_execution_time_ms == 100
+        assert bucket.max_execution_time_ms == 300
+        assert bucket.avg_execution_time_ms == 200
+        assert float(bucket.total_cost_usd) == pytest.approx(1.0)
+
+    async def test_compaction_preserves_totals(self, async_session):
+        """Old hourly buckets become daily, old daily buckets become weekly."""
+        service = MetricsRollupService(async_session)
+        now = datetime.utcnow()
+        hourly_days = service.settings.metrics_hourly_retention_days
+        daily_days = service.settings.metrics_daily_retention_days
+
+        # Written as hourly buckets "in the past", then time moves forward
+        past = now - timedelta(days=daily_days + 30)
+        for i in range(24):
+            await service.record_execution(
+                project_id="project-1",
+                command="/plan",
+                model_used="opus-4.5",
+                started_at=past + timedelta(hours=i),
+                duration_ms=1000,
+                input_tokens=1,
+                output_tokens=1,
+                total_tokens=2,
+                estimated_cost_usd=Decimal(0),
+                status="success",
+            )
+        # Force them to be hourly regardless of age
+        await async_session.execute(
+            ProjectMetrics.__table__.update().values(granularity="hour")
+        )
+        await async_session.commit()
+
+        result = await service.compact("project-1", now=now)
+        assert result["hourToDay"] > 0
+        assert result["dayToWeek"] > 0
+
+        counts = await bucket_counts(async_session)
+        assert counts == {"week": 24}
+
+        total_tokens = (await async_session.execute(
+            select(func.sum(ProjectMetrics.total_tokens))
+        )).scalar()
+        assert total_tokens == 48
+
+        # Recent hourly data is untouched
+        await service.record_execution(
+            project_id="project-1",
+            command="/plan",
+            model_used="opus-4.5",
+            started_at=now - timedelta(days=hourly_days - 1),
+            duration_ms=1000,
+            input_tokens=1,
+            output_tokens=1,
+            total_tokens=2,
+            estimated_cost_usd=Decimal(0),
+            status="success",
+        )
+        await service.compact("project-1", now=now)
+        counts = await bucket_counts(async_session)
+        assert counts == {"week": 24, "hour": 1}
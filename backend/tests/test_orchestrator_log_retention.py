@@ -0,0 +1,57 @@
+"""Tests for the retention of orchestrator short-term memory logs."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.database import Base
+from src.models.orchestrator import OrchestratorLog, OrchestratorLogType
+from src.repositories.orchestrator_repository import LogRepository
+
+
+@pytest.mark.asyncio
+class TestOrchestratorLogRetention:
+    """Test suite for LogRepository.purge."""
+
+    async def test_purge_deletes_expired_and_caps_each_goal_in_batches(self, tmp_path):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'orchestrator.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=[OrchestratorLog.__table__])
+        session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        now = datetime.utcnow()
+        async with session_maker() as db:
+            repo = LogRepository(db)
+            for i in range(25):
+                await repo.add(OrchestratorLogType.THINK, f"idle {i}")
+            for i in range(13):
+                await repo.add(OrchestratorLogType.ACT, f"goal {i}", goal_id="goal-1")
+            await db.execute(
+                OrchestratorLog.__table__.update()
+                .where(OrchestratorLog.content.in_(["idle 0", "idle 1", "idle 2"]))
+                .values(expires_at=now - timedelta(minutes=1))
+            )
+            # Timestamps crescentes para o ranking por goal ser determinístico
+            for n, log in enumerate(await repo.get_recent(limit=100)):
+                log.timestamp = now - timedelta(seconds=n)
+            await db.commit()
+
+            totals = await repo.purge(batch_size=4, max_per_goal=10)
+            assert totals == {"expired": 3, "overCap": 15}
+
+            idle = await repo.get_recent(limit=100, log_types=[OrchestratorLogType.THINK])
+            assert len(idle) == 10 and idle[0].content == "idle 24"
+            goal = await repo.get_recent(limit=100, goal_id="goal-1")
+            assert len(goal) == 10 and goal[-1].content == "goal 3"
+
+            indexes = await db.execute(text("SELECT name FROM sqlite_master WHERE tbl_name = 'orchestrator_logs'"))
+            assert "idx_logs_goal_timestamp" in {row[0] for row in indexes}
+            plan = await db.execute(text(
+                "EXPLAIN QUERY PLAN SELECT timestamp FROM orchestrator_logs WHERE goal_id = 'goal-1' "
+                "ORDER BY timestamp DESC LIMIT 1 OFFSET 10"
+            ))
+            assert "idx_logs_goal_timestamp" in " ".join(row[-1] for row in plan)
+            assert await db.scalar(select(func.count()).select_from(OrchestratorLog)) == 20
+        await engine.dispose()
@@ -0,0 +1,52 @@
+"""Tests for layered prompt assembly and prompt cache token accounting."""
+
+from decimal import Decimal
+
+from src.agent import GEMINI_IMPLEMENT_PROMPT, GEMINI_REVIEW_PROMPT, usage_tokens
+from src.config.pricing import calculate_cost
+from src.services.prompt_builder import PromptBuilder, images_note, plan_toml_context
+
+
+class TestPromptBuilder:
+    """Test suite for PromptBuilder and usage parsing."""
+
+    def test_project_prefix_is_stable_across_cards(self, tmp_path):
+        (tmp_path / "plan.toml").write_text('name = "demo"\nstack = "fastapi"\n')
+
+        def claude_stage(command, images):
+            builder = PromptBuilder().project(plan_toml_context(str(tmp_path))).card(images_note(images))
+            return builder, builder.claude(command)
+
+        first, (prompt_a, system_a) = claude_stage("/implement specs/a.md", [{"filename": "a.png", "path": "/a.png"}])
+        second, (prompt_b, system_b) = claude_stage("/review specs/b.md", None)
+
+        assert system_a == system_b and 'name: demo' in system_a
+        assert first.prefix_hash() == second.prefix_hash()
+        assert prompt_a.startswith("/implement specs/a.md") and "a.png" in prompt_a
+        assert prompt_b == "/review specs/b.md"
+
+    def test_gemini_prompt_keeps_card_content_last(self, tmp_path):
+        prompts = [
+            PromptBuilder().system(template).project(plan_toml_context(str(tmp_path)))
+            .card(f"## Conteúdo do Plano\n\n{spec}").build()
+            for template, spec in ((GEMINI_IMPLEMENT_PROMPT, "spec one"), (GEMINI_REVIEW_PROMPT, "spec two"))
+        ]
+        assert prompts[0].startswith(GEMINI_IMPLEMENT_PROMPT.strip())
+        assert prompts[0].endswith("spec one")
+        assert "{spec_content}" not in prompts[1]
+
+    def test_cache_tokens_are_tracked_and_priced(self):
+        stats = usage_tokens({
+            "input_tokens": 100,
+            "output_tokens": 50,
+            "cache_read_input_tokens": 10_000,
+            "cache_creation_input_tokens": 2_000,
+        })
+        assert stats["total_tokens"] == 150
+        assert (stats["cache_read_tokens"], stats["cache_write_tokens"]) == (10_000, 2_000)
+        assert usage_tokens(None)["cache_read_tokens"] == 0
+
+        uncached = calculate_cost("sonnet-4.5", 12_100, 50)
+        cached = calculate_cost("sonnet-4.5", 100, 50, cache_read_tokens=12_000)
+        assert cached < uncached
+        assert cached == Decimal("0.0003") + Decimal("0.00075") + Decimal("0.0036")
@@ -0,0 +1,154 @@
+"""Tests for DDSketch and sketch-backed execution performance analysis."""
+
+import random
+import statistics
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.models.metrics import ExecutionMetrics
+from src.services.metrics_aggregator import MetricsAggregator
+from src.services.quantile_sketch import DDSketch
+
+
+def exact_quantile(values, q):
+    """Same rank definition the exact implementation used."""
+    ordered = sorted(values)
+    index = int(len(ordered) * q)
+    return ordered[index] if index < len(ordered) else ordered[-1]
+
+
+class TestDDSketch:
+    """Test suite for DDSketch."""
+
+    @pytest.mark.parametrize("seed", [1, 2, 3])
+    def test_quantiles_within_relative_accuracy(self, seed):
+        """Quantiles stay within the configured relative error of exact values."""
+        rng = random.Random(seed)
+        values = [int(rng.lognormvariate(10, 1.2)) + 1 for _ in range(20000)]
+
+        sketch = DDSketch(relative_accuracy=0.01)
+        for value in values:
+            sketch.add(value)
+
+        for q in (0.5, 0.9, 0.95, 0.99):
+            exact = exact_quantile(values, q)
+            assert sketch.quantile(q) == pytest.approx(exact, rel=0.01)
+
+        assert sketch.mean == pytest.approx(statistics.mean(values))
+        assert sketch.stdev == pytest.approx(statistics.stdev(values), rel=1e-6)
+        assert sketch.min == min(values)
+        assert sketch.max == max(values)
+
+    def test_merge_equals_single_sketch(self):
+        """Merging per-window sketches matches a sketch built over all values."""
+        rng = random.Random(42)
+        windows = [[rng.randint(100, 600000) for _ in range(1000)] for _ in range(7)]
+
+        merged = DDSketch()
+        full = DDSketch()
+        for window in windows:
+            partial = DDSketch()
+            for value in window:
+                partial.add(value)
+                full.add(value)
+            merged.merge(partial)
+
+        assert merged.count == full.count
+        assert merged.bins == full.bins
+        for q in (0.5, 0.95, 0.99):
+            assert merged.quantile(q) == full.quantile(q)
+
+    def test_serialization_roundtrip(self):
+        """to_dict/from_dict preserves the sketch."""
+        sketch = DDSketch()
+        for value in (0, 5, 10, 1500, 98000):
+            sketch.add(value)
+
+        restored = DDSketch.from_dict(sketch.to_dict())
+
+        assert restored.count == sketch.count
+        assert restored.zero_count == 1
+        assert restored.quantile(0.5) == sketch.quantile(0.5)
+
+    def test_count_above(self):
+        """count_above approximates the number of values over a threshold."""
+        sketch = DDSketch()
+        for value in range(1, 1001):
+            sketch.add(value)
+
+        # One bucket spans ~2% of the value around the threshold
+        assert sketch.count_above(900) == pytest.approx(100, abs=20)
+        assert sketch.count_above(1000) == 0
+
+    def test_empty_sketch(self):
+        """Empty sketches return zeros."""
+        sketch = DDSketch()
+        assert sketch.quantile(0.5) == 0
+        assert sketch.stdev == 0
+        assert sketch.count_above(10) == 0
+
+
+@pytest.mark.asyncio
+class TestSketchPerformanceAnalysis:
+    """analyze_execution_performance served from persisted sketches."""
+
+    async def test_matches_exact_computation(self, async_session):
+        """Percentiles from sketches match exact values within 1%."""
+        rng = random.Random(7)
+        start = datetime(2024, 1, 1)
+        durations = []
+
+        for i in range(500):
+            duration = rng.randint(1000, 900000)
+            durations.append(duration)
+            started_at = start + timedelta(hours=i)
+            async_session.add(ExecutionMetrics(
+                execution_id=f"exec-{i}",
+                card_id=f"card-{i % 10}",
+                project_id="project-1",
+                command="/implement" if i % 2 else "/plan",
+                model_used="opus-4.5",
+                started_at=started_at,
+                completed_at=started_at + timedelta(milliseconds=duration),
+                duration_ms=duration,
+                status="success",
+            ))
+        await async_session.commit()
+
+        aggregator = MetricsAggregator(async_session)
+        result = await aggregator.analyze_execution_performance("project-1")
+
+        for key, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+            assert result[key] == pytest.approx(exact_quantile(durations, q), rel=0.011)
+        assert result["mean"] == int(statistics.mean(durations))
+        assert result["min"] == min(durations)
+        assert result["max"] == max(durations)
+
+        plan_durations = durations[0::2]
+        plan = await aggregator.analyze_execution_performance("project-1", "/plan")
+        assert plan["p50"] == pytest.approx(exact_quantile(plan_durations, 0.5), rel=0.011)
+
+    async def test_sketch_coverage_checked_once_per_project(self, async_session, monkeypatch):
+        """Later reads skip the coverage COUNT once the project was verified."""
+        aggregator = MetricsAggregator(async_session)
+        calls = []
+        original = aggregator.repo.count_sketched_durations
+
+        async def counting(*args, **kwargs):
+            calls.append(args)
+            return await original(*args, **kwargs)
+
+        monkeypatch.setattr(aggregator.repo, "count_sketched_durations", counting)
+
+        await aggregator.analyze_execution_performance("project-2")
+        await aggregator.analyze_execution_performance("project-2", "/plan")
+
+        assert len(calls) == 1
+
+    async def test_empty_project(self, async_session):
+        """Projects without metrics return zeros."""
+        aggregator = MetricsAggregator(async_session)
+        result = await aggregator.analyze_execution_performance("missing")
+        assert result["p50"] == 0
+        assert result["outlierCount"] == 0
@@ -0,0 +1,140 @@
+"""Tests for ResponseCache (metrics/dashboard response caching)."""
+
+import asyncio
+
+import pytest
+
+from src.cache import ResponseCache
+
+
+@pytest.mark.asyncio
+class TestResponseCache:
+    """Test suite for ResponseCache."""
+
+    async def test_hit_returns_same_entry(self):
+        """Fresh entries are served without recomputing."""
+        cache = ResponseCache(ttl_seconds=60)
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            return {"value": calls}
+
+        first = await cache.get_or_compute("k", compute, tags=["metrics:p1"])
+        second = await cache.get_or_compute("k", compute, tags=["metrics:p1"])
+
+        assert calls == 1
+        assert first.body == second.body
+        assert first.etag == second.etag
+
+    async def test_concurrent_misses_share_one_computation(self):
+        """Single-flight: 20 concurrent viewers trigger one computation."""
+        cache = ResponseCache(ttl_seconds=60)
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"ok": True}
+
+        entries = await asyncio.gather(*[
+            cache.get_or_compute("k", compute) for _ in range(20)
+        ])
+
+        assert calls == 1
+        assert len({entry.etag for entry in entries}) == 1
+
+    async def test_invalidate_tag(self):
+        """Invalidating a tag drops only the entries that carry it."""
+        cache = ResponseCache(ttl_seconds=60)
+        values = {"a": 1, "b": 1}
+
+        async def compute_a():
+            return {"a": values["a"]}
+
+        async def compute_b():
+            return {"b": values["b"]}
+
+        await cache.get_or_compute("a", compute_a, tags=["metrics:p1"])
+        old_b = await cache.get_or_compute("b", compute_b, tags=["metrics:p2"])
+
+        values["a"] = values["b"] = 2
+        assert cache.invalidate_tag("metrics:p1") == 1
+
+        new_a = await cache.get_or_compute("a", compute_a, tags=["metrics:p1"])
+        same_b = await cache.get_or_compute("b", compute_b, tags=["metrics:p2"])
+
+        assert new_a.body == b'{"a":2}'
+        assert same_b.etag == old_b.etag
+
+    async def test_stale_while_revalidate(self):
+        """Stale entries are served while a background refresh runs."""
+        cache = ResponseCache(ttl_seconds=0, stale_seconds=60)
+        version = {"n": 1}
+
+        async def compute():
+            return {"n": version["n"]}
+
+        first = await cache.get_or_compute("k", compute, revalidate=compute)
+        version["n"] = 2
+
+        stale = await cache.get_or_compute("k", compute, revalidate=compute)
+        assert stale.etag == first.etag
+
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        refreshed = cache._entries["k"]
+        assert refreshed.body == b'{"n":2}'
+
+    async def test_invalidation_during_computation_is_not_stored(self):
+        """A result computed before an invalidation is not cached."""
+        cache = ResponseCache(ttl_seconds=60)
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return {"stale": True}
+
+        task = asyncio.create_task(cache.get_or_compute("k", slow, tags=["metrics:p1"]))
+        await asyncio.sleep(0)
+        cache.invalidate_tag("metrics:p1")
+        release.set()
+        await task
+
+        assert "k" not in cache._entries
+
+    async def test_disabled_cache_always_computes(self):
+        """With the cache disabled every call computes."""
+        cache = ResponseCache()
+        cache.enabled = False
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            return {}
+
+        await cache.get_or_compute("k", compute)
+        await cache.get_or_compute("k", compute)
+        assert calls == 2
+
+    async def test_cancelled_requester_does_not_cancel_shared_compute(self):
+        """The shared computation outlives the requester that started it."""
+        cache = ResponseCache(ttl_seconds=60)
+        started = asyncio.Event()
+
+        async def compute():
+            started.set()
+            await asyncio.sleep(0.02)
+            return {"ok": True}
+
+        first = asyncio.create_task(cache.get_or_compute("k", compute))
+        await started.wait()
+        second = asyncio.create_task(cache.get_or_compute("k", compute))
+        first.cancel()
+
+        entry = await second
+        assert entry.body == b'{"ok":true}'
+        assert cache._tasks == set()
@@ -0,0 +1,67 @@
+"""Tests for the Prometheus metrics registry and the HTTP middleware."""
+
+import asyncio
+import sys
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from src.services import telemetry
+from src.services.telemetry import EventLoopLagMonitor, HTTPMetricsMiddleware, MetricsRegistry
+
+
+@pytest.mark.asyncio
+class TestTelemetry:
+    """Test suite for the metrics registry."""
+
+    async def test_render_counters_gauges_and_cumulative_buckets(self):
+        registry = MetricsRegistry()
+        spawns = registry.counter("spawns_total", "Spawns.", ("executable",))
+        spawns.inc(executable="git")
+        spawns.inc(2, executable='we"ird')
+        registry.gauge("pool", "Pool.", ("database", "state"), callback=lambda: {("main", "idle"): 3})
+        latency = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            latency.observe(value, route="/api/cards/{card_id}")
+        registry.gauge("broken", "Broken.", callback=lambda: 1 / 0)
+
+        text = registry.render()
+        assert "# TYPE spawns_total counter" in text
+        assert 'spawns_total{executable="we\\"ird"} 2' in text
+        assert 'pool{database="main",state="idle"} 3' in text
+        assert 'latency_seconds_bucket{route="/api/cards/{card_id}",le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{route="/api/cards/{card_id}",le="1"} 2' in text
+        assert 'latency_seconds_bucket{route="/api/cards/{card_id}",le="+Inf"} 3' in text
+        assert 'latency_seconds_count{route="/api/cards/{card_id}"} 3' in text
+        assert "# broken unavailable" in text
+
+    async def test_middleware_labels_by_route_template(self, monkeypatch):
+        registry = MetricsRegistry()
+        telemetry._register_builtin_metrics(registry)
+        monkeypatch.setattr(telemetry, "_registry", registry)
+
+        app = FastAPI()
+        app.add_middleware(HTTPMetricsMiddleware)
+
+        @app.get("/api/cards/{card_id}")
+        async def get_card(card_id: str):
+            return {"id": card_id}
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            await client.get("/api/cards/a")
+            await client.get("/api/cards/b")
+            await client.get("/nope")
+
+        durations = registry.metrics["http_request_duration_seconds"]
+        assert durations.count(method="GET", route="/api/cards/{card_id}", status=200) == 2
+        assert durations.count(method="GET", route="unmatched", status=404) == 1
+
+        monitor = EventLoopLagMonitor(interval=0.01)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+        assert registry.metrics["event_loop_lag"].count() >= 1
+
+        telemetry._audit_hook("subprocess.Popen", (sys.executable, [sys.executable], None, None))
+        assert registry.metrics["subprocess_spawns_total"].value(executable=sys.executable.rsplit("/", 1)[-1]) == 1
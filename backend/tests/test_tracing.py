@@ -0,0 +1,57 @@
+"""Tests for cycle tracing and step latency histograms."""
+
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.services import tracing
+from src.services.tracing import Tracer
+
+
+@pytest.mark.asyncio
+class TestTracing:
+    """Test suite for Tracer."""
+
+    async def test_cycle_trace_nests_steps_sql_and_exports_otlp(self, tmp_path, monkeypatch):
+        tracer = Tracer(export_path=str(tmp_path / "traces.jsonl"))
+        monkeypatch.setattr(tracing, "_tracer", tracer)
+        tracing.instrument_sqlalchemy()
+        engine = create_async_engine("sqlite+aiosqlite://")
+
+        async def stage(name):
+            with tracer.span(name):
+                await asyncio.sleep(0.01)
+
+        with tracer.trace("orchestrator.cycle") as cycle:
+            with tracer.span("orchestrator.read"):
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+            with tracer.span("orchestrator.act"):
+                await asyncio.gather(stage("agent.plan"), stage("agent.implement"))
+            with pytest.raises(RuntimeError):
+                with tracer.span("orchestrator.record"):
+                    raise RuntimeError("falhou")
+        with tracer.span("git"):  # fora de um ciclo: só histograma
+            pass
+        await tracer.close()
+        await engine.dispose()
+
+        perf = tracer.perf()
+        steps = perf["steps"]
+        assert steps["agent.plan"]["count"] == 1 and steps["agent.plan"]["p50Ms"] >= 9
+        assert steps["orchestrator.record"]["errors"] == 1 and steps["git"]["count"] == 1
+        assert steps["sql.select"]["buckets"]["+Inf"] >= 1
+        assert perf["recentTraces"][0]["traceId"] == cycle.trace_id
+        assert "agent.implement" in perf["recentTraces"][0]["steps"]
+
+        lines = (tmp_path / "traces.jsonl").read_text().splitlines()
+        assert len(lines) == 1
+        spans = json.loads(lines[0])["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        by_name = {span["name"]: span for span in spans}
+        assert by_name["agent.plan"]["parentSpanId"] == by_name["orchestrator.act"]["spanId"]
+        assert by_name["sql.select"]["parentSpanId"] == by_name["orchestrator.read"]["spanId"]
+        assert by_name["orchestrator.record"]["status"]["code"] == 2
+        assert "parentSpanId" not in by_name["orchestrator.cycle"] and "git" not in by_name
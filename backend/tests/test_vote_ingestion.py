@@ -0,0 +1,98 @@
+"""Tests for vote ingestion (dedup, batched flush, throttled broadcasts)."""
+
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+
+from src.models.live import Vote, VotingOption
+from src.services import voting_service as voting_module
+from src.services.backplane import InProcessBackplane
+from src.services.vote_ingestion import BloomFilter, VoteIngestion
+from src.services.voting_service import VotingService
+
+
+@pytest.mark.asyncio
+class TestVoteIngestion:
+    """Test suite for VoteIngestion and the throttled VotingService."""
+
+    async def test_bloom_filter_has_no_false_negatives(self):
+        bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+        for i in range(10_000):
+            bloom.add(f"session-{i}")
+
+        assert all(f"session-{i}" in bloom for i in range(10_000))
+        false_positives = sum(f"other-{i}" in bloom for i in range(10_000))
+        assert false_positives < 300
+
+    async def test_dedup_beyond_exact_set_and_ip_cap(self):
+        """Sessions past the exact set are still rejected; one IP is capped."""
+        ingestion = VoteIngestion(session_factory=None, max_exact_sessions=10, max_votes_per_ip=3)
+        ingestion.start("round-1", ["a"])
+        for i in range(50):
+            assert ingestion.admit(f"s{i}", None) is None
+            ingestion.record("a", f"s{i}", None)
+
+        assert ingestion.admit("s42", None) == "You have already voted in this round"
+        assert ingestion.count("a") == 50
+
+        for i in range(3):
+            ingestion.record("a", f"nat-{i}", "10.0.0.1")
+        assert ingestion.admit("nat-new", "10.0.0.1") == "Too many votes from this network"
+        ingestion._task.cancel()
+
+    async def test_burst_is_one_transaction_and_few_broadcasts(self, session_maker, monkeypatch):
+        """A burst of votes becomes one flush and a handful of count broadcasts."""
+        monkeypatch.setattr(VotingService, "_instance", None)
+        monkeypatch.setattr(voting_module, "get_backplane", lambda: InProcessBackplane())
+        service = VotingService()
+        service._ingestion.session_factory = session_maker
+        updates = []
+
+        async def on_update(votes):
+            updates.append(votes)
+
+        service.on_update(on_update)
+
+        async with session_maker() as db:
+            _, options = await service.start_round(db, duration_seconds=60)
+            for i in range(2000):
+                ok, _, _ = await service.vote(db, options[i % 2].id, f"s{i}", f"ip-{i}")
+                assert ok
+                if i % 500 == 0:
+                    await asyncio.sleep(0.1)
+
+            assert await service._ingestion.flush()
+            stored = await db.scalar(select(func.count()).select_from(Vote))
+            assert stored == 2000
+            await asyncio.sleep(0.3)
+
+            # 4 Hz: ~0.4s of voting plus the flush produce only a few broadcasts
+            assert 1 <= len(updates) <= 5
+            assert sum(updates[-1].values()) == 2000
+
+            await service.end_round(db)
+            tallied = await db.scalar(select(func.sum(VotingOption.vote_count)))
+            assert tallied == 2000
+
+    async def test_live_tallies_do_not_overwrite_flushed_counts(self, session_maker, monkeypatch):
+        """Committing the caller's session never writes the in-memory tallies."""
+        monkeypatch.setattr(VotingService, "_instance", None)
+        monkeypatch.setattr(voting_module, "get_backplane", lambda: InProcessBackplane())
+        service = VotingService()
+        service._ingestion.session_factory = session_maker
+
+        async with session_maker() as db:
+            _, options = await service.start_round(db, duration_seconds=60)
+            for i in range(10):
+                await service.vote(db, options[0].id, f"s{i}", None)
+            assert await service._ingestion.flush()
+
+            for i in range(10, 15):
+                await service.vote(db, options[0].id, f"s{i}", None)
+            await db.commit()
+            assert await service._ingestion.flush()
+
+            tallied = await db.scalar(select(func.sum(VotingOption.vote_count)))
+            assert tallied == 15
+            await service.end_round(db)
@@ -0,0 +1,118 @@
+"""Tests for WebSocketBroadcaster (per-client queues and slow consumers)."""
+
+import asyncio
+
+import pytest
+
+from src.services.ws_broadcaster import WebSocketBroadcaster, SlowConsumerPolicy
+
+
+class FakeWebSocket:
+    """Records sent frames; optionally blocks until released."""
+
+    def __init__(self, blocked: bool = False):
+        self.sent = []
+        self.closed_with = None
+        self.release = asyncio.Event()
+        if not blocked:
+            self.release.set()
+
+    async def send_text(self, text):
+        await self.release.wait()
+        self.sent.append(text)
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+async def drain():
+    for _ in range(5):
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+class TestWebSocketBroadcaster:
+    """Test suite for WebSocketBroadcaster."""
+
+    async def test_serializes_once_and_shares_text(self):
+        """Every recipient gets the same string object."""
+        broadcaster = WebSocketBroadcaster("test")
+        sockets = [FakeWebSocket() for _ in range(3)]
+        for ws in sockets:
+            broadcaster.add(ws)
+
+        assert broadcaster.publish({"type": "log", "content": "hi"}) == 3
+        await drain()
+
+        texts = [ws.sent[0] for ws in sockets]
+        assert texts[0] == '{"type": "log", "content": "hi"}'
+        assert all(text is texts[0] for text in texts)
+
+    async def test_slow_client_does_not_block_others(self):
+        """A stuck socket only delays itself."""
+        broadcaster = WebSocketBroadcaster("test", max_queue=10)
+        slow = FakeWebSocket(blocked=True)
+        fast = FakeWebSocket()
+        broadcaster.add(slow)
+        broadcaster.add(fast)
+
+        for i in range(5):
+            broadcaster.publish({"n": i})
+        await drain()
+
+        assert len(fast.sent) == 5
+        assert slow.sent == []
+
+        slow.release.set()
+        await drain()
+        assert len(slow.sent) == 5
+
+    async def test_drop_policy_keeps_newest(self):
+        """Full queues discard the oldest message."""
+        broadcaster = WebSocketBroadcaster("test", policy=SlowConsumerPolicy.DROP, max_queue=3)
+        slow = FakeWebSocket(blocked=True)
+        client = broadcaster.add(slow)
+        broadcaster.publish({"n": 0})
+        await drain()  # writer now blocked sending the first message
+
+        for i in range(1, 10):
+            broadcaster.publish({"n": i})
+        assert client.dropped == 6
+
+        slow.release.set()
+        await drain()
+        assert slow.sent == ['{"n": 0}', '{"n": 7}', '{"n": 8}', '{"n": 9}']
+
+    async def test_coalesce_policy_replaces_pending_update(self):
+        """Keyed updates replace the queued one with the same key."""
+        broadcaster = WebSocketBroadcaster("test", policy=SlowConsumerPolicy.COALESCE)
+        slow = FakeWebSocket(blocked=True)
+        broadcaster.add(slow)
+        broadcaster.publish({"type": "log"})
+        await drain()
+
+        for count in range(1, 6):
+            broadcaster.publish({"type": "presence_update", "count": count}, coalesce_key="presence")
+        broadcaster.publish({"type": "log", "n": 2})
+
+        slow.release.set()
+        await drain()
+        assert slow.sent == [
+            '{"type": "log"}',
+            '{"type": "presence_update", "count": 5}',
+            '{"type": "log", "n": 2}',
+        ]
+
+    async def test_disconnect_policy_closes_slow_client(self):
+        """Overflowing a disconnect-policy queue closes and removes the client."""
+        broadcaster = WebSocketBroadcaster("test", policy=SlowConsumerPolicy.DISCONNECT, max_queue=2)
+        slow = FakeWebSocket(blocked=True)
+        broadcaster.add(slow, group="card-1")
+
+        for i in range(5):
+            broadcaster.publish({"n": i}, group="card-1")
+        await drain()
+
+        assert slow.closed_with == 1013
+        assert broadcaster.count() == 0
+        assert broadcaster.publish({"n": 99}, group="card-1") == 0
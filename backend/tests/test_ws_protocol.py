@@ -0,0 +1,124 @@
+"""Tests for WebSocket protocol negotiation, binary frames and card deltas."""
+
+import asyncio
+
+import pytest
+
+from src.services import ws_protocol
+from src.services.backplane import InProcessBackplane
+from src.services.card_ws import CardWebSocketManager, card_diff
+from src.services.ws_broadcaster import WebSocketBroadcaster
+
+
+class FakeWebSocket:
+    """Records text and binary frames; carries a handshake scope."""
+
+    def __init__(self, subprotocols=None, query_string=b""):
+        self.scope = {"type": "websocket", "subprotocols": subprotocols or [], "query_string": query_string}
+        self.sent = []
+        self.accepted_subprotocol = "unset"
+
+    @property
+    def query_params(self):
+        from starlette.datastructures import QueryParams
+        return QueryParams(self.scope["query_string"])
+
+    async def accept(self, subprotocol=None):
+        self.accepted_subprotocol = subprotocol
+
+    async def send_text(self, text):
+        self.sent.append(text)
+
+    async def send_bytes(self, data):
+        self.sent.append(data)
+
+    async def close(self, code=1000):
+        pass
+
+    def messages(self):
+        return [ws_protocol.decode(frame) for frame in self.sent]
+
+
+async def drain():
+    for _ in range(5):
+        await asyncio.sleep(0.01)
+
+
+CARD = {"id": "c1", "title": "Login", "columnId": "backlog", "description": "x" * 500, "specPath": None}
+
+
+@pytest.mark.asyncio
+class TestWsProtocol:
+    """Test suite for protocol negotiation and delta broadcasts."""
+
+    async def test_negotiation_via_subprotocol_and_query(self):
+        """Subprotocol wins; query params are the fallback; unknown means JSON."""
+        ws = FakeWebSocket(subprotocols=["chat", "orq.v1.json.delta"])
+        assert ws_protocol.negotiate(ws) == ("orq.v1.json.delta", "json", frozenset({"delta"}))
+
+        ws = FakeWebSocket(query_string=b"delta=1")
+        assert ws_protocol.negotiate(ws) == (None, "json", frozenset({"delta"}))
+
+        ws = FakeWebSocket(subprotocols=["orq.v1.xml"], query_string=b"encoding=yaml")
+        assert ws_protocol.negotiate(ws) == (None, "json", frozenset())
+
+    async def test_msgpack_clients_receive_binary_frames(self):
+        """Each encoding is serialized once and sent with the matching frame type."""
+        pytest.importorskip("msgpack")
+        broadcaster = WebSocketBroadcaster("test")
+        json_ws, msgpack_ws = FakeWebSocket(), FakeWebSocket()
+        broadcaster.add(json_ws)
+        broadcaster.add(msgpack_ws, encoding="msgpack")
+
+        broadcaster.publish({"type": "log", "content": "hi"})
+        await drain()
+
+        assert isinstance(json_ws.sent[0], str)
+        assert isinstance(msgpack_ws.sent[0], bytes)
+        assert json_ws.messages() == msgpack_ws.messages() == [{"type": "log", "content": "hi"}]
+
+    async def test_card_delta_sent_only_to_negotiated_clients(self):
+        """Delta clients get changed fields keyed by version; others the full card."""
+        manager = CardWebSocketManager(InProcessBackplane())
+        full_ws, delta_ws = FakeWebSocket(), FakeWebSocket()
+        manager.broadcaster.add(full_ws)
+        manager.broadcaster.add(delta_ws, features=frozenset({"delta"}))
+
+        await manager.broadcast_card_created("c1", CARD)
+        await manager.broadcast_card_moved("c1", "backlog", "plan", {**CARD, "columnId": "plan"})
+        await drain()
+
+        created, moved = delta_ws.messages()
+        assert moved["type"] == "card_delta"
+        assert moved["baseVersion"] == created["version"]
+        assert moved["version"] > created["version"]
+        assert moved["changes"] == {"columnId": "plan"}
+        assert (moved["fromColumn"], moved["toColumn"]) == ("backlog", "plan")
+
+        full = full_ws.messages()[1]
+        assert full["type"] == "card_moved"
+        assert full["card"]["description"] == CARD["description"]
+        assert len(delta_ws.sent[1]) < len(full_ws.sent[1]) / 3
+
+    async def test_card_sync_resends_full_card(self):
+        """A client with a stale base asks for the current full card."""
+        manager = CardWebSocketManager(InProcessBackplane())
+        ws = FakeWebSocket()
+        manager.broadcaster.add(ws, features=frozenset({"delta"}))
+        await manager.broadcast_card_updated("c1", CARD)
+        await drain()
+        ws.sent.clear()
+
+        manager.handle_client_message(ws, {"type": "card_sync", "cardId": "c1"})
+        manager.handle_client_message(ws, {"type": "ping"})
+        await drain()
+
+        synced, pong = ws.messages()
+        assert synced["type"] == "card_updated"
+        assert synced["card"] == CARD
+        assert pong == {"type": "pong"}
+
+    async def test_card_diff_reports_removed_fields(self):
+        changes, removed = card_diff({"a": 1, "b": 2}, {"a": 1, "c": 3})
+        assert changes == {"c": 3}
+        assert removed == ["b"]
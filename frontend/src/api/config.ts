@@ -41,6 +41,9 @@ export const API_CONFIG = {
 export const API_ENDPOINTS = {
   // Cards
   cards: `${API_CONFIG.BASE_URL}/api/cards`,
+  cardsSearch: `${API_CONFIG.BASE_URL}/api/cards/search`,
+  cardsBulk: `${API_CONFIG.BASE_URL}/api/cards/bulk`,
+  cardsBulkMove: `${API_CONFIG.BASE_URL}/api/cards/bulk/move`,
 
   // Projects
   projects: {
@@ -59,6 +62,10 @@ export const API_ENDPOINTS = {
 
   // Logs
   logs: `${API_CONFIG.BASE_URL}/api/logs`,
+  logsSearch: `${API_CONFIG.BASE_URL}/api/logs/search`,
+
+  // Background jobs
+  jobs: `${API_CONFIG.BASE_URL}/api/jobs`,
 
   // Execution endpoints
   execution: {
@@ -67,6 +74,8 @@ export const API_ENDPOINTS = {
     test: `${API_CONFIG.BASE_URL}/api/execute-test`,
     review: `${API_CONFIG.BASE_URL}/api/execute-review`,
     expertTriage: `${API_CONFIG.BASE_URL}/api/execute-expert-triage`,
+    queue: `${API_CONFIG.BASE_URL}/api/executions/queue`,
+    cancel: (cardId: string) => `${API_CONFIG.BASE_URL}/api/executions/${cardId}/cancel`,
   },
 
   // Git worktree isolation endpoints
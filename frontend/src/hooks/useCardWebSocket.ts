@@ -1,4 +1,4 @@
-import { useCallback, useMemo } from 'react';
+import { useCallback, useMemo, useRef } from 'react';
 import { Card, ColumnId } from '../types';
 import { useWebSocketBase } from './useWebSocketBase';
 import { WS_ENDPOINTS } from '../api/config';
@@ -9,6 +9,7 @@ export interface CardMovedMessage {
   fromColumn: ColumnId;
   toColumn: ColumnId;
   card: Card;
+  version?: number;
   timestamp: string;
 }
 
@@ -16,6 +17,7 @@ export interface CardUpdatedMessage {
   type: 'card_updated';
   cardId: string;
   card: Card;
+  version?: number;
   timestamp: string;
 }
 
@@ -23,10 +25,48 @@ export interface CardCreatedMessage {
   type: 'card_created';
   cardId: string;
   card: Card;
+  version?: number;
   timestamp: string;
 }
 
-type WebSocketMessage = CardMovedMessage | CardUpdatedMessage | CardCreatedMessage;
+/** Only the fields that changed since baseVersion (negotiated with ?delta=1) */
+export interface CardDeltaMessage {
+  type: 'card_delta';
+  event: 'moved' | 'updated';
+  cardId: string;
+  baseVersion: number;
+  version: number;
+  changes: Partial<Card>;
+  removed: string[];
+  fromColumn?: ColumnId;
+  toColumn?: ColumnId;
+  timestamp: string;
+}
+
+/** Bulk operations: one event for many cards, each with its own version */
+export interface CardsBatchMessage {
+  type: 'cards_created' | 'cards_moved' | 'cards_updated';
+  cards: Array<{
+    cardId: string;
+    card: Card;
+    version: number;
+    fromColumn?: ColumnId;
+    toColumn?: ColumnId;
+  }>;
+  timestamp: string;
+}
+
+type WebSocketMessage =
+  | CardMovedMessage
+  | CardUpdatedMessage
+  | CardCreatedMessage
+  | CardDeltaMessage
+  | CardsBatchMessage;
+
+interface VersionedCard {
+  version: number;
+  card: Card;
+}
 
 interface UseCardWebSocketProps {
   onCardMoved?: (message: CardMovedMessage) => void;
@@ -41,9 +81,85 @@ export function useCardWebSocket({
   onCardCreated,
   enabled = true
 }: UseCardWebSocketProps) {
+  // Último estado conhecido de cada card, base para aplicar os deltas
+  const cardsRef = useRef<Map<string, VersionedCard>>(new Map());
+  const sendRef = useRef<(data: unknown) => boolean>(() => false);
+
+  const remember = useCallback((cardId: string, card: Card | null, version?: number) => {
+    if (card && version !== undefined) {
+      cardsRef.current.set(cardId, { version, card });
+    } else {
+      cardsRef.current.delete(cardId);
+    }
+  }, []);
+
   const handleMessage = useCallback((data: unknown) => {
     const message = data as WebSocketMessage;
 
+    if (message.type === 'card_delta') {
+      const known = cardsRef.current.get(message.cardId);
+      if (!known || known.version !== message.baseVersion) {
+        // Perdemos uma versão: pede o card completo (chega como card_updated)
+        cardsRef.current.delete(message.cardId);
+        sendRef.current({ type: 'card_sync', cardId: message.cardId });
+        return;
+      }
+      const card = { ...known.card, ...message.changes } as Card;
+      for (const field of message.removed) {
+        delete (card as unknown as Record<string, unknown>)[field];
+      }
+      cardsRef.current.set(message.cardId, { version: message.version, card });
+
+      if (message.event === 'moved') {
+        console.log(`[CardWS] Card ${message.cardId} moved from ${message.fromColumn} to ${message.toColumn}`);
+        onCardMoved?.({
+          type: 'card_moved',
+          cardId: message.cardId,
+          fromColumn: message.fromColumn as ColumnId,
+          toColumn: message.toColumn as ColumnId,
+          card,
+          version: message.version,
+          timestamp: message.timestamp,
+        });
+      } else {
+        console.log(`[CardWS] Card ${message.cardId} updated`);
+        onCardUpdated?.({
+          type: 'card_updated',
+          cardId: message.cardId,
+          card,
+          version: message.version,
+          timestamp: message.timestamp,
+        });
+      }
+      return;
+    }
+
+    if (message.type === 'cards_created' || message.type === 'cards_moved' || message.type === 'cards_updated') {
+      // Lote: entrega cada card como o evento individual equivalente
+      console.log(`[CardWS] ${message.type}: ${message.cards.length} cards`);
+      for (const item of message.cards) {
+        remember(item.cardId, item.card, item.version);
+        const base = { cardId: item.cardId, card: item.card, version: item.version, timestamp: message.timestamp };
+        if (message.type === 'cards_created') {
+          onCardCreated?.({ type: 'card_created', ...base });
+        } else if (message.type === 'cards_moved') {
+          onCardMoved?.({
+            type: 'card_moved',
+            ...base,
+            fromColumn: item.fromColumn as ColumnId,
+            toColumn: item.toColumn as ColumnId,
+          });
+        } else {
+          onCardUpdated?.({ type: 'card_updated', ...base });
+        }
+      }
+      return;
+    }
+
+    if (message.type === 'card_moved' || message.type === 'card_updated' || message.type === 'card_created') {
+      remember(message.cardId, message.card, message.version);
+    }
+
     switch (message.type) {
       case 'card_moved':
         console.log(`[CardWS] Card ${message.cardId} moved from ${message.fromColumn} to ${message.toColumn}`);
@@ -58,16 +174,18 @@ export function useCardWebSocket({
         onCardCreated?.(message);
         break;
     }
-  }, [onCardMoved, onCardUpdated, onCardCreated]);
+  }, [onCardMoved, onCardUpdated, onCardCreated, remember]);
 
-  const { isConnected, status, reconnect } = useWebSocketBase({
-    url: WS_ENDPOINTS.cards,
+  const { isConnected, status, reconnect, send } = useWebSocketBase({
+    // delta=1: atualizações de card chegam só com os campos alterados
+    url: `${WS_ENDPOINTS.cards}?delta=1`,
     enabled,
     onMessage: handleMessage,
     name: 'CardWS',
     maxReconnectAttempts: 10,
     heartbeatInterval: 30000,
   });
+  sendRef.current = send;
 
   return useMemo(() => ({
     isConnected,
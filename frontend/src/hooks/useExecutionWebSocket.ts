@@ -1,11 +1,11 @@
-import { useCallback, useMemo } from 'react';
+import { useCallback, useMemo, useRef } from 'react';
 import { useWebSocketBase } from './useWebSocketBase';
 import { WS_ENDPOINTS } from '../api/config';
 
 interface ExecutionCompleteMessage {
   type: 'execution_complete';
   cardId: string;
-  status: 'success' | 'error';
+  status: 'success' | 'error' | 'cancelled';
   command: string;
   tokenStats?: { inputTokens: number; outputTokens: number; totalTokens: number };
   costStats?: { totalCost: number; planCost: number; implementCost: number; testCost: number; reviewCost: number };
@@ -21,13 +21,69 @@ interface LogMessage {
   timestamp: string;
 }
 
-type WebSocketMessage = ExecutionCompleteMessage | LogMessage;
+export interface StreamedLog {
+  seq: number;
+  timestamp: string;
+  logType: string;
+  content: string;
+}
+
+/** Lote de linhas enviado a cada ~100ms durante a execução */
+interface LogBatchMessage {
+  type: 'log_batch';
+  cardId: string;
+  epoch: string | null;
+  fromSeq: number;
+  toSeq: number;
+  logs: StreamedLog[];
+}
+
+/** Resposta ao "resume": linhas após o último seq visto */
+interface LogBackfillMessage {
+  type: 'log_backfill';
+  cardId: string;
+  epoch: string | null;
+  lastSeq: number;
+  truncated: boolean;
+  logs: StreamedLog[];
+}
+
+/** Execução aguardando vaga no governor (posição na fila) ou recém-admitida */
+export interface ExecutionQueueMessage {
+  type: 'execution_queued' | 'execution_admitted';
+  cardId: string;
+  command: string;
+  model: string;
+  projectId: string;
+  waitedMs: number;
+  position?: number;
+  queued?: number;
+  reason?: 'global' | 'model' | 'project' | 'rate';
+}
+
+type WebSocketMessage =
+  | ExecutionCompleteMessage
+  | LogMessage
+  | LogBatchMessage
+  | LogBackfillMessage
+  | ExecutionQueueMessage;
+
+/**
+ * `onLogs` recebe linhas novas (sem duplicatas). `reset` indica nova execução
+ * (epoch diferente) ou backfill truncado: o cliente deve substituir o log atual.
+ */
+type OnLogs = (logs: StreamedLog[], reset: boolean) => void;
 
 export function useExecutionWebSocket(
   cardId: string | null,
   onComplete?: (msg: ExecutionCompleteMessage) => void,
-  onLog?: (msg: LogMessage) => void
+  onLog?: (msg: LogMessage) => void,
+  onLogs?: OnLogs,
+  onQueue?: (msg: ExecutionQueueMessage) => void
 ) {
+  // Cursor do stream: em reconexões só as linhas após lastSeq são reenviadas
+  const cursorRef = useRef<{ epoch: string | null; lastSeq: number }>({ epoch: null, lastSeq: 0 });
+
   const handleMessage = useCallback((data: unknown) => {
     const msg = data as WebSocketMessage;
 
@@ -35,17 +91,40 @@ export function useExecutionWebSocket(
       onComplete(msg as ExecutionCompleteMessage);
     } else if (msg.type === 'log' && onLog) {
       onLog(msg as LogMessage);
+    } else if ((msg.type === 'execution_queued' || msg.type === 'execution_admitted') && onQueue) {
+      onQueue(msg);
+    } else if (msg.type === 'log_batch' || msg.type === 'log_backfill') {
+      const cursor = cursorRef.current;
+      const reset = msg.epoch !== cursor.epoch || (msg.type === 'log_backfill' && msg.truncated);
+      const fresh = reset ? msg.logs : msg.logs.filter((log) => log.seq > cursor.lastSeq);
+
+      cursorRef.current = {
+        epoch: msg.epoch,
+        lastSeq: msg.type === 'log_batch' ? msg.toSeq : msg.lastSeq,
+      };
+      if (onLogs && (fresh.length > 0 || reset)) {
+        onLogs(fresh, reset);
+      }
     }
-  }, [onComplete, onLog]);
+  }, [onComplete, onLog, onLogs, onQueue]);
+
+  const sendRef = useRef<(data: unknown) => boolean>(() => false);
+
+  const handleOpen = useCallback(() => {
+    const { epoch, lastSeq } = cursorRef.current;
+    sendRef.current({ type: 'resume', afterSeq: lastSeq, epoch });
+  }, []);
 
-  const { isConnected, status, reconnect } = useWebSocketBase({
+  const { isConnected, status, reconnect, send } = useWebSocketBase({
     url: cardId ? WS_ENDPOINTS.execution(cardId) : '',
     enabled: !!cardId,
+    onOpen: handleOpen,
     onMessage: handleMessage,
     name: `ExecWS:${cardId?.slice(0, 8) || 'none'}`,
     maxReconnectAttempts: 10,
     heartbeatInterval: 30000,
   });
+  sendRef.current = send;
 
   return useMemo(() => ({
     isConnected,
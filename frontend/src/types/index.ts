@@ -62,6 +62,8 @@ export interface TokenStats {
   inputTokens: number;
   outputTokens: number;
   totalTokens: number;
+  cacheReadTokens?: number;
+  cacheWriteTokens?: number;
   executionCount: number;
 }
 